@@ -19,7 +19,7 @@ import imp
 __all__ = ["compile_dir","compile_file","compile_path"]
 
 def compile_dir(dir, maxlevels=10, ddir=None,
-                force=0, rx=None, quiet=0):
+                force=0, rx=None, quiet=0, workers=1):
     """Byte-compile all modules in the given directory tree.
 
     Arguments (only dir is required):
@@ -30,7 +30,13 @@ def compile_dir(dir, maxlevels=10, ddir=None,
                file as it is compiled into each byte-code file.
     force:     if 1, force compilation, even if timestamps are up-to-date
     quiet:     if 1, be quiet during compilation
+    workers:   number of worker processes compiling in parallel; 0 means
+               one per CPU (default 1)
     """
+    if workers != 1:
+        # PyPy extension
+        files = _walk_dir(dir, maxlevels, ddir, quiet)
+        return _compile_files_in_workers(files, force, rx, quiet, workers)
     if not quiet:
         print 'Listing', dir, '...'
     try:
@@ -58,6 +64,58 @@ def compile_dir(dir, maxlevels=10, ddir=None,
                 success = 0
     return success
 
+def _walk_dir(dir, maxlevels, ddir, quiet):
+    """Yield (fullname, ddir) for the files that compile_dir() would
+    consider, in the same order."""
+    if not quiet:
+        print 'Listing', dir, '...'
+    try:
+        names = os.listdir(dir)
+    except os.error:
+        print "Can't list", dir
+        names = []
+    names.sort()
+    for name in names:
+        fullname = os.path.join(dir, name)
+        if ddir is not None:
+            dfile = os.path.join(ddir, name)
+        else:
+            dfile = None
+        if not os.path.isdir(fullname):
+            yield fullname, ddir
+        elif maxlevels > 0 and \
+             name != os.curdir and name != os.pardir and \
+             os.path.isdir(fullname) and \
+             not os.path.islink(fullname):
+            for item in _walk_dir(fullname, maxlevels - 1, dfile, quiet):
+                yield item
+
+def _compile_file_args(args):
+    return compile_file(*args)
+
+def _compile_files_in_workers(files, force, rx, quiet, workers):
+    """Byte-compile the (fullname, ddir) pairs in worker processes.  Each
+    .pyc file is written by py_compile, which replaces it atomically."""
+    try:
+        import multiprocessing
+    except ImportError:
+        multiprocessing = None
+    tasks = [(fullname, ddir, force, rx, quiet) for fullname, ddir in files]
+    if multiprocessing is None or len(tasks) <= 1:
+        results = map(_compile_file_args, tasks)
+    else:
+        pool = multiprocessing.Pool(workers or None)
+        try:
+            results = pool.map(_compile_file_args, tasks, chunksize=16)
+        finally:
+            pool.terminate()
+            pool.join()
+    success = 1
+    for ok in results:
+        if not ok:
+            success = 0
+    return success
+
 def compile_file(fullname, ddir=None, force=0, rx=None, quiet=0):
     """Byte-compile one file.
 
@@ -110,7 +168,7 @@ def compile_file(fullname, ddir=None, force=0, rx=None, quiet=0):
                     success = 0
     return success
 
-def compile_path(skip_curdir=1, maxlevels=0, force=0, quiet=0):
+def compile_path(skip_curdir=1, maxlevels=0, force=0, quiet=0, workers=1):
     """Byte-compile all module on sys.path.
 
     Arguments (all optional):
@@ -119,6 +177,7 @@ def compile_path(skip_curdir=1, maxlevels=0, force=0, quiet=0):
     maxlevels:   max recursion level (default 0)
     force: as for compile_dir() (default 0)
     quiet: as for compile_dir() (default 0)
+    workers: as for compile_dir() (default 1)
     """
     success = 1
     for dir in sys.path:
@@ -126,7 +185,8 @@ def compile_path(skip_curdir=1, maxlevels=0, force=0, quiet=0):
             print 'Skipping current directory'
         else:
             success = success and compile_dir(dir, maxlevels, None,
-                                              force, quiet=quiet)
+                                              force, quiet=quiet,
+                                              workers=workers)
     return success
 
 def expand_args(args, flist):
@@ -152,11 +212,14 @@ def main():
     """Script main program."""
     import getopt
     try:
-        opts, args = getopt.getopt(sys.argv[1:], 'lfqd:x:i:')
-    except getopt.error, msg:
+        opts, args = getopt.getopt(sys.argv[1:], 'lfqd:x:i:j:')
+        for o, a in opts:
+            if o == '-j':
+                int(a)
+    except (getopt.error, ValueError), msg:
         print msg
         print "usage: python compileall.py [-l] [-f] [-q] [-d destdir] " \
-              "[-x regexp] [-i list] [directory|file ...]"
+              "[-x regexp] [-i list] [-j workers] [directory|file ...]"
         print
         print "arguments: zero or more file and directory names to compile; " \
               "if no arguments given, "
@@ -177,6 +240,9 @@ def main():
         print "-i file: add all the files and directories listed in file to " \
               "the list considered for"
         print '         compilation; if "-", names are read from stdin'
+        print "-j workers: use this many worker processes to compile " \
+              "directories; 0 means"
+        print "            one per CPU"
 
         sys.exit(2)
     maxlevels = 10
@@ -185,6 +251,7 @@ def main():
     quiet = 0
     rx = None
     flist = None
+    workers = 1
     for o, a in opts:
         if o == '-l': maxlevels = 0
         if o == '-d': ddir = a
@@ -194,6 +261,7 @@ def main():
             import re
             rx = re.compile(a)
         if o == '-i': flist = a
+        if o == '-j': workers = int(a)
     if ddir:
         if len(args) != 1 and not os.path.isdir(args[0]):
             print "-d destdir require exactly one directory argument"
@@ -210,13 +278,13 @@ def main():
                 for arg in args:
                     if os.path.isdir(arg):
                         if not compile_dir(arg, maxlevels, ddir,
-                                           force, rx, quiet):
+                                           force, rx, quiet, workers):
                             success = 0
                     else:
                         if not compile_file(arg, ddir, force, rx, quiet):
                             success = 0
         else:
-            success = compile_path()
+            success = compile_path(workers=workers)
     except KeyboardInterrupt:
         print "\n[interrupted]"
         success = 0
@@ -41,6 +41,7 @@ class GzipFile(io.BufferedIOBase):
 
     myfileobj = None
     max_read_chunk = 10 * 1024 * 1024   # 10Mb
+    _bulk_chunks = None
 
     def __init__(self, filename=None, mode=None,
                  compresslevel=9, fileobj=None, mtime=None):
@@ -256,12 +257,7 @@ class GzipFile(io.BufferedIOBase):
 
         readsize = 1024
         if size < 0:        # get the whole thing
-            try:
-                while True:
-                    self._read(readsize)
-                    readsize = min(self.max_read_chunk, readsize * 2)
-            except EOFError:
-                size = self.extrasize
+            return self._read_all()
         else:               # just get some more of it
             try:
                 while size > self.extrasize:
@@ -278,6 +274,33 @@ class GzipFile(io.BufferedIOBase):
         self.offset += size
         return chunk
 
+    def _read_all(self):
+        # PyPy modification: collect the decompressed data in a list and
+        # join it once at the end, instead of growing self.extrabuf with
+        # every chunk
+        offset = self.offset - self.extrastart
+        self._bulk_chunks = chunks = [
+            self.extrabuf[offset: offset + self.extrasize]]
+        readsize = 1024
+        try:
+            try:
+                while True:
+                    self._read(readsize)
+                    readsize = min(self.max_read_chunk, readsize * 2)
+            except EOFError:
+                pass
+        finally:
+            # if an exception is raised, the data read so far stays
+            # buffered for the next call
+            self._bulk_chunks = None
+            data = ''.join(chunks)
+            self.extrabuf = data
+            self.extrasize = len(data)
+            self.extrastart = self.offset
+        self.extrasize = 0
+        self.offset += len(data)
+        return data
+
     def _unread(self, buf):
         self.extrasize = len(buf) + self.extrasize
         self.offset -= len(buf)
@@ -334,6 +357,10 @@ class GzipFile(io.BufferedIOBase):
 
     def _add_read_data(self, data):
         self.crc = zlib.crc32(data, self.crc) & 0xffffffffL
+        if self._bulk_chunks is not None:
+            self._bulk_chunks.append(data)
+            self.size = self.size + len(data)
+            return
         offset = self.offset - self.extrastart
         self.extrabuf = self.extrabuf[offset:] + data
         self.extrasize = self.extrasize + len(data)
@@ -206,6 +206,17 @@ class JSONEncoder(object):
         '{"foo": ["bar", "baz"]}'
 
         """
+        iterencode = type(self).iterencode.__func__
+        if iterencode is not JSONEncoder.iterencode.__func__:
+            # a subclass overriding iterencode() gets it called, as in
+            # CPython
+            chunks = self.iterencode(o, _one_shot=True)
+            if not isinstance(chunks, (list, tuple)):
+                chunks = list(chunks)
+            return ''.join(chunks)
+        if (_pypyjson_encode is not None and self.ensure_ascii and
+                self.encoding == 'utf-8' and self.__has_plain_default()):
+            return _pypyjson_encode(self, o)
         if self.check_circular:
             markers = {}
         else:
@@ -217,6 +228,12 @@ class JSONEncoder(object):
         self.__encode(o, markers, builder, 0)
         return builder.build()
 
+    def __has_plain_default(self):
+        # _pypyjson.encode() is not used if default() is overridden by a
+        # subclass or given as an argument
+        return (type(self).default.__func__ is JSONEncoder.default.__func__
+                and 'default' not in self.__dict__)
+
     def __emit_indent(self, builder, _current_indent_level):
         if self.indent is not None:
             _current_indent_level += 1
@@ -536,3 +553,7 @@ try:
     from _pypyjson import raw_encode_basestring_ascii
 except ImportError:
     pass
+try:
+    from _pypyjson import encode as _pypyjson_encode
+except ImportError:
+    _pypyjson_encode = None
@@ -120,13 +120,34 @@ def compile(file, cfile=None, dfile=None, doraise=False):
             return
     if cfile is None:
         cfile = file + (__debug__ and 'c' or 'o')
-    with open(cfile, 'wb') as fc:
-        fc.write('\0\0\0\0')
-        wr_long(fc, timestamp)
-        marshal.dump(codeobject, fc)
-        fc.flush()
-        fc.seek(0, 0)
-        fc.write(MAGIC)
+    # PyPy modification: write to a temporary file and rename it, so that
+    # concurrent compilations or imports never see a partial .pyc file
+    tmpfile = '%s.%d.tmp' % (cfile, os.getpid())
+    try:
+        with open(tmpfile, 'wb') as fc:
+            fc.write('\0\0\0\0')
+            wr_long(fc, timestamp)
+            marshal.dump(codeobject, fc)
+            fc.flush()
+            fc.seek(0, 0)
+            fc.write(MAGIC)
+        _rename_atomic(tmpfile, cfile)
+    except:
+        try:
+            os.unlink(tmpfile)
+        except OSError:
+            pass
+        raise
+
+def _rename_atomic(src, dst):
+    try:
+        os.rename(src, dst)
+    except OSError:
+        if os.name != 'nt' or not os.path.exists(dst):
+            raise
+        # os.rename() does not replace existing files on Windows
+        os.unlink(dst)
+        os.rename(src, dst)
 
 def main(args=None):
     """Compile several source files.
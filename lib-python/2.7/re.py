@@ -220,12 +220,22 @@ def escape(pattern):
 # --------------------------------------------------------------------
 # internals
 
-_cache = {}
-_cache_repl = {}
+try:
+    # PyPy: bounded caches that only evict the least recently used entry
+    from _sre import LRUCache as _LRUCache
+except ImportError:
+    _LRUCache = None
 
-_pattern_type = type(sre_compile.compile("", 0))
+if _LRUCache is not None:
+    _MAXCACHE = 512
+    _cache = _LRUCache(_MAXCACHE)
+    _cache_repl = _LRUCache(_MAXCACHE)
+else:
+    _MAXCACHE = 100
+    _cache = {}
+    _cache_repl = {}
 
-_MAXCACHE = 100
+_pattern_type = type(sre_compile.compile("", 0))
 
 def _compile(*key):
     # internal: compile pattern
@@ -250,7 +260,7 @@ def _compile(*key):
     except error, v:
         raise error, v # invalid expression
     if not bypass_cache:
-        if len(_cache) >= _MAXCACHE:
+        if len(_cache) >= _MAXCACHE and _LRUCache is None:
             _cache.clear()
         if p.flags & LOCALE:
             if not _locale:
@@ -271,7 +281,7 @@ def _compile_repl(*key):
         p = sre_parse.parse_template(repl, pattern)
     except error, v:
         raise error, v # invalid expression
-    if len(_cache_repl) >= _MAXCACHE:
+    if len(_cache_repl) >= _MAXCACHE and _LRUCache is None:
         _cache_repl.clear()
     _cache_repl[key] = p
     return p
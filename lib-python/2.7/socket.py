@@ -196,6 +196,7 @@ class _closedsocket(object):
         raise error(EBADF, 'Bad file descriptor')
     # All _delegate_methods must also be initialized here.
     send = recv = recv_into = sendto = recvfrom = recvfrom_into = _dummy
+    sendmsg = recvmsg = recvmsg_into = _dummy
     __getattr__ = _dummy
     def _drop(self):
         pass
@@ -245,6 +246,19 @@ class _socketobject(object):
             return self._sock.sendto(data, param2, param3)
     sendto.__doc__ = _realsocket.sendto.__doc__
 
+    if hasattr(_realsocket, 'sendmsg'):
+        def sendmsg(self, buffers, ancdata=(), flags=0, address=None):
+            return self._sock.sendmsg(buffers, ancdata, flags, address)
+        sendmsg.__doc__ = _realsocket.sendmsg.__doc__
+
+        def recvmsg(self, bufsize, ancbufsize=0, flags=0):
+            return self._sock.recvmsg(bufsize, ancbufsize, flags)
+        recvmsg.__doc__ = _realsocket.recvmsg.__doc__
+
+        def recvmsg_into(self, buffers, ancbufsize=0, flags=0):
+            return self._sock.recvmsg_into(buffers, ancbufsize, flags)
+        recvmsg_into.__doc__ = _realsocket.recvmsg_into.__doc__
+
     def close(self):
         s = self._sock
         self._sock = _closedsocket()
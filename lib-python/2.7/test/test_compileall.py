@@ -71,6 +71,26 @@ class CompileallTests(unittest.TestCase):
         os.unlink(self.bc_path)
         os.unlink(self.bc_path2)
 
+    def test_compile_dir_workers(self):
+        # PyPy extension: compile in worker processes
+        subdir = os.path.join(self.directory, 'sub')
+        os.mkdir(subdir)
+        source_path3 = os.path.join(subdir, '_test3.py')
+        shutil.copyfile(self.source_path, source_path3)
+        with open(os.path.join(self.directory, '_bad.py'), 'w') as file:
+            file.write('x = (\n')
+        self.assertFalse(compileall.compile_dir(self.directory, quiet=True,
+                                                workers=2))
+        for fn in (self.bc_path, self.bc_path2,
+                   source_path3 + ('c' if __debug__ else 'o')):
+            self.assertTrue(os.path.isfile(fn))
+        self.assertEqual(*self.data())
+        self.assertEqual([name for name in os.listdir(self.directory)
+                          if name.endswith('.tmp')], [])
+        os.unlink(os.path.join(self.directory, '_bad.py'))
+        self.assertTrue(compileall.compile_dir(self.directory, quiet=True,
+                                               force=True, workers=0))
+
 def test_main():
     test_support.run_unittest(CompileallTests)
 
@@ -220,6 +220,12 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         BoolOption("withsmalllong", "use a version of 'long' in a C long long",
                    default=False),
 
+        BoolOption("withsmalllong128",
+                   "use a version of 'long' in two machine words, "
+                   "i.e. 128 bits on 64-bit platforms",
+                   default=False,
+                   requires=[("objspace.std.withsmalllong", False)]),
+
         BoolOption("withspecialisedtuple",
                    "use specialised tuples",
                    default=False),
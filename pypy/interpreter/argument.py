@@ -22,7 +22,7 @@ class Arguments(object):
 
     def __init__(self, space, args_w, keywords=None, keywords_w=None,
                  w_stararg=None, w_starstararg=None, keyword_names_w=None,
-                 methodcall=False):
+                 methodcall=False, keyword_call_cache=None):
         self.space = space
         assert isinstance(args_w, list)
         self.arguments_w = args_w
@@ -45,6 +45,9 @@ class Arguments(object):
         # a flag whether this is likely a method call, which doesn't change the
         # behaviour but produces better error messages
         self.methodcall = methodcall
+        # the KeywordCallCache of the call site, if the interpreter is
+        # calling with constant keyword names and without */**
+        self.keyword_call_cache = keyword_call_cache
 
     def __repr__(self):
         """ NOT_RPYTHON """
@@ -70,7 +73,8 @@ class Arguments(object):
     def replace_arguments(self, args_w):
         "Return a new Arguments with a args_w as positional arguments."
         return Arguments(self.space, args_w, self.keywords, self.keywords_w,
-                         keyword_names_w = self.keyword_names_w)
+                         keyword_names_w = self.keyword_names_w,
+                         keyword_call_cache = self.keyword_call_cache)
 
     def prepend(self, w_firstarg):
         "Return a new Arguments with a new argument inserted first."
@@ -229,19 +233,29 @@ class Arguments(object):
         keywords_w = self.keywords_w
         kwds_mapping = None
         if num_kwds:
-            # kwds_mapping maps target indexes in the scope (minus input_argcount)
-            # to positions in the keywords_w list
-            kwds_mapping = [0] * (co_argcount - input_argcount)
-            # initialize manually, for the JIT :-(
-            for i in range(len(kwds_mapping)):
-                kwds_mapping[i] = -1
-            # match the keywords given at the call site to the argument names
-            # the called function takes
-            # this function must not take a scope_w, to make the scope not
-            # escape
-            num_remainingkwds = _match_keywords(
-                    signature, blindargs, input_argcount, keywords,
-                    kwds_mapping, self._jit_few_keywords)
+            cache = self.keyword_call_cache
+            if (cache is not None and
+                    cache.is_valid_for(signature, input_argcount, blindargs)):
+                # same call site calling the same code as the last time:
+                # all keywords matched named arguments already
+                kwds_mapping = cache.kwds_mapping
+            else:
+                # kwds_mapping maps target indexes in the scope (minus
+                # input_argcount) to positions in the keywords_w list
+                kwds_mapping = [0] * (co_argcount - input_argcount)
+                # initialize manually, for the JIT :-(
+                for i in range(len(kwds_mapping)):
+                    kwds_mapping[i] = -1
+                # match the keywords given at the call site to the argument
+                # names the called function takes
+                # this function must not take a scope_w, to make the scope
+                # not escape
+                num_remainingkwds = _match_keywords(
+                        signature, blindargs, input_argcount, keywords,
+                        kwds_mapping, self._jit_few_keywords)
+                if cache is not None and num_remainingkwds == 0:
+                    cache.update(signature, input_argcount, blindargs,
+                                 kwds_mapping)
             if num_remainingkwds:
                 if w_kwds is not None:
                     # collect extra keyword arguments into the **kwarg
@@ -340,6 +354,35 @@ class Arguments(object):
                     space.setitem(w_kwds, w_key, self.keywords_w[i])
         return w_args, w_kwds
 
+class KeywordCallCache(object):
+    """Cache attached by the interpreter to a call site with keyword
+    arguments.  The keyword names of such a call site are constants, so
+    they are decoded only once; and the way they matched the signature
+    of the last callee is remembered, which lets the following calls to
+    the same code skip _match_keywords().  Only calls where every keyword
+    names a regular argument are cached.  Not used by the JIT, which
+    constant-folds the matching anyway.
+    """
+
+    def __init__(self):
+        self.keywords = None
+        self.signature = None
+        self.input_argcount = -1
+        self.blindargs = -1
+        self.kwds_mapping = None
+
+    def is_valid_for(self, signature, input_argcount, blindargs):
+        return (self.signature is signature and
+                self.input_argcount == input_argcount and
+                self.blindargs == blindargs)
+
+    def update(self, signature, input_argcount, blindargs, kwds_mapping):
+        self.signature = signature
+        self.input_argcount = input_argcount
+        self.blindargs = blindargs
+        self.kwds_mapping = kwds_mapping
+
+
 # JIT helper functions
 # these functions contain functionality that the JIT is not always supposed to
 # look at. They should not get a self arguments, which makes the amount of
@@ -120,8 +120,20 @@ class Block(object):
     def get_code(self):
         """Encode the instructions in this block into bytecode."""
         code = []
-        for instr in self.instructions:
+        instructions = self.instructions
+        fused = False
+        for i in range(len(instructions)):
+            instr = instructions[i]
             opcode = instr.opcode
+            # The second instruction of a superinstruction is emitted
+            # unchanged, but it cannot start another superinstruction.
+            if not fused and i + 1 < len(instructions):
+                superop = _superinstruction(instr, instructions[i + 1])
+                if superop != -1:
+                    opcode = superop
+                    fused = True
+            else:
+                fused = False
             if opcode >= ops.HAVE_ARGUMENT:
                 arg = instr.arg
                 if instr.arg > 0xFFFF:
@@ -138,6 +150,45 @@ class Block(object):
         return ''.join(code)
 
 
+_threadable_jumps = (ops.JUMP_ABSOLUTE, ops.JUMP_FORWARD,
+                     ops.POP_JUMP_IF_FALSE, ops.POP_JUMP_IF_TRUE,
+                     ops.JUMP_IF_FALSE_OR_POP, ops.JUMP_IF_TRUE_OR_POP)
+
+def _skip_jumps_forward(target):
+    """Return the block where a jump to 'target' really continues, if
+    'target' starts with a chain of JUMP_FORWARDs."""
+    while target.instructions:
+        instr = target.instructions[0]
+        if instr.opcode != ops.JUMP_FORWARD:
+            break
+        target = instr.jump[0]
+    return target
+
+
+def _superinstruction(instr, next_instr):
+    """Return the superinstruction fusing 'instr' with 'next_instr', or -1.
+
+    The superinstruction replaces only the opcode of 'instr'; the
+    interpreter reads the argument of 'next_instr' and then skips it.
+    Both instructions must be in the same block, so that nothing can
+    jump to 'next_instr', and on the same line, so that tracing does not
+    miss a line event.
+    """
+    if next_instr.lineno or next_instr.arg > 0xFFFF:
+        return -1
+    op1 = instr.opcode
+    op2 = next_instr.opcode
+    if op1 == ops.LOAD_FAST:
+        if op2 == ops.LOAD_ATTR:
+            return ops.LOAD_FAST_LOAD_ATTR
+        if op2 == ops.LOAD_FAST:
+            return ops.LOAD_FAST_LOAD_FAST
+    elif op1 == ops.COMPARE_OP:
+        if op2 == ops.POP_JUMP_IF_FALSE:
+            return ops.COMPARE_OP_POP_JUMP_IF_FALSE
+    return -1
+
+
 def _make_index_dict_filter(syms, flag):
     names = syms.keys()
     string_sort(names)   # return cell vars in alphabetical order
@@ -333,6 +384,13 @@ class PythonCodeMaker(ast.ASTVisitor):
                     if instr.has_jump:
                         target, absolute = instr.jump
                         op = instr.opcode
+                        # Optimize a jump going to a JUMP_FORWARD, of any
+                        # kind, including JUMP_ABSOLUTE.  Only chains of
+                        # JUMP_FORWARD are skipped: a jump never goes past
+                        # a JUMP_ABSOLUTE here, because loop back-edges
+                        # need to go through it for the JIT.
+                        if op in _threadable_jumps:
+                            target = _skip_jumps_forward(target)
                         # Optimize an unconditional jump going to another
                         # unconditional jump.
                         if op == ops.JUMP_ABSOLUTE or op == ops.JUMP_FORWARD:
@@ -673,6 +731,12 @@ _static_opcode_stack_effects = {
     ops.JUMP_IF_NOT_DEBUG: 0,
 
     ops.BUILD_LIST_FROM_ARG: 1,
+
+    # superinstructions only appear in the final bytecode, these are the
+    # combined effects of both instructions
+    ops.LOAD_FAST_LOAD_ATTR: 1,
+    ops.LOAD_FAST_LOAD_FAST: 2,
+    ops.COMPARE_OP_POP_JUMP_IF_FALSE: -2,
 }
 
 
@@ -866,7 +866,7 @@ class ASTBuilder(object):
                             atom.get_child(0).type == tokens.NUMBER:
                         num = atom.get_child(0)
                         assert isinstance(num, Terminal)
-                        num.value = "-" + num.get_value()
+                        num.set_value("-" + num.get_value())
                         return self.handle_atom(atom)
         expr = self.handle_expr(factor_node.get_child(1))
         op_type = factor_node.get_child(0).type
@@ -444,7 +444,11 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
                 otherwise = self.new_block()
             else:
                 otherwise = end
-            if_.test.accept_jump_if(self, False, otherwise)
+            if optimize.is_debug_test(if_.test):
+                # "if __debug__:" is compiled like the assert statement
+                self.emit_jump(ops.JUMP_IF_NOT_DEBUG, otherwise)
+            else:
+                if_.test.accept_jump_if(self, False, otherwise)
             self.visit_sequence(if_.body)
             self.emit_jump(ops.JUMP_FORWARD, end)
             if if_.orelse:
@@ -491,7 +495,7 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
         end = self.new_block()
         self.emit_jump(ops.SETUP_LOOP, end)
         self.push_frame_block(F_BLOCK_LOOP, start)
-        fr.iter.walkabout(self)
+        self._visit_iterable(fr.iter)
         self.emit_op(ops.GET_ITER)
         self.use_next_block(start)
         # This adds another line, so each for iteration can be traced.
@@ -871,18 +875,34 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
         returns False
         """
         if op in (ast.In, ast.NotIn):
-            is_list = isinstance(node, ast.List)
-            if is_list or isinstance(node, ast.Set):
+            if isinstance(node, ast.List):
+                self._visit_iterable(node)
+                return True
+            if isinstance(node, ast.Set):
                 w_const = self._tuple_of_consts(node.elts)
                 if w_const is not None:
-                    if not is_list:
-                        from pypy.objspace.std.setobject import (
-                            W_FrozensetObject)
-                        w_const = W_FrozensetObject(self.space, w_const)
+                    from pypy.objspace.std.setobject import (
+                        W_FrozensetObject)
+                    w_const = W_FrozensetObject(self.space, w_const)
                     self.load_const(w_const)
                     return True
         return False
 
+    def _visit_iterable(self, node):
+        """Emit an expression which is only iterated over, by a for loop
+        or an "in" test.  A list display is built as a tuple instead, or
+        folded into a constant tuple, because nobody else can see it."""
+        if isinstance(node, ast.List) and node.ctx == ast.Load:
+            self.update_position(node.lineno)
+            w_const = self._tuple_of_consts(node.elts)
+            if w_const is not None:
+                self.load_const(w_const)
+            else:
+                self.visit_sequence(node.elts)
+                self.emit_op_arg(ops.BUILD_TUPLE, len(node.elts))
+        else:
+            node.walkabout(self)
+
     def _tuple_of_consts(self, elts):
         """Return a tuple of consts from elts if possible, or None"""
         count = len(elts) if elts is not None else 0
@@ -1003,7 +1023,7 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
         anchor = self.new_block()
         gen = gens[gen_index]
         assert isinstance(gen, ast.comprehension)
-        gen.iter.walkabout(self)
+        self._visit_iterable(gen.iter)
         if single:
             self.emit_op_arg(ops.BUILD_LIST_FROM_ARG, 0)
         self.emit_op(ops.GET_ITER)
@@ -1051,7 +1071,7 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
             self.argcount = 1
             self.emit_op_arg(ops.LOAD_FAST, 0)
         else:
-            gen.iter.walkabout(self)
+            self._visit_iterable(gen.iter)
             self.emit_op(ops.GET_ITER)
         self.use_next_block(start)
         self.emit_jump(ops.FOR_ITER, anchor)
@@ -1076,7 +1096,7 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
         self._make_function(code)
         first_comp = node.get_generators()[0]
         assert isinstance(first_comp, ast.comprehension)
-        first_comp.iter.walkabout(self)
+        self._visit_iterable(first_comp.iter)
         self.emit_op(ops.GET_ITER)
         self.emit_op_arg(ops.CALL_FUNCTION, 1)
 
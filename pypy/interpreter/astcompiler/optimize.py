@@ -18,6 +18,13 @@ CONST_FALSE = 0
 CONST_TRUE = 1
 
 
+def is_debug_test(node):
+    """Return True if the node is a load of __debug__, which cannot be
+    rebound but changes with __pypy__.set_debug()."""
+    return (isinstance(node, ast.Name) and node.id == "__debug__" and
+            node.ctx == ast.Load)
+
+
 class __extend__(ast.AST):
 
     def as_constant_truth(self, space):
@@ -159,6 +166,22 @@ opposite_compare_operations = misc.dict_to_switch({
 })
 
 
+class _YieldFinder(ast.GenericASTVisitor):
+
+    def __init__(self):
+        self.found = False
+
+    def visit_Yield(self, node):
+        self.found = True
+
+def _contains_yield(node):
+    # this runs before the symbol table is built: an expression that is
+    # dropped must not take away the 'yield' that makes a generator
+    finder = _YieldFinder()
+    node.walkabout(finder)
+    return finder.found
+
+
 class OptimizingVisitor(ast.ASTVisitor):
     """Constant folds AST."""
 
@@ -255,6 +278,16 @@ class OptimizingVisitor(ast.ASTVisitor):
             return values[0]
         return bop
 
+    def visit_IfExp(self, ifexp):
+        truth = ifexp.test.as_constant_truth(self.space)
+        if truth == CONST_TRUE:
+            if not _contains_yield(ifexp.orelse):
+                return ifexp.body
+        elif truth == CONST_FALSE:
+            if not _contains_yield(ifexp.body):
+                return ifexp.orelse
+        return ifexp
+
     def visit_Repr(self, rep):
         w_const = rep.value.as_constant()
         if w_const is not None:
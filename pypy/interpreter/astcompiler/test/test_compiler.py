@@ -948,11 +948,111 @@ class TestCompiler:
         finally:
             space.call_function(w_set_debug, space.w_True)
 
+    def test_if_debug(self):
+        space = self.space
+        source = """if 1:
+        def f():
+            if __debug__:
+                return 1
+            else:
+                return 2
+        """
+        w_dict = self.run(source)
+        self.check(w_dict, "f()", 1)
+        mod = space.getbuiltinmodule('__pypy__')
+        w_set_debug = space.getattr(mod, space.wrap('set_debug'))
+        space.call_function(w_set_debug, space.w_False)
+        try:
+            self.check(w_dict, "f()", 2)
+        finally:
+            space.call_function(w_set_debug, space.w_True)
+
+    def test_constant_ifexp_keeps_yield(self):
+        # the branch that is not taken still makes 'f' a generator
+        source = """if 1:
+        def f():
+            x = 1 if 1 else (yield)
+        def g():
+            x = (yield) if 0 else 2
+        h = lambda: 1 if 1 else (yield)
+        """
+        space = self.space
+        # through the real compiler, which runs the AST optimizer
+        code = space.createcompiler().compile(str(py.code.Source(source)),
+                                              '<test>', 'exec', 0)
+        w_dict = space.newdict()
+        code.exec_code(space, w_dict, w_dict)
+        self.check(w_dict, "type(f()).__name__", "generator")
+        self.check(w_dict, "type(g()).__name__", "generator")
+        self.check(w_dict, "type(h()).__name__", "generator")
+        code = space.createcompiler().compile(
+            "def f(): return 1 if 1 else (lambda: (yield))",
+            '<test>', 'exec', 0)
+        w_dict = space.newdict()
+        code.exec_code(space, w_dict, w_dict)
+        self.check(w_dict, "f()", 1)
+
+    def test_jump_threading(self):
+        source = """if 1:
+        def f(x, y, z):
+            res = 0
+            if x:
+                if y and z:
+                    res = 1
+                elif y or z:
+                    res = 2
+            else:
+                res = 3
+            return res
+        """
+        for args, expected in [("1, 1, 1", 1), ("1, 1, 0", 2),
+                               ("1, 0, 1", 2), ("1, 0, 0", 0),
+                               ("0, 1, 1", 3)]:
+            yield self.st, source + "x = f(%s)" % args, "x", expected
+        source = """if 1:
+        def f(l):
+            res = []
+            for x in l:
+                if x:
+                    if x > 1:
+                        x = 10
+                else:
+                    x = -1
+                res.append(x)
+            return res
+        """
+        yield (self.st, source + "x = f([0, 1, 2])", "x", [-1, 1, 10])
+        yield (self.st, "def f(a, b): return [x for x in [a, b] if x in [b]]"
+                        "\nx = f(1, 2)", "x", [2])
+
     def test_dont_fold_equal_code_objects(self):
         yield self.st, "f=lambda:1;g=lambda:1.0;x=g()", 'type(x)', float
         yield (self.st, "x=(lambda: (-0.0, 0.0), lambda: (0.0, -0.0))[1]()",
                         'repr(x)', '(0.0, -0.0)')
 
+    def test_superinstructions(self):
+        source = """if 1:
+        class A(object):
+            a = 5
+        def f(x, y, n):
+            res = []
+            while n > 0:
+                res.append(x.a + y)
+                if x.a == y:
+                    res.append(n)
+                n -= 1
+            return res
+        def g(x, y):
+            return (x,
+                    y)
+        x = f(A(), 5, 3)
+        y = g(1, 2)
+        """
+        yield self.st, source, "x", [10, 3, 10, 2, 10, 1]
+        yield self.st, source, "y", (1, 2)
+        yield (self.st, "def f(x): return x.missing\ntry: f(1)\n"
+                        "except AttributeError: x = 1", "x", 1)
+
 
 class AppTestCompiler:
 
@@ -1170,6 +1270,147 @@ class TestOptimizations:
             assert ops.BUILD_SET not in counts
             assert ops.LOAD_CONST in counts
 
+    def get_bytecode(self, source):
+        code, blocks = generate_function_code(source, self.space)
+        return ''.join([block.get_code() for block in blocks])
+
+    def test_superinstructions(self):
+        source = """def f(x, y):
+            if x.a < y:
+                return x
+        """
+        co_code = self.get_bytecode(source)
+        assert ord(co_code[0]) == ops.LOAD_FAST_LOAD_ATTR
+        assert ord(co_code[3]) == ops.LOAD_ATTR
+        assert ord(co_code[6]) == ops.LOAD_FAST
+        assert ord(co_code[9]) == ops.COMPARE_OP_POP_JUMP_IF_FALSE
+        assert ord(co_code[12]) == ops.POP_JUMP_IF_FALSE
+
+    def test_superinstructions_do_not_overlap(self):
+        source = """def f(x, y, z):
+            return x + (y, z)
+        """
+        co_code = self.get_bytecode(source)
+        assert ord(co_code[0]) == ops.LOAD_FAST_LOAD_FAST
+        assert ord(co_code[3]) == ops.LOAD_FAST
+        assert ord(co_code[6]) == ops.LOAD_FAST
+        # but instructions on different lines are not fused
+        source = """def f(x, y):
+            return (x,
+                    y)
+        """
+        co_code = self.get_bytecode(source)
+        assert ord(co_code[0]) == ops.LOAD_FAST
+        assert ord(co_code[3]) == ops.LOAD_FAST
+
+    def test_if_debug(self):
+        source = """def f(x):
+            if __debug__:
+                x = 1
+            else:
+                x = 2
+            return x
+        """
+        counts = self.count_instructions(source)
+        assert counts[ops.JUMP_IF_NOT_DEBUG] == 1
+        assert ops.LOAD_GLOBAL not in counts
+        assert ops.POP_JUMP_IF_FALSE not in counts
+
+    def test_constant_ifexp(self):
+        source = """def f(x):
+            return x if 1 else -x
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_FAST: 1, ops.RETURN_VALUE: 1}
+        source = """def f(x):
+            return x if None else -x
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_FAST: 1, ops.UNARY_NEGATIVE: 1,
+                          ops.RETURN_VALUE: 1}
+
+    def test_list_display_iterated_as_tuple(self):
+        for source in (
+            'for x in [a, b]:\n    pass',
+            'return (x for x in [a, b])',
+            'return x in [a, b]',
+            'return x not in [a, b]',
+            ):
+            source = 'def f():\n    %s' % source.replace('\n', '\n    ')
+            counts = self.count_instructions(source)
+            assert ops.BUILD_LIST not in counts
+            assert counts[ops.BUILD_TUPLE] == 1
+        for source in (
+            'for x in [1, 2]:\n    pass',
+            'return [y for x in l for y in [1, 2]]',
+            ):
+            source = 'def f():\n    %s' % source.replace('\n', '\n    ')
+            counts = self.count_instructions(source)
+            assert ops.BUILD_TUPLE not in counts
+            assert counts.get(ops.BUILD_LIST, 0) == source.count('[y')
+
+    def test_jump_threading(self):
+        source = """def f(x, y, z):
+            if x:
+                if y and z:
+                    x = 1
+            else:
+                x = 2
+            return x
+        """
+        co_code = self.get_bytecode(source)
+        i = 0
+        found = 0
+        while i < len(co_code):
+            op = ord(co_code[i])
+            if op >= ops.HAVE_ARGUMENT:
+                arg = ord(co_code[i + 1]) | (ord(co_code[i + 2]) << 8)
+                if op in (ops.POP_JUMP_IF_FALSE,
+                          ops.COMPARE_OP_POP_JUMP_IF_FALSE):
+                    found += 1
+                    assert ord(co_code[arg]) != ops.JUMP_FORWARD
+                i += 3
+            else:
+                i += 1
+        assert found == 3
+
+    def test_jump_threading_loop(self):
+        source = """def f(l):
+            for x in l:
+                if x:
+                    if x > 1:
+                        x = 1
+                else:
+                    x = 2
+            return x
+        """
+        co_code = self.get_bytecode(source)
+        loop_start = co_code.index(chr(ops.FOR_ITER))
+        i = 0
+        backward = 0
+        while i < len(co_code):
+            op = ord(co_code[i])
+            if op >= ops.HAVE_ARGUMENT:
+                arg = ord(co_code[i + 1]) | (ord(co_code[i + 2]) << 8)
+                if op in (ops.JUMP_FORWARD, ops.FOR_ITER):
+                    target = i + 3 + arg
+                elif op in (ops.JUMP_ABSOLUTE, ops.POP_JUMP_IF_FALSE,
+                            ops.COMPARE_OP_POP_JUMP_IF_FALSE):
+                    target = arg
+                else:
+                    target = -1
+                if target >= 0:
+                    assert ord(co_code[target]) != ops.JUMP_FORWARD
+                if target == loop_start:
+                    # the back-edges are all JUMP_ABSOLUTE
+                    assert op == ops.JUMP_ABSOLUTE
+                    backward += 1
+                i += 3
+            else:
+                i += 1
+        # the end of each branch jumps directly back to the FOR_ITER
+        assert backward == 3
+
     def test_dont_fold_huge_powers(self):
         for source in (
             "2 ** 3000",         # not constant-folded: too big
@@ -32,7 +32,7 @@ def unpack_text_tuple(space, w_str_tuple):
 # Magic numbers for the bytecode version in code objects.
 # See comments in pypy/module/imp/importing.
 cpython_magic, = struct.unpack("<i", imp.get_magic())   # host magic number
-default_magic = (0xf303 + 7) | 0x0a0d0000               # this PyPy's magic
+default_magic = (0xf303 + 8) | 0x0a0d0000               # this PyPy's magic
                                                         # (from CPython 2.7.0)
 
 # cpython_code_signature helper
@@ -151,6 +151,21 @@ class PyCode(eval.Code):
         self._compute_flatcall()
 
         init_mapdict_cache(self)
+        self._keyword_call_caches = None
+
+    @jit.dont_look_inside
+    def get_keyword_call_cache(self, callsite):
+        """Return the KeywordCallCache of the call at the bytecode offset
+        'callsite'.  Only used by the interpreter, not by the JIT."""
+        from pypy.interpreter.argument import KeywordCallCache
+        caches = self._keyword_call_caches
+        if caches is None:
+            caches = self._keyword_call_caches = {}
+        try:
+            return caches[callsite]
+        except KeyError:
+            cache = caches[callsite] = KeywordCallCache()
+            return cache
 
     def _init_ready(self):
         "This is a hook for the vmprof module, which overrides this method."
@@ -425,10 +425,37 @@ class PyFrame(W_Root):
         return Arguments(
                 self.space, self.peekvalues(nargs), methodcall=methodcall)
 
-    def argument_factory(self, arguments, keywords, keywords_w, w_star, w_starstar, methodcall=False):
+    def argument_factory(self, arguments, keywords, keywords_w, w_star, w_starstar, methodcall=False,
+                         keyword_call_cache=None):
         return Arguments(
                 self.space, arguments, keywords, keywords_w, w_star,
-                w_starstar, methodcall=methodcall)
+                w_starstar, methodcall=methodcall,
+                keyword_call_cache=keyword_call_cache)
+
+    @jit.unroll_safe
+    def popkeywords(self, n_keywords, keyword_call_cache=None):
+        """Pop the keyword arguments of a call.  Returns the lists
+        (keywords, keywords_w).  The names are only decoded if they are
+        not already stored in the KeywordCallCache of the call site."""
+        keywords_w = [None] * n_keywords
+        keywords = None
+        if keyword_call_cache is not None:
+            keywords = keyword_call_cache.keywords
+        decode_keywords = keywords is None
+        if decode_keywords:
+            keywords = [None] * n_keywords
+        while True:
+            n_keywords -= 1
+            if n_keywords < 0:
+                break
+            w_value = self.popvalue()
+            w_key = self.popvalue()
+            if decode_keywords:
+                keywords[n_keywords] = self.space.text_w(w_key)
+            keywords_w[n_keywords] = w_value
+        if keyword_call_cache is not None:
+            keyword_call_cache.keywords = keywords
+        return keywords, keywords_w
 
     @jit.dont_look_inside
     def descr__reduce__(self, space):
@@ -217,6 +217,13 @@ class __extend__(pyframe.PyFrame):
                 next_instr = self.POP_JUMP_IF_FALSE(oparg, next_instr)
             elif opcode == opcodedesc.POP_JUMP_IF_TRUE.index:
                 next_instr = self.POP_JUMP_IF_TRUE(oparg, next_instr)
+            elif opcode == opcodedesc.COMPARE_OP_POP_JUMP_IF_FALSE.index:
+                next_instr = self.COMPARE_OP_POP_JUMP_IF_FALSE(oparg,
+                                                               next_instr)
+            elif opcode == opcodedesc.LOAD_FAST_LOAD_ATTR.index:
+                next_instr = self.LOAD_FAST_LOAD_ATTR(oparg, next_instr)
+            elif opcode == opcodedesc.LOAD_FAST_LOAD_FAST.index:
+                next_instr = self.LOAD_FAST_LOAD_FAST(oparg, next_instr)
             elif opcode == opcodedesc.BINARY_ADD.index:
                 self.BINARY_ADD(oparg, next_instr)
             elif opcode == opcodedesc.BINARY_AND.index:
@@ -1165,24 +1172,21 @@ class __extend__(pyframe.PyFrame):
     def call_function(self, oparg, w_star=None, w_starstar=None):
         n_arguments = oparg & 0xff
         n_keywords = (oparg>>8) & 0xff
+        keyword_call_cache = None
         if n_keywords:
-            keywords = [None] * n_keywords
-            keywords_w = [None] * n_keywords
-            while True:
-                n_keywords -= 1
-                if n_keywords < 0:
-                    break
-                w_value = self.popvalue()
-                w_key = self.popvalue()
-                key = self.space.text_w(w_key)
-                keywords[n_keywords] = key
-                keywords_w[n_keywords] = w_value
+            if (not jit.we_are_jitted() and w_star is None and
+                    w_starstar is None):
+                keyword_call_cache = self.getcode().get_keyword_call_cache(
+                    self.last_instr)
+            keywords, keywords_w = self.popkeywords(n_keywords,
+                                                    keyword_call_cache)
         else:
             keywords = None
             keywords_w = None
         arguments = self.popvalues(n_arguments)
         args = self.argument_factory(arguments, keywords, keywords_w, w_star,
-                                     w_starstar)
+                                     w_starstar,
+                                     keyword_call_cache=keyword_call_cache)
         w_function  = self.popvalue()
         if self.get_is_being_profiled() and function.is_builtin_code(w_function):
             w_result = self.space.call_args_and_c_profile(self, w_function,
@@ -1271,6 +1275,37 @@ class __extend__(pyframe.PyFrame):
     def SET_LINENO(self, lineno, next_instr):
         pass
 
+    ### superinstructions ###
+    # These are emitted by the astcompiler for frequent pairs of opcodes.
+    # The second instruction of the pair is left in the bytecode; its
+    # argument is read from there, and then it is skipped.
+
+    def _get_superinstruction_arg(self, next_instr):
+        co_code = self.pycode.co_code
+        lo = ord(co_code[next_instr + 1])
+        hi = ord(co_code[next_instr + 2])
+        return (hi * 256) | lo
+
+    def LOAD_FAST_LOAD_ATTR(self, varindex, next_instr):
+        self.LOAD_FAST(varindex, next_instr)
+        nameindex = self._get_superinstruction_arg(next_instr)
+        next_instr += 3
+        self.LOAD_ATTR(nameindex, next_instr)
+        return next_instr
+
+    def LOAD_FAST_LOAD_FAST(self, varindex, next_instr):
+        self.LOAD_FAST(varindex, next_instr)
+        varindex2 = self._get_superinstruction_arg(next_instr)
+        next_instr += 3
+        self.LOAD_FAST(varindex2, next_instr)
+        return next_instr
+
+    def COMPARE_OP_POP_JUMP_IF_FALSE(self, testnum, next_instr):
+        self.COMPARE_OP(testnum, next_instr)
+        target = self._get_superinstruction_arg(next_instr)
+        next_instr += 3
+        return self.POP_JUMP_IF_FALSE(target, next_instr)
+
     # overridden by faster version in the standard object space.
     LOOKUP_METHOD = LOAD_ATTR
     CALL_METHOD = CALL_FUNCTION
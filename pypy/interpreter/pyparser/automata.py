@@ -67,14 +67,24 @@ class DFA:
             return self.states[crntState * self.max_char + ord(item)]
 
     def recognize(self, inVec, pos = 0):
+        # the transition lookup of _next_state() is done inline, with the
+        # tables read into locals once per call: this is the inner loop
+        # of the tokenizer.
+        states = self.states
+        defaults = self.defaults
+        accepts = self.accepts
+        max_char = self.max_char
         crntState = self.start
         lastAccept = False
         i = pos
         for i in range(pos, len(inVec)):
-            item = inVec[i]
-            accept = self.accepts[crntState]
-            crntState = self._next_state(item, crntState)
-            if crntState != ERROR_STATE:
+            code = ord(inVec[i])
+            accept = accepts[crntState]
+            if code >= max_char:
+                nextState = defaults[crntState]
+            else:
+                nextState = states[crntState * max_char + code]
+            if nextState != ERROR_STATE:
                 pass
             elif accept:
                 return i
@@ -84,10 +94,10 @@ class DFA:
                 return i - 1
             else:
                 return -1
-            crntState = ord(crntState)
+            crntState = ord(nextState)
             lastAccept = accept
         # if self.states[crntState][1]:
-        if self.accepts[crntState]:
+        if accepts[crntState]:
             return i + 1
         elif lastAccept:
             return i
@@ -99,19 +109,25 @@ class DFA:
 class NonGreedyDFA (DFA):
 
     def recognize(self, inVec, pos = 0):
+        states = self.states
+        defaults = self.defaults
+        accepts = self.accepts
+        max_char = self.max_char
         crntState = self.start
         i = pos
         for i in range(pos, len(inVec)):
-            item = inVec[i]
-            accept = self.accepts[crntState]
-            if accept:
+            if accepts[crntState]:
                 return i
-            crntState = self._next_state(item, crntState)
-            if crntState == ERROR_STATE:
+            code = ord(inVec[i])
+            if code >= max_char:
+                nextState = defaults[crntState]
+            else:
+                nextState = states[crntState * max_char + code]
+            if nextState == ERROR_STATE:
                 return -1
-            crntState = ord(crntState)
+            crntState = ord(nextState)
             i += 1
-        if self.accepts[crntState]:
+        if accepts[crntState]:
             return i
         else:
             return -1
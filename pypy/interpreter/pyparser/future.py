@@ -43,7 +43,7 @@ class TokenIterator:
         self.tok = self.tokens[index]
 
     def skip(self, n):
-        if self.tok[0] == n:
+        if self.tok.token_type == n:
             self.next()
             return True
         else:
@@ -51,7 +51,8 @@ class TokenIterator:
 
     def skip_name(self, name):
         from pypy.interpreter.pyparser import pygram
-        if self.tok[0] == pygram.tokens.NAME and self.tok[1] == name:
+        if (self.tok.token_type == pygram.tokens.NAME and
+                self.tok.value_is(name)):
             self.next()
             return True
         else:
@@ -59,8 +60,8 @@ class TokenIterator:
 
     def next_feature_name(self):
         from pypy.interpreter.pyparser import pygram
-        if self.tok[0] == pygram.tokens.NAME:
-            name = self.tok[1]
+        if self.tok.token_type == pygram.tokens.NAME:
+            name = self.tok.get_value()
             self.next()
             if self.skip_name("as"):
                 self.skip(pygram.tokens.NAME)
@@ -97,7 +98,7 @@ def add_future_flags(future_flags, tokens):
         # somewhere inside the last __future__ import statement
         # (at the start would be fine too, but it's easier to grab a
         # random position inside)
-        last_position = (it.tok[2], it.tok[3])
+        last_position = (it.tok.lineno, it.tok.column)
         result |= future_flags.get_compiler_feature(it.next_feature_name())
         while it.skip(pygram.tokens.COMMA):
             result |= future_flags.get_compiler_feature(it.next_feature_name())
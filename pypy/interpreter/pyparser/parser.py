@@ -74,25 +74,78 @@ class Node(object):
         raise NotImplementedError("abstract base class")
 
 
+def _slice_source(source, start, end):
+    if start == 0 and end == len(source):
+        return source
+    assert start >= 0
+    assert end >= 0
+    return source[start:end]
+
+
+class Token(object):
+    """A token produced by the tokenizer.  Its text is not copied out of
+    the source: it is the slice [start:end] of 'source', which is usually
+    the line where the token is found, and it is only sliced out on
+    demand.  'line' is the line reported in error messages."""
+
+    def __init__(self, token_type, source, start, end, lineno, column, line):
+        self.token_type = token_type
+        self.source = source
+        self.start = start
+        self.end = end
+        self.lineno = lineno
+        self.column = column
+        self.line = line
+
+    def get_value(self):
+        return _slice_source(self.source, self.start, self.end)
+
+    def value_is(self, string):
+        """Check if the text of the token is 'string', without slicing."""
+        length = self.end - self.start
+        if length != len(string):
+            return False
+        source = self.source
+        start = self.start
+        for i in range(length):
+            if source[start + i] != string[i]:
+                return False
+        return True
+
+    def __repr__(self):
+        return "Token(%s, %r, %d, %d)" % (self.token_type, self.get_value(),
+                                          self.lineno, self.column)
+
+
 class Terminal(Node):
-    __slots__ = ("value", "lineno", "column")
-    def __init__(self, type, value, lineno, column):
+    # the value is stored as a slice of 'source', see Token
+    __slots__ = ("source", "start", "end", "lineno", "column")
+    def __init__(self, type, value, lineno, column, start=0, end=-1):
         Node.__init__(self, type)
-        self.value = value
+        if end < 0:
+            end = len(value)
+        self.source = value
+        self.start = start
+        self.end = end
         self.lineno = lineno
         self.column = column
 
     def __repr__(self):
-        return "Terminal(type=%s, value=%r)" % (self.type, self.value)
+        return "Terminal(type=%s, value=%r)" % (self.type, self.get_value())
 
     def __eq__(self, other):
         # For tests.
         return (type(self) == type(other) and
                 self.type == other.type and
-                self.value == other.value)
+                self.get_value() == other.get_value())
 
     def get_value(self):
-        return self.value
+        return _slice_source(self.source, self.start, self.end)
+
+    def set_value(self, value):
+        self.source = value
+        self.start = 0
+        self.end = len(value)
 
     def get_lineno(self):
         return self.lineno
@@ -200,8 +253,8 @@ class Parser(object):
         self.stack = []
         self.stack.append((self.grammar.dfas[start - 256], 0, current_node))
 
-    def add_token(self, token_type, value, lineno, column, line):
-        label_index = self.classify(token_type, value, lineno, column, line)
+    def add_token(self, token):
+        label_index = self.classify(token)
         sym_id = 0 # for the annotator
         while True:
             dfa, state_index, node = self.stack[-1]
@@ -211,7 +264,7 @@ class Parser(object):
                 sym_id = self.grammar.labels[i]
                 if label_index == i:
                     # We matched a non-terminal.
-                    self.shift(next_state, token_type, value, lineno, column)
+                    self.shift(next_state, token)
                     state = states[next_state]
                     # While the only possible action is to accept, pop nodes off
                     # the stack.
@@ -227,8 +280,8 @@ class Parser(object):
                     sub_node_dfa = self.grammar.dfas[sym_id - 256]
                     # Check if this token can start a child node.
                     if label_index in sub_node_dfa[1]:
-                        self.push(sub_node_dfa, next_state, sym_id, lineno,
-                                  column)
+                        self.push(sub_node_dfa, next_state, sym_id,
+                                  token.lineno, token.column)
                         break
             else:
                 # We failed to find any arcs to another state, so unless this
@@ -236,8 +289,9 @@ class Parser(object):
                 if is_accepting:
                     self.pop()
                     if not self.stack:
-                        raise ParseError("too much input", token_type, value,
-                                         lineno, column, line)
+                        raise ParseError("too much input", token.token_type,
+                                         token.get_value(), token.lineno,
+                                         token.column, token.line)
                 else:
                     # If only one possible input would satisfy, attach it to the
                     # error.
@@ -245,25 +299,28 @@ class Parser(object):
                         expected = sym_id
                     else:
                         expected = -1
-                    raise ParseError("bad input", token_type, value, lineno,
-                                     column, line, expected)
+                    raise ParseError("bad input", token.token_type,
+                                     token.get_value(), token.lineno,
+                                     token.column, token.line, expected)
 
-    def classify(self, token_type, value, lineno, column, line):
+    def classify(self, token):
         """Find the label for a token."""
+        token_type = token.token_type
         if token_type == self.grammar.KEYWORD_TOKEN:
-            label_index = self.grammar.keyword_ids.get(value, -1)
+            label_index = self.grammar.keyword_ids.get(token.get_value(), -1)
             if label_index != -1:
                 return label_index
         label_index = self.grammar.token_ids.get(token_type, -1)
         if label_index == -1:
-            raise ParseError("invalid token", token_type, value, lineno, column,
-                             line)
+            raise ParseError("invalid token", token_type, token.get_value(),
+                             token.lineno, token.column, token.line)
         return label_index
 
-    def shift(self, next_state, token_type, value, lineno, column):
+    def shift(self, next_state, token):
         """Shift a non-terminal and prepare for the next state."""
         dfa, state, node = self.stack[-1]
-        new_node = Terminal(token_type, value, lineno, column)
+        new_node = Terminal(token.token_type, token.source, token.lineno,
+                            token.column, token.start, token.end)
         node.append_child(new_node)
         self.stack[-1] = (dfa, next_state, node)
 
@@ -161,8 +161,9 @@ class PythonParser(parser.Parser):
                 else:
                     self.grammar = pygram.python_grammar
 
-                for tp, value, lineno, column, line in tokens:
-                    if self.add_token(tp, value, lineno, column, line):
+                for token in tokens:
+                    tp = token.token_type
+                    if self.add_token(token):
                         break
             except error.TokenError as e:
                 e.filename = compile_info.filename
@@ -2,7 +2,8 @@ from pypy.interpreter.pyparser import automata
 from pypy.interpreter.pyparser.pygram import tokens
 from pypy.interpreter.pyparser.pytoken import python_opmap
 from pypy.interpreter.pyparser.error import TokenError, TokenIndentationError
-from pypy.interpreter.pyparser.pytokenize import tabsize, whiteSpaceDFA, \
+from pypy.interpreter.pyparser.parser import Token
+from pypy.interpreter.pyparser.pytokenize import tabsize, \
     triple_quoted, endDFAs, single_quoted, pseudoDFA
 from pypy.interpreter.astcompiler import consts
 
@@ -44,6 +45,16 @@ def match_encoding_declaration(comment):
     return None
 
 
+def skip_whitespace(line, pos):
+    """returns the position of the first character of 'line' at or after
+    'pos' that is not a space, a tab or a form feed
+    """
+    end = len(line)
+    while pos < end and line[pos] in ' \t\f':
+        pos += 1
+    return pos
+
+
 DUMMY_DFA = automata.DFA([], [])
 
 def generate_tokens(lines, flags):
@@ -51,12 +62,14 @@ def generate_tokens(lines, flags):
     This is a rewrite of pypy.module.parser.pytokenize.generate_tokens since
     the original function is not RPYTHON (uses yield)
     It was also slightly modified to generate Token instances instead
-    of the original 5-tuples -- it's now a 4-tuple of
+    of the original 5-tuples.  A Token records its text as a slice of the
+    line it comes from, without copying it, together with
 
-    * the Token instance
-    * the whole line as a string
     * the line number (the real one, counting continuation lines)
-    * the position on the line of the end of the token.
+    * the position on the line of the start of the token
+    * the whole line as a string, for error messages.
+
+    Only string literals that span several lines get a string of their own.
 
     Original docstring ::
 
@@ -76,10 +89,15 @@ def generate_tokens(lines, flags):
     lnum = parenlev = continued = 0
     namechars = NAMECHARS
     numchars = NUMCHARS
-    contstr, needcont = '', 0
-    contline = None
+    # the pieces of a string literal spanning several lines are collected
+    # in 'contstr' and joined once the closing quote is found, to avoid
+    # copying the whole literal again for every line
+    contstr, needcont = [], 0
     indents = [0]
-    last_comment = ''
+    # the last comment is line[comment_start:comment_end] of comment_line;
+    # it becomes the value of the NEWLINE token that follows it
+    comment_line = ''
+    comment_start = comment_end = 0
     parenlevstart = (0, 0, "")
 
     # make the annotator happy
@@ -103,24 +121,25 @@ def generate_tokens(lines, flags):
             endmatch = endDFA.recognize(line)
             if endmatch >= 0:
                 pos = end = endmatch
-                tok = (tokens.STRING, contstr + line[:end], strstart[0],
-                       strstart[1], line)
+                contstr.append(line[:end])
+                value = ''.join(contstr)
+                tok = Token(tokens.STRING, value, 0, len(value), strstart[0],
+                            strstart[1], line)
                 token_list.append(tok)
-                last_comment = ''
-                contstr, needcont = '', 0
-                contline = None
+                comment_start = comment_end = 0
+                contstr, needcont = [], 0
             elif (needcont and not line.endswith('\\\n') and
                                not line.endswith('\\\r\n')):
-                tok = (tokens.ERRORTOKEN, contstr + line, strstart[0],
-                       strstart[1], line)
+                contstr.append(line)
+                value = ''.join(contstr)
+                tok = Token(tokens.ERRORTOKEN, value, 0, len(value),
+                            strstart[0], strstart[1], line)
                 token_list.append(tok)
-                last_comment = ''
-                contstr = ''
-                contline = None
+                comment_start = comment_end = 0
+                contstr = []
                 continue
             else:
-                contstr = contstr + line
-                contline = contline + line
+                contstr.append(line)
                 continue
 
         elif parenlev == 0 and not continued:  # new statement
@@ -140,12 +159,14 @@ def generate_tokens(lines, flags):
 
             if column > indents[-1]:           # count indents or dedents
                 indents.append(column)
-                token_list.append((tokens.INDENT, line[:pos], lnum, 0, line))
-                last_comment = ''
+                token_list.append(Token(tokens.INDENT, line, 0, pos, lnum, 0,
+                                        line))
+                comment_start = comment_end = 0
             while column < indents[-1]:
                 indents = indents[:-1]
-                token_list.append((tokens.DEDENT, '', lnum, pos, line))
-                last_comment = ''
+                token_list.append(Token(tokens.DEDENT, '', 0, 0, lnum, pos,
+                                        line))
+                comment_start = comment_end = 0
             if column != indents[-1]:
                 err = "unindent does not match any outer indentation level"
                 raise TokenIndentationError(err, line, lnum, 0, token_list)
@@ -164,9 +185,7 @@ def generate_tokens(lines, flags):
             pseudomatch = pseudoDFA.recognize(line, pos)
             if pseudomatch >= 0:                            # scan for tokens
                 # JDR: Modified
-                start = whiteSpaceDFA.recognize(line, pos)
-                if start < 0:
-                    start = pos
+                start = skip_whitespace(line, pos)
                 end = pseudomatch
 
                 if start == end:
@@ -174,52 +193,66 @@ def generate_tokens(lines, flags):
                                      lnum, start + 1, token_list)
 
                 pos = end
-                token, initial = line[start:end], line[start]
-                if initial in numchars or \
-                   (initial == '.' and token != '.'):      # ordinary number
-                    token_list.append((tokens.NUMBER, token, lnum, start, line))
-                    last_comment = ''
-                elif initial in '\r\n':
+                # the tokens are recorded as slices of 'line'; the text of
+                # a token is only sliced out here when it is needed to
+                # classify it, which is not the case for names and numbers
+                initial = line[start]
+                last = line[end - 1]
+                if initial in '\r\n':
                     if parenlev <= 0:
-                        tok = (tokens.NEWLINE, last_comment, lnum, start, line)
+                        tok = Token(tokens.NEWLINE, comment_line,
+                                    comment_start, comment_end, lnum, start,
+                                    line)
                         token_list.append(tok)
-                    last_comment = ''
+                    comment_start = comment_end = 0
+                    continue
+                elif initial == '\\':                    # continued stmt
+                    continued = 1
+                    continue
+                if initial in numchars or \
+                   (initial == '.' and end - start > 1):   # ordinary number
+                    token_list.append(Token(tokens.NUMBER, line, start, end,
+                                            lnum, start, line))
+                    comment_start = comment_end = 0
                 elif initial == '#':
                     # skip comment
-                    last_comment = token
-                elif token in triple_quoted:
-                    endDFA = endDFAs[token]
+                    comment_line = line
+                    comment_start = start
+                    comment_end = end
+                elif initial in namechars and last not in '\'"\n':
+                    # ordinary name; string literals with a prefix also
+                    # start with a letter, but end with a quote or with
+                    # the newline of a continued string
+                    token_list.append(Token(tokens.NAME, line, start, end,
+                                            lnum, start, line))
+                    comment_start = comment_end = 0
+                elif line[start:end] in triple_quoted:
+                    endDFA = endDFAs[line[start:end]]
                     endmatch = endDFA.recognize(line, pos)
                     if endmatch >= 0:                     # all on one line
                         pos = endmatch
-                        token = line[start:pos]
-                        tok = (tokens.STRING, token, lnum, start, line)
+                        tok = Token(tokens.STRING, line, start, pos, lnum,
+                                    start, line)
                         token_list.append(tok)
-                        last_comment = ''
+                        comment_start = comment_end = 0
                     else:
                         strstart = (lnum, start, line)
-                        contstr = line[start:]
-                        contline = line
+                        contstr = [line[start:]]
                         break
                 elif initial in single_quoted or \
-                    token[:2] in single_quoted or \
-                    token[:3] in single_quoted:
-                    if token[-1] == '\n':                  # continued string
+                    line[start:start + 2] in single_quoted or \
+                    line[start:start + 3] in single_quoted:
+                    if last == '\n':                       # continued string
                         strstart = (lnum, start, line)
-                        endDFA = (endDFAs[initial] or endDFAs[token[1]] or
-                                   endDFAs[token[2]])
-                        contstr, needcont = line[start:], 1
-                        contline = line
+                        endDFA = (endDFAs[initial] or endDFAs[line[start + 1]]
+                                  or endDFAs[line[start + 2]])
+                        contstr, needcont = [line[start:]], 1
                         break
                     else:                                  # ordinary string
-                        tok = (tokens.STRING, token, lnum, start, line)
+                        tok = Token(tokens.STRING, line, start, end, lnum,
+                                    start, line)
                         token_list.append(tok)
-                        last_comment = ''
-                elif initial in namechars:                 # ordinary name
-                    token_list.append((tokens.NAME, token, lnum, start, line))
-                    last_comment = ''
-                elif initial == '\\':                      # continued stmt
-                    continued = 1
+                        comment_start = comment_end = 0
                 else:
                     if initial in '([{':
                         if parenlev == 0:
@@ -230,35 +263,36 @@ def generate_tokens(lines, flags):
                         if parenlev < 0:
                             raise TokenError("unmatched '%s'" % initial, line,
                                              lnum, start + 1, token_list)
+                    token = line[start:end]
                     if token in python_opmap:
                         punct = python_opmap[token]
                     else:
                         punct = tokens.OP
-                    token_list.append((punct, token, lnum, start, line))
-                    last_comment = ''
+                    token_list.append(Token(punct, line, start, end, lnum,
+                                            start, line))
+                    comment_start = comment_end = 0
             else:
-                start = whiteSpaceDFA.recognize(line, pos)
-                if start < 0:
-                    start = pos
+                start = skip_whitespace(line, pos)
                 if start<max and line[start] in single_quoted:
                     raise TokenError("EOL while scanning string literal",
                              line, lnum, start+1, token_list)
-                tok = (tokens.ERRORTOKEN, line[pos], lnum, pos, line)
+                tok = Token(tokens.ERRORTOKEN, line, pos, pos + 1, lnum, pos,
+                            line)
                 token_list.append(tok)
-                last_comment = ''
+                comment_start = comment_end = 0
                 pos = pos + 1
 
     lnum -= 1
     if not (flags & consts.PyCF_DONT_IMPLY_DEDENT):
-        if token_list and token_list[-1][0] != tokens.NEWLINE:
-            tok = (tokens.NEWLINE, '', lnum, 0, '\n')
+        if token_list and token_list[-1].token_type != tokens.NEWLINE:
+            tok = Token(tokens.NEWLINE, '', 0, 0, lnum, 0, '\n')
             token_list.append(tok)
         for indent in indents[1:]:                # pop remaining indent levels
-            token_list.append((tokens.DEDENT, '', lnum, pos, line))
-    tok = (tokens.NEWLINE, '', lnum, 0, '\n')
+            token_list.append(Token(tokens.DEDENT, '', 0, 0, lnum, pos, line))
+    tok = Token(tokens.NEWLINE, '', 0, 0, lnum, 0, '\n')
     token_list.append(tok)
 
-    token_list.append((tokens.ENDMARKER, '', lnum, pos, line))
+    token_list.append(Token(tokens.ENDMARKER, '', 0, 0, lnum, pos, line))
     return token_list
 
 
@@ -14,7 +14,9 @@ class SimpleParser(parser.Parser):
         rl = StringIO.StringIO(input + "\n").readline
         gen = tokenize.generate_tokens(rl)
         for tp, value, begin, end, line in gen:
-            if self.add_token(tp, value, begin[0], begin[1], line):
+            token = parser.Token(tp, value, 0, len(value), begin[0], begin[1],
+                                 line)
+            if self.add_token(token):
                 py.test.raises(StopIteration, gen.next)
         return self.root
 
@@ -165,3 +165,32 @@ pass"""
         for linefeed in ["\r\n","\r"]:
             tree = self.parse(fmt % linefeed)
             assert expected_tree == tree
+
+    def test_tokenize_continuation_lines(self):
+        from pypy.interpreter.pyparser import pytokenizer
+        lines = ['x = """a\n', 'b\r\n', 'c""" + \\\n', ' \t 0.5 # hi\n']
+        toks = pytokenizer.generate_tokens(lines, 0)
+        assert [(tok.token_type, tok.get_value()) for tok in toks] == [
+            (tokens.NAME, 'x'), (tokens.EQUAL, '='),
+            (tokens.STRING, '"""a\nb\nc"""'), (tokens.PLUS, '+'),
+            (tokens.NUMBER, '0.5'), (tokens.NEWLINE, '# hi'),
+            (tokens.NEWLINE, ''), (tokens.ENDMARKER, '')]
+        assert [(tok.lineno, tok.column) for tok in toks][3:5] == [
+            (3, 5), (4, 3)]
+        lines = ["x = '''" + "a\n"] + ["b\n"] * 1000 + ["'''\n"]
+        toks = pytokenizer.generate_tokens(lines, 0)
+        assert toks[2].get_value() == "'''a\n" + "b\n" * 1000 + "'''"
+
+    def test_tokens_are_slices(self):
+        from pypy.interpreter.pyparser import pytokenizer
+        lines = ["if x.abc >= 42: # hi\n", "  y = r'z' + u'''t'''\n"]
+        toks = pytokenizer.generate_tokens(lines[:], 0)
+        assert [tok.get_value() for tok in toks] == [
+            'if', 'x', '.', 'abc', '>=', '42', ':', '# hi', '  ',
+            'y', '=', "r'z'", '+', "u'''t'''", '', '', '', '']
+        # the text of the tokens is not copied out of the lines
+        for tok in toks[:14]:
+            assert tok.source is lines[tok.lineno - 1]
+        assert toks[4].value_is('>=')
+        assert not toks[4].value_is('>')
+        assert not toks[3].value_is('abd')
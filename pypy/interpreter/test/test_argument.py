@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 import py
 from pypy.interpreter.argument import (Arguments, ArgErr, ArgErrUnknownKwds,
-        ArgErrMultipleValues, ArgErrCount, ArgErrCountMethod)
+        ArgErrMultipleValues, ArgErrCount, ArgErrCountMethod, KeywordCallCache)
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.error import OperationError
 
@@ -378,6 +378,53 @@ class TestArgumentsNormal(object):
             py.test.raises(ArgErrUnknownKwds, args._match_signature, None, l,
                            Signature(["a", "b"]), blindargs=2)
 
+    def test_keyword_call_cache(self):
+        space = DummySpace()
+        cache = KeywordCallCache()
+        keywords = ["c", "b"]
+        cache.keywords = keywords
+        sig = Signature(["a", "b", "c"])
+        args = Arguments(space, [1], keywords, [3, 2],
+                         keyword_call_cache=cache)
+        l = [None, None, None]
+        args._match_signature(None, l, sig)
+        assert l == [1, 2, 3]
+        assert cache.is_valid_for(sig, 1, 0)
+        assert cache.kwds_mapping == [1, 0]
+        # the next call to the same signature uses the cached mapping
+        args = Arguments(space, [4], keywords, [6, 5],
+                         keyword_call_cache=cache)
+        l = [None, None, None, None]
+        args.prepend(0)._match_signature(None, l,
+                                         Signature(["x", "a", "b", "c"]))
+        assert l == [0, 4, 5, 6]
+        assert not cache.is_valid_for(sig, 1, 0)
+        args = Arguments(space, [4], keywords, [6, 5],
+                         keyword_call_cache=cache)
+        l = [None, None, None, None]
+        sig2 = Signature(["a", "b", "c", "d"])
+        args._match_signature(None, l, sig2, defaults_w=[7])
+        assert l == [4, 5, 6, 7]
+        assert cache.is_valid_for(sig2, 1, 0)
+
+    def test_keyword_call_cache_only_for_named_args(self):
+        space = DummySpace()
+        cache = KeywordCallCache()
+        keywords = ["b", "c"]
+        cache.keywords = keywords
+        args = Arguments(space, [1], keywords, [2, 3],
+                         keyword_call_cache=cache)
+        l = [None, None, None]
+        args._match_signature(None, l, Signature(["a", "b"], None, "**"))
+        assert l == [1, 2, {'c': 3}]
+        assert cache.signature is None
+        args = Arguments(space, [1, 2], keywords, [2, 3],
+                         keyword_call_cache=cache)
+        l = [None, None, None]
+        py.test.raises(ArgErrMultipleValues, args._match_signature, None, l,
+                       Signature(["a", "b", "c"]))
+        assert cache.signature is None
+
     def test_args_parsing(self):
         space = DummySpace()
         args = Arguments(space, [])
@@ -803,6 +850,26 @@ class AppTestArgument:
             return kwargs
         assert f(**globals()) == globals()
 
+    def test_keyword_call_cache_callee_changes(self):
+        def f(a, b=2, c=3):
+            return (a, b, c)
+        def g(c=4, b=5, a=6):
+            return (a, b, c)
+        class A(object):
+            def m(self, a, b=2, c=3):
+                return (a, b, c)
+        res = []
+        for func in [f, f, g, g, f, A().m, A().m]:
+            res.append(func(b=10, a=11))
+        assert res == [(11, 10, 3), (11, 10, 3), (11, 10, 4), (11, 10, 4),
+                       (11, 10, 3), (11, 10, 3), (11, 10, 3)]
+        res = []
+        for obj in [A(), A(), A()]:
+            res.append(obj.m(c=12, a=13))
+        assert res == [(13, 2, 12)] * 3
+        for i in range(2):
+            raises(TypeError, f, 1, a=2)
+
     def test_cpython_issue4806(self):
         def broken():
             raise TypeError("myerror")
@@ -34,6 +34,17 @@ class ThreadModule(MixedModule):
         '_signals_exit':   'interp_signal.signals_exit',
     }
 
+    def setup_after_space_initialization(self):
+        """NOT_RPYTHON"""
+        if self.space.config.objspace.usemodules.thread:
+            self.extra_interpdef('gil_stats', 'interp_gil.gil_stats')
+            self.extra_interpdef('reset_gil_stats',
+                                 'interp_gil.reset_gil_stats')
+            self.extra_interpdef('enable_gil_stats',
+                                 'interp_gil.enable_gil_stats')
+            self.extra_interpdef('set_gil_policy', 'interp_gil.set_gil_policy')
+            self.extra_interpdef('get_gil_policy', 'interp_gil.get_gil_policy')
+
 
 class IntOpModule(MixedModule):
     """ Module for integer operations that have two-complement overflow
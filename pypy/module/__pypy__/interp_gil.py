@@ -0,0 +1,69 @@
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from rpython.rlib import rgil
+
+
+def _wrap_histogram(space, stats, start):
+    return space.newlist([space.newint(stats[start + i])
+                          for i in range(rgil.HIST_SIZE)])
+
+@unwrap_spec(per_thread=bool)
+def gil_stats(space, per_thread=False):
+    """Return a dict with statistics about the GIL, for the whole process
+    or only for the current thread.  Times are in seconds.  Bucket 0 of
+    the histograms counts the periods below one microsecond, and bucket
+    i the ones between 2**(i-1) and 2**i microseconds.  The acquisitions
+    and the hold periods are only counted after enable_gil_stats().  A
+    hold period is only measured if it starts while other threads are
+    waiting; it extends over the external calls done by JIT-compiled
+    code."""
+    stats = rgil.get_stats(per_thread)
+    w_d = space.newdict()
+    def setitem(key, w_value):
+        space.setitem_str(w_d, key, w_value)
+    if not per_thread:
+        setitem('acquisitions', space.newint(stats[rgil.STAT_ACQUIRE]))
+    setitem('contended', space.newint(stats[rgil.STAT_CONTENDED]))
+    setitem('yields', space.newint(stats[rgil.STAT_YIELD]))
+    setitem('wait_time', space.newfloat(stats[rgil.STAT_WAIT_US] * 1e-6))
+    setitem('holds', space.newint(stats[rgil.STAT_HOLD]))
+    setitem('hold_time', space.newfloat(stats[rgil.STAT_HOLD_US] * 1e-6))
+    setitem('wait_histogram',
+            _wrap_histogram(space, stats, rgil.STAT_WAIT_HIST))
+    setitem('hold_histogram',
+            _wrap_histogram(space, stats, rgil.STAT_HOLD_HIST))
+    return w_d
+
+@unwrap_spec(per_thread=bool)
+def reset_gil_stats(space, per_thread=False):
+    """Reset the counters returned by gil_stats()."""
+    rgil.reset_stats(per_thread)
+
+@unwrap_spec(flag=bool)
+def enable_gil_stats(space, flag=True):
+    """Also count the acquisitions of the GIL and measure the hold
+    periods in gil_stats().  This adds a little work every time the GIL
+    is acquired or released, so it is disabled by default."""
+    rgil.enable_stats(flag)
+
+@unwrap_spec(name='text')
+def set_gil_policy(space, name):
+    """Select how the GIL is handed off between threads: 'fair' (the
+    default) cycles between all waiting threads, while 'io' gives
+    priority to the threads that come back from a blocking call over
+    the ones that yield it after running for sys.getcheckinterval()
+    bytecodes, and makes the latter yield more often as long as the
+    former are waiting."""
+    if name == 'fair':
+        rgil.set_policy(rgil.POLICY_FAIR)
+    elif name == 'io':
+        rgil.set_policy(rgil.POLICY_IO)
+    else:
+        raise oefmt(space.w_ValueError,
+                    "unknown GIL policy '%s' (expected 'fair' or 'io')", name)
+
+def get_gil_policy(space):
+    """Return the name of the GIL handoff policy, see set_gil_policy()."""
+    if rgil.get_policy() == rgil.POLICY_IO:
+        return space.newtext('io')
+    return space.newtext('fair')
@@ -0,0 +1,52 @@
+
+class AppTestGilStats:
+    spaceconfig = dict(usemodules=['__pypy__', 'thread'])
+
+    def test_gil_stats(self):
+        from __pypy__ import thread
+        thread.reset_gil_stats()
+        stats = thread.gil_stats()
+        for key in ['acquisitions', 'contended', 'yields', 'holds']:
+            assert stats[key] >= 0
+        assert stats['wait_time'] >= 0.0
+        assert stats['hold_time'] >= 0.0
+        assert len(stats['wait_histogram']) == 24
+        assert len(stats['hold_histogram']) == 24
+        assert sum(stats['wait_histogram']) == stats['contended']
+        assert sum(stats['hold_histogram']) == stats['holds']
+
+    def test_gil_stats_per_thread(self):
+        from __pypy__ import thread
+        thread.reset_gil_stats(per_thread=True)
+        stats = thread.gil_stats(per_thread=True)
+        assert 'acquisitions' not in stats
+        assert stats['contended'] == 0
+        assert stats['wait_time'] == 0.0
+
+    def test_enable_gil_stats(self):
+        from __pypy__ import thread
+        thread.enable_gil_stats()
+        try:
+            thread.reset_gil_stats()
+            assert thread.gil_stats()['holds'] == 0
+        finally:
+            thread.enable_gil_stats(False)
+
+    def test_gil_policy(self):
+        from __pypy__ import thread
+        assert thread.get_gil_policy() == 'fair'
+        thread.set_gil_policy('io')
+        try:
+            assert thread.get_gil_policy() == 'io'
+        finally:
+            thread.set_gil_policy('fair')
+        assert thread.get_gil_policy() == 'fair'
+        raises(ValueError, thread.set_gil_policy, 'lifo')
+
+
+class AppTestNoThread:
+    spaceconfig = dict(usemodules=['__pypy__'])
+
+    def test_no_gil_stats(self):
+        from __pypy__ import thread
+        assert not hasattr(thread, 'gil_stats')
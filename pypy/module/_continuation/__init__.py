@@ -27,6 +27,12 @@ that idea only works in C, not in Python, notably because of exceptions.
 
 The most primitive API is actually 'permute()', which just permutes the
 one-shot continuation stored in two (or more) continulets.
+
+By default, switching copies slices of the C stack around.  After
+'set_segment_size(n)', the threads that start using continulets give
+each of them its own stack segment of n bytes instead, which makes
+switching cheaper.  The amount of stack kept alive by a suspended
+continulet is returned by its 'stack_size()' method.
 """
 
     appleveldefs = {
@@ -37,5 +43,6 @@ one-shot continuation stored in two (or more) continulets.
     interpleveldefs = {
         'continulet': 'interp_continuation.W_Continulet',
         'permute': 'interp_continuation.permute',
+        'set_segment_size': 'interp_continuation.set_segment_size',
         '_p': 'interp_continuation.unpickle',      # pickle support
     }
@@ -1,6 +1,7 @@
 from rpython.rlib.rstacklet import StackletThread
 from rpython.rlib import jit
 from pypy.interpreter.error import OperationError, get_cleared_operation_error
+from pypy.interpreter.error import oefmt
 from pypy.interpreter.executioncontext import ExecutionContext
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.typedef import TypeDef
@@ -114,6 +115,13 @@ class W_Continulet(W_Root):
                  and not self.sthread.is_empty_handle(self.h))
         return self.space.newbool(valid)
 
+    def descr_stack_size(self):
+        """Number of bytes of C stack kept alive by the suspended
+        continuation, or 0 if the continulet is not pending."""
+        if self.sthread is None:
+            return self.space.newint(0)
+        return self.space.newint(self.sthread.get_stack_size(self.h))
+
     def descr__reduce__(self):
         from pypy.module._continuation import interp_pickle
         return interp_pickle.reduce(self)
@@ -142,6 +150,7 @@ W_Continulet.typedef = TypeDef(
     switch      = interp2app(W_Continulet.descr_switch),
     throw       = interp2app(W_Continulet.descr_throw),
     is_pending  = interp2app(W_Continulet.descr_is_pending),
+    stack_size  = interp2app(W_Continulet.descr_stack_size),
     __reduce__  = interp2app(W_Continulet.descr__reduce__),
     __setstate__= interp2app(W_Continulet.descr__setstate__),
     )
@@ -176,6 +185,7 @@ class State:
         self.entrypoint_pycode.hidden_applevel = True
         self.w_unpickle = w_module.get('_p')
         self.w_module_dict = w_module.getdict(space)
+        self.segment_size = 0
 
 def geterror(space, message):
     cs = space.fromcache(State)
@@ -195,7 +205,8 @@ def get_w_module_dict(space):
 class SThread(StackletThread):
 
     def __init__(self, space, ec):
-        StackletThread.__init__(self)
+        cs = space.fromcache(State)
+        StackletThread.__init__(self, segment_size=cs.segment_size)
         self.space = space
         self.ec = ec
         # for unpickling
@@ -263,6 +274,20 @@ def build_sthread(space):
         sthread = ec.stacklet_thread = SThread(space, ec)
     return sthread
 
+@unwrap_spec(size=int)
+def set_segment_size(space, size):
+    """Run the continulets of the threads that don't have any yet on
+    separate stack segments of 'size' bytes.  Switching is then faster,
+    because no stack needs to be copied, but the recursion limit inside
+    a continulet depends on 'size'.  0 (the default) goes back to copying
+    the stacks.  Returns the previous value."""
+    if size < 0:
+        raise oefmt(space.w_ValueError, "segment size must be >= 0")
+    cs = space.fromcache(State)
+    old_size = cs.segment_size
+    cs.segment_size = size
+    return space.newint(old_size)
+
 # ____________________________________________________________
 
 def permute(space, args_w):
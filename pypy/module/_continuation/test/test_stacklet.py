@@ -699,6 +699,28 @@ class AppTestStacklet(BaseAppTest):
             got = c1.switch()
         assert got == (None, None, None)
 
+    def test_stack_size(self):
+        from _continuation import continulet
+        #
+        def f1(c1):
+            c1.switch()
+        #
+        c1 = continulet(f1)
+        assert c1.stack_size() > 0
+        c1.switch()
+        assert c1.is_pending()
+        assert c1.stack_size() > 0
+        c1.switch()
+        assert not c1.is_pending()
+        assert c1.stack_size() == 0
+        assert continulet.__new__(continulet).stack_size() == 0
+
+    def test_set_segment_size(self):
+        from _continuation import set_segment_size
+        raises(ValueError, set_segment_size, -1)
+        old = set_segment_size(12345)
+        assert set_segment_size(old) == 12345
+
     def test_bug_issue1984(self):
         from _continuation import continulet, error
 
@@ -707,3 +729,73 @@ class AppTestStacklet(BaseAppTest):
 
         continulet.switch(c1, to=c2)
         raises(error, continulet.switch, c1, to=c2)
+
+
+class AppTestStackletSegments(BaseAppTest):
+    SEGMENT_SIZE = 32 * 1024 * 1024    # untranslated code needs a lot
+
+    def setup_class(cls):
+        BaseAppTest.setup_class.im_func(cls)
+        from pypy.module._continuation.interp_continuation import State
+        space = cls.space
+        ec = space.getexecutioncontext()
+        cls.old_sthread = ec.stacklet_thread
+        ec.stacklet_thread = None
+        space.fromcache(State).segment_size = cls.SEGMENT_SIZE
+
+    def teardown_class(cls):
+        from pypy.module._continuation.interp_continuation import State
+        space = cls.space
+        space.fromcache(State).segment_size = 0
+        space.getexecutioncontext().stacklet_thread = cls.old_sthread
+
+    def test_switch(self):
+        from _continuation import continulet
+        #
+        def f1(c1, x):
+            y = c1.switch(x + 1)
+            return y * 2
+        #
+        c1 = continulet(f1, 40)
+        assert c1.switch() == 41
+        assert c1.is_pending()
+        assert c1.stack_size() > 0
+        assert c1.switch(5) == 10
+        assert not c1.is_pending()
+        assert c1.stack_size() == 0
+
+    def test_exception(self):
+        from _continuation import continulet
+        #
+        def f1(c1):
+            res = c1.switch(1)
+            raise ValueError(res)
+        #
+        c1 = continulet(f1)
+        assert c1.switch() == 1
+        e = raises(ValueError, c1.switch, 3)
+        assert e.value.args == (3,)
+        assert not c1.is_pending()
+
+    def test_many_continulets(self):
+        from _continuation import continulet
+        #
+        def f(c, n):
+            total = 0
+            for i in range(3):
+                total += c.switch(total)
+            return -n
+        #
+        lst = [continulet(f, i) for i in range(10)]
+        for c in lst:
+            assert c.switch() == 0
+        for i in range(2):
+            for j, c in enumerate(lst):
+                assert c.switch(j) == j * (i + 1)
+        for j, c in enumerate(lst):
+            assert c.switch(0) == -j
+            assert not c.is_pending()
+        # the segments of finished continulets are reused
+        for i in range(30):
+            c = continulet(lambda c: 42)
+            assert c.switch() == 42
@@ -1,5 +1,8 @@
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib import objectmodel
+from rpython.rlib.rarithmetic import string_to_int
+from rpython.rlib.rfloat import string_to_float
+from rpython.rlib.rstring import ParseStringError, ParseStringOverflowError
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import unwrap_spec
@@ -22,6 +25,9 @@ class W_Reader(W_Root):
         self.dialect = dialect
         self.w_iter = w_iter
         self.line_num = 0
+        self.fields_w = []
+        self.field_builder = None
+        self.row_fields = None   # list of strings, only in bulk mode
 
     def iter_w(self):
         return self
@@ -42,9 +48,11 @@ class W_Reader(W_Root):
     def save_field(self, field_builder):
         space = self.space
         field = field_builder.build()
+        row_fields = self.row_fields
+        if row_fields is not None:
+            row_fields.append(field)
+            return
         if self.numeric_field:
-            from rpython.rlib.rstring import ParseStringError
-            from rpython.rlib.rfloat import string_to_float
             self.numeric_field = False
             try:
                 ff = string_to_float(field)
@@ -55,12 +63,170 @@ class W_Reader(W_Root):
             w_obj = space.newtext(field)
         self.fields_w.append(w_obj)
 
+    def process_chars(self, line, i, state, bulk=False):
+        """Run the state machine over the characters of 'line' starting
+        at index 'i'.  Returns the new state and the index where parsing
+        stopped: normally the end of the line, but in bulk mode parsing
+        stops at the first character of the next record."""
+        dialect = self.dialect
+        field_builder = self.field_builder
+        end = len(line)
+        while i < end:
+            c = line[i]
+            i += 1
+            if c == '\0':
+                raise self.error("line contains NULL byte")
+
+            if state == START_RECORD:
+                if c == '\n' or c == '\r':
+                    state = EAT_CRNL
+                    continue
+                # normal character - handle as START_FIELD
+                state = START_FIELD
+                # fall-through to the next case
+
+            if state == START_FIELD:
+                field_builder = StringBuilder(64)
+                # expecting field
+                if c == '\n' or c == '\r':
+                    # save empty field
+                    self.save_field(field_builder)
+                    state = EAT_CRNL
+                elif (c == dialect.quotechar and
+                          dialect.quoting != QUOTE_NONE):
+                    # start quoted field
+                    state = IN_QUOTED_FIELD
+                elif c == dialect.escapechar:
+                    # possible escaped character
+                    state = ESCAPED_CHAR
+                elif c == ' ' and dialect.skipinitialspace:
+                    # ignore space at start of field
+                    pass
+                elif c == dialect.delimiter:
+                    # save empty field
+                    self.save_field(field_builder)
+                else:
+                    # begin new unquoted field
+                    if dialect.quoting == QUOTE_NONNUMERIC:
+                        self.numeric_field = True
+                    self.add_char(field_builder, c)
+                    state = IN_FIELD
+
+            elif state == ESCAPED_CHAR:
+                self.add_char(field_builder, c)
+                state = IN_FIELD
+
+            elif state == IN_FIELD:
+                # in unquoted field
+                if c == '\n' or c == '\r':
+                    # end of line
+                    self.save_field(field_builder)
+                    state = EAT_CRNL
+                elif c == dialect.escapechar:
+                    # possible escaped character
+                    state = ESCAPED_CHAR
+                elif c == dialect.delimiter:
+                    # save field - wait for new field
+                    self.save_field(field_builder)
+                    state = START_FIELD
+                else:
+                    # normal character - save in field
+                    self.add_char(field_builder, c)
+
+            elif state == IN_QUOTED_FIELD:
+                # in quoted field
+                if c == dialect.escapechar:
+                    # Possible escape character
+                    state = ESCAPE_IN_QUOTED_FIELD
+                elif (c == dialect.quotechar and
+                          dialect.quoting != QUOTE_NONE):
+                    if dialect.doublequote:
+                        # doublequote; " represented by ""
+                        state = QUOTE_IN_QUOTED_FIELD
+                    else:
+                        # end of quote part of field
+                        state = IN_FIELD
+                else:
+                    # normal character - save in field
+                    self.add_char(field_builder, c)
+
+            elif state == ESCAPE_IN_QUOTED_FIELD:
+                self.add_char(field_builder, c)
+                state = IN_QUOTED_FIELD
+
+            elif state == QUOTE_IN_QUOTED_FIELD:
+                # doublequote - seen a quote in an quoted field
+                if (dialect.quoting != QUOTE_NONE and
+                        c == dialect.quotechar):
+                    # save "" as "
+                    self.add_char(field_builder, c)
+                    state = IN_QUOTED_FIELD
+                elif c == dialect.delimiter:
+                    # save field - wait for new field
+                    self.save_field(field_builder)
+                    state = START_FIELD
+                elif c == '\n' or c == '\r':
+                    # end of line
+                    self.save_field(field_builder)
+                    state = EAT_CRNL
+                elif not dialect.strict:
+                    self.add_char(field_builder, c)
+                    state = IN_FIELD
+                else:
+                    # illegal
+                    raise self.error("'%s' expected after '%s'" % (
+                        dialect.delimiter, dialect.quotechar))
+
+            elif state == EAT_CRNL:
+                if not (c == '\n' or c == '\r'):
+                    if bulk:
+                        # first character of the next record
+                        i -= 1
+                        break
+                    raise self.error("new-line character seen in unquoted "
+                                    "field - do you need to open the file "
+                                    "in universal-newline mode?")
+        self.field_builder = field_builder
+        return state, i
+
+    def end_of_line(self, state):
+        """Called when the end of a line is reached.  If the record is
+        complete, returns START_RECORD or EAT_CRNL."""
+        field_builder = self.field_builder
+        if state == IN_FIELD or state == QUOTE_IN_QUOTED_FIELD:
+            self.save_field(field_builder)
+            state = START_RECORD
+        elif state == ESCAPED_CHAR:
+            self.add_char(field_builder, '\n')
+            state = IN_FIELD
+        elif state == IN_QUOTED_FIELD:
+            pass
+        elif state == ESCAPE_IN_QUOTED_FIELD:
+            self.add_char(field_builder, '\n')
+            state = IN_QUOTED_FIELD
+        elif state == START_FIELD:
+            # save empty field
+            self.save_field(StringBuilder(1))
+            state = START_RECORD
+        return state
+
+    def end_of_input(self, state):
+        field_builder = self.field_builder
+        if (field_builder is not None and
+                state != START_RECORD and state != EAT_CRNL and
+                (len(field_builder.build()) > 0 or
+                 state == IN_QUOTED_FIELD)):
+            if self.dialect.strict:
+                raise self.error("newline inside string")
+            self.save_field(field_builder)
+            return True
+        return False
+
     def next_w(self):
         space = self.space
-        dialect = self.dialect
         self.fields_w = []
         self.numeric_field = False
-        field_builder = None  # valid iff state not in [START_RECORD, EAT_CRNL]
+        self.field_builder = None  # valid iff state not in [START_RECORD, EAT_CRNL]
         state = START_RECORD
         #
         while True:
@@ -68,151 +234,168 @@ class W_Reader(W_Root):
                 w_line = space.next(self.w_iter)
             except OperationError as e:
                 if e.match(space, space.w_StopIteration):
-                    if (field_builder is not None and
-                            state != START_RECORD and state != EAT_CRNL and
-                            (len(field_builder.build()) > 0 or
-                             state == IN_QUOTED_FIELD)):
-                        if dialect.strict:
-                            raise self.error("newline inside string")
-                        else:
-                            self.save_field(field_builder)
-                            break
+                    if self.end_of_input(state):
+                        break
                 raise
             self.line_num += 1
             line = space.text_w(w_line)
-            for c in line:
-                if c == '\0':
-                    raise self.error("line contains NULL byte")
-
-                if state == START_RECORD:
-                    if c == '\n' or c == '\r':
-                        state = EAT_CRNL
-                        continue
-                    # normal character - handle as START_FIELD
-                    state = START_FIELD
-                    # fall-through to the next case
-
-                if state == START_FIELD:
-                    field_builder = StringBuilder(64)
-                    # expecting field
-                    if c == '\n' or c == '\r':
-                        # save empty field
-                        self.save_field(field_builder)
-                        state = EAT_CRNL
-                    elif (c == dialect.quotechar and
-                              dialect.quoting != QUOTE_NONE):
-                        # start quoted field
-                        state = IN_QUOTED_FIELD
-                    elif c == dialect.escapechar:
-                        # possible escaped character
-                        state = ESCAPED_CHAR
-                    elif c == ' ' and dialect.skipinitialspace:
-                        # ignore space at start of field
-                        pass
-                    elif c == dialect.delimiter:
-                        # save empty field
-                        self.save_field(field_builder)
-                    else:
-                        # begin new unquoted field
-                        if dialect.quoting == QUOTE_NONNUMERIC:
-                            self.numeric_field = True
-                        self.add_char(field_builder, c)
-                        state = IN_FIELD
-
-                elif state == ESCAPED_CHAR:
-                    self.add_char(field_builder, c)
-                    state = IN_FIELD
-
-                elif state == IN_FIELD:
-                    # in unquoted field
-                    if c == '\n' or c == '\r':
-                        # end of line
-                        self.save_field(field_builder)
-                        state = EAT_CRNL
-                    elif c == dialect.escapechar:
-                        # possible escaped character
-                        state = ESCAPED_CHAR
-                    elif c == dialect.delimiter:
-                        # save field - wait for new field
-                        self.save_field(field_builder)
-                        state = START_FIELD
-                    else:
-                        # normal character - save in field
-                        self.add_char(field_builder, c)
-
-                elif state == IN_QUOTED_FIELD:
-                    # in quoted field
-                    if c == dialect.escapechar:
-                        # Possible escape character
-                        state = ESCAPE_IN_QUOTED_FIELD
-                    elif (c == dialect.quotechar and
-                              dialect.quoting != QUOTE_NONE):
-                        if dialect.doublequote:
-                            # doublequote; " represented by ""
-                            state = QUOTE_IN_QUOTED_FIELD
-                        else:
-                            # end of quote part of field
-                            state = IN_FIELD
-                    else:
-                        # normal character - save in field
-                        self.add_char(field_builder, c)
-
-                elif state == ESCAPE_IN_QUOTED_FIELD:
-                    self.add_char(field_builder, c)
-                    state = IN_QUOTED_FIELD
-
-                elif state == QUOTE_IN_QUOTED_FIELD:
-                    # doublequote - seen a quote in an quoted field
-                    if (dialect.quoting != QUOTE_NONE and
-                            c == dialect.quotechar):
-                        # save "" as "
-                        self.add_char(field_builder, c)
-                        state = IN_QUOTED_FIELD
-                    elif c == dialect.delimiter:
-                        # save field - wait for new field
-                        self.save_field(field_builder)
-                        state = START_FIELD
-                    elif c == '\n' or c == '\r':
-                        # end of line
-                        self.save_field(field_builder)
-                        state = EAT_CRNL
-                    elif not dialect.strict:
-                        self.add_char(field_builder, c)
-                        state = IN_FIELD
-                    else:
-                        # illegal
-                        raise self.error("'%s' expected after '%s'" % (
-                            dialect.delimiter, dialect.quotechar))
-
-                elif state == EAT_CRNL:
-                    if not (c == '\n' or c == '\r'):
-                        raise self.error("new-line character seen in unquoted "
-                                        "field - do you need to open the file "
-                                        "in universal-newline mode?")
-
-            if state == IN_FIELD or state == QUOTE_IN_QUOTED_FIELD:
-                self.save_field(field_builder)
-                break
-            elif state == ESCAPED_CHAR:
-                self.add_char(field_builder, '\n')
-                state = IN_FIELD
-            elif state == IN_QUOTED_FIELD:
-                pass
-            elif state == ESCAPE_IN_QUOTED_FIELD:
-                self.add_char(field_builder, '\n')
-                state = IN_QUOTED_FIELD
-            elif state == START_FIELD:
-                # save empty field
-                field_builder = StringBuilder(1)
-                self.save_field(field_builder)
-                break
-            else:
+            state, _ = self.process_chars(line, 0, state)
+            state = self.end_of_line(state)
+            if state == START_RECORD or state == EAT_CRNL:
                 break
         #
+        self.field_builder = None
         w_result = space.newlist(self.fields_w)
         self.fields_w = None
         return w_result
 
+    def read_columns(self, data, columns):
+        """Parse all the records in the string 'data' at once, appending
+        the fields of each one to the corresponding column.  'columns' is
+        a list of Column instances, or None to create string columns based
+        on the number of fields of the first record."""
+        self.row_fields = []
+        self.numeric_field = False
+        self.field_builder = None
+        state = START_RECORD
+        i = 0
+        end = len(data)
+        while i < end:
+            self.line_num += 1
+            state, i = self.process_chars(data, i, state, bulk=True)
+            if i < end:
+                columns = self.store_row(columns)
+                state = START_RECORD
+        state = self.end_of_line(state)
+        if state != START_RECORD and state != EAT_CRNL:
+            self.end_of_input(state)
+        columns = self.store_row(columns)
+        self.row_fields = None
+        self.field_builder = None
+        return columns
+
+    def store_row(self, columns):
+        fields = self.row_fields
+        if not fields:
+            return columns     # blank lines are skipped
+        if columns is None:
+            columns = [StrColumn() for field in fields]
+        if len(fields) != len(columns):
+            raise self.error("expected %d fields, saw %d" % (
+                len(columns), len(fields)))
+        for j in range(len(fields)):
+            columns[j].append(self, fields[j])
+        self.row_fields = []
+        return columns
+
+
+class Column(object):
+    """A column of values filled by W_Reader.read_columns()."""
+
+    def append(self, reader, field):
+        raise NotImplementedError
+
+    def wrap(self, space):
+        raise NotImplementedError
+
+
+class StrColumn(Column):
+    def __init__(self):
+        self.items = []
+
+    def append(self, reader, field):
+        self.items.append(field)
+
+    def wrap(self, space):
+        return space.newlist_bytes(self.items)
+
+
+class IntColumn(Column):
+    def __init__(self):
+        self.items = []
+
+    def append(self, reader, field):
+        try:
+            value = string_to_int(field)
+        except ParseStringOverflowError:
+            raise reader.error("integer too large for an int column: '%s'"
+                               % (field,))
+        except ParseStringError as e:
+            space = reader.space
+            raise wrap_parsestringerror(space, e, space.newtext(field))
+        self.items.append(value)
+
+    def wrap(self, space):
+        return space.newlist_int(self.items)
+
+
+class FloatColumn(Column):
+    def __init__(self):
+        self.items = []
+
+    def append(self, reader, field):
+        try:
+            value = string_to_float(field)
+        except ParseStringError as e:
+            space = reader.space
+            raise wrap_parsestringerror(space, e, space.newtext(field))
+        self.items.append(value)
+
+    def wrap(self, space):
+        return space.newlist_float(self.items)
+
+
+def _make_columns(space, w_types):
+    if space.is_none(w_types):
+        return None
+    columns = []
+    for w_type in space.listview(w_types):
+        if space.is_w(w_type, space.w_int):
+            columns.append(IntColumn())
+        elif space.is_w(w_type, space.w_float):
+            columns.append(FloatColumn())
+        elif space.is_w(w_type, space.w_bytes) or space.is_none(w_type):
+            columns.append(StrColumn())
+        else:
+            raise oefmt(space.w_TypeError,
+                        "column types must be int, float, str or None, "
+                        "not %R", w_type)
+    return columns
+
+
+def csv_read_columns(space, w_data, w_types=None, w_dialect=None,
+                  w_delimiter        = None,
+                  w_doublequote      = None,
+                  w_escapechar       = None,
+                  w_lineterminator   = None,
+                  w_quotechar        = None,
+                  w_quoting          = None,
+                  w_skipinitialspace = None,
+                  w_strict           = None,
+                  ):
+    """
+    columns = read_columns(data [, types] [, dialect='excel']
+                           [optional keyword args])
+
+    Parse all the rows contained in the string or buffer "data" at once
+    and return a list of columns instead of a list of rows.  All the rows
+    must have the same number of fields; blank lines are skipped.  The
+    optional "types" argument is a sequence giving the type of each
+    column: int or float convert the fields of that column, str or None
+    keeps them as strings.  Numeric columns are stored compactly.  The
+    dialect and keyword arguments are the same as for reader(), but the
+    QUOTE_NONNUMERIC conversion is not done; use "types" instead."""
+    data = space.getarg_w('s*', w_data).as_str()
+    columns = _make_columns(space, w_types)
+    dialect = _build_dialect(space, w_dialect, w_delimiter, w_doublequote,
+                             w_escapechar, w_lineterminator, w_quotechar,
+                             w_quoting, w_skipinitialspace, w_strict)
+    reader = W_Reader(space, dialect, None)
+    columns = reader.read_columns(data, columns)
+    if columns is None:
+        return space.newlist([])
+    return space.newlist([column.wrap(space) for column in columns])
+
 
 def csv_reader(space, w_iterator, w_dialect=None,
                   w_delimiter        = None,
@@ -104,3 +104,27 @@ class AppTestReader(object):
         self._read_test(['a,"'], 'Error', strict=True)
         self._read_test(['"a'], 'Error', strict=True)
         self._read_test(['^'], 'Error', escapechar='^', strict=True)
+
+    def test_read_columns(self):
+        import _csv
+        data = 'a,1,2.5\r\n"b,c",-2,1e3\r\n\r\nd, 3 ,.5'
+        assert _csv.read_columns(data) == [['a', 'b,c', 'd'],
+                                           ['1', '-2', ' 3 '],
+                                           ['2.5', '1e3', '.5']]
+        cols = _csv.read_columns(data, (str, int, float))
+        assert cols == [['a', 'b,c', 'd'], [1, -2, 3], [2.5, 1000.0, 0.5]]
+        assert type(cols[1][0]) is int
+        assert _csv.read_columns(buffer('x;y\nz;w\n'), [None, None],
+                                 delimiter=';') == [['x', 'z'], ['y', 'w']]
+        assert _csv.read_columns('') == []
+        assert _csv.read_columns('"a\nb",c\n') == [['a\nb'], ['c']]
+
+    def test_read_columns_errors(self):
+        import _csv
+        raises(_csv.Error, _csv.read_columns, 'a,b\nc\n')
+        raises(_csv.Error, _csv.read_columns, 'a,b\n', [int])
+        raises(ValueError, _csv.read_columns, 'a,b\n', [int, str])
+        raises(ValueError, _csv.read_columns, '1,\n', [int, float])
+        raises(TypeError, _csv.read_columns, 'a\n', [list])
+        raises(_csv.Error, _csv.read_columns, '"ab', strict=True)
+        assert _csv.read_columns('"ab') == [['ab']]
@@ -15,6 +15,9 @@ from pypy.module.thread.os_lock import Lock
 
 algorithms = ('md5', 'sha1', 'sha224', 'sha256', 'sha384', 'sha512')
 
+# updates with at least this many bytes release the GIL
+HASHLIB_GIL_MINSIZE = 2048
+
 def hash_name_mapper_callback(obj_name, userdata):
     if not obj_name:
         return
@@ -53,9 +56,9 @@ class W_Hash(W_Root):
         digest_type = self.digest_type_by_name(space)
         self.digest_size = ropenssl.EVP_MD_size(digest_type)
 
-        # Allocate a lock for each HASH object.
-        # An optimization would be to not release the GIL on small requests,
-        # and use a custom lock only when needed.
+        # Allocate a lock for each HASH object.  It is needed even for
+        # small requests, which don't release the GIL: another thread
+        # might be in the middle of a large one.
         self.lock = Lock(space)
 
         ctx = ropenssl.EVP_MD_CTX_new()
@@ -95,8 +98,11 @@ class W_Hash(W_Root):
     def update(self, space, string):
         with rffi.scoped_nonmovingbuffer(string) as buf:
             with self.lock:
-                # XXX try to not release the GIL for small requests
-                ropenssl.EVP_DigestUpdate(self.ctx, buf, len(string))
+                if len(string) < HASHLIB_GIL_MINSIZE:
+                    ropenssl.EVP_DigestUpdate_nogil(self.ctx, buf,
+                                                    len(string))
+                else:
+                    ropenssl.EVP_DigestUpdate(self.ctx, buf, len(string))
 
     def copy(self, space):
         "Return a copy of the hash object."
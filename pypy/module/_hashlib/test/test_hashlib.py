@@ -13,6 +13,16 @@ class AppTestHashlib:
         assert _hashlib.new('md5').__class__.__name__ == 'HASH'
         assert len(_hashlib.new('md5').hexdigest()) == 32
 
+    def test_update_large(self):
+        import _hashlib
+        data = ''.join([chr(i % 251) for i in range(10000)])
+        h1 = _hashlib.new('sha1')
+        h1.update(data)          # releases the GIL
+        h2 = _hashlib.new('sha1')
+        for i in range(0, len(data), 100):
+            h2.update(data[i:i + 100])
+        assert h1.hexdigest() == h2.hexdigest()
+
     def test_attributes(self):
         import hashlib
         for name, (expected_size, expected_block_size) in {
@@ -135,6 +135,11 @@ class BufferedMixin:
         self.write_end = -1 # Just after the last byte waiting to be written,
                             # or -1 if the buffer isn't ready for writing.
 
+        self.line_ends = None   # For next(): the ends of the complete lines
+        self.line_index = 0     # that follow 'pos' in the buffer, and the
+                                # index of the next one.  Cleared by all
+                                # the other operations, see _check_init().
+
         self.lock = None
 
         self.readable = False
@@ -153,6 +158,7 @@ class BufferedMixin:
                         "buffer size must be strictly positive")
 
         self.buffer = ByteBuffer(self.buffer_size)
+        self.line_ends = None
 
         self.lock = TryLock(space)
 
@@ -162,6 +168,9 @@ class BufferedMixin:
             pass
 
     def _check_init(self, space):
+        # every operation apart from next() starts here, and may move
+        # 'pos' or change the buffer
+        self.line_ends = None
         if self.state == STATE_ZERO:
             raise oefmt(space.w_ValueError,
                         "I/O operation on uninitialized object")
@@ -552,6 +561,19 @@ class BufferedMixin:
             return self._read_fast(n)
 
         result_buffer = ByteBuffer(n)
+        written = self._read_generic_into(space, result_buffer, n)
+        if written < 0:
+            return None
+        return result_buffer[0:written]
+
+    def _read_generic_into(self, space, result_buffer, n):
+        """Like _read_generic(), but store the bytes at the start of
+           'result_buffer' instead of returning a string.  Whole blocks are
+           read directly into it.  Returns the number of bytes read, or -1
+           if read() would block before any byte was read."""
+        # Must run with the lock held!
+        current_size = self._readahead()
+        assert n > current_size
         remaining = n
         written = 0
         if current_size:
@@ -575,10 +597,10 @@ class BufferedMixin:
                 size = self._raw_read(space, result_buffer, written, r)
             except BlockingIOError:
                 if written == 0:
-                    return None
+                    return -1
                 size = 0
             if size == 0:
-                return result_buffer[0:written]
+                return written
             remaining -= size
             written += size
 
@@ -592,7 +614,7 @@ class BufferedMixin:
             except BlockingIOError:
                 # EOF or read() would block
                 if written == 0:
-                    return None
+                    return -1
                 size = 0
             if size == 0:
                 break
@@ -606,7 +628,29 @@ class BufferedMixin:
                 written += size
                 remaining -= size
 
-        return result_buffer[0:written]
+        return written
+
+    def readinto_w(self, space, w_buffer):
+        self._check_init(space)
+        self._check_closed(space, "readinto of closed file")
+        rwbuffer = space.writebuf_w(w_buffer)
+        length = rwbuffer.getlength()
+
+        # Read into the target buffer directly, instead of going through
+        # read() and a temporary string of the whole result
+        if length <= self._readahead():
+            rwbuffer.setslice(0, self.buffer[self.pos:self.pos + length])
+            self.pos += length
+            return space.newint(length)
+        with self.lock:
+            if length <= self._readahead():
+                rwbuffer.setslice(0, self.buffer[self.pos:self.pos + length])
+                self.pos += length
+                return space.newint(length)
+            written = self._read_generic_into(space, rwbuffer, length)
+        if written < 0:
+            return space.w_None
+        return space.newint(written)
 
     def _read_fast(self, n):
         """Read n bytes from the buffer if it can, otherwise return None.
@@ -686,6 +730,98 @@ class BufferedMixin:
                     limit -= have
             return space.newbytes(''.join(chunks))
 
+    def _read_buffered_lines(self, space, lines_w, limit):
+        """Append to 'lines_w' the complete lines that are already in the
+        buffer, in a single scan, stopping as soon as more than 'limit'
+        bytes were returned (if limit >= 0).  Returns the number of bytes.
+        Like the first part of readline_w(), this runs unlocked."""
+        data = self.buffer.data
+        start = self.pos
+        end = start + self._readahead()
+        total = 0
+        pos = start
+        while pos < end:
+            c = data[pos]
+            pos += 1
+            if c == '\n':
+                lines_w.append(space.newbytes(self.buffer[start:pos]))
+                total += pos - start
+                start = pos
+                if limit >= 0 and total > limit:
+                    break
+        self.pos = start
+        return total
+
+    def _has_builtin_readline(self, space):
+        # an app-level subclass may override readline(), which the
+        # generic W_IOBase implementations must then call
+        return space.is_w(space.type(self), space.gettypeobject(self.typedef))
+
+    def _find_line_ends(self):
+        """Return the ends of the complete lines that are already in the
+        buffer after 'pos', found in a single scan."""
+        data = self.buffer.data
+        pos = self.pos
+        end = pos + self._readahead()
+        line_ends = []
+        while pos < end:
+            c = data[pos]
+            pos += 1
+            if c == '\n':
+                line_ends.append(pos)
+        return line_ends
+
+    def next_w(self, space):
+        if not self._has_builtin_readline(space):
+            return W_IOBase.next_w(self, space)
+        # Serve the lines already in the buffer from the ends found in a
+        # single scan, and only go through readline_w() to refill it.
+        line_ends = self.line_ends
+        if line_ends is not None and self.line_index < len(line_ends):
+            W_IOBase._check_closed(self, space, "readline of closed file")
+            start = self.pos
+            end = line_ends[self.line_index]
+            self.line_index += 1
+            self.pos = end
+            return space.newbytes(self.buffer[start:end])
+        w_line = self.readline_w(space)
+        if space.len_w(w_line) == 0:
+            raise OperationError(space.w_StopIteration, space.w_None)
+        self.line_ends = self._find_line_ends()
+        self.line_index = 0
+        return w_line
+
+    def readlines_w(self, space, w_hint=None):
+        if not self._has_builtin_readline(space):
+            return W_IOBase.readlines_w(self, space, w_hint)
+        self._check_init(space)
+        self._check_closed(space, "readline of closed file")
+        hint = convert_size(space, w_hint)
+        if hint <= 0:
+            hint = -1
+
+        # Return all the lines already in the buffer at once, and only go
+        # through readline_w() to refill it.
+        lines_w = []
+        length = 0
+        while True:
+            if hint >= 0:
+                limit = hint - length
+            else:
+                limit = -1
+            length += self._read_buffered_lines(space, lines_w, limit)
+            if hint >= 0 and length > hint:
+                break
+            w_line = self.readline_w(space)
+            line_length = space.len_w(w_line)
+            if line_length == 0: # done
+                break
+            lines_w.append(w_line)
+            length += line_length
+            if hint >= 0 and length > hint:
+                break
+        return space.newlist(lines_w)
+
     # ____________________________________________________
     # Write methods
 
@@ -845,6 +981,9 @@ W_BufferedReader.typedef = TypeDef(
     read1 = interp2app(W_BufferedReader.read1_w),
     raw = interp_attrproperty_w("w_raw", cls=W_BufferedReader),
     readline = interp2app(W_BufferedReader.readline_w),
+    readinto = interp2app(W_BufferedReader.readinto_w),
+    readlines = interp2app(W_BufferedReader.readlines_w),
+    next = interp2app(W_BufferedReader.next_w),
 
     # from the mixin class
     __repr__ = interp2app(W_BufferedReader.repr_w),
@@ -1041,6 +1180,9 @@ W_BufferedRandom.typedef = TypeDef(
     peek = interp2app(W_BufferedRandom.peek_w),
     read1 = interp2app(W_BufferedRandom.read1_w),
     readline = interp2app(W_BufferedRandom.readline_w),
+    readinto = interp2app(W_BufferedRandom.readinto_w),
+    readlines = interp2app(W_BufferedRandom.readlines_w),
+    next = interp2app(W_BufferedRandom.next_w),
 
     write = interp2app(W_BufferedRandom.write_w),
     flush = interp2app(W_BufferedRandom.flush_w),
@@ -4,7 +4,7 @@ from pypy.interpreter.error import (
     OperationError, oefmt, wrap_oserror, wrap_oserror2)
 from rpython.rlib.objectmodel import keepalive_until_here
 from rpython.rlib.rarithmetic import r_longlong
-from rpython.rlib.rposix import c_read, get_saved_errno
+from rpython.rlib.rposix import c_read, c_write, get_saved_errno
 from rpython.rlib.rstring import StringBuilder
 from rpython.rtyper.lltypesystem import lltype, rffi
 from os import O_RDONLY, O_WRONLY, O_RDWR, O_CREAT, O_TRUNC
@@ -337,8 +337,32 @@ class W_FileIO(W_RawIOBase):
     def write_w(self, space, w_data):
         self._check_closed(space)
         self._check_writable(space)
-        data = space.getarg_w('s*', w_data).as_str()
+        buf = space.getarg_w('s*', w_data)
+        length = buf.getlength()
 
+        source_address = lltype.nullptr(rffi.CCHARP.TO)
+        if length > 64 and not space.isinstance_w(w_data, space.w_bytes):
+            try:
+                source_address = buf.get_raw_address()
+            except ValueError:
+                pass
+
+        if source_address:
+            # optimized case: writing more than 64 bytes from a buffer
+            # (bytearray, memoryview...) with a valid raw address, without
+            # making a string copy of it first
+            n = c_write(self.fd, source_address, length)
+            keepalive_until_here(buf)
+            n = rffi.cast(lltype.Signed, n)
+            if n >= 0:
+                return space.newint(n)
+            err = get_saved_errno()
+            if err == errno.EAGAIN:
+                return space.w_None
+            e = OSError(err, "write failed")
+            raise wrap_oserror(space, e, exception_name='w_IOError')
+
+        data = buf.as_str()
         try:
             n = os.write(self.fd, data)
         except OSError as e:
@@ -7,10 +7,12 @@ from pypy.interpreter.typedef import (
     GetSetProperty, TypeDef, generic_new_descr, interp_attrproperty,
     interp_attrproperty_w)
 from pypy.module._codecs import interp_codecs
+from pypy.module._codecs.interp_codecs import CodecState
 from pypy.module._io.interp_iobase import W_IOBase, convert_size, trap_eintr
 from rpython.rlib.rarithmetic import intmask, r_uint, r_ulonglong
 from rpython.rlib.rbigint import rbigint
 from rpython.rlib.rstring import UnicodeBuilder
+from rpython.rlib import runicode
 
 
 STATE_ZERO, STATE_OK, STATE_DETACHED = range(3)
@@ -22,10 +24,22 @@ SEEN_ALL  = SEEN_CR | SEEN_LF | SEEN_CRLF
 
 _WINDOWS = sys.platform == 'win32'
 
+# codecs (by the 'name' of their CodecInfo) which are decoded directly at
+# interp-level, instead of calling their app-level incremental decoder
+_FAST_DECODERS = {
+    'utf-8': 'utf-8',
+    'iso8859-1': 'latin-1',
+    'latin-1': 'latin-1',
+    'ascii': 'ascii',
+}
+
 class W_IncrementalNewlineDecoder(W_Root):
     seennl = 0
     pendingcr = False
     w_decoder = None
+    fastcodec = None     # one of the values of _FAST_DECODERS, or None
+    errors = 'strict'
+    pendingbytes = ''    # incomplete utf-8 sequence, for the fast codecs
 
     def __init__(self, space):
         self.w_newlines_dict = {
@@ -56,12 +70,48 @@ class W_IncrementalNewlineDecoder(W_Root):
     def newlines_get_w(self, space):
         return self.w_newlines_dict.get(self.seennl, space.w_None)
 
+    def set_fast_codec(self, fastcodec, errors):
+        """Decode with one of the codecs of runicode instead of calling
+        self.w_decoder.  Used by TextIOWrapper for the common encodings.
+        """
+        self.fastcodec = fastcodec
+        self.errors = errors
+        self.pendingbytes = ''
+
+    def _fast_decode(self, space, input, final):
+        if self.pendingbytes:
+            input = self.pendingbytes + input
+        state = space.fromcache(CodecState)
+        if self.fastcodec == 'utf-8':
+            output, consumed = runicode.str_decode_utf_8_impl(
+                input, len(input), self.errors, final,
+                state.decode_error_handler, allow_surrogates=True)
+        elif self.fastcodec == 'latin-1':
+            output, consumed = runicode.str_decode_latin_1(
+                input, len(input), self.errors, final,
+                state.decode_error_handler)
+        else:
+            output, consumed = runicode.str_decode_ascii(
+                input, len(input), self.errors, final,
+                state.decode_error_handler)
+        if consumed < len(input):
+            assert consumed >= 0
+            self.pendingbytes = input[consumed:]
+        else:
+            self.pendingbytes = ''
+        return output
+
     @unwrap_spec(final=int)
     def decode_w(self, space, w_input, final=False):
         if self.w_decoder is None:
             raise oefmt(space.w_ValueError,
                         "IncrementalNewlineDecoder.__init__ not called")
 
+        if self.fastcodec is not None:
+            output = self._fast_decode(space, space.bufferstr_w(w_input),
+                                       bool(final))
+            return space.newunicode(self.translate_newlines(output, bool(final)))
+
         # decode input (with the eventual \r from a previous pass)
         if not space.is_w(self.w_decoder, space.w_None):
             w_output = space.call_method(self.w_decoder, "decode",
@@ -74,6 +124,15 @@ class W_IncrementalNewlineDecoder(W_Root):
                         "decoder should return a string result")
 
         output = space.unicode_w(w_output)
+        return space.newunicode(self.translate_newlines(output, bool(final)))
+
+    def decode_bytes(self, space, input, final):
+        """Interp-level equivalent of decode_w() for the fast codecs."""
+        assert self.fastcodec is not None
+        output = self._fast_decode(space, input, final)
+        return self.translate_newlines(output, final)
+
+    def translate_newlines(self, output, final):
         output_len = len(output)
         if self.pendingcr and (final or output_len):
             output = u'\r' + output
@@ -91,7 +150,7 @@ class W_IncrementalNewlineDecoder(W_Root):
                 output_len -= 1
 
         if output_len == 0:
-            return space.newunicode(u"")
+            return u""
 
         # Record which newlines are read and do newline translation if
         # desired, all in one pass.
@@ -146,16 +205,21 @@ class W_IncrementalNewlineDecoder(W_Root):
             output = builder.build()
 
         self.seennl |= seennl
-        return space.newunicode(output)
+        return output
 
     def reset_w(self, space):
         self.seennl = 0
         self.pendingcr = False
-        if self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
+        if self.fastcodec is not None:
+            self.pendingbytes = ''
+        elif self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
             space.call_method(self.w_decoder, "reset")
 
     def getstate_w(self, space):
-        if self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
+        if self.fastcodec is not None:
+            w_buffer = space.newbytes(self.pendingbytes)
+            flag = 0
+        elif self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
             w_state = space.call_method(self.w_decoder, "getstate")
             w_buffer, w_flag = space.unpackiterable(w_state, 2)
             flag = space.r_longlong_w(w_flag)
@@ -173,7 +237,9 @@ class W_IncrementalNewlineDecoder(W_Root):
         self.pendingcr = bool(flag & 1)
         flag >>= 1
 
-        if self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
+        if self.fastcodec is not None:
+            self.pendingbytes = space.bytes_w(w_buffer)
+        elif self.w_decoder and not space.is_w(self.w_decoder, space.w_None):
             w_state = space.newtuple([w_buffer, space.newint(flag)])
             space.call_method(self.w_decoder, "setstate", w_state)
 
@@ -289,6 +355,12 @@ def _determine_encoding(space, encoding):
 
     raise oefmt(space.w_IOError, "could not determine default encoding")
 
+def _get_fast_codec(space, w_codec):
+    w_name = space.findattr(w_codec, space.newtext("name"))
+    if w_name is None or not space.isinstance_w(w_name, space.w_text):
+        return None
+    return _FAST_DECODERS.get(space.text_w(w_name), None)
+
 class PositionCookie(object):
     def __init__(self, bigint):
         self.start_pos = bigint.ulonglongmask()
@@ -343,6 +415,9 @@ class W_TextIOWrapper(W_TextIOBase):
         self.state = STATE_ZERO
         self.w_encoder = None
         self.w_decoder = None
+        # the W_IncrementalNewlineDecoder in self.w_decoder, if it decodes
+        # without going through app-level (see set_fast_codec())
+        self.fastdecoder = None
 
         self.decoded_chars = None   # buffer for text returned from decoder
         self.decoded_chars_used = 0 # offset into _decoded_chars for read()
@@ -395,15 +470,22 @@ class W_TextIOWrapper(W_TextIOBase):
             self.writenl = None
 
         # build the decoder object
+        self.fastdecoder = None
         if space.is_true(space.call_method(w_buffer, "readable")):
             w_codec = interp_codecs.lookup_codec(space,
                                                  space.text_w(self.w_encoding))
             self.w_decoder = space.call_method(w_codec,
                                                "incrementaldecoder", w_errors)
             if self.readuniversal:
-                self.w_decoder = space.call_function(
-                    space.gettypeobject(W_IncrementalNewlineDecoder.typedef),
-                    self.w_decoder, space.newbool(self.readtranslate))
+                decoder = W_IncrementalNewlineDecoder(space)
+                decoder.descr_init(space, self.w_decoder, self.readtranslate,
+                                   w_errors)
+                fastcodec = _get_fast_codec(space, w_codec)
+                if (fastcodec is not None and
+                        space.isinstance_w(w_errors, space.w_text)):
+                    decoder.set_fast_codec(fastcodec, space.text_w(w_errors))
+                    self.fastdecoder = decoder
+                self.w_decoder = decoder
 
         # build the encoder object
         if space.is_true(space.call_method(w_buffer, "writable")):
@@ -548,6 +630,10 @@ class W_TextIOWrapper(W_TextIOBase):
         if not self.w_decoder:
             raise oefmt(space.w_IOError, "not readable")
 
+        fastdecoder = self.fastdecoder
+        if fastdecoder is not None:
+            return self._read_chunk_fast(space, fastdecoder)
+
         if self.telling:
             # To prepare for tell(), we need to snapshot a point in the file
             # where the decoder's input buffer is empty.
@@ -586,6 +672,35 @@ class W_TextIOWrapper(W_TextIOBase):
 
         return not eof
 
+    def _read_chunk_fast(self, space, fastdecoder):
+        # Same as _read_chunk(), with the bytes decoded and the newlines
+        # translated at interp-level in one call to the decoder
+        if self.telling:
+            dec_buffer = fastdecoder.pendingbytes
+            dec_flags = int(fastdecoder.pendingcr)
+        else:
+            dec_buffer = None
+            dec_flags = 0
+
+        w_input = space.call_method(self.w_buffer, "read1",
+                                    space.newint(self.chunk_size))
+        if not space.isinstance_w(w_input, space.w_bytes):
+            msg = "decoder getstate() should have returned a bytes " \
+                  "object not '%T'"
+            raise oefmt(space.w_TypeError, msg, w_input)
+        input = space.bytes_w(w_input)
+
+        eof = len(input) == 0
+        decoded = fastdecoder.decode_bytes(space, input, eof)
+        self._set_decoded_chars(decoded)
+        if len(decoded) > 0:
+            eof = False
+
+        if self.telling:
+            self.snapshot = PositionSnapshot(dec_flags, dec_buffer + input)
+
+        return not eof
+
     def next_w(self, space):
         self._check_attached(space)
         self.telling = False
@@ -608,7 +723,12 @@ class W_TextIOWrapper(W_TextIOBase):
         if size < 0:
             # Read everything
             w_bytes = space.call_method(self.w_buffer, "read")
-            w_decoded = space.call_method(self.w_decoder, "decode", w_bytes, space.w_True)
+            if self.fastdecoder is not None:
+                w_decoded = space.newunicode(self.fastdecoder.decode_bytes(
+                    space, space.bytes_w(w_bytes), True))
+            else:
+                w_decoded = space.call_method(self.w_decoder, "decode",
+                                              w_bytes, space.w_True)
             check_decoded(space, w_decoded)
             w_result = space.newunicode(self._get_decoded_chars(-1))
             w_final = space.add(w_result, w_decoded)
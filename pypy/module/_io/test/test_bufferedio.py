@@ -167,6 +167,21 @@ class AppTestBufferedReader:
         assert f.readinto(a) == 99
         assert a == '\nb\nc' + 'a\nb\nc' * 19 + 'x' * 100
 
+    def test_readinto_whole_blocks(self):
+        import _io
+        data = "".join([chr(i % 256) for i in range(1000)])
+        f = _io.BufferedReader(_io.BytesIO(data), 16)
+        assert f.read(3) == data[:3]
+        a = bytearray(100)
+        assert f.readinto(a) == 100
+        assert a == data[3:103]
+        assert f.readinto(memoryview(a)[:5]) == 5
+        assert a[:5] == data[103:108]
+        a = bytearray(1000)
+        assert f.readinto(a) == 892
+        assert a[:892] == data[108:]
+        assert f.readinto(a) == 0
+
     def test_seek(self):
         import _io
         raw = _io.FileIO(self.tmpfile)
@@ -184,6 +199,62 @@ class AppTestBufferedReader:
         f = _io.BufferedReader(raw)
         assert f.readlines() == ['a\n', 'b\n', 'c']
 
+    def test_readlines_batch(self):
+        import _io
+        data = "".join(["line %d\n" % i for i in range(100)]) + "end"
+        lines = data.splitlines(True)
+        raw = _io.BytesIO(data)
+        f = _io.BufferedReader(raw, 64)
+        assert f.readline() == lines[0]
+        assert f.readlines(20) == lines[1:4]
+        assert f.read(3) == "lin"
+        assert f.next() == lines[4][3:]
+        assert list(f) == lines[5:]
+        assert f.readlines() == []
+        f.seek(0)
+        assert f.readlines() == lines
+        #
+        class MyReader(_io.BufferedReader):
+            def readline(self, limit=-1):
+                return _io.BufferedReader.readline(self, limit).upper()
+        f = MyReader(_io.BytesIO(data), 64)
+        assert f.readlines() == [line.upper() for line in lines]
+        f.seek(0)
+        assert list(f) == [line.upper() for line in lines]
+
+    def test_next_batch(self):
+        import _io
+        data = "".join(["line %d\n" % i for i in range(100)]) + "end"
+        lines = data.splitlines(True)
+        raw = _io.BytesIO(data)
+        f = _io.BufferedReader(raw, 64)
+        assert f.next() == lines[0]
+        assert f.next() == lines[1]
+        assert f.tell() == len("".join(lines[:2]))
+        assert f.read(3) == "lin"
+        assert f.next() == lines[2][3:]
+        assert f.next() == lines[3]
+        assert f.peek(1).startswith(lines[4][0])
+        assert f.next() == lines[4]
+        f.seek(len(lines[0]))
+        assert f.next() == lines[1]
+        assert f.readline() == lines[2]
+        assert f.next() == lines[3]
+        assert list(f) == lines[4:]
+        f.seek(0)
+        assert list(f) == lines
+        f.seek(0)
+        assert f.next() == lines[0]
+        raw.close()
+        raises(ValueError, f.next)
+        #
+        f = _io.BufferedRandom(_io.BytesIO(data), 64)
+        assert f.next() == lines[0]
+        f.write("LINE")
+        assert f.next() == lines[1][4:]
+        f.seek(0)
+        assert list(f) == [lines[0], "LINE" + lines[1][4:]] + lines[2:]
+
     def test_detach(self):
         import _io
         raw = _io.FileIO(self.tmpfile)
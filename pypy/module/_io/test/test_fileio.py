@@ -95,6 +95,20 @@ class AppTestFileIO:
         f.close()
         f2.close()
 
+    def test_write_buffers(self):
+        import _io
+        filename = self.tmpfile + '_w'
+        f = _io.FileIO(filename, 'wb')
+        data = "".join([chr(i % 256) for i in range(300)])
+        assert f.write(bytearray(data)) == 300
+        assert f.write(memoryview(data)[100:]) == 200
+        assert f.write(buffer(bytearray(data))) == 300
+        assert f.write(bytearray("small")) == 5
+        f.close()
+        f = _io.FileIO(filename, 'rb')
+        assert f.read() == data + data[100:] + data + "small"
+        f.close()
+
     def test_writelines(self):
         import _io
         filename = self.tmpfile + '_w'
@@ -206,6 +206,42 @@ class AppTestTextIO:
         reads += txt.readline()
         assert reads == r
 
+    def test_fast_codecs(self):
+        import _io
+        text = u"\xe9t\xe9\r\nh\u20acver\rfin\n"
+        for encoding in ["utf-8", "UTF8", "latin-1", "iso-8859-1"]:
+            try:
+                data = text.encode(encoding)
+            except UnicodeEncodeError:
+                data = text.replace(u"\u20ac", u"E").encode(encoding)
+            expected = data.decode(encoding).replace(u"\r\n", u"\n")
+            expected = expected.replace(u"\r", u"\n")
+            txt = _io.TextIOWrapper(_io.BytesIO(data), encoding=encoding)
+            txt._CHUNK_SIZE = 1
+            lines = []
+            while True:
+                line = txt.readline()
+                if not line:
+                    break
+                lines.append(line)
+            assert u"".join(lines) == expected
+            txt.seek(0)
+            assert txt.read() == expected
+            assert txt.newlines == (u"\r", u"\n", u"\r\n")
+            txt.seek(0)
+            assert txt.read(2) == expected[:2]
+            pos = txt.tell()
+            rest = txt.read()
+            txt.seek(pos)
+            assert txt.read() == rest
+        txt = _io.TextIOWrapper(_io.BytesIO("a\xffb\n"), encoding="ascii")
+        raises(UnicodeDecodeError, txt.read)
+        txt = _io.TextIOWrapper(_io.BytesIO("a\xffb\n"), encoding="ascii",
+                                errors="replace")
+        assert txt.read() == u"a\ufffdb\n"
+        txt = _io.TextIOWrapper(_io.BytesIO("a\xc3"), encoding="utf-8")
+        raises(UnicodeDecodeError, txt.read)
+
     def test_name(self):
         import _io
 
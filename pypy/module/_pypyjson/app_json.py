@@ -0,0 +1,15 @@
+def iterload(fp, items=False, chunk_size=65536):
+    """Iterate over the JSON values stored one after the other in the file
+    'fp', e.g. newline-delimited JSON, reading it in chunks of 'chunk_size'
+    bytes.  If 'items' is true, the file must contain a single JSON array
+    and its items are returned one by one instead."""
+    from _pypyjson import IncrementalDecoder
+    decoder = IncrementalDecoder(items)
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        for value in decoder.feed(chunk):
+            yield value
+    for value in decoder.close():
+        yield value
@@ -5,6 +5,9 @@ from rpython.rlib import rfloat, runicode
 from rpython.rtyper.lltypesystem import lltype, rffi
 from pypy.interpreter.error import oefmt
 from pypy.interpreter import unicodehelper
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef
 
 OVF_DIGITS = len(str(sys.maxint))
 
@@ -42,12 +45,43 @@ def strslice2unicode_latin1(s, start, end):
         ll_res.chars[i] = cast_primitive(UniChar, ch)
     return hlunicode(ll_res)
 
+# the number of distinct key sequences that a KeyCache remembers, and
+# also the number of distinct keys
+MAX_KEY_NODES = 10000
+
+class KeyNode(object):
+    """A node in the tree of the sequences of keys seen in objects.  The
+    path from the root to a node is the list of keys of an object so far."""
+
+    def __init__(self, key, w_key):
+        self.key = key          # the key as utf-8 bytes, as in the document
+        self.w_key = w_key
+        self.transitions = {}   # key -> KeyNode
+        self.predicted = None   # the KeyNode that followed this one last time
+
+
+class KeyCache(object):
+    """Remembers the keys of the decoded objects.  Keys are decoded and
+    wrapped only once, and objects of the same shape, like the records of
+    an array, usually have their keys recognized without any allocation
+    by comparing the document with the key that came next last time."""
+
+    def __init__(self):
+        self.root = KeyNode('', None)
+        self.keys_w = {}        # key -> wrapped unicode key
+        self.num_nodes = 0
+
+
 TYPE_UNKNOWN = 0
 TYPE_STRING = 1
 class JSONDecoder(object):
-    def __init__(self, space, s):
+    def __init__(self, space, s, keycache=None):
         self.space = space
         self.s = s
+        if keycache is None:
+            keycache = KeyCache()
+        self.keycache = keycache
+        self.key_node = None    # out-argument of decode_key()
         # we put our string in a raw buffer so:
         # 1) we automatically get the '\0' sentinel at the end of the string,
         #    which means that we never have to check for the "end of string"
@@ -255,12 +289,19 @@ class JSONDecoder(object):
             self.pos = i+1
             return w_dict
         #
+        node = self.keycache.root
         while True:
             # parse a key: value
-            self.last_type = TYPE_UNKNOWN
-            w_name = self.decode_any(i)
-            if self.last_type != TYPE_STRING:
+            i = self.skip_whitespace(i)
+            if self.ll_chars[i] == '"':
+                w_name = self.decode_key(i+1, node)
+                node = self.key_node
+            else:
+                self.last_type = TYPE_UNKNOWN
+                self.decode_any(i)
                 self._raise("Key name must be string for object starting at char %d", start)
+                return # help the annotator to know that we'll never go
+                       # beyond this point
             i = self.skip_whitespace(self.pos)
             ch = self.ll_chars[i]
             if ch != ':':
@@ -285,6 +326,67 @@ class JSONDecoder(object):
                             ch, i-1)
 
 
+    def decode_key(self, i, node):
+        """Decode the key starting at 'i', just after the opening quote,
+        which follows the keys leading to 'node' (or None) in the current
+        object.  The node of the key is stored in self.key_node."""
+        if node is not None:
+            next = node.predicted
+            if next is not None and self.match_key(i, next.key):
+                self.pos = i + len(next.key) + 1
+                self.key_node = next
+                return next.w_key
+        start = i
+        bits = 0
+        while True:
+            ch = self.ll_chars[i]
+            i += 1
+            bits |= ord(ch)
+            if ch == '"':
+                break
+            elif ch == '\\' or ch < '\x20':
+                # keys with escapes are not cached
+                self.pos = i-1
+                self.key_node = None
+                return self.decode_string_escaped(start)
+        self.pos = i
+        key = self.getslice(start, i-1)
+        keycache = self.keycache
+        w_key = keycache.keys_w.get(key, None)
+        if w_key is None:
+            if bits & 0x80:
+                content_unicode = unicodehelper.decode_utf8(self.space, key)
+            else:
+                content_unicode = strslice2unicode_latin1(key, 0, len(key))
+            w_key = self.space.newunicode(content_unicode)
+            # keys are cached even when they are not part of the tree
+            # (after an escaped key, or when the tree is full), so they
+            # need their own bound
+            if len(keycache.keys_w) < MAX_KEY_NODES:
+                keycache.keys_w[key] = w_key
+        if node is None:
+            self.key_node = None
+            return w_key
+        next = node.transitions.get(key, None)
+        if next is None:
+            if keycache.num_nodes >= MAX_KEY_NODES:
+                self.key_node = None
+                return w_key
+            next = KeyNode(key, w_key)
+            node.transitions[key] = next
+            keycache.num_nodes += 1
+        node.predicted = next
+        self.key_node = next
+        return w_key
+
+    def match_key(self, i, key):
+        # the '\0' at the end of the string stops the loop, because keys
+        # in the cache never contain control characters
+        for j in range(len(key)):
+            if self.ll_chars[i+j] != key[j]:
+                return False
+        return self.ll_chars[i+len(key)] == '"'
+
     def decode_string(self, i):
         start = i
         bits = 0
@@ -387,12 +489,8 @@ class JSONDecoder(object):
         lowsurr = int(hexdigits, 16) # the possible ValueError is caugth by the caller
         return 0x10000 + (((highsurr - 0xd800) << 10) | (lowsurr - 0xdc00))
 
-def loads(space, w_s):
-    if space.isinstance_w(w_s, space.w_unicode):
-        raise oefmt(space.w_TypeError,
-                    "Expected utf8-encoded str, got unicode")
-    s = space.bytes_w(w_s)
-    decoder = JSONDecoder(space, s)
+def _decode(space, s, keycache=None):
+    decoder = JSONDecoder(space, s, keycache)
     try:
         w_res = decoder.decode_any(0)
         i = decoder.skip_whitespace(decoder.pos)
@@ -404,3 +502,184 @@ def loads(space, w_s):
         return w_res
     finally:
         decoder.close()
+
+def _check_str(space, w_s):
+    if space.isinstance_w(w_s, space.w_unicode):
+        raise oefmt(space.w_TypeError,
+                    "Expected utf8-encoded str, got unicode")
+    return space.bytes_w(w_s)
+
+def loads(space, w_s):
+    s = _check_str(space, w_s)
+    return _decode(space, s)
+
+# ____________________________________________________________
+# incremental decoding
+
+def is_scalar_end(ch):
+    return (is_whitespace(ch) or ch == ',' or ch == ']' or ch == '}' or
+            ch == '[' or ch == '{' or ch == '"')
+
+
+class W_IncrementalDecoder(W_Root):
+    """Split a stream of chunks into complete JSON values, and decode each
+    of them as soon as it is complete.  Only the text of the value being
+    received is kept around.  A light scanner which only tracks strings
+    and nesting finds where the values end; each one is then decoded by
+    JSONDecoder."""
+
+    def __init__(self, space, items):
+        self.space = space
+        self.items = items      # decode the items of a top-level array
+        self.pending = []       # chunks of the value being received
+        self.keycache = KeyCache()  # shared by all the values
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.in_scalar = False
+        self.in_value = False
+        # a value just ended: if self.items, a ',' or ']' is expected next;
+        # otherwise, whitespace is needed before a value next to a scalar
+        self.need_sep = False
+        self.after_scalar = False   # the value that just ended is a scalar
+        # only used if self.items
+        self.started = False    # seen the '['
+        self.finished = False   # seen the ']'
+        self.need_value = False # seen a ',', so a value is expected next
+
+    @staticmethod
+    @unwrap_spec(items=bool)
+    def descr_new(space, w_subtype, items=False):
+        return W_IncrementalDecoder(space, items)
+
+    @specialize.arg(1)
+    def _raise(self, msg, *args):
+        raise oefmt(self.space.w_ValueError, msg, *args)
+
+    def end_value(self, values_w, chunk, start, end):
+        assert start >= 0
+        assert end >= start
+        if self.pending:
+            self.pending.append(chunk[start:end])
+            text = ''.join(self.pending)
+            self.pending = []
+        else:
+            text = chunk[start:end]
+        values_w.append(_decode(self.space, text, self.keycache))
+        self.after_scalar = self.in_scalar
+        self.in_value = False
+        self.in_scalar = False
+        self.need_sep = True
+
+    def start_value(self, ch):
+        """Called with the first character of a value, between values.
+        Returns False if the character is not the start of a value."""
+        if is_whitespace(ch):
+            if not self.items:
+                self.need_sep = False
+            return False
+        if self.items:
+            if not self.started:
+                if ch != '[':
+                    self._raise("Expected '[' at the start of the array")
+                self.started = True
+                return False
+            if self.finished:
+                self._raise("Extra data after the end of the array")
+            if ch == ']':
+                if self.need_value:
+                    self._raise("Unexpected ']' after ',' when decoding array")
+                self.finished = True
+                return False
+            if ch == ',':
+                if not self.need_sep:
+                    self._raise("Unexpected ',' when decoding array")
+                self.need_sep = False
+                self.need_value = True
+                return False
+            if self.need_sep:
+                self._raise("Unexpected '%s' when decoding array", ch)
+            self.need_value = False
+        elif self.need_sep:
+            # '1[2]' or '"a"1' are not two values, but garbage
+            is_scalar = ch != '"' and ch != '[' and ch != '{'
+            if self.after_scalar or is_scalar:
+                self._raise("Expected whitespace between JSON values, "
+                            "got '%s'", ch)
+        self.in_value = True
+        if ch == '"':
+            self.in_string = True
+        elif ch == '[' or ch == '{':
+            self.depth = 1
+        else:
+            self.in_scalar = True
+        return True
+
+    def scan(self, chunk):
+        values_w = []
+        start = 0
+        i = 0
+        end = len(chunk)
+        while i < end:
+            ch = chunk[i]
+            i += 1
+            if not self.in_value:
+                if self.start_value(ch):
+                    start = i - 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 0:
+                        self.end_value(values_w, chunk, start, i)
+            elif self.in_scalar:
+                if is_scalar_end(ch):
+                    i -= 1
+                    self.end_value(values_w, chunk, start, i)
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '[' or ch == '{':
+                self.depth += 1
+            elif ch == ']' or ch == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end_value(values_w, chunk, start, i)
+        if self.in_value and start < end:
+            assert start >= 0
+            self.pending.append(chunk[start:end])
+        return values_w
+
+    def descr_feed(self, space, w_data):
+        """feed(data) -> list of the values completed by this chunk"""
+        chunk = _check_str(space, w_data)
+        return space.newlist(self.scan(chunk))
+
+    def descr_close(self, space):
+        """close() -> list of the remaining values
+
+        Signal the end of the input.  Raises ValueError if it stops in
+        the middle of a value."""
+        values_w = []
+        if self.in_scalar:
+            self.end_value(values_w, '', 0, 0)
+        elif self.in_value:
+            self._raise("Unterminated JSON value at the end of the input")
+        if self.items and self.started and not self.finished:
+            self._raise("Unterminated array at the end of the input")
+        return space.newlist(values_w)
+
+
+W_IncrementalDecoder.typedef = TypeDef("_pypyjson.IncrementalDecoder",
+    __doc__ = """IncrementalDecoder(items=False)
+
+Decode a sequence of JSON values (e.g. newline-delimited JSON) which is
+received in chunks of any size.  If 'items' is true, the input must be
+a single JSON array, and its items are returned one by one instead.""",
+    __new__ = interp2app(W_IncrementalDecoder.descr_new),
+    feed = interp2app(W_IncrementalDecoder.descr_feed),
+    close = interp2app(W_IncrementalDecoder.descr_close),
+)
+W_IncrementalDecoder.typedef.acceptable_as_base_class = False
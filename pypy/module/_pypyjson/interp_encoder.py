@@ -1,6 +1,10 @@
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.runicode import str_decode_utf_8
+from rpython.rlib.rfloat import isfinite, isnan
 from pypy.interpreter import unicodehelper
+from pypy.interpreter.error import oefmt
+from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+from pypy.objspace.std.floatobject import float2string
 
 
 HEX = '0123456789abcdef'
@@ -16,26 +20,25 @@ ESCAPE_BEFORE_SPACE = [ESCAPE_DICT.get(chr(_i), '\\u%04x' % _i)
                        for _i in range(32)]
 
 
+def _first_special(s):
+    for i in range(len(s)):
+        c = s[i]
+        if c >= ' ' and c <= '~' and c != '"' and c != '\\':
+            pass
+        else:
+            return i
+    return -1
+
+
 def raw_encode_basestring_ascii(space, w_string):
     if space.isinstance_w(w_string, space.w_bytes):
         s = space.bytes_w(w_string)
-        for i in range(len(s)):
-            c = s[i]
-            if c >= ' ' and c <= '~' and c != '"' and c != '\\':
-                pass
-            else:
-                first = i
-                break
-        else:
+        first = _first_special(s)
+        if first < 0:
             # the input is a string with only non-special ascii chars
             return w_string
-
-        eh = unicodehelper.decode_error_handler(space)
-        u = str_decode_utf_8(
-                s, len(s), None, final=True, errorhandler=eh,
-                allow_surrogates=True)[0]
-        sb = StringBuilder(len(u))
-        sb.append_slice(s, 0, first)
+        sb = StringBuilder(len(s))
+        _append_escaped_bytes(space, sb, s, first)
     else:
         # We used to check if 'u' contains only safe characters, and return
         # 'w_string' directly.  But this requires an extra pass over all
@@ -46,8 +49,23 @@ def raw_encode_basestring_ascii(space, w_string):
         # string here --- only one pass.
         u = space.unicode_w(w_string)
         sb = StringBuilder(len(u))
-        first = 0
+        _append_escaped_unicode(sb, u, 0)
+    res = sb.build()
+    return space.newtext(res)
+
+
+def _append_escaped_bytes(space, sb, s, first):
+    """Append the utf-8 string 's' escaped, knowing that the first 'first'
+    characters don't need escaping."""
+    eh = unicodehelper.decode_error_handler(space)
+    u = str_decode_utf_8(
+            s, len(s), None, final=True, errorhandler=eh,
+            allow_surrogates=True)[0]
+    sb.append_slice(s, 0, first)
+    _append_escaped_unicode(sb, u, first)
+
 
+def _append_escaped_unicode(sb, u, first):
     for i in range(first, len(u)):
         c = u[i]
         if c <= u'~':
@@ -78,5 +96,268 @@ def raw_encode_basestring_ascii(space, w_string):
                 sb.append(HEX[(s2 >> 4) & 0x0f])
                 sb.append(HEX[s2 & 0x0f])
 
-    res = sb.build()
-    return space.newtext(res)
+# ____________________________________________________________
+
+
+class JSONEncoder(object):
+    """Encode objects to ascii-only JSON, with the settings of the
+    app-level json.JSONEncoder 'w_encoder'.  This does the same as its
+    pure-Python implementation, with fast paths for the exact list and
+    dict types that avoid wrapping the items of lists of ints, floats or
+    strings and the keys of dicts with string keys."""
+
+    def __init__(self, space, w_encoder):
+        self.space = space
+        self.w_encoder = w_encoder
+        self.skipkeys = space.is_true(space.getattr(w_encoder,
+                                            space.newtext('skipkeys')))
+        self.allow_nan = space.is_true(space.getattr(w_encoder,
+                                            space.newtext('allow_nan')))
+        self.sort_keys = space.is_true(space.getattr(w_encoder,
+                                            space.newtext('sort_keys')))
+        w_indent = space.getattr(w_encoder, space.newtext('indent'))
+        if space.is_none(w_indent):
+            self.indent = -1
+        else:
+            self.indent = space.int_w(w_indent)
+        self.item_separator = space.text_w(space.getattr(w_encoder,
+                                            space.newtext('item_separator')))
+        self.key_separator = space.text_w(space.getattr(w_encoder,
+                                            space.newtext('key_separator')))
+        if space.is_true(space.getattr(w_encoder,
+                                       space.newtext('check_circular'))):
+            self.markers = {}
+        else:
+            self.markers = None
+        self.builder = StringBuilder()
+
+    def mark(self, w_obj):
+        if self.markers is not None:
+            if w_obj in self.markers:
+                raise oefmt(self.space.w_ValueError,
+                            "Circular reference detected")
+            self.markers[w_obj] = None
+
+    def unmark(self, w_obj):
+        if self.markers is not None:
+            del self.markers[w_obj]
+
+    def emit_indent(self, level):
+        """Called after an opening bracket.  Returns the separator to use
+        between the items, and the new indentation level."""
+        if self.indent >= 0:
+            level += 1
+            newline_indent = '\n' + ' ' * (self.indent * level)
+            self.builder.append(newline_indent)
+            return self.item_separator + newline_indent, level
+        return self.item_separator, level
+
+    def emit_unindent(self, level):
+        if self.indent >= 0:
+            self.builder.append('\n')
+            self.builder.append(' ' * (self.indent * (level - 1)))
+
+    def append_string(self, w_string):
+        space = self.space
+        if space.isinstance_w(w_string, space.w_bytes):
+            self.append_bytes(space.bytes_w(w_string))
+        else:
+            self.builder.append('"')
+            _append_escaped_unicode(self.builder, space.unicode_w(w_string), 0)
+            self.builder.append('"')
+
+    def append_bytes(self, s):
+        self.builder.append('"')
+        first = _first_special(s)
+        if first < 0:
+            self.builder.append(s)
+        else:
+            _append_escaped_bytes(self.space, self.builder, s, first)
+        self.builder.append('"')
+
+    def float_repr(self, x):
+        if isfinite(x):
+            return float2string(x, 'r', 0)
+        if isnan(x):
+            text = 'NaN'
+        elif x > 0.0:
+            text = 'Infinity'
+        else:
+            text = '-Infinity'
+        if not self.allow_nan:
+            raise oefmt(self.space.w_ValueError,
+                        "Out of range float values are not JSON compliant: "
+                        "%s", float2string(x, 'r', 0))
+        return text
+
+    def encode(self, w_obj, level):
+        space = self.space
+        w_type = space.type(w_obj)
+        if space.is_w(w_type, space.w_int):
+            self.builder.append(str(space.int_w(w_obj)))
+        elif space.isinstance_w(w_obj, space.w_basestring):
+            self.append_string(w_obj)
+        elif space.is_w(w_obj, space.w_None):
+            self.builder.append('null')
+        elif space.is_w(w_obj, space.w_True):
+            self.builder.append('true')
+        elif space.is_w(w_obj, space.w_False):
+            self.builder.append('false')
+        elif (space.isinstance_w(w_obj, space.w_int) or
+                  space.isinstance_w(w_obj, space.w_long)):
+            self.builder.append(space.text_w(space.str(w_obj)))
+        elif space.isinstance_w(w_obj, space.w_float):
+            # float.__repr__(), not the __repr__ of a float subclass
+            self.builder.append(self.float_repr(
+                space.float_w(w_obj, allow_conversion=False)))
+        elif (space.isinstance_w(w_obj, space.w_list) or
+                  space.isinstance_w(w_obj, space.w_tuple)):
+            self.encode_list(w_obj, level)
+        elif space.isinstance_w(w_obj, space.w_dict):
+            self.encode_dict(w_obj, level)
+        else:
+            self.mark(w_obj)
+            w_res = space.call_method(self.w_encoder, 'default', w_obj)
+            self.encode(w_res, level)
+            self.unmark(w_obj)
+
+    def encode_list(self, w_list, level):
+        space = self.space
+        if space.len_w(w_list) == 0:
+            self.builder.append('[]')
+            return
+        self.mark(w_list)
+        self.builder.append('[')
+        separator, level = self.emit_indent(level)
+        intlist = space.listview_int(w_list)
+        if intlist is not None:
+            for i in range(len(intlist)):
+                if i > 0:
+                    self.builder.append(separator)
+                self.builder.append(str(intlist[i]))
+        else:
+            floatlist = space.listview_float(w_list)
+            if floatlist is not None:
+                for i in range(len(floatlist)):
+                    if i > 0:
+                        self.builder.append(separator)
+                    self.builder.append(self.float_repr(floatlist[i]))
+            else:
+                byteslist = space.listview_bytes(w_list)
+                if byteslist is not None:
+                    for i in range(len(byteslist)):
+                        if i > 0:
+                            self.builder.append(separator)
+                        self.append_bytes(byteslist[i])
+                else:
+                    items_w = space.listview(w_list)
+                    for i in range(len(items_w)):
+                        if i > 0:
+                            self.builder.append(separator)
+                        self.encode(items_w[i], level)
+        self.emit_unindent(level)
+        self.builder.append(']')
+        self.unmark(w_list)
+
+    def encode_dict(self, w_dict, level):
+        space = self.space
+        if space.len_w(w_dict) == 0:
+            self.builder.append('{}')
+            return
+        self.mark(w_dict)
+        self.builder.append('{')
+        separator, level = self.emit_indent(level)
+        first = True
+        if space.is_w(space.type(w_dict), space.w_dict) and not self.sort_keys:
+            keys, values_w = space.view_as_kwargs(w_dict)
+            if keys is not None:
+                # the keys are all strings: no need to wrap them
+                for i in range(len(keys)):
+                    if i > 0:
+                        self.builder.append(separator)
+                    self.append_bytes(keys[i])
+                    self.builder.append(self.key_separator)
+                    self.encode(values_w[i], level)
+            else:
+                assert isinstance(w_dict, W_DictMultiObject)
+                iteritems = w_dict.iteritems()
+                while True:
+                    w_key, w_value = iteritems.next_item()
+                    if w_key is None:
+                        break
+                    first = self.encode_item(w_key, w_value, first,
+                                             separator, level)
+        else:
+            if self.sort_keys:
+                self.encode_sorted_items(w_dict, separator, level)
+            else:
+                w_items = space.call_method(w_dict, 'iteritems')
+                for w_item in space.unpackiterable(w_items):
+                    w_key, w_value = space.fixedview(w_item, 2)
+                    first = self.encode_item(w_key, w_value, first,
+                                             separator, level)
+        self.emit_unindent(level)
+        self.builder.append('}')
+        self.unmark(w_dict)
+
+    def encode_sorted_items(self, w_dict, separator, level):
+        # like sorted(d.items(), key=lambda kv: kv[0]): the values are
+        # never compared.  The list sorted is made of (key, index) pairs,
+        # the index being only compared between equal keys.
+        space = self.space
+        values_w = []
+        pairs_w = []
+        w_items = space.call_method(w_dict, 'items')
+        for w_item in space.unpackiterable(w_items):
+            w_key, w_value = space.fixedview(w_item, 2)
+            pairs_w.append(space.newtuple([w_key,
+                                           space.newint(len(values_w))]))
+            values_w.append(w_value)
+        w_pairs = space.newlist(pairs_w)
+        space.call_method(w_pairs, 'sort')
+        first = True
+        for w_pair in space.listview(w_pairs):
+            w_key, w_index = space.fixedview(w_pair, 2)
+            first = self.encode_item(w_key, values_w[space.int_w(w_index)],
+                                     first, separator, level)
+
+    def encode_item(self, w_key, w_value, first, separator, level):
+        space = self.space
+        if space.isinstance_w(w_key, space.w_basestring):
+            key = None
+        elif space.isinstance_w(w_key, space.w_float):
+            key = self.float_repr(
+                space.float_w(w_key, allow_conversion=False))
+        elif space.is_w(w_key, space.w_True):
+            key = 'true'
+        elif space.is_w(w_key, space.w_False):
+            key = 'false'
+        elif space.is_w(w_key, space.w_None):
+            key = 'null'
+        elif (space.isinstance_w(w_key, space.w_int) or
+                  space.isinstance_w(w_key, space.w_long)):
+            key = space.text_w(space.str(w_key))
+        elif self.skipkeys:
+            return first
+        else:
+            raise oefmt(space.w_TypeError, "key %R is not a string", w_key)
+        if not first:
+            self.builder.append(separator)
+        if key is None:
+            self.append_string(w_key)
+        else:
+            self.append_bytes(key)
+        self.builder.append(self.key_separator)
+        self.encode(w_value, level)
+        return False
+
+
+def encode(space, w_encoder, w_obj):
+    """encode(encoder, obj) -> str
+
+    Encode 'obj' to ascii-only JSON like the pure-Python encode() method
+    of the json.JSONEncoder 'encoder', whose settings and 'default' method
+    are used."""
+    encoder = JSONEncoder(space, w_encoder)
+    encoder.encode(w_obj, 0)
+    return space.newbytes(encoder.builder.build())
@@ -10,6 +10,36 @@ def test_skip_whitespace():
     assert dec.skip_whitespace(8) == len(s)
     dec.close()
 
+
+def test_key_cache(space):
+    from pypy.module._pypyjson.interp_decoder import _decode, KeyCache
+    keycache = KeyCache()
+    _decode(space, '[{"a": 1, "b": {"a": 2, "c": 3}}, {"a": 4, "b": 5}]',
+            keycache)
+    root = keycache.root
+    assert sorted(root.transitions) == ['a']
+    node_a = root.transitions['a']
+    assert sorted(node_a.transitions) == ['b', 'c']
+    assert node_a.predicted is node_a.transitions['b']
+    assert node_a.transitions['c'].w_key is keycache.keys_w['c']
+    # keys are wrapped only once
+    assert node_a.w_key is keycache.keys_w['a']
+    assert keycache.num_nodes == 3
+
+def test_key_cache_bounded(space, monkeypatch):
+    from pypy.module._pypyjson import interp_decoder
+    monkeypatch.setattr(interp_decoder, 'MAX_KEY_NODES', 10)
+    keycache = interp_decoder.KeyCache()
+    # the keys after an escaped key are not in the tree
+    for i in range(50):
+        interp_decoder._decode(space, '{"\\u0061": 1, "k%d": 2}' % i,
+                               keycache)
+    assert keycache.num_nodes == 0
+    assert len(keycache.keys_w) == 10
+    for i in range(50):
+        interp_decoder._decode(space, '{"x%d": 1, "y": 2}' % i, keycache)
+    assert keycache.num_nodes == 10
+    assert len(keycache.keys_w) == 10
     
 
 class AppTest(object):
@@ -164,6 +194,24 @@ class AppTest(object):
         raises(ValueError, _pypyjson.loads, '{"key"')
         raises(ValueError, _pypyjson.loads, '{"key": 42')
 
+    def test_decode_object_same_keys(self):
+        import _pypyjson
+        s = ('[{"id": 1, "name": "a", "tags": {"x": 1}}, '
+             '{"id": 2, "name": "b", "tags": {"x": 2, "y": 3}}, '
+             '{"id": 3, "nam": "c", "tags": {}}, '
+             '{"id": 4, "name\\u00e8": "d", "\xc3\xa8": null}, '
+             '{"id": 5, "name": "e", "name": "f"}, '
+             '{"i": 6}]')
+        assert _pypyjson.loads(s) == [
+            {u"id": 1, u"name": u"a", u"tags": {u"x": 1}},
+            {u"id": 2, u"name": u"b", u"tags": {u"x": 2, u"y": 3}},
+            {u"id": 3, u"nam": u"c", u"tags": {}},
+            {u"id": 4, u"name\xe8": u"d", u"\xe8": None},
+            {u"id": 5, u"name": u"f"},
+            {u"i": 6}]
+        raises(ValueError, _pypyjson.loads, '[{"id": 1}, {"id')
+        raises(ValueError, _pypyjson.loads, '[{"id": 1}, {"id"')
+
     def test_decode_object_nonstring_key(self):
         import _pypyjson
         raises(ValueError, "_pypyjson.loads('{42: 43}')")
@@ -231,3 +279,196 @@ class AppTest(object):
         for inputtext, errmsg in test_cases:
             exc = raises(ValueError, _pypyjson.loads, inputtext)
             assert str(exc.value) == errmsg
+
+    def test_incremental_decoder(self):
+        import _pypyjson
+        data = '{"a": [1, "x\\"}"]}\n42\n"spam" [true,\nnull] 1.5e3 -7'
+        for size in [1, 2, 3, 7, len(data)]:
+            dec = _pypyjson.IncrementalDecoder()
+            res = []
+            for i in range(0, len(data), size):
+                res += dec.feed(data[i:i+size])
+            res += dec.close()
+            assert res == [{u"a": [1, u'x"}']}, 42, u"spam", [True, None],
+                           1500.0, -7]
+        dec = _pypyjson.IncrementalDecoder()
+        assert dec.feed('[1, 2] [3') == [[1, 2]]
+        raises(ValueError, dec.close)
+        dec = _pypyjson.IncrementalDecoder()
+        raises(ValueError, dec.feed, '{"a": }')
+        raises(TypeError, dec.feed, u'42')
+        # values next to a scalar need to be separated by whitespace
+        for bad in ['1[2]', '1{}', '1"a"', 'true"a"', '[1]2', '"a"1',
+                    '{}null', '1,2']:
+            dec = _pypyjson.IncrementalDecoder()
+            raises(ValueError, dec.feed, bad)
+        dec = _pypyjson.IncrementalDecoder()
+        assert dec.feed('1\t[2]"a"{}') == [1, [2], u"a", {}]
+
+    def test_incremental_decoder_items(self):
+        import _pypyjson
+        data = ' [{"a": 1}, [2, 3] ,"four",5, null]  '
+        for size in [1, 2, 5, len(data)]:
+            dec = _pypyjson.IncrementalDecoder(items=True)
+            res = []
+            for i in range(0, len(data), size):
+                res += dec.feed(data[i:i+size])
+            res += dec.close()
+            assert res == [{u"a": 1}, [2, 3], u"four", 5, None]
+        dec = _pypyjson.IncrementalDecoder(items=True)
+        assert dec.feed('[]') == []
+        assert dec.close() == []
+        for bad in ['{}', '[1 2]', '[1,,2]', '[1] 2', '[1,]', '[1, ]',
+                    '[,]', '[1,\n]']:
+            dec = _pypyjson.IncrementalDecoder(items=True)
+            raises(ValueError, dec.feed, bad)
+        dec = _pypyjson.IncrementalDecoder(items=True)
+        assert dec.feed('[1, 2') == [1]
+        raises(ValueError, dec.close)
+
+    def test_iterload(self):
+        import _pypyjson
+        from StringIO import StringIO
+        f = StringIO('{"a": 1}\n{"a": 2}\n{"a": 3}\n')
+        it = _pypyjson.iterload(f, chunk_size=5)
+        assert next(it) == {u"a": 1}
+        assert list(it) == [{u"a": 2}, {u"a": 3}]
+        f = StringIO('[1, 2, 3]')
+        assert list(_pypyjson.iterload(f, items=True, chunk_size=2)) == [1, 2, 3]
+
+    def test_encode(self):
+        import _pypyjson
+        class Encoder(object):
+            skipkeys = False
+            allow_nan = True
+            sort_keys = False
+            indent = None
+            item_separator = ', '
+            key_separator = ': '
+            check_circular = True
+            def default(self, o):
+                if isinstance(o, set):
+                    return sorted(o)
+                raise TypeError(repr(o) + " is not JSON serializable")
+        enc = Encoder()
+        class MyInt(int):
+            def __str__(self):
+                return '42'
+        class MyList(list):
+            pass
+        for obj, expected in [
+                (None, 'null'), (True, 'true'), (False, 'false'),
+                (3, '3'), (-2**70, str(-2**70)), (MyInt(5), '42'),
+                (1.5, '1.5'), (float('inf'), 'Infinity'),
+                (float('-inf'), '-Infinity'), (float('nan'), 'NaN'),
+                ('a"b', '"a\\"b"'), (u'\xe8\n', '"\\u00e8\\n"'),
+                ('\xc3\xa8', '"\\u00e8"'),
+                ([], '[]'), ((), '[]'), ({}, '{}'),
+                ([1, 2, 3], '[1, 2, 3]'), ([1.5, 2.0], '[1.5, 2.0]'),
+                (['a', 'b\t'], '["a", "b\\t"]'), ((1, 'a', None), '[1, "a", null]'),
+                (MyList([1, [2]]), '[1, [2]]'),
+                ({'a': 1}, '{"a": 1}'), ({u'\xe8': [1]}, '{"\\u00e8": [1]}'),
+                ({1: 2, 1.5: 3, None: 4, False: 5}, None),
+                (set([2, 1]), '[1, 2]'),
+                ]:
+            res = _pypyjson.encode(enc, obj)
+            assert type(res) is str
+            if expected is not None:
+                assert res == expected
+            else:
+                assert sorted(res[1:-1].split(', ')) == [
+                    '"1": 2', '"1.5": 3', '"false": 5', '"null": 4']
+        raises(TypeError, _pypyjson.encode, enc, object())
+        raises(TypeError, _pypyjson.encode, enc, {(1,): 2})
+        l = [1]
+        l.append(l)
+        raises(ValueError, _pypyjson.encode, enc, l)
+        d = {}
+        d['x'] = [d]
+        raises(ValueError, _pypyjson.encode, enc, d)
+        enc.allow_nan = False
+        raises(ValueError, _pypyjson.encode, enc, [float('nan')])
+        enc.skipkeys = True
+        assert _pypyjson.encode(enc, {(1,): 2, 'a': 3}) == '{"a": 3}'
+        enc.sort_keys = True
+        enc.indent = 2
+        enc.item_separator = ','
+        assert _pypyjson.encode(enc, {'b': [1, 2], 'a': {}, 'c': 'x'}) == (
+            '{\n  "a": {},\n  "b": [\n    1,\n    2\n  ],\n  "c": "x"\n}')
+
+    def test_encode_float_subclass_and_sort_keys(self):
+        import _pypyjson
+        class Encoder(object):
+            skipkeys = False
+            allow_nan = True
+            sort_keys = True
+            indent = None
+            item_separator = ', '
+            key_separator = ': '
+            check_circular = True
+        class MyFloat(float):
+            def __repr__(self):
+                return 'my float'
+            def __float__(self):
+                return 42.0
+        enc = Encoder()
+        assert _pypyjson.encode(enc, [MyFloat(1.5)]) == '[1.5]'
+        assert _pypyjson.encode(enc, {MyFloat(2.5): 1}) == '{"2.5": 1}'
+        # only the keys are compared, not the (key, value) items
+        class Unorderable(object):
+            def __lt__(self, other):
+                raise TypeError("unorderable")
+            __gt__ = __le__ = __ge__ = __eq__ = __ne__ = __lt__
+        enc.default = lambda o: 'u'
+        assert _pypyjson.encode(enc, {'b': Unorderable(), 'a': 1,
+                                      'c': Unorderable()}) == (
+            '{"a": 1, "b": "u", "c": "u"}')
+        assert _pypyjson.encode(enc, {1: [2], 1.5: [1]}) == (
+            '{"1": [2], "1.5": [1]}')
+
+
+class AppTestJson(object):
+    spaceconfig = {"usemodules": ['_pypyjson', 'struct']}
+
+    def test_json_dumps(self):
+        import json
+        assert json.dumps({'a': [1, 2.5, u'\xe8']}) == '{"a": [1, 2.5, "\\u00e8"]}'
+        assert json.dumps([1, {}], separators=(',', ':')) == '[1,{}]'
+        assert json.dumps(set([1]), default=list) == '[1]'
+        assert json.dumps(u'\xe8', ensure_ascii=False) == u'"\xe8"'
+
+    def test_json_dumps_overridden_methods(self):
+        import json
+        class IterEncoder(json.JSONEncoder):
+            def iterencode(self, o, _one_shot=False):
+                return ['"iter"']
+        class DefaultEncoder(json.JSONEncoder):
+            def default(self, o):
+                return 'default'
+        assert json.dumps([1], cls=IterEncoder) == '"iter"'
+        assert json.dumps([set()], cls=DefaultEncoder) == '["default"]'
+        assert json.dumps([set()], default=lambda o: 'arg') == '["arg"]'
+        class MyFloat(float):
+            def __repr__(self):
+                return 'my float'
+        assert json.dumps([MyFloat(0.5)]) == '[0.5]'
+
+    def test_same_as_pure_python(self):
+        import json
+        from json import encoder
+        obj = {'a': [1, 2.5, None, True, {'b': (u'\xe8', 'c\n')}],
+               'd': {}, 'e': [], '': [[[]]], 3: -1e100}
+        results = []
+        fast_encode = encoder._pypyjson_encode
+        assert fast_encode is not None
+        try:
+            for enc in [fast_encode, None]:
+                encoder._pypyjson_encode = enc
+                results.append([
+                    json.dumps(obj, sort_keys=True),
+                    json.dumps(obj, indent=3, sort_keys=True),
+                    json.dumps(obj, indent=0, separators=(',', ':'),
+                               sort_keys=True)])
+        finally:
+            encoder._pypyjson_encode = fast_encode
+        assert results[0] == results[1]
@@ -1,6 +1,8 @@
 import sys
 from rpython.rlib import rsocket, rweaklist
 from rpython.rlib.rarithmetic import intmask
+from rpython.rlib.objectmodel import keepalive_until_here
+from rpython.rlib.buffer import ByteBuffer
 from rpython.rlib.rsocket import (
     RSocket, AF_INET, SOCK_STREAM, SocketError, SocketErrorWithErrno,
     RSocketError
@@ -8,7 +10,7 @@ from rpython.rlib.rsocket import (
 from rpython.rtyper.lltypesystem import lltype, rffi
 
 from pypy.interpreter import gateway
-from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.baseobjspace import W_Root, BufferInterfaceNotFound
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
 from pypy.interpreter.typedef import (
@@ -150,6 +152,24 @@ def ipaddr_from_object(space, w_sockaddr):
     return addr
 
 
+def raw_send_buffer(space, w_data):
+    """Returns the buffer of 'w_data' if it can be sent directly from its
+    raw address (bytearray, array, memoryview...), or None if 'w_data' has
+    to be converted to a string first."""
+    if (space.isinstance_w(w_data, space.w_bytes) or
+            space.isinstance_w(w_data, space.w_unicode)):
+        return None
+    try:
+        buf = w_data.buffer_w(space, 0)
+    except BufferInterfaceNotFound:
+        return None
+    try:
+        buf.get_raw_address()
+    except ValueError:
+        return None
+    return buf
+
+
 class W_Socket(W_Root):
     w_tb = None  # String representation of the traceback at creation time
 
@@ -379,22 +399,28 @@ class W_Socket(W_Root):
         except SocketError as e:
             raise converted_error(space, e)
 
-    @unwrap_spec(data='bufferstr', flags=int)
-    def send_w(self, space, data, flags=0):
+    @unwrap_spec(flags=int)
+    def send_w(self, space, w_data, flags=0):
         """send(data[, flags]) -> count
 
         Send a data string to the socket.  For the optional flags
         argument, see the Unix manual.  Return the number of bytes
         sent; this may be less than len(data) if the network is busy.
         """
+        buf = raw_send_buffer(space, w_data)
         try:
-            count = self.sock.send(data, flags)
+            if buf is not None:
+                count = self.sock.send_raw(buf.get_raw_address(),
+                                           buf.getlength(), flags)
+                keepalive_until_here(buf)
+            else:
+                count = self.sock.send(space.bufferstr_w(w_data), flags)
         except SocketError as e:
             raise converted_error(space, e)
         return space.newint(count)
 
-    @unwrap_spec(data='bufferstr', flags=int)
-    def sendall_w(self, space, data, flags=0):
+    @unwrap_spec(flags=int)
+    def sendall_w(self, space, w_data, flags=0):
         """sendall(data[, flags])
 
         Send a data string to the socket.  For the optional flags
@@ -402,12 +428,107 @@ class W_Socket(W_Root):
         until all data is sent.  If an error occurs, it's impossible
         to tell how much data has been sent.
         """
+        buf = raw_send_buffer(space, w_data)
+        signal_checker = space.getexecutioncontext().checksignals
         try:
-            self.sock.sendall(
-                data, flags, space.getexecutioncontext().checksignals)
+            if buf is not None:
+                self.sock.sendall_raw(buf.get_raw_address(), buf.getlength(),
+                                      flags, signal_checker)
+                keepalive_until_here(buf)
+            else:
+                self.sock.sendall(space.bufferstr_w(w_data), flags,
+                                  signal_checker)
         except SocketError as e:
             raise converted_error(space, e)
 
+    @unwrap_spec(flags=int)
+    def sendmsg_w(self, space, w_buffers, w_ancdata=None, flags=0,
+                  w_address=None):
+        """sendmsg(buffers[, ancdata[, flags[, address]]]) -> count
+
+        Send the data of a sequence of buffers to the socket with a single
+        system call, without joining them first.  Sending ancillary data
+        is not supported: a non-empty 'ancdata' raises ValueError.  For the
+        optional flags argument, see the Unix manual.  Return the number of
+        bytes sent.
+        """
+        if w_ancdata is not None and space.len_w(w_ancdata) > 0:
+            raise oefmt(space.w_ValueError,
+                        "sendmsg() does not support ancillary data")
+        buffers = [space.getarg_w('s*', w_buffer)
+                   for w_buffer in space.listview(w_buffers)]
+        try:
+            if space.is_none(w_address):
+                addr = None
+            else:
+                addr = self.addr_from_object(space, w_address)
+            count = self.sock.sendmsg(buffers, flags, addr)
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.newint(count)
+
+    def _recvmsg_into(self, space, buffers, ancbufsize, flags):
+        if ancbufsize < 0:
+            raise oefmt(space.w_ValueError,
+                        "negative buffer size in recvmsg()")
+        if ancbufsize > 0:
+            raise oefmt(space.w_ValueError,
+                        "recvmsg() does not support ancillary data")
+        try:
+            nbytes, msg_flags, addr = self.sock.recvmsg_into(buffers, flags)
+        except SocketError as e:
+            raise converted_error(space, e)
+        if addr:
+            w_addr = addr_as_object(addr, self.sock.fd, space)
+        else:
+            w_addr = space.w_None
+        return nbytes, msg_flags, w_addr
+
+    @unwrap_spec(bufsize=int, ancbufsize=int, flags=int)
+    def recvmsg_w(self, space, bufsize, ancbufsize=0, flags=0):
+        """recvmsg(bufsize[, ancbufsize[, flags]]) -> (data, ancdata, msg_flags, address)
+
+        Receive up to bufsize bytes from the socket, like recvfrom(), and
+        also return the flags set on the received message.  Receiving
+        ancillary data is not supported: a non-zero 'ancbufsize' raises
+        ValueError, and 'ancdata' is always an empty list.
+        """
+        if bufsize < 0:
+            raise oefmt(space.w_ValueError,
+                        "negative buffer size in recvmsg()")
+        buf = ByteBuffer(bufsize)
+        nbytes, msg_flags, w_addr = self._recvmsg_into(space, [buf],
+                                                       ancbufsize, flags)
+        data = buf.getslice(0, nbytes, 1, nbytes)
+        return space.newtuple([space.newbytes(data), space.newlist([]),
+                               space.newint(msg_flags), w_addr])
+
+    @unwrap_spec(ancbufsize=int, flags=int)
+    def recvmsg_into_w(self, space, w_buffers, ancbufsize=0, flags=0):
+        """recvmsg_into(buffers[, ancbufsize[, flags]]) -> (nbytes, ancdata, msg_flags, address)
+
+        Like recvmsg(), but scatter the received data into a sequence of
+        writable buffers, filling each of them in turn with a single
+        system call.
+        """
+        buffers = []
+        copies = []   # (target, temporary) for the buffers without raw address
+        for w_buffer in space.listview(w_buffers):
+            buf = space.getarg_w('w*', w_buffer)
+            try:
+                buf.get_raw_address()
+            except ValueError:
+                tmp = ByteBuffer(buf.getlength())
+                copies.append((buf, tmp))
+                buf = tmp
+            buffers.append(buf)
+        nbytes, msg_flags, w_addr = self._recvmsg_into(space, buffers,
+                                                       ancbufsize, flags)
+        for buf, tmp in copies:
+            buf.setslice(0, tmp.as_str())
+        return space.newtuple([space.newint(nbytes), space.newlist([]),
+                               space.newint(msg_flags), w_addr])
+
     @unwrap_spec(data='bufferstr')
     def sendto_w(self, space, data, w_param2, w_param3=None):
         """sendto(data[, flags], address) -> count
@@ -716,6 +837,8 @@ setsockopt settimeout shutdown _reuse _drop recv_into recvfrom_into
 for name in ('dup',):
     if not hasattr(RSocket, name):
         socketmethodnames.remove(name)
+if hasattr(rsocket._c, 'sendmsg'):
+    socketmethodnames.extend(['sendmsg', 'recvmsg', 'recvmsg_into'])
 if hasattr(rsocket._c, 'WSAIoctl'):
     socketmethodnames.append('ioctl')
 
@@ -831,6 +831,51 @@ class AppTestSocketTCP:
         msg = buf[:len(MSG)]
         assert msg == MSG
 
+    def test_send_buffers(self):
+        import socket
+        import array
+        MSG = b'dupa was here\n' * 10
+        cli = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        cli.connect(self.serv.getsockname())
+        conn, addr = self.serv.accept()
+        for data, expected in [(bytearray(MSG), MSG),
+                               (memoryview(MSG), MSG),
+                               (array.array('c', MSG), MSG),
+                               (memoryview(bytearray(MSG))[7:], MSG[7:])]:
+            assert conn.send(data) == len(expected)
+            assert conn.sendall(data) is None
+            expected += expected
+            received = b''
+            while len(received) < len(expected):
+                received += cli.recv(1024)
+            assert received == expected
+
+    def test_sendmsg_recvmsg(self):
+        import socket
+        import array
+        if not hasattr(socket.socket, 'sendmsg'):
+            skip("no sendmsg")
+        cli = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        cli.connect(self.serv.getsockname())
+        conn, addr = self.serv.accept()
+        n = conn.sendmsg([b'dupa ', bytearray(b'was '), memoryview(b'here\n')])
+        assert n == 14
+        data, ancdata, flags, addr = cli.recvmsg(1024)
+        assert data == b'dupa was here\n'
+        assert ancdata == []
+        conn.sendall(b'dupa was here\n')
+        buf1 = bytearray(5)
+        buf2 = array.array('c', b' ' * 20)
+        nbytes, ancdata, flags, addr = cli.recvmsg_into([buf1, buf2])
+        assert nbytes == 14
+        assert buf1 == b'dupa '
+        assert buf2.tostring()[:9] == b'was here\n'
+        # ancillary data is not supported
+        raises(ValueError, conn.sendmsg, [b'x'], [(1, 1, b'')])
+        raises(ValueError, cli.recvmsg, 10, 100)
+        raises(ValueError, cli.recvmsg_into, [buf1], 100)
+        assert conn.sendmsg([b'x'], [], 0) == 1
+
     def test_recvfrom_into(self):
         import socket
         import array
@@ -12,4 +12,5 @@ class Module(MixedModule):
         'compile':        'interp_sre.W_SRE_Pattern',
         'getlower':       'interp_sre.w_getlower',
         'getcodesize':    'interp_sre.w_getcodesize',
+        'LRUCache':       'interp_cache.W_LRUCache',
     }
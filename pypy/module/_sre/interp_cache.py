@@ -0,0 +1,114 @@
+from rpython.rlib.objectmodel import r_dict
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.typedef import TypeDef, interp_attrproperty
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.error import OperationError, oefmt
+
+# ____________________________________________________________
+#
+# LRUCache class
+# A mapping of bounded size, used by re.py to cache compiled patterns
+# and replacement templates.  When it is full, adding an entry only
+# evicts the least recently used one, instead of clearing everything.
+
+class CacheEntry(object):
+    def __init__(self, w_key, w_value):
+        self.w_key = w_key
+        self.w_value = w_value
+        self.prev = self     # doubly-linked list, most recently used first
+        self.next = self
+
+    def unlink(self):
+        self.prev.next = self.next
+        self.next.prev = self.prev
+
+    def insert_after(self, other):
+        self.prev = other
+        self.next = other.next
+        other.next.prev = self
+        other.next = self
+
+
+class W_LRUCache(W_Root):
+    def __init__(self, space, maxsize):
+        self.space = space
+        self.maxsize = maxsize
+        self.entries = r_dict(space.eq_w, space.hash_w, force_non_null=True)
+        self.head = CacheEntry(None, None)
+
+    def lookup(self, w_key):
+        entry = self.entries.get(w_key, None)
+        if entry is not None and entry.prev is not self.head:
+            entry.unlink()
+            entry.insert_after(self.head)
+        return entry
+
+    def getitem_w(self, w_key):
+        entry = self.lookup(w_key)
+        if entry is None:
+            raise OperationError(self.space.w_KeyError, w_key)
+        return entry.w_value
+
+    def get_w(self, w_key, w_default=None):
+        entry = self.lookup(w_key)
+        if entry is None:
+            if w_default is None:
+                return self.space.w_None
+            return w_default
+        return entry.w_value
+
+    def setitem_w(self, w_key, w_value):
+        entry = self.lookup(w_key)
+        if entry is not None:
+            entry.w_value = w_value
+            return
+        if self.maxsize == 0:
+            return
+        while len(self.entries) >= self.maxsize:
+            oldest = self.head.prev
+            oldest.unlink()
+            del self.entries[oldest.w_key]
+        entry = CacheEntry(w_key, w_value)
+        entry.insert_after(self.head)
+        self.entries[w_key] = entry
+
+    def contains_w(self, w_key):
+        return self.space.newbool(w_key in self.entries)
+
+    def len_w(self):
+        return self.space.newint(len(self.entries))
+
+    def clear_w(self):
+        self.entries.clear()
+        self.head = CacheEntry(None, None)
+
+    def keys_w(self):
+        "Return the keys, from the most recently used to the least."
+        keys_w = []
+        entry = self.head.next
+        while entry is not self.head:
+            keys_w.append(entry.w_key)
+            entry = entry.next
+        return self.space.newlist(keys_w)
+
+@unwrap_spec(maxsize=int)
+def W_LRUCache__new__(space, w_subtype, maxsize):
+    if maxsize < 0:
+        raise oefmt(space.w_ValueError, "maxsize must be >= 0")
+    cache = space.allocate_instance(W_LRUCache, w_subtype)
+    W_LRUCache.__init__(cache, space, maxsize)
+    return cache
+
+W_LRUCache.typedef = TypeDef(
+    '_sre.LRUCache',
+    __new__      = interp2app(W_LRUCache__new__),
+    __getitem__  = interp2app(W_LRUCache.getitem_w),
+    __setitem__  = interp2app(W_LRUCache.setitem_w),
+    __contains__ = interp2app(W_LRUCache.contains_w),
+    __len__      = interp2app(W_LRUCache.len_w),
+    get          = interp2app(W_LRUCache.get_w),
+    clear        = interp2app(W_LRUCache.clear_w),
+    keys         = interp2app(W_LRUCache.keys_w),
+    maxsize      = interp_attrproperty('maxsize', W_LRUCache,
+                                       wrapfn="newint"),
+)
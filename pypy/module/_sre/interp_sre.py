@@ -13,7 +13,7 @@ from rpython.rlib.rstring import StringBuilder, UnicodeBuilder
 #
 # Constants and exposed functions
 
-from rpython.rlib.rsre import rsre_core
+from rpython.rlib.rsre import rsre_core, rsre_dfa
 from rpython.rlib.rsre.rsre_char import CODESIZE, MAXREPEAT, getlower, set_unicode_db
 
 
@@ -94,7 +94,10 @@ def searchcontext(space, ctx):
 # SRE_Pattern class
 
 class W_SRE_Pattern(W_Root):
-    _immutable_fields_ = ["code", "flags", "num_groups", "w_groupindex"]
+    _immutable_fields_ = ["code", "flags", "num_groups", "w_groupindex",
+                          "prefilter", "dfa"]
+    w_last_template = None    # the last template given to sub(), and
+    w_last_filter = None      # what re._subx() returned for it
 
     def cannot_copy_w(self):
         space = self.space
@@ -114,16 +117,16 @@ class W_SRE_Pattern(W_Root):
                 pos = len(unicodestr)
             if endpos > len(unicodestr):
                 endpos = len(unicodestr)
-            return rsre_core.UnicodeMatchContext(self.code, unicodestr,
-                                                 pos, endpos, self.flags)
+            ctx = rsre_core.UnicodeMatchContext(self.code, unicodestr,
+                                                pos, endpos, self.flags)
         elif space.isinstance_w(w_string, space.w_bytes):
             str = space.bytes_w(w_string)
             if pos > len(str):
                 pos = len(str)
             if endpos > len(str):
                 endpos = len(str)
-            return rsre_core.StrMatchContext(self.code, str,
-                                             pos, endpos, self.flags)
+            ctx = rsre_core.StrMatchContext(self.code, str,
+                                            pos, endpos, self.flags)
         else:
             buf = space.readbuf_w(w_string)
             size = buf.getlength()
@@ -132,8 +135,11 @@ class W_SRE_Pattern(W_Root):
                 pos = size
             if endpos > size:
                 endpos = size
-            return rsre_core.BufMatchContext(self.code, buf,
-                                             pos, endpos, self.flags)
+            ctx = rsre_core.BufMatchContext(self.code, buf,
+                                            pos, endpos, self.flags)
+        ctx.prefilter = self.prefilter
+        ctx.dfa = self.dfa
+        return ctx
 
     def getmatch(self, ctx, found):
         if found:
@@ -255,12 +261,21 @@ class W_SRE_Pattern(W_Root):
             if literal:
                 w_filter = w_ptemplate
                 filter_is_callable = False
+            elif (self.w_last_template is not None and
+                  (filter_as_string is not None or
+                   filter_as_unicode is not None) and
+                  space.is_w(w_ptemplate, self.w_last_template)):
+                # same immutable template as in the previous call
+                w_filter = self.w_last_filter
+                filter_is_callable = space.is_true(space.callable(w_filter))
             else:
                 # not a literal; hand it over to the template compiler
                 w_re = import_re(space)
                 w_filter = space.call_method(w_re, '_subx',
                                              self, w_ptemplate)
                 filter_is_callable = space.is_true(space.callable(w_filter))
+                self.w_last_template = w_ptemplate
+                self.w_last_filter = w_filter
         #
         # XXX this is a bit of a mess, but it improves performance a lot
         ctx = self.make_ctx(w_string)
@@ -386,6 +401,8 @@ def SRE_Pattern__new__(space, w_subtype, w_pattern, flags, w_code,
     srepat.w_pattern = w_pattern      # the original uncompiled pattern
     srepat.flags = flags
     srepat.code = code
+    srepat.prefilter = rsre_core.compute_prefilter(code)
+    srepat.dfa = rsre_dfa.compile_dfa(code, flags)
     srepat.num_groups = groups
     srepat.w_groupindex = w_groupindex
     srepat.w_indexgroup = w_indexgroup
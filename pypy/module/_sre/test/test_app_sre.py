@@ -320,6 +320,89 @@ class AppTestSreMatch:
         KEYCRE = re.compile(r"%\(([^)]*)\)s|.")
         raises(TypeError, KEYCRE.sub, "hello", {"%(": 1})
 
+    def test_sub_same_template(self):
+        import re
+        p = re.compile("a(.)")
+        for i in range(3):
+            assert p.sub(r"<\1>", "xabacad") == "x<b><c><d>"
+            assert p.sub(r"\1\1", "xab") == "xbb"
+            assert p.sub(u"[\\1]", "xab") == u"x[b]"
+        assert p.sub(r"a\n", "ab") == "a\n"
+        assert p.sub(r"a\n", "ab") == "a\n"
+        raises(re.error, p.sub, r"\2", "ab")
+        raises(re.error, p.sub, r"\2", "ab")
+
+
+class AppTestLRUCache:
+
+    def test_basic(self):
+        from _sre import LRUCache
+        c = LRUCache(3)
+        assert c.maxsize == 3
+        assert len(c) == 0
+        c['a'] = 1
+        c['b'] = 2
+        assert c['a'] == 1
+        assert c.get('b') == 2
+        assert c.get('x') is None
+        assert c.get('x', 42) == 42
+        raises(KeyError, "c['x']")
+        assert 'a' in c
+        assert 'x' not in c
+        c['a'] = 3
+        assert c['a'] == 3
+        assert len(c) == 2
+        c.clear()
+        assert len(c) == 0
+        assert c.keys() == []
+
+    def test_evicts_least_recently_used(self):
+        from _sre import LRUCache
+        c = LRUCache(3)
+        c[1] = 'a'
+        c[2] = 'b'
+        c[3] = 'c'
+        assert c.keys() == [3, 2, 1]
+        c[1]
+        assert c.keys() == [1, 3, 2]
+        c[4] = 'd'
+        assert c.keys() == [4, 1, 3]
+        assert 2 not in c
+        c.get(3)
+        c[5] = 'e'
+        assert c.keys() == [5, 3, 4]
+
+    def test_keys_by_value(self):
+        from _sre import LRUCache
+        c = LRUCache(10)
+        c[(str, 'a+', 0)] = 1
+        c[(unicode, u'a+', 0)] = 2
+        assert c[(str, 'a' + '+', 0)] == 1
+        assert c[(unicode, u'a+', 0)] == 2
+        assert len(c) == 2
+        raises(TypeError, "c[[]] = 3")
+
+    def test_maxsize(self):
+        from _sre import LRUCache
+        c = LRUCache(0)
+        c['a'] = 1
+        assert len(c) == 0
+        raises(ValueError, LRUCache, -1)
+
+    def test_re_cache(self):
+        import re
+        re.purge()
+        first = re.compile('pattern0')
+        for i in range(1, re._MAXCACHE + 10):
+            re.compile('pattern%d' % i)
+            # keep using the first pattern
+            assert re.compile('pattern0') is first
+        assert len(re._cache) == re._MAXCACHE
+        assert re.compile('pattern%d' % (re._MAXCACHE + 9)) is not None
+        re.purge()
+        assert len(re._cache) == 0
+        assert len(re._cache_repl) == 0
+
 
 class AppTestSreScanner:
     def test_scanner_attributes(self):
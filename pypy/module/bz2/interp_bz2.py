@@ -10,6 +10,7 @@ from rpython.rlib.streamio import Stream
 from rpython.translator.tool.cbuild import ExternalCompilationInfo
 from rpython.translator.platform import platform as compiler
 from rpython.rlib.rarithmetic import intmask, r_longlong
+from rpython.rlib.objectmodel import keepalive_until_here
 import sys
 
 
@@ -515,6 +516,8 @@ class W_BZ2Compressor(W_Root):
     must be a number between 1 and 9."""
     def __init__(self, space, compresslevel):
         self.space = space
+        # the bz2 calls release the GIL, so the stream needs a lock
+        self.lock = space.allocate_lock()
         self.bzs = lltype.malloc(bz_stream.TO, flavor='raw', zero=True)
         try:
             self.running = False
@@ -558,50 +561,52 @@ class W_BZ2Compressor(W_Root):
         if datasize == 0:
             return self.space.newbytes("")
 
-        if not self.running:
-            raise oefmt(self.space.w_ValueError,
-                        "this object was already flushed")
+        with self.lock:
+            if not self.running:
+                raise oefmt(self.space.w_ValueError,
+                            "this object was already flushed")
 
-        in_bufsize = datasize
+            in_bufsize = datasize
 
-        with OutBuffer(self.bzs) as out:
-            with rffi.scoped_nonmovingbuffer(data) as in_buf:
+            with OutBuffer(self.bzs) as out:
+                with rffi.scoped_nonmovingbuffer(data) as in_buf:
 
-                self.bzs.c_next_in = in_buf
-                rffi.setintfield(self.bzs, 'c_avail_in', in_bufsize)
+                    self.bzs.c_next_in = in_buf
+                    rffi.setintfield(self.bzs, 'c_avail_in', in_bufsize)
 
-                while True:
-                    bzerror = BZ2_bzCompress(self.bzs, BZ_RUN)
-                    if bzerror != BZ_RUN_OK:
-                        _catch_bz2_error(self.space, bzerror)
+                    while True:
+                        bzerror = BZ2_bzCompress(self.bzs, BZ_RUN)
+                        if bzerror != BZ_RUN_OK:
+                            _catch_bz2_error(self.space, bzerror)
 
-                    if rffi.getintfield(self.bzs, 'c_avail_in') == 0:
-                        break
-                    elif rffi.getintfield(self.bzs, 'c_avail_out') == 0:
-                        out.prepare_next_chunk()
+                        if rffi.getintfield(self.bzs, 'c_avail_in') == 0:
+                            break
+                        elif rffi.getintfield(self.bzs, 'c_avail_out') == 0:
+                            out.prepare_next_chunk()
 
-                res = out.make_result_string()
-                return self.space.newbytes(res)
+                    res = out.make_result_string()
+                    return self.space.newbytes(res)
 
     def flush(self):
-        if not self.running:
-            raise oefmt(self.space.w_ValueError,
-                        "this object was already flushed")
-        self.running = False
+        with self.lock:
+            if not self.running:
+                raise oefmt(self.space.w_ValueError,
+                            "this object was already flushed")
+            self.running = False
 
-        with OutBuffer(self.bzs) as out:
-            while True:
-                bzerror = BZ2_bzCompress(self.bzs, BZ_FINISH)
-                if bzerror == BZ_STREAM_END:
-                    break
-                elif bzerror != BZ_FINISH_OK:
-                    _catch_bz2_error(self.space, bzerror)
+            with OutBuffer(self.bzs) as out:
+                while True:
+                    bzerror = BZ2_bzCompress(self.bzs, BZ_FINISH)
+                    if bzerror == BZ_STREAM_END:
+                        break
+                    elif bzerror != BZ_FINISH_OK:
+                        _catch_bz2_error(self.space, bzerror)
 
-                if rffi.getintfield(self.bzs, 'c_avail_out') == 0:
-                    out.prepare_next_chunk()
+                    if rffi.getintfield(self.bzs, 'c_avail_out') == 0:
+                        out.prepare_next_chunk()
 
-            res = out.make_result_string()
-            return self.space.newbytes(res)
+                res = out.make_result_string()
+                return self.space.newbytes(res)
 
 W_BZ2Compressor.typedef = TypeDef("BZ2Compressor",
     __doc__ = W_BZ2Compressor.__doc__,
@@ -626,11 +631,14 @@ class W_BZ2Decompressor(W_Root):
 
     def __init__(self, space):
         self.space = space
+        # the bz2 calls release the GIL, so the stream needs a lock
+        self.lock = space.allocate_lock()
 
         self.bzs = lltype.malloc(bz_stream.TO, flavor='raw', zero=True)
         try:
             self.running = False
             self.unused_data = ""
+            self.unconsumed_tail = ""
 
             self._init_bz2decomp()
         except:
@@ -664,40 +672,103 @@ class W_BZ2Decompressor(W_Root):
         unused_data attribute."""
 
         assert data is not None
-        if not self.running:
-            raise oefmt(self.space.w_EOFError,
-                        "end of stream was already found")
-        if data == '':
-            return self.space.newbytes('')
+        with self.lock:
+            if not self.running:
+                raise oefmt(self.space.w_EOFError,
+                            "end of stream was already found")
+            if data == '':
+                return self.space.newbytes('')
 
-        in_bufsize = len(data)
+            in_bufsize = len(data)
 
-        with rffi.scoped_nonmovingbuffer(data) as in_buf:
-            self.bzs.c_next_in = in_buf
-            rffi.setintfield(self.bzs, 'c_avail_in', in_bufsize)
+            with rffi.scoped_nonmovingbuffer(data) as in_buf:
+                self.bzs.c_next_in = in_buf
+                rffi.setintfield(self.bzs, 'c_avail_in', in_bufsize)
+
+                with OutBuffer(self.bzs) as out:
+                    while True:
+                        bzerror = BZ2_bzDecompress(self.bzs)
+                        if bzerror == BZ_STREAM_END:
+                            if rffi.getintfield(self.bzs, 'c_avail_in') != 0:
+                                self.unused_data = self._remaining_input()
+                            self.running = False
+                            break
+                        if bzerror != BZ_OK:
+                            _catch_bz2_error(self.space, bzerror)
+
+                        if rffi.getintfield(self.bzs, 'c_avail_in') == 0:
+                            break
+                        elif rffi.getintfield(self.bzs, 'c_avail_out') == 0:
+                            out.prepare_next_chunk()
+
+                    res = out.make_result_string()
+                    return self.space.newbytes(res)
+
+    def _remaining_input(self):
+        avail_in = rffi.getintfield(self.bzs, 'c_avail_in')
+        return rffi.charpsize2str(self.bzs.c_next_in, avail_in)
+
+    def _decompress_into(self, data, outbuf, outsize):
+        with self.lock:
+            if not self.running:
+                raise oefmt(self.space.w_EOFError,
+                            "end of stream was already found")
+            self.unconsumed_tail = ""
+
+            with rffi.scoped_nonmovingbuffer(data) as in_buf:
+                self.bzs.c_next_in = in_buf
+                rffi.setintfield(self.bzs, 'c_avail_in', len(data))
+                self.bzs.c_next_out = outbuf
+                rffi.setintfield(self.bzs, 'c_avail_out', outsize)
 
-            with OutBuffer(self.bzs) as out:
                 while True:
                     bzerror = BZ2_bzDecompress(self.bzs)
                     if bzerror == BZ_STREAM_END:
-                        if rffi.getintfield(self.bzs, 'c_avail_in') != 0:
-                            unused = [self.bzs.c_next_in[i]
-                                      for i in range(
-                                          rffi.getintfield(self.bzs,
-                                                           'c_avail_in'))]
-                            self.unused_data = "".join(unused)
+                        self.unused_data = self._remaining_input()
                         self.running = False
                         break
                     if bzerror != BZ_OK:
                         _catch_bz2_error(self.space, bzerror)
 
-                    if rffi.getintfield(self.bzs, 'c_avail_in') == 0:
+                    if (rffi.getintfield(self.bzs, 'c_avail_in') == 0 or
+                        rffi.getintfield(self.bzs, 'c_avail_out') == 0):
+                        self.unconsumed_tail = self._remaining_input()
                         break
-                    elif rffi.getintfield(self.bzs, 'c_avail_out') == 0:
-                        out.prepare_next_chunk()
 
-                res = out.make_result_string()
-                return self.space.newbytes(res)
+                return outsize - rffi.getintfield(self.bzs, 'c_avail_out')
+
+    @unwrap_spec(data='bufferstr')
+    def decompress_into(self, data, w_buffer):
+        """decompress_into(data, buffer) -> number of bytes written
+
+        Like decompress(), but write the decompressed data directly into
+        the writable buffer instead of returning a new string. If the
+        buffer is full before all the input is processed, the rest of
+        the input is saved in the unconsumed_tail attribute and must be
+        passed again in the next call."""
+
+        assert data is not None
+        space = self.space
+        rwbuffer = space.getarg_w('w*', w_buffer)
+        length = rwbuffer.getlength()
+        if length == 0:
+            raise oefmt(space.w_ValueError, "buffer must not be empty")
+
+        target_address = lltype.nullptr(rffi.CCHARP.TO)
+        try:
+            target_address = rwbuffer.get_raw_address()
+        except ValueError:
+            pass
+
+        if target_address:
+            written = self._decompress_into(data, target_address, length)
+            keepalive_until_here(rwbuffer)
+        else:
+            # unoptimized case: the buffer has no raw address
+            with lltype.scoped_alloc(rffi.CCHARP.TO, length) as outbuf:
+                written = self._decompress_into(data, outbuf, length)
+                rwbuffer.setslice(0, rffi.charpsize2str(outbuf, written))
+        return space.newint(written)
 
 
 W_BZ2Decompressor.typedef = TypeDef("BZ2Decompressor",
@@ -705,7 +776,10 @@ W_BZ2Decompressor.typedef = TypeDef("BZ2Decompressor",
     __new__ = interp2app(descr_decompressor__new__),
     unused_data = interp_attrproperty("unused_data", W_BZ2Decompressor,
         wrapfn="newbytes"),
+    unconsumed_tail = interp_attrproperty("unconsumed_tail",
+        W_BZ2Decompressor, wrapfn="newbytes"),
     decompress = interp2app(W_BZ2Decompressor.decompress),
+    decompress_into = interp2app(W_BZ2Decompressor.decompress_into),
 )
 
 
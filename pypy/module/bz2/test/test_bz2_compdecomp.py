@@ -106,7 +106,7 @@ class AppTestBZ2Compressor(CheckAllocation):
 
 
 class AppTestBZ2Decompressor(CheckAllocation):
-    spaceconfig = dict(usemodules=('bz2',))
+    spaceconfig = dict(usemodules=('bz2', 'array'))
 
     def setup_class(cls):
         cls.w_TEXT = cls.space.wrap(TEXT)
@@ -173,6 +173,35 @@ class AppTestBZ2Decompressor(CheckAllocation):
         decompressed_data = bz2d.decompress(buffer(self.DATA))
         assert decompressed_data == self.TEXT
 
+    def test_decompress_into(self):
+        from bz2 import BZ2Decompressor
+        import array
+
+        bz2d = BZ2Decompressor()
+        assert bz2d.unconsumed_tail == ""
+        buf = bytearray(100)
+        pieces = []
+        data = self.DATA + "unused"
+        while True:
+            n = bz2d.decompress_into(data, buf)
+            pieces.append(str(buf[:n]))
+            data = bz2d.unconsumed_tail
+            if n < len(buf):
+                break
+        assert "".join(pieces) == self.TEXT
+        assert bz2d.unused_data == "unused"
+        assert bz2d.unconsumed_tail == ""
+        raises(EOFError, bz2d.decompress_into, "foo", buf)
+
+        bz2d = BZ2Decompressor()
+        a = array.array('c', 'x' * (len(self.TEXT) + 10))
+        n = bz2d.decompress_into(self.DATA, a)
+        assert n == len(self.TEXT)
+        assert a.tostring()[:n] == self.TEXT
+        raises(TypeError, BZ2Decompressor().decompress_into, self.DATA, "abc")
+        raises(ValueError, BZ2Decompressor().decompress_into, self.DATA,
+               bytearray())
+
     def test_subsequent_read(self):
         from bz2 import BZ2Decompressor
         bz2d = BZ2Decompressor()
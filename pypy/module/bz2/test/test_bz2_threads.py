@@ -0,0 +1,32 @@
+import os
+
+if os.name == "nt":
+    from py.test import skip
+    skip("bz2 module is not available on Windows")
+
+# not in test_bz2_compdecomp: with the 'thread' module, the space keeps
+# locks allocated, which CheckAllocation would report as leaks
+
+class AppTestBZ2Threads:
+    spaceconfig = dict(usemodules=('bz2', 'thread', 'time'))
+
+    def setup_class(cls):
+        cls.w_TEXT = cls.space.wrap('root:x:0:0:root:/root:/bin/bash\n' * 50)
+
+    def test_shared_compressor(self):
+        # the bz2 calls release the GIL, so the compressor object must
+        # not be used by several threads at the same time
+        import bz2, thread, time
+        bz2c = bz2.BZ2Compressor()
+        results = []
+        done = []
+        def compress():
+            for i in range(5):
+                results.append(bz2c.compress(self.TEXT))
+            done.append(1)
+        for i in range(3):
+            thread.start_new_thread(compress, ())
+        while len(done) < 3:
+            time.sleep(0.01)
+        results.append(bz2c.flush())
+        assert bz2.decompress(''.join(results)) == self.TEXT * 15
@@ -92,6 +92,9 @@ corresponding Unix manual entries for more information on calls."""
         interpleveldefs['fsync'] = 'interp_posix.fsync'
     if hasattr(os, 'fdatasync'):
         interpleveldefs['fdatasync'] = 'interp_posix.fdatasync'
+    if hasattr(rposix, 'writev'):
+        interpleveldefs['writev'] = 'interp_posix.writev'
+        interpleveldefs['readv'] = 'interp_posix.readv'
     if hasattr(os, 'fchdir'):
         interpleveldefs['fchdir'] = 'interp_posix.fchdir'
     if hasattr(os, 'putenv'):
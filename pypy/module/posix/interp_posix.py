@@ -4,6 +4,7 @@ import sys
 from rpython.rlib import rposix, rposix_stat
 from rpython.rlib import objectmodel, rurandom
 from rpython.rlib.objectmodel import specialize
+from rpython.rlib.buffer import ByteBuffer
 from rpython.rlib.rarithmetic import r_longlong, intmask, r_uint
 from rpython.rlib.unroll import unrolling_iterable
 
@@ -153,6 +154,48 @@ actually written, which may be smaller than len(data)."""
     else:
         return space.newint(res)
 
+@unwrap_spec(fd=c_int)
+def writev(space, fd, w_buffers):
+    """writev(fd, buffers) -> byteswritten
+
+Write the contents of a sequence of buffers to a file descriptor with a
+single system call, without joining them first.  Return the total number
+of bytes written."""
+    buffers = [space.getarg_w('s*', w_buffer)
+               for w_buffer in space.listview(w_buffers)]
+    try:
+        res = rposix.writev(fd, buffers)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    else:
+        return space.newint(res)
+
+@unwrap_spec(fd=c_int)
+def readv(space, fd, w_buffers):
+    """readv(fd, buffers) -> bytesread
+
+Read from a file descriptor into a sequence of writable buffers, filling
+each of them in turn with a single system call.  Return the total number
+of bytes read."""
+    buffers = []
+    copies = []   # (target, temporary) for the buffers without raw address
+    for w_buffer in space.listview(w_buffers):
+        buf = space.getarg_w('w*', w_buffer)
+        try:
+            buf.get_raw_address()
+        except ValueError:
+            tmp = ByteBuffer(buf.getlength())
+            copies.append((buf, tmp))
+            buf = tmp
+        buffers.append(buf)
+    try:
+        res = rposix.readv(fd, buffers)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    for buf, tmp in copies:
+        buf.setslice(0, tmp.as_str())
+    return space.newint(res)
+
 @unwrap_spec(fd=c_int)
 def close(space, fd):
     """Close a file descriptor (for low level IO)."""
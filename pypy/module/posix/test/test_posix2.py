@@ -875,6 +875,26 @@ class AppTestPosix:
         assert data == 'hello, world!\n'
         os.close(fd)
 
+    def test_writev_readv(self):
+        os = self.posix
+        if not hasattr(os, 'writev'):
+            skip("no writev")
+        fd = os.open(self.path2 + 'test_writev', os.O_RDWR | os.O_CREAT, 0666)
+        res = os.writev(fd, ['hello', bytearray(', '), buffer('world!\n'),
+                             memoryview('abc')[1:], u''])
+        assert res == 16
+        assert os.lseek(fd, 0, 0) == 0
+        buffers = [bytearray(3), bytearray(0), bytearray(10),
+                   memoryview(bytearray(10))[2:]]
+        assert os.readv(fd, buffers) == 16
+        assert buffers[0] == 'hel'
+        assert buffers[2] == 'lo, world!'
+        assert buffers[3].tobytes()[:3] == '\nbc'
+        raises(TypeError, os.readv, fd, ['abc'])
+        raises(TypeError, os.writev, fd, [None])
+        os.close(fd)
+        raises(OSError, os.writev, fd, ['abc'])
+
     def test_write_unicode(self):
         os = self.posix
         fd = os.open(self.path2 + 'test_write_unicode', os.O_RDWR | os.O_CREAT, 0666)
@@ -12,6 +12,7 @@ from rpython.rtyper.tool import rffi_platform
 from rpython.rlib._rsocket_rffi import socketclose, FD_SETSIZE
 from rpython.rlib.rposix import get_saved_errno
 from rpython.rlib.rarithmetic import intmask
+from rpython.rlib.buffer import ByteBuffer, CannotWrite
 from rpython.translator.tool.cbuild import ExternalCompilationInfo
 
 
@@ -49,6 +50,7 @@ for symbol in public_symbols:
 
 
 epoll_event = cconfig["epoll_event"]
+EPOLL_EVENTS = rffi.CArray(epoll_event)
 EPOLL_CTL_ADD = cconfig["EPOLL_CTL_ADD"]
 EPOLL_CTL_MOD = cconfig["EPOLL_CTL_MOD"]
 EPOLL_CTL_DEL = cconfig["EPOLL_CTL_DEL"]
@@ -77,10 +79,27 @@ epoll_wait = rffi.llexternal(
 )
 
 
+# size in bytes of one (fd, events) pair written by poll_into()
+EVENT_PAIR_SIZE = 2 * rffi.sizeof(rffi.UINT)
+
+
+def fill_event_pairs(buf, evs, nfds):
+    for i in range(nfds):
+        event = evs[i]
+        buf.typed_write(rffi.UINT, i * EVENT_PAIR_SIZE,
+                        rffi.cast(rffi.UINT, event.c_data.c_fd))
+        buf.typed_write(rffi.UINT, i * EVENT_PAIR_SIZE + EVENT_PAIR_SIZE // 2,
+                        event.c_events)
+
+
 class W_Epoll(W_Root):
     def __init__(self, space, epfd):
         self.space = space
         self.epfd = epfd
+        # the array of events passed to epoll_wait() is kept around between
+        # calls to poll(); it is NULL while another thread is using it
+        self.evs = lltype.nullptr(EPOLL_EVENTS)
+        self.evs_size = 0
         self.register_finalizer(space)
 
     @unwrap_spec(sizehint=int)
@@ -115,6 +134,35 @@ class W_Epoll(W_Root):
             socketclose(self.epfd)
             self.epfd = -1
             self.may_unregister_rpython_finalizer(self.space)
+        if self.evs:
+            lltype.free(self.evs, flavor='raw')
+            self.evs = lltype.nullptr(EPOLL_EVENTS)
+            self.evs_size = 0
+
+    def _get_events(self, maxevents):
+        evs = self.evs
+        if evs and self.evs_size >= maxevents:
+            size = self.evs_size
+            self.evs = lltype.nullptr(EPOLL_EVENTS)
+        else:
+            evs = lltype.malloc(EPOLL_EVENTS, maxevents, flavor='raw')
+            size = maxevents
+        return evs, size
+
+    def _put_events(self, evs, size):
+        if self.get_closed() or size <= self.evs_size:
+            lltype.free(evs, flavor='raw')
+            return
+        if self.evs:
+            lltype.free(self.evs, flavor='raw')
+        self.evs = evs
+        self.evs_size = size
+
+    def _wait(self, space, evs, maxevents, timeout):
+        nfds = epoll_wait(self.epfd, evs, maxevents, timeout)
+        if nfds < 0:
+            raise exception_from_saved_errno(space, space.w_IOError)
+        return nfds
 
     def epoll_ctl(self, space, ctl, w_fd, eventmask, ignore_ebadf=False):
         fd = space.c_filedescriptor_w(w_fd)
@@ -155,29 +203,106 @@ class W_Epoll(W_Root):
     @unwrap_spec(timeout=float, maxevents=int)
     def descr_poll(self, space, timeout=-1.0, maxevents=-1):
         self.check_closed(space)
-        if timeout < 0:
-            timeout = -1.0
-        else:
-            timeout *= 1000.0
-
-        if maxevents == -1:
-            maxevents = FD_SETSIZE - 1
-        elif maxevents < 1:
-            raise oefmt(space.w_ValueError,
-                        "maxevents must be greater than 0, not %d", maxevents)
-
-        with lltype.scoped_alloc(rffi.CArray(epoll_event), maxevents) as evs:
-            nfds = epoll_wait(self.epfd, evs, maxevents, int(timeout))
-            if nfds < 0:
-                raise exception_from_saved_errno(space, space.w_IOError)
+        timeout = _convert_timeout(timeout)
+        maxevents = _check_maxevents(space, maxevents)
 
+        evs, size = self._get_events(maxevents)
+        try:
+            nfds = self._wait(space, evs, maxevents, timeout)
             elist_w = [None] * nfds
             for i in xrange(nfds):
                 event = evs[i]
                 elist_w[i] = space.newtuple(
                     [space.newint(event.c_data.c_fd), space.newint(event.c_events)]
                 )
-            return space.newlist(elist_w)
+        finally:
+            self._put_events(evs, size)
+        return space.newlist(elist_w)
+
+    @unwrap_spec(timeout=float)
+    def descr_poll_into(self, space, w_buffer, timeout=-1.0):
+        """poll_into(buffer[, timeout=-1]) -> number of events
+
+        Like poll(), but instead of building a list of tuples, store the
+        events as pairs of C unsigned ints (fd, events) into the writable
+        buffer, for example an array.array('I').  At most as many events
+        as fit into the buffer are returned."""
+        self.check_closed(space)
+        timeout = _convert_timeout(timeout)
+        buf = space.getarg_w('w*', w_buffer)
+        maxevents = buf.getlength() // EVENT_PAIR_SIZE
+        if maxevents < 1:
+            raise oefmt(space.w_ValueError,
+                        "buffer too small to hold a single event")
+
+        evs, size = self._get_events(maxevents)
+        try:
+            nfds = self._wait(space, evs, maxevents, timeout)
+            try:
+                fill_event_pairs(buf, evs, nfds)
+            except CannotWrite:
+                tmp = ByteBuffer(nfds * EVENT_PAIR_SIZE)
+                fill_event_pairs(tmp, evs, nfds)
+                buf.setslice(0, tmp.as_str())
+        finally:
+            self._put_events(evs, size)
+        return space.newint(nfds)
+
+    @unwrap_spec(timeout=float, maxevents=int)
+    def descr_drain(self, space, timeout=-1.0, maxevents=-1):
+        """drain([timeout=-1[, maxevents=-1]]) -> [(fd, events), (...)]
+
+        Wait for events like poll(), then keep collecting the ready file
+        descriptors without blocking until no new ones are reported.  The
+        events of a file descriptor that is reported several times are
+        merged.  This is meant for edge-triggered (EPOLLET) registrations,
+        where a single poll() may not see all of them at once."""
+        self.check_closed(space)
+        timeout = _convert_timeout(timeout)
+        maxevents = _check_maxevents(space, maxevents)
+
+        fds = []
+        events = {}
+        evs, size = self._get_events(maxevents)
+        try:
+            while True:
+                nfds = self._wait(space, evs, maxevents, timeout)
+                found_new = False
+                for i in xrange(nfds):
+                    event = evs[i]
+                    fd = intmask(event.c_data.c_fd)
+                    mask = intmask(event.c_events)
+                    if fd in events:
+                        events[fd] |= mask
+                    else:
+                        events[fd] = mask
+                        fds.append(fd)
+                        found_new = True
+                if nfds < maxevents or not found_new:
+                    break
+                timeout = 0
+        finally:
+            self._put_events(evs, size)
+        elist_w = [None] * len(fds)
+        for i in xrange(len(fds)):
+            fd = fds[i]
+            elist_w[i] = space.newtuple([space.newint(fd),
+                                         space.newint(events[fd])])
+        return space.newlist(elist_w)
+
+
+def _convert_timeout(timeout):
+    if timeout < 0:
+        return -1
+    return int(timeout * 1000.0)
+
+def _check_maxevents(space, maxevents):
+    if maxevents == -1:
+        return FD_SETSIZE - 1
+    elif maxevents < 1:
+        raise oefmt(space.w_ValueError,
+                    "maxevents must be greater than 0, not %d", maxevents)
+    return maxevents
 
 
 W_Epoll.typedef = TypeDef("select.epoll",
@@ -191,5 +316,7 @@ W_Epoll.typedef = TypeDef("select.epoll",
     unregister = interp2app(W_Epoll.descr_unregister),
     modify = interp2app(W_Epoll.descr_modify),
     poll = interp2app(W_Epoll.descr_poll),
+    poll_into = interp2app(W_Epoll.descr_poll_into),
+    drain = interp2app(W_Epoll.descr_drain),
 )
 W_Epoll.typedef.acceptable_as_base_class = False
@@ -7,7 +7,7 @@ import platform
 
 class AppTestEpoll(object):
     spaceconfig = {
-        "usemodules": ["select", "_socket", "posix", "time"],
+        "usemodules": ["select", "_socket", "posix", "time", "array"],
     }
 
     def setup_class(cls):
@@ -209,3 +209,63 @@ class AppTestEpoll(object):
         ep = select.epoll()
         ep.close()
         ep.close()
+
+    def test_poll_into(self):
+        import select
+        import array
+
+        client, server = self.socket_pair()
+
+        ep = select.epoll(16)
+        ep.register(server.fileno(), select.EPOLLIN | select.EPOLLOUT)
+        ep.register(client.fileno(), select.EPOLLIN | select.EPOLLOUT)
+        client.send("Hello!")
+        server.send("world!!!")
+
+        buf = array.array('I', [0] * 8)
+        expected = ep.poll(1, 4)
+        n = ep.poll_into(buf, 1)
+        assert n == 2
+        events = [(buf[0], buf[1]), (buf[2], buf[3])]
+        events.sort()
+        expected.sort()
+        assert events == expected
+        assert buf[4:] == array.array('I', [0] * 4)
+
+        # only as many events as fit into the buffer
+        buf = bytearray(12)
+        assert ep.poll_into(buf, 1) == 1
+        raises(ValueError, ep.poll_into, bytearray(7))
+        raises(TypeError, ep.poll_into, "read-only string")
+        ep.close()
+        raises(ValueError, ep.poll_into, array.array('I', [0, 0]))
+
+    def test_drain(self):
+        import select
+
+        client, server = self.socket_pair()
+
+        ep = select.epoll(16)
+        ep.register(server.fileno(),
+            select.EPOLLIN | select.EPOLLOUT | select.EPOLLET
+        )
+        ep.register(client.fileno(),
+            select.EPOLLIN | select.EPOLLOUT | select.EPOLLET
+        )
+        client.send("Hello!")
+        server.send("world!!!")
+
+        # one event per call to epoll_wait(), but drain() collects them all
+        events = ep.drain(1, 1)
+        events.sort()
+        expected = [
+            (client.fileno(), select.EPOLLIN | select.EPOLLOUT),
+            (server.fileno(), select.EPOLLIN | select.EPOLLOUT)
+        ]
+        expected.sort()
+        assert events == expected
+        assert ep.drain(0) == []
+
+        # level-triggered fds are reported again and again: stop anyway
+        ep.modify(server.fileno(), select.EPOLLOUT)
+        assert ep.drain(1, 1) == [(server.fileno(), select.EPOLLOUT)]
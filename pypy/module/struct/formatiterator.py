@@ -120,10 +120,14 @@ class PackFormatIterator(FormatIterator):
 
 
 class UnpackFormatIterator(FormatIterator):
-    def __init__(self, space, buf):
+    def __init__(self, space, buf, offset=0, length=-1):
+        # unpack buf[offset:offset+length] without making a slice of it
         self.space = space
         self.buf = buf
-        self.length = buf.getlength()
+        self.offset = offset
+        if length < 0:
+            length = buf.getlength() - offset
+        self.length = length
         self.pos = 0
         self.result_w = []     # list of wrapped objects
 
@@ -158,7 +162,8 @@ class UnpackFormatIterator(FormatIterator):
         curpos = self.pos
         end = curpos + count
         self.advance(count) # raise if we are out of bound
-        return self.buf.getslice(curpos, end, 1, count)
+        return self.buf.getslice(self.offset + curpos, self.offset + end,
+                                 1, count)
 
     @specialize.argtype(1)
     def appendobj(self, value):
@@ -195,7 +200,110 @@ class UnpackFormatIterator(FormatIterator):
         return self.pos
 
     def get_buffer_and_pos(self):
-        return self.buf, self.pos
+        return self.buf, self.offset + self.pos
 
     def skip(self, size):
         self.read(size) # XXX, could avoid taking the slice
+
+
+class UnpackColumn(object):
+    """The values of one field of the records unpacked by
+    ColumnsUnpackFormatIterator.  Ints and floats are stored unwrapped,
+    so that the resulting lists get the int or float strategy."""
+
+    def __init__(self, space):
+        self.space = space
+        self.ints = None
+        self.floats = None
+        self.items_w = None
+
+    def append_int(self, value):
+        if self.ints is not None:
+            self.ints.append(value)
+        elif self.floats is None and self.items_w is None:
+            self.ints = [value]
+        else:
+            self.append_w(self.space.newint(value))
+
+    def append_float(self, value):
+        if self.floats is not None:
+            self.floats.append(value)
+        elif self.ints is None and self.items_w is None:
+            self.floats = [value]
+        else:
+            self.append_w(self.space.newfloat(value))
+
+    def append_w(self, w_value):
+        if self.items_w is None:
+            self.items_w = self.getitems_w()
+            self.ints = None
+            self.floats = None
+        self.items_w.append(w_value)
+
+    def getitems_w(self):
+        space = self.space
+        if self.ints is not None:
+            return [space.newint(value) for value in self.ints]
+        if self.floats is not None:
+            return [space.newfloat(value) for value in self.floats]
+        if self.items_w is not None:
+            return self.items_w
+        return []
+
+    def wrap(self):
+        space = self.space
+        if self.ints is not None:
+            return space.newlist_int(self.ints)
+        if self.floats is not None:
+            return space.newlist_float(self.floats)
+        return space.newlist(self.getitems_w())
+
+
+class ColumnsUnpackFormatIterator(UnpackFormatIterator):
+    """Unpack records one after the other, and put the n-th value of each
+    record in the n-th column instead of building a tuple."""
+
+    def __init__(self, space, buf, offset, length):
+        UnpackFormatIterator.__init__(self, space, buf, offset, length)
+        self.columns = []
+        self.field = 0
+
+    def start_record(self, offset):
+        self.offset = offset
+        self.pos = 0
+        self.field = 0
+
+    def next_column(self):
+        if self.field == len(self.columns):
+            self.columns.append(UnpackColumn(self.space))
+        column = self.columns[self.field]
+        self.field += 1
+        return column
+
+    @specialize.argtype(1)
+    def appendobj(self, value):
+        is_unsigned = (isinstance(value, r_uint) or
+                       isinstance(value, r_ulonglong))
+        column = self.next_column()
+        if is_unsigned:
+            if value <= maxint:
+                column.append_int(intmask(value))
+            else:
+                column.append_w(self.space.newint(value))
+        elif isinstance(value, r_longlong):
+            if value == r_longlong(intmask(value)):
+                column.append_int(intmask(value))
+            else:
+                column.append_w(self.space.newint(value))
+        elif isinstance(value, bool):
+            column.append_w(self.space.newbool(value))
+        elif isinstance(value, int):
+            column.append_int(value)
+        elif isinstance(value, float):
+            column.append_float(value)
+        elif isinstance(value, str):
+            column.append_w(self.space.newbytes(value))
+        elif isinstance(value, unicode):
+            column.append_w(self.space.newunicode(value))
+        else:
+            assert 0, "unreachable"
@@ -1,5 +1,5 @@
 from rpython.rlib import jit
-from rpython.rlib.buffer import SubBuffer
+from rpython.rlib.buffer import SubBuffer, StringBuffer
 from rpython.rlib.mutbuffer import MutableStringBuffer
 from rpython.rlib.rstruct.error import StructError, StructOverflowError
 from rpython.rlib.rstruct.formatiterator import CalcSizeFormatIterator
@@ -9,7 +9,7 @@ from pypy.interpreter.gateway import interp2app, unwrap_spec
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.typedef import TypeDef, interp_attrproperty
 from pypy.module.struct.formatiterator import (
-    PackFormatIterator, UnpackFormatIterator
+    PackFormatIterator, UnpackFormatIterator, ColumnsUnpackFormatIterator
 )
 
 
@@ -83,14 +83,18 @@ Write the packed bytes into the writable buffer buf starting at offset
         raise OperationError(get_error(space), space.newtext(e.msg))
 
 
-def _unpack(space, format, buf):
-    fmtiter = UnpackFormatIterator(space, buf)
+def _interpret(space, fmtiter, format):
     try:
         fmtiter.interpret(format)
     except StructOverflowError as e:
         raise OperationError(space.w_OverflowError, space.newtext(e.msg))
     except StructError as e:
         raise OperationError(get_error(space), space.newtext(e.msg))
+
+
+def _unpack(space, format, buf, offset=0, length=-1):
+    fmtiter = UnpackFormatIterator(space, buf, offset, length)
+    _interpret(space, fmtiter, format)
     return space.newtuple(fmtiter.result_w[:])
 
 
@@ -104,7 +108,11 @@ def unpack(space, format, w_str):
 def unpack_from(space, format, w_buffer, offset=0):
     """Unpack the buffer, containing packed C structure data, according to
 fmt, starting at offset. Requires len(buffer[offset:]) >= calcsize(fmt)."""
-    size = _calcsize(space, format)
+    return _unpack_from(space, format, _calcsize(space, format), w_buffer,
+                        offset)
+
+
+def _unpack_from(space, format, size, w_buffer, offset):
     buf = space.getarg_w('z*', w_buffer)
     if buf is None:
         raise oefmt(get_error(space), "unpack_from requires a buffer argument")
@@ -114,8 +122,98 @@ fmt, starting at offset. Requires len(buffer[offset:]) >= calcsize(fmt)."""
         raise oefmt(get_error(space),
                     "unpack_from requires a buffer of at least %d bytes",
                     size)
-    buf = SubBuffer(buf, offset, size)
-    return _unpack(space, format, buf)
+    return _unpack(space, format, buf, offset, size)
+
+
+@unwrap_spec(format='text')
+def iter_unpack(space, format, w_buffer):
+    """Return an iterator which unpacks the buffer, which must contain
+a whole number of packed C structures described by fmt, one structure at a
+time.  The buffer is not copied."""
+    return _iter_unpack(space, format, _calcsize(space, format), w_buffer)
+
+
+def _iter_unpack(space, format, size, w_buffer):
+    if size == 0:
+        raise oefmt(get_error(space),
+                    "cannot iteratively unpack with a struct of length 0")
+    buf = space.getarg_w('s*', w_buffer)
+    if buf.getlength() % size != 0:
+        raise oefmt(get_error(space),
+                    "iterative unpacking requires a buffer of a multiple of "
+                    "%d bytes", size)
+    return W_UnpackIter(space, format, size, buf)
+
+
+@unwrap_spec(format='text', offset=int, count=int)
+def unpack_columns(space, format, w_buffer, offset=0, count=-1):
+    """Unpack 'count' packed C structures described by fmt, stored one
+after the other in the buffer starting at offset, and return a tuple with
+one list per field: the n-th list contains the n-th value of every
+structure.  By default, unpack as many structures as the buffer holds."""
+    return _unpack_columns(space, format, _calcsize(space, format), w_buffer,
+                           offset, count)
+
+
+def _unpack_columns(space, format, size, w_buffer, offset, count):
+    if size == 0:
+        raise oefmt(get_error(space),
+                    "cannot unpack columns with a struct of length 0")
+    buf = space.getarg_w('s*', w_buffer)
+    if offset < 0:
+        offset += buf.getlength()
+    if offset < 0 or offset > buf.getlength():
+        raise oefmt(get_error(space), "offset out of range")
+    if count < 0:
+        count = (buf.getlength() - offset) // size
+    elif (buf.getlength() - offset) // size < count:
+        raise oefmt(get_error(space),
+                    "unpack_columns requires a buffer of at least %d bytes",
+                    count * size)
+    if count == 0:
+        # the number of fields, for the empty columns
+        w_res = _unpack(space, format, StringBuffer('\x00' * size))
+        return space.newtuple([space.newlist([])
+                               for i in range(space.len_w(w_res))])
+    fmtiter = ColumnsUnpackFormatIterator(space, buf, offset, size)
+    for i in range(count):
+        fmtiter.start_record(offset + i * size)
+        _interpret(space, fmtiter, format)
+    return space.newtuple([column.wrap() for column in fmtiter.columns])
+
+
+class W_UnpackIter(W_Root):
+    def __init__(self, space, format, size, buf):
+        self.format = format
+        self.size = size
+        self.buf = buf
+        self.index = 0
+
+    def descr_iter(self, space):
+        return self
+
+    def descr_next(self, space):
+        if self.buf is None:
+            raise OperationError(space.w_StopIteration, space.w_None)
+        offset = self.index * self.size
+        if offset + self.size > self.buf.getlength():
+            self.buf = None
+            raise OperationError(space.w_StopIteration, space.w_None)
+        self.index += 1
+        return _unpack(space, jit.promote_string(self.format), self.buf,
+                       offset, self.size)
+
+    def descr_length_hint(self, space):
+        if self.buf is None:
+            return space.newint(0)
+        return space.newint(self.buf.getlength() // self.size - self.index)
+
+W_UnpackIter.typedef = TypeDef("unpack_iterator",
+    __iter__=interp2app(W_UnpackIter.descr_iter),
+    next=interp2app(W_UnpackIter.descr_next),
+    __length_hint__=interp2app(W_UnpackIter.descr_length_hint),
+)
+W_UnpackIter.typedef.acceptable_as_base_class = False
 
 
 class W_Struct(W_Root):
@@ -144,7 +242,16 @@ class W_Struct(W_Root):
 
     @unwrap_spec(offset=int)
     def descr_unpack_from(self, space, w_buffer, offset=0):
-        return unpack_from(space, jit.promote_string(self.format), w_buffer, offset)
+        return _unpack_from(space, jit.promote_string(self.format), self.size,
+                            w_buffer, offset)
+
+    def descr_iter_unpack(self, space, w_buffer):
+        return _iter_unpack(space, self.format, self.size, w_buffer)
+
+    @unwrap_spec(offset=int, count=int)
+    def descr_unpack_columns(self, space, w_buffer, offset=0, count=-1):
+        return _unpack_columns(space, jit.promote_string(self.format),
+                               self.size, w_buffer, offset, count)
 
 W_Struct.typedef = TypeDef("Struct",
     __new__=interp2app(W_Struct.descr__new__.im_func),
@@ -156,6 +263,8 @@ W_Struct.typedef = TypeDef("Struct",
     unpack=interp2app(W_Struct.descr_unpack),
     pack_into=interp2app(W_Struct.descr_pack_into),
     unpack_from=interp2app(W_Struct.descr_unpack_from),
+    iter_unpack=interp2app(W_Struct.descr_iter_unpack),
+    unpack_columns=interp2app(W_Struct.descr_unpack_columns),
 )
 
 def clearcache(space):
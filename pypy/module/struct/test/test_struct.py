@@ -458,6 +458,53 @@ class AppTestStruct(object):
         assert val == sys.maxint+1
         assert type(val) is long
 
+    def test_iter_unpack(self):
+        import array
+        data = self.struct.pack('<hd', 1, 1.5) + self.struct.pack('<hd', -2, 3.0)
+        it = self.struct.iter_unpack('<hd', data)
+        assert it.__length_hint__() == 2
+        assert iter(it) is it
+        assert next(it) == (1, 1.5)
+        assert it.__length_hint__() == 1
+        assert list(it) == [(-2, 3.0)]
+        assert list(it) == []
+        s = self.struct.Struct('<hd')
+        buf = array.array('c', data)
+        assert list(s.iter_unpack(buf)) == [(1, 1.5), (-2, 3.0)]
+        assert list(s.iter_unpack(memoryview(data)[10:])) == [(-2, 3.0)]
+        assert list(s.iter_unpack('')) == []
+        raises(self.struct.error, self.struct.iter_unpack, '<hd', data[:-1])
+        raises(self.struct.error, self.struct.iter_unpack, '', data)
+        raises(TypeError, self.struct.iter_unpack, '<hd', 42)
+
+    def test_unpack_from_native_alignment(self):
+        # alignment is relative to the start of the structure
+        data = 'x' + self.struct.pack('bi', 1, 2)
+        assert self.struct.unpack_from('bi', data, 1) == (1, 2)
+        assert list(self.struct.iter_unpack('bi', data[1:])) == [(1, 2)]
+
+    def test_unpack_columns(self):
+        import sys
+        pack = self.struct.pack
+        data = ''.join([pack('<ifQ?2s', i, i / 2.0, i * 3, i % 2, 'ab')
+                        for i in range(5)])
+        cols = self.struct.unpack_columns('<ifQ?2s', data)
+        assert cols == ([0, 1, 2, 3, 4], [0.0, 0.5, 1.0, 1.5, 2.0],
+                        [0, 3, 6, 9, 12],
+                        [False, True, False, True, False], ['ab'] * 5)
+        assert type(cols[0][0]) is int
+        s = self.struct.Struct('<ifQ?2s')
+        assert s.unpack_columns(data, s.size, 2) == (
+            [1, 2], [0.5, 1.0], [3, 6], [True, False], ['ab', 'ab'])
+        assert s.unpack_columns(data + 'xx', -s.size - 2) == (
+            [4], [2.0], [12], [False], ['ab'])
+        assert s.unpack_columns(data, 0, 0) == ([], [], [], [], [])
+        raises(self.struct.error, s.unpack_columns, data, 0, 6)
+        raises(self.struct.error, s.unpack_columns, data, len(data) + 1)
+        # a column which does not fit into ints
+        data = pack('<Q', 5) + pack('<Q', 2**64 - 1) + pack('<Q', 7)
+        assert self.struct.unpack_columns('<Q', data) == ([5, 2**64 - 1, 7],)
+
 class AppTestStructBuffer(object):
     spaceconfig = dict(usemodules=['struct', '__pypy__'])
 
@@ -45,7 +45,23 @@ class GILThreadLocals(OSThreadLocals):
 class GILReleaseAction(PeriodicAsyncAction):
     """An action called every sys.checkinterval bytecodes.  It releases
     the GIL to give some other thread a chance to run.
+
+    With the POLICY_IO handoff policy, the interval is shortened as long
+    as threads coming back from external calls are waiting for the GIL,
+    the more so the more of them are waiting.
     """
+    MAX_SHIFT = 6
 
     def perform(self, executioncontext, frame):
         rgil.yield_thread()
+        if rgil.get_policy() == rgil.POLICY_IO:
+            self.adapt_interval()
+
+    def adapt_interval(self):
+        waiting = rgil.waiting_threads(priority_only=True)
+        if waiting > 0:
+            shift = min(waiting + 2, self.MAX_SHIFT)
+            actionflag = self.space.actionflag
+            ticker = actionflag.checkinterval_scaled >> shift
+            if actionflag.get_ticker() > ticker:
+                actionflag.reset_ticker(ticker)
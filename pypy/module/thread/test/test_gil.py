@@ -29,11 +29,33 @@ class FakeSpace(object):
         raise NotImplementedError
 
 
+def test_adapt_interval(monkeypatch):
+    class ActionFlag(FakeActionFlag):
+        checkinterval_scaled = 1000
+        ticker = 1000
+        def get_ticker(self):
+            return self.ticker
+        def reset_ticker(self, value):
+            self.ticker = value
+    space = FakeSpace()
+    space.actionflag = ActionFlag()
+    action = gil.GILReleaseAction(space)
+    monkeypatch.setattr(rgil, 'waiting_threads', lambda priority_only: 0)
+    action.adapt_interval()
+    assert space.actionflag.ticker == 1000
+    monkeypatch.setattr(rgil, 'waiting_threads', lambda priority_only: 1)
+    action.adapt_interval()
+    assert space.actionflag.ticker == 1000 >> 3
+    monkeypatch.setattr(rgil, 'waiting_threads', lambda priority_only: 10)
+    action.adapt_interval()
+    assert space.actionflag.ticker == 1000 >> gil.GILReleaseAction.MAX_SHIFT
+
+
 class GILTests(test_rthread.AbstractGCTestClass):
     use_threads = True
     bigtest = False
 
-    def test_one_thread(self, skew=+1):
+    def test_one_thread(self, skew=+1, policy=rgil.POLICY_FAIR):
         from rpython.rlib.debug import debug_print
         if self.bigtest:
             N = 100000
@@ -69,6 +91,7 @@ class GILTests(test_rthread.AbstractGCTestClass):
             thread.gc_thread_die()
         my_gil_threadlocals = gil.GILThreadLocals(space)
         def f():
+            rgil.set_policy(policy)
             state.data = []
             state.datalen1 = 0
             state.datalen2 = 0
@@ -102,6 +125,7 @@ class GILTests(test_rthread.AbstractGCTestClass):
                     assert 0
             assert i1 == N + skew
             assert i2 == N - skew
+            rgil.set_policy(rgil.POLICY_FAIR)
             return len(state.data)
 
         fn = self.getcompiled(f, [])
@@ -111,6 +135,9 @@ class GILTests(test_rthread.AbstractGCTestClass):
     def test_one_thread_rev(self):
         self.test_one_thread(skew=-1)
 
+    def test_one_thread_io_policy(self):
+        self.test_one_thread(policy=rgil.POLICY_IO)
+
 
 class TestRunDirectly(GILTests):
     def getcompiled(self, f, argtypes):
@@ -21,7 +21,7 @@ decompressobj([wbits]) -- Return a decompressor object.
 
 'wbits' is window buffer size.
 Compressor objects support compress() and flush() methods; decompressor
-objects support decompress() and flush()."""
+objects support decompress(), decompress_into() and flush()."""
 
     interpleveldefs = {
         'crc32': 'interp_zlib.crc32',
@@ -5,7 +5,7 @@ from pypy.interpreter.typedef import TypeDef, interp_attrproperty
 from pypy.interpreter.error import OperationError, oefmt
 from rpython.rlib.rarithmetic import intmask, r_uint
 from rpython.rlib.objectmodel import keepalive_until_here
-from rpython.rtyper.lltypesystem import rffi
+from rpython.rtyper.lltypesystem import lltype, rffi
 
 from rpython.rlib import rzlib
 
@@ -113,10 +113,23 @@ class ZLibObject(W_Root):
     Common base class for Compress and Decompress.
     """
     stream = rzlib.null_stream
+    outbuf = rzlib.NULL_OUTBUF
 
     def __init__(self, space):
         self._lock = space.allocate_lock()
 
+    def get_outbuf(self):
+        """The output buffer reused by all the calls on this object.
+        To call with the lock held."""
+        if not self.outbuf:
+            self.outbuf = rzlib.alloc_output_buffer()
+        return self.outbuf
+
+    def free_outbuf(self):
+        if self.outbuf:
+            rzlib.free_output_buffer(self.outbuf)
+            self.outbuf = rzlib.NULL_OUTBUF
+
     def lock(self):
         """To call before using self.stream."""
         self._lock.acquire(True)
@@ -154,6 +167,7 @@ class Compress(ZLibObject):
         if self.stream:
             rzlib.deflateEnd(self.stream)
             self.stream = rzlib.null_stream
+        self.free_outbuf()
 
     @unwrap_spec(data='bufferstr')
     def compress(self, space, data):
@@ -171,7 +185,8 @@ class Compress(ZLibObject):
                 if not self.stream:
                     raise zlib_error(space,
                                      "compressor object already flushed")
-                result = rzlib.compress(self.stream, data)
+                result = rzlib.compress(self.stream, data,
+                                        outbuf=self.get_outbuf())
             finally:
                 self.unlock()
         except rzlib.RZlibError as e:
@@ -197,10 +212,12 @@ class Compress(ZLibObject):
                 if not self.stream:
                     raise zlib_error(space,
                                      "compressor object already flushed")
-                result = rzlib.compress(self.stream, '', mode)
+                result = rzlib.compress(self.stream, '', mode,
+                                        outbuf=self.get_outbuf())
                 if mode == rzlib.Z_FINISH:    # release the data structures now
                     rzlib.deflateEnd(self.stream)
                     self.stream = rzlib.null_stream
+                    self.free_outbuf()
                     self.may_unregister_rpython_finalizer(space)
             finally:
                 self.unlock()
@@ -266,6 +283,7 @@ class Decompress(ZLibObject):
         if self.stream:
             rzlib.inflateEnd(self.stream)
             self.stream = rzlib.null_stream
+        self.free_outbuf()
 
     def _save_unconsumed_input(self, data, finished, unused_len):
         unused_start = len(data) - unused_len
@@ -295,7 +313,9 @@ class Decompress(ZLibObject):
         try:
             self.lock()
             try:
-                result = rzlib.decompress(self.stream, data, max_length=max_length)
+                result = rzlib.decompress(self.stream, data,
+                                          max_length=max_length,
+                                          outbuf=self.get_outbuf())
             finally:
                 self.unlock()
         except rzlib.RZlibError as e:
@@ -305,6 +325,49 @@ class Decompress(ZLibObject):
         self._save_unconsumed_input(data, finished, unused_len)
         return space.newbytes(string)
 
+    @unwrap_spec(data='bufferstr')
+    def decompress_into(self, space, data, w_buffer):
+        """
+        decompress_into(data, buffer) -- Decompress data directly into the
+        writable buffer and return the number of bytes written.
+
+        This is like decompress(data, len(buffer)) without building a new
+        string.  Unconsumed input data will be stored in the
+        unconsumed_tail attribute.
+        """
+        rwbuffer = space.getarg_w('w*', w_buffer)
+        length = rwbuffer.getlength()
+        if length == 0:
+            raise oefmt(space.w_ValueError, "buffer must not be empty")
+
+        target_address = lltype.nullptr(rffi.CCHARP.TO)
+        try:
+            target_address = rwbuffer.get_raw_address()
+        except ValueError:
+            pass
+
+        try:
+            self.lock()
+            try:
+                if target_address:
+                    written, finished, unused_len = rzlib.decompress_into(
+                        self.stream, data, target_address, length)
+                    keepalive_until_here(rwbuffer)
+                else:
+                    # unoptimized case: the buffer has no raw address
+                    string, finished, unused_len = rzlib.decompress(
+                        self.stream, data, max_length=length,
+                        outbuf=self.get_outbuf())
+                    rwbuffer.setslice(0, string)
+                    written = len(string)
+            finally:
+                self.unlock()
+        except rzlib.RZlibError as e:
+            raise zlib_error(space, e.msg)
+
+        self._save_unconsumed_input(data, finished, unused_len)
+        return space.newint(written)
+
     def flush(self, space, w_length=None):
         """
         flush( [length] ) -- This is kept for backward compatibility,
@@ -320,7 +383,8 @@ class Decompress(ZLibObject):
         try:
             self.lock()
             try:
-                result = rzlib.decompress(self.stream, data, rzlib.Z_FINISH)
+                result = rzlib.decompress(self.stream, data, rzlib.Z_FINISH,
+                                          outbuf=self.get_outbuf())
             finally:
                 self.unlock()
         except rzlib.RZlibError:
@@ -346,6 +410,7 @@ Decompress.typedef = TypeDef(
     'Decompress',
     __new__ = interp2app(Decompress___new__),
     decompress = interp2app(Decompress.decompress),
+    decompress_into = interp2app(Decompress.decompress_into),
     flush = interp2app(Decompress.flush),
     unused_data = interp_attrproperty('unused_data', Decompress, wrapfn="newbytes"),
     unconsumed_tail = interp_attrproperty('unconsumed_tail', Decompress, wrapfn="newbytes"),
@@ -24,7 +24,7 @@ def test_unsigned_to_signed_32bit():
 
 
 class AppTestZlib(object):
-    spaceconfig = dict(usemodules=['zlib'])
+    spaceconfig = dict(usemodules=['zlib', 'array'])
 
     def setup_class(cls):
         """
@@ -232,6 +232,35 @@ class AppTestZlib(object):
             data = d.unconsumed_tail
         assert not data
 
+    def test_decompress_into(self):
+        """
+        decompress_into() fills a writable buffer, stores the input it
+        could not process in unconsumed_tail, and returns the number of
+        bytes written.
+        """
+        d = self.zlib.decompressobj()
+        buf = bytearray(10)
+        data = self.compressed
+        pieces = []
+        while True:
+            n = d.decompress_into(data, buf)
+            assert n <= 10
+            pieces.append(str(buf[:n]))
+            data = d.unconsumed_tail
+            if n < len(buf):
+                break
+        assert ''.join(pieces) == self.expanded
+
+        import array
+        d = self.zlib.decompressobj()
+        a = array.array('c', 'x' * 100)
+        n = d.decompress_into(self.compressed, a)
+        assert n == len(self.expanded)
+        assert a.tostring()[:n] == self.expanded
+        assert d.unconsumed_tail == ''
+        raises(TypeError, d.decompress_into, self.compressed, 'abc')
+        raises(ValueError, d.decompress_into, self.compressed, bytearray())
+
     def test_max_length_large(self):
         import sys
         if sys.version_info < (2, 7, 13):
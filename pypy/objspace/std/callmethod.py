@@ -98,22 +98,17 @@ def CALL_METHOD(f, oparg, *ignored):
         finally:
             f.dropvalues(n_args + 2)
     else:
-        keywords = [None] * n_kwargs
-        keywords_w = [None] * n_kwargs
-        while True:
-            n_kwargs -= 1
-            if n_kwargs < 0:
-                break
-            w_value = f.popvalue()
-            w_key = f.popvalue()
-            key = f.space.text_w(w_key)
-            keywords[n_kwargs] = key
-            keywords_w[n_kwargs] = w_value
+        keyword_call_cache = None
+        if not jit.we_are_jitted():
+            keyword_call_cache = f.getcode().get_keyword_call_cache(
+                f.last_instr)
+        keywords, keywords_w = f.popkeywords(n_kwargs, keyword_call_cache)
 
         arguments = f.popvalues(n)    # includes w_self if it is not None
         args = f.argument_factory(
                 arguments, keywords, keywords_w, None, None,
-                methodcall=w_self is not None)
+                methodcall=w_self is not None,
+                keyword_call_cache=keyword_call_cache)
         if w_self is None:
             f.popvalue_maybe_none()    # removes w_self, which is None
         w_callable = f.popvalue()
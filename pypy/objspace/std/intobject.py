@@ -277,6 +277,10 @@ def _pow_ovf2long(space, iv, iw, w_modulus):
             return _pow_small(space, r_longlong(iv), iw, r_longlong(0))
         except (OverflowError, ValueError):
             pass
+    if space.config.objspace.std.withsmalllong128:
+        from pypy.objspace.std.smalllong128object import W_SmallLong128Object
+        w_iv = W_SmallLong128Object.fromint(iv)
+        return w_iv.descr_pow(space, space.newint(iw), w_modulus)
     from pypy.objspace.std.longobject import W_LongObject
     w_iv = W_LongObject.fromint(space, iv)
     w_iw = W_LongObject.fromint(space, iw)
@@ -299,6 +303,13 @@ def _make_ovf2long(opname, ovf2small=None):
             b = r_longlong(y)
             return W_SmallLongObject(op(a, b))
 
+        if space.config.objspace.std.withsmalllong128:
+            from pypy.objspace.std.smalllong128object import (
+                W_SmallLong128Object)
+            w_x = W_SmallLong128Object.fromint(x)
+            w_y = W_SmallLong128Object.fromint(y)
+            return getattr(w_x, 'descr_' + opname)(space, w_y)
+
         from pypy.objspace.std.longobject import W_LongObject
         w_x = W_LongObject.fromint(space, x)
         w_y = W_LongObject.fromint(space, y)
@@ -531,9 +531,10 @@ class W_LongObject(W_AbstractLongObject):
 
 
 def newlong(space, bigint):
-    """Turn the bigint into a W_LongObject.  If withsmalllong is
-    enabled, check if the bigint would fit in a smalllong, and return a
-    W_SmallLongObject instead if it does.
+    """Turn the bigint into a W_LongObject.  If withsmalllong (or
+    withsmalllong128) is enabled, check if the bigint would fit in a
+    smalllong, and return a W_SmallLongObject (or W_SmallLong128Object)
+    instead if it does.
     """
     if space.config.objspace.std.withsmalllong:
         try:
@@ -543,6 +544,12 @@ def newlong(space, bigint):
         else:
             from pypy.objspace.std.smalllongobject import W_SmallLongObject
             return W_SmallLongObject(z)
+    if space.config.objspace.std.withsmalllong128:
+        from pypy.objspace.std.smalllong128object import W_SmallLong128Object
+        try:
+            return W_SmallLong128Object.frombigint(bigint)
+        except OverflowError:
+            pass
     return W_LongObject(bigint)
 
 
@@ -550,6 +557,9 @@ def newlong(space, bigint):
 def descr__new__(space, w_longtype, w_x, w_base=None):
     if space.config.objspace.std.withsmalllong:
         from pypy.objspace.std.smalllongobject import W_SmallLongObject
+    elif space.config.objspace.std.withsmalllong128:
+        from pypy.objspace.std.smalllong128object import \
+            W_SmallLong128Object as W_SmallLongObject
     else:
         W_SmallLongObject = None
 
@@ -637,6 +647,13 @@ def newbigint(space, w_longtype, bigint):
         else:
             from pypy.objspace.std.smalllongobject import W_SmallLongObject
             return W_SmallLongObject(z)
+    if (space.config.objspace.std.withsmalllong128
+        and space.is_w(w_longtype, space.w_long)):
+        from pypy.objspace.std.smalllong128object import W_SmallLong128Object
+        try:
+            return W_SmallLong128Object.frombigint(bigint)
+        except OverflowError:
+            pass
     w_obj = space.allocate_instance(W_LongObject, w_longtype)
     W_LongObject.__init__(w_obj, bigint)
     return w_obj
@@ -242,6 +242,14 @@ class StdObjSpace(ObjSpace):
                 from pypy.objspace.std.smalllongobject import \
                                                W_SmallLongObject
                 return W_SmallLongObject(rx)
+        if self.config.objspace.std.withsmalllong128:
+            from rpython.rlib.rbigint import rbigint
+            from pypy.objspace.std.smalllong128object import \
+                                           W_SmallLong128Object
+            try:
+                return W_SmallLong128Object.frombigint(rbigint.fromlong(x))
+            except OverflowError:
+                pass
         return W_LongObject.fromlong(x)
 
     @not_rpython
@@ -262,6 +270,9 @@ class StdObjSpace(ObjSpace):
                 return W_SmallLongObject(r_longlong(intval))
         intval = widen(intval)
         if not isinstance(intval, int):
+            if self.config.objspace.std.withsmalllong128:
+                from rpython.rlib.rbigint import rbigint
+                return newlong(self, rbigint.fromrarith_int(intval))
             return W_LongObject.fromrarith_int(intval)
         return wrapint(self, intval)
 
@@ -279,6 +290,10 @@ class StdObjSpace(ObjSpace):
         if self.config.objspace.std.withsmalllong:
             from pypy.objspace.std.smalllongobject import W_SmallLongObject
             return W_SmallLongObject.fromint(val)
+        if self.config.objspace.std.withsmalllong128:
+            from pypy.objspace.std.smalllong128object import \
+                                           W_SmallLong128Object
+            return W_SmallLong128Object.fromint(val)
         return W_LongObject.fromint(self, val)
 
     @specialize.argtype(1)
@@ -0,0 +1,508 @@
+"""
+Implementation of 'small' longs stored in two machine words, i.e. in
+128 bits on 64-bit platforms.  Useful for applications whose values
+briefly overflow a machine word, e.g. multiply-then-mod or hash mixing.
+
+The value is 'hi * 2**LONG_BIT + lo', with 'hi' signed and 'lo'
+unsigned.  Unlike a field of type r_longlonglong, two regular words can
+be read by the JIT and kept unboxed in virtuals.  Addition, subtraction,
+multiplication, comparison, bitwise operations and shifts are written
+with word operations only; division and modulo use the C compiler's
+128-bit integers where available.  Any result that does not fit turns
+into a W_LongObject.
+"""
+import operator
+import sys
+
+from rpython.rlib import jit
+from rpython.rlib.rarithmetic import (
+    LONG_BIT, intmask, ovfcheck, r_longlonglong, r_uint)
+from rpython.rlib.rbigint import rbigint, SHIFT, SUPPORT_INT128
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.tool.sourcetools import func_renamer, func_with_new_name
+
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import WrappedDefault, unwrap_spec
+from pypy.objspace.std.intobject import W_AbstractIntObject
+from pypy.objspace.std.longobject import W_AbstractLongObject, W_LongObject
+from pypy.objspace.std.util import COMMUTATIVE_OPS
+
+MININT = -sys.maxint - 1
+HALF_BIT = LONG_BIT // 2
+HALF_MASK = r_uint((1 << HALF_BIT) - 1)
+TOPBIT = r_uint(1) << (LONG_BIT - 1)
+MAX_DIGITS = (2 * LONG_BIT + SHIFT - 1) // SHIFT
+
+
+class W_SmallLong128Object(W_AbstractLongObject):
+
+    _immutable_fields_ = ['hi', 'lo']
+
+    def __init__(self, hi, lo):
+        assert isinstance(lo, r_uint)
+        self.hi = hi
+        self.lo = lo
+
+    @staticmethod
+    def fromint(value):
+        return W_SmallLong128Object(-1 if value < 0 else 0, r_uint(value))
+
+    @staticmethod
+    def frombigint(bigint):
+        """Raises OverflowError if 'bigint' does not fit."""
+        if bigint.numdigits() > MAX_DIGITS:
+            raise OverflowError
+        hi = bigint.rshift(LONG_BIT).toint()
+        return W_SmallLong128Object(hi, bigint.uintmask())
+
+    def fits_int(self):
+        """True if the value fits in a single machine word."""
+        return self.hi == intmask(self.lo) >> (LONG_BIT - 1)
+
+    def asbigint(self):
+        if self.fits_int():
+            return rbigint.fromint(intmask(self.lo))
+        return rbigint.fromint(self.hi).lshift(LONG_BIT).add(
+            rbigint.fromrarith_int(self.lo))
+
+    def longval(self):
+        return self.asbigint().tolong()
+
+    def __repr__(self):
+        return '<W_SmallLong128Object(%d)>' % self.longval()
+
+    def _int_w(self, space):
+        if self.fits_int():
+            return intmask(self.lo)
+        raise oefmt(space.w_OverflowError,
+                    "long int too large to convert to int")
+
+    def uint_w(self, space):
+        if self.hi < 0:
+            raise oefmt(space.w_ValueError,
+                        "cannot convert negative integer to unsigned int")
+        if self.hi == 0:
+            return self.lo
+        raise oefmt(space.w_OverflowError,
+                    "long int too large to convert to unsigned int")
+
+    def bigint_w(self, space, allow_conversion=True):
+        return self.asbigint()
+
+    def _bigint_w(self, space):
+        return self.asbigint()
+
+    def tofloat(self):
+        if self.fits_int():
+            return float(intmask(self.lo))
+        # adding the two words as floats would round twice
+        return self.asbigint().tofloat()
+
+    def _float_w(self, space):
+        return self.tofloat()
+
+    def int(self, space):
+        if self.fits_int():
+            return space.newint(intmask(self.lo))
+        return self
+
+    def descr_long(self, space):
+        if space.is_w(space.type(self), space.w_long):
+            return self
+        return W_SmallLong128Object(self.hi, self.lo)
+    descr_index = descr_trunc = descr_pos = descr_long
+
+    def descr_float(self, space):
+        return space.newfloat(self.tofloat())
+
+    def descr_hash(self, space):
+        if self.fits_int():
+            # same as the hash of ints
+            h = intmask(self.lo)
+            h -= (h == -1)
+            return space.newint(h)
+        return W_AbstractLongObject.descr_hash(self, space)
+
+    def descr_neg(self, space):
+        try:
+            return _neg(self)
+        except OverflowError:
+            self = _small2long(space, self)
+            return self.descr_neg(space)
+
+    def descr_abs(self, space):
+        return self if self.hi >= 0 else self.descr_neg(space)
+
+    def descr_nonzero(self, space):
+        return space.newbool(self.hi != 0 or self.lo != 0)
+
+    def descr_invert(self, space):
+        return W_SmallLong128Object(~self.hi, ~self.lo)
+
+    @unwrap_spec(w_modulus=WrappedDefault(None))
+    def descr_pow(self, space, w_exponent, w_modulus=None):
+        if isinstance(w_exponent, W_AbstractLongObject):
+            self = _small2long(space, self)
+            return self.descr_pow(space, w_exponent, w_modulus)
+        elif not isinstance(w_exponent, W_AbstractIntObject):
+            return space.w_NotImplemented
+
+        y = space.int_w(w_exponent)
+
+        if space.is_none(w_modulus):
+            try:
+                return _pow(space, self, y, None)
+            except ValueError:
+                self = self.descr_float(space)
+                return space.pow(self, w_exponent, space.w_None)
+            except OverflowError:
+                self = _small2long(space, self)
+                return self.descr_pow(space, w_exponent, w_modulus)
+        elif isinstance(w_modulus, W_AbstractIntObject):
+            w_modulus = w_modulus.descr_long(space)
+        elif not isinstance(w_modulus, W_AbstractLongObject):
+            return space.w_NotImplemented
+
+        if not isinstance(w_modulus, W_SmallLong128Object):
+            self = _small2long(space, self)
+            return self.descr_pow(space, w_exponent, w_modulus)
+        if w_modulus.hi == 0 and w_modulus.lo == 0:
+            raise oefmt(space.w_ValueError, "pow() 3rd argument cannot be 0")
+        try:
+            return _pow(space, self, y, w_modulus)
+        except ValueError:
+            self = self.descr_float(space)
+            return space.pow(self, w_exponent, w_modulus)
+        except OverflowError:
+            self = _small2long(space, self)
+            return self.descr_pow(space, w_exponent, w_modulus)
+
+    @unwrap_spec(w_modulus=WrappedDefault(None))
+    def descr_rpow(self, space, w_base, w_modulus=None):
+        if isinstance(w_base, W_AbstractIntObject):
+            # Defer to w_base<W_SmallLong128Object>.descr_pow
+            w_base = w_base.descr_long(space)
+        elif not isinstance(w_base, W_AbstractLongObject):
+            return space.w_NotImplemented
+        return w_base.descr_pow(space, self, w_modulus)
+
+    def _make_descr_cmp(opname):
+        op = getattr(operator, opname)
+        bigint_op = getattr(rbigint, opname)
+        @func_renamer('descr_' + opname)
+        def descr_cmp(self, space, w_other):
+            if isinstance(w_other, W_AbstractIntObject):
+                y = w_other.int_w(space)
+                result = op(_cmp(self.hi, self.lo, -1 if y < 0 else 0,
+                                 r_uint(y)), 0)
+            elif not isinstance(w_other, W_AbstractLongObject):
+                return space.w_NotImplemented
+            elif isinstance(w_other, W_SmallLong128Object):
+                result = op(_cmp(self.hi, self.lo, w_other.hi, w_other.lo), 0)
+            else:
+                result = bigint_op(self.asbigint(), w_other.asbigint())
+            return space.newbool(result)
+        return descr_cmp
+
+    descr_lt = _make_descr_cmp('lt')
+    descr_le = _make_descr_cmp('le')
+    descr_eq = _make_descr_cmp('eq')
+    descr_ne = _make_descr_cmp('ne')
+    descr_gt = _make_descr_cmp('gt')
+    descr_ge = _make_descr_cmp('ge')
+
+    def _make_descr_binop(func, ovf=True):
+        opname = func.__name__[1:]
+        descr_name, descr_rname = 'descr_' + opname, 'descr_r' + opname
+        long_op = getattr(W_LongObject, descr_name)
+
+        @func_renamer(descr_name)
+        def descr_binop(self, space, w_other):
+            if isinstance(w_other, W_AbstractIntObject):
+                w_other = w_other.descr_long(space)
+            elif not isinstance(w_other, W_AbstractLongObject):
+                return space.w_NotImplemented
+            elif not isinstance(w_other, W_SmallLong128Object):
+                self = _small2long(space, self)
+                return long_op(self, space, w_other)
+
+            if ovf:
+                try:
+                    return func(self, space, w_other)
+                except OverflowError:
+                    self = _small2long(space, self)
+                    w_other = _small2long(space, w_other)
+                    return long_op(self, space, w_other)
+            else:
+                return func(self, space, w_other)
+
+        if opname in COMMUTATIVE_OPS:
+            @func_renamer(descr_rname)
+            def descr_rbinop(self, space, w_other):
+                return descr_binop(self, space, w_other)
+            return descr_binop, descr_rbinop
+
+        long_rop = getattr(W_LongObject, descr_rname)
+        @func_renamer(descr_rname)
+        def descr_rbinop(self, space, w_other):
+            if isinstance(w_other, W_AbstractIntObject):
+                w_other = w_other.descr_long(space)
+            elif not isinstance(w_other, W_AbstractLongObject):
+                return space.w_NotImplemented
+            elif not isinstance(w_other, W_SmallLong128Object):
+                self = _small2long(space, self)
+                return long_rop(self, space, w_other)
+
+            if ovf:
+                try:
+                    return func(w_other, space, self)
+                except OverflowError:
+                    self = _small2long(space, self)
+                    w_other = _small2long(space, w_other)
+                    return long_rop(self, space, w_other)
+            else:
+                return func(w_other, space, self)
+
+        return descr_binop, descr_rbinop
+
+    def _add(self, space, w_other):
+        lo = self.lo + w_other.lo
+        carry = int(lo < self.lo)
+        hi = ovfcheck(self.hi + w_other.hi)
+        hi = ovfcheck(hi + carry)
+        return W_SmallLong128Object(hi, lo)
+    descr_add, descr_radd = _make_descr_binop(_add)
+
+    def _sub(self, space, w_other):
+        lo = self.lo - w_other.lo
+        borrow = int(self.lo < w_other.lo)
+        hi = ovfcheck(self.hi - w_other.hi)
+        hi = ovfcheck(hi - borrow)
+        return W_SmallLong128Object(hi, lo)
+    descr_sub, descr_rsub = _make_descr_binop(_sub)
+
+    def _mul(self, space, w_other):
+        return _mul(self, w_other)
+    descr_mul, descr_rmul = _make_descr_binop(_mul)
+
+    def _floordiv(self, space, w_other):
+        if w_other.hi == 0 and w_other.lo == 0:
+            raise oefmt(space.w_ZeroDivisionError, "integer division by zero")
+        if self.fits_int() and w_other.fits_int():
+            x = intmask(self.lo)
+            y = intmask(w_other.lo)
+            if y == -1 and x == MININT:
+                return _neg(self)
+            return W_SmallLong128Object.fromint(x // y)
+        return _floordiv_lllong(self, w_other)
+    descr_floordiv, descr_rfloordiv = _make_descr_binop(_floordiv)
+
+    _div = func_with_new_name(_floordiv, '_div')
+    descr_div, descr_rdiv = _make_descr_binop(_div)
+
+    def _mod(self, space, w_other):
+        if w_other.hi == 0 and w_other.lo == 0:
+            raise oefmt(space.w_ZeroDivisionError, "integer modulo by zero")
+        return _mod(self, w_other)
+    descr_mod, descr_rmod = _make_descr_binop(_mod)
+
+    def _divmod(self, space, w_other):
+        if w_other.hi == 0 and w_other.lo == 0:
+            raise oefmt(space.w_ZeroDivisionError, "integer divmod by zero")
+        w_div = W_SmallLong128Object._floordiv(self, space, w_other)
+        return space.newtuple([w_div, _mod(self, w_other)])
+    descr_divmod, descr_rdivmod = _make_descr_binop(_divmod)
+
+    def _lshift(self, space, w_other):
+        # May overflow
+        b = space.int_w(w_other)
+        if r_uint(b) < LONG_BIT: # 0 <= b < LONG_BIT
+            if b == 0:
+                return self
+            hi = intmask(self.hi << b)
+            if (hi >> b) != self.hi:
+                raise OverflowError
+            hi |= intmask(self.lo >> (LONG_BIT - b))
+            return W_SmallLong128Object(hi, self.lo << b)
+        if b < 0:
+            raise oefmt(space.w_ValueError, "negative shift count")
+        if self.hi == 0 and self.lo == 0:
+            return self
+        if b >= 2 * LONG_BIT or not self.fits_int():
+            raise OverflowError
+        # LONG_BIT <= b < 2 * LONG_BIT, and the value fits in 'lo'
+        b -= LONG_BIT
+        x = intmask(self.lo)
+        hi = intmask(x << b)
+        if (hi >> b) != x:
+            raise OverflowError
+        return W_SmallLong128Object(hi, r_uint(0))
+    descr_lshift, descr_rlshift = _make_descr_binop(_lshift)
+
+    def _rshift(self, space, w_other):
+        b = space.int_w(w_other)
+        if r_uint(b) < LONG_BIT: # 0 <= b < LONG_BIT
+            if b == 0:
+                return self
+            lo = (self.lo >> b) | (r_uint(self.hi) << (LONG_BIT - b))
+            return W_SmallLong128Object(self.hi >> b, lo)
+        if b < 0:
+            raise oefmt(space.w_ValueError, "negative shift count")
+        sign = -1 if self.hi < 0 else 0
+        if b >= 2 * LONG_BIT:
+            return W_SmallLong128Object(sign, r_uint(sign))
+        # LONG_BIT <= b < 2 * LONG_BIT
+        return W_SmallLong128Object(sign, r_uint(self.hi >> (b - LONG_BIT)))
+    descr_rshift, descr_rrshift = _make_descr_binop(_rshift, ovf=False)
+
+    def _and(self, space, w_other):
+        return W_SmallLong128Object(self.hi & w_other.hi, self.lo & w_other.lo)
+    descr_and, descr_rand = _make_descr_binop(_and, ovf=False)
+
+    def _or(self, space, w_other):
+        return W_SmallLong128Object(self.hi | w_other.hi, self.lo | w_other.lo)
+    descr_or, descr_ror = _make_descr_binop(_or, ovf=False)
+
+    def _xor(self, space, w_other):
+        return W_SmallLong128Object(self.hi ^ w_other.hi, self.lo ^ w_other.lo)
+    descr_xor, descr_rxor = _make_descr_binop(_xor, ovf=False)
+
+
+def _cmp(xhi, xlo, yhi, ylo):
+    if xhi < yhi:
+        return -1
+    if xhi > yhi:
+        return 1
+    if xlo < ylo:
+        return -1
+    return int(xlo > ylo)
+
+
+def _neg(w_x):
+    """Raises OverflowError for -2**(2*LONG_BIT-1)."""
+    if w_x.lo == 0:
+        return W_SmallLong128Object(ovfcheck(-w_x.hi), r_uint(0))
+    return W_SmallLong128Object(~w_x.hi, r_uint(0) - w_x.lo)
+
+
+def _abs_hi(w_x):
+    # high word of the absolute value, as an unsigned number
+    if w_x.hi >= 0:
+        return r_uint(w_x.hi)
+    return ~r_uint(w_x.hi) + r_uint(w_x.lo == 0)
+
+def _abs_lo(w_x):
+    # low word of the absolute value
+    if w_x.hi >= 0:
+        return w_x.lo
+    return r_uint(0) - w_x.lo
+
+
+def _umul_high(a, b):
+    """The high word of the double-word product of the r_uints a and b."""
+    ah = a >> HALF_BIT
+    al = a & HALF_MASK
+    bh = b >> HALF_BIT
+    bl = b & HALF_MASK
+    lh = al * bh
+    hl = ah * bl
+    mid = ((al * bl) >> HALF_BIT) + (lh & HALF_MASK) + (hl & HALF_MASK)
+    return ah * bh + (lh >> HALF_BIT) + (hl >> HALF_BIT) + (mid >> HALF_BIT)
+
+
+def _mul(w_x, w_y):
+    """Raises OverflowError if the product does not fit."""
+    negative = (w_x.hi < 0) != (w_y.hi < 0)
+    ahi = _abs_hi(w_x)
+    alo = _abs_lo(w_x)
+    bhi = _abs_hi(w_y)
+    blo = _abs_lo(w_y)
+    if bhi != 0:
+        if ahi != 0:
+            raise OverflowError
+        ahi, alo, bhi, blo = bhi, blo, ahi, alo
+    # (ahi * 2**LONG_BIT + alo) * blo
+    lo = alo * blo
+    hi = _umul_high(alo, blo)
+    if ahi != 0:
+        if _umul_high(ahi, blo) != 0:
+            raise OverflowError
+        t = hi + ahi * blo
+        if t < hi:
+            raise OverflowError
+        hi = t
+    if hi >= TOPBIT:
+        # only -2**(2*LONG_BIT-1) fits
+        if not (negative and hi == TOPBIT and lo == 0):
+            raise OverflowError
+    if negative:
+        if lo == 0:
+            return W_SmallLong128Object(intmask(r_uint(0) - hi), lo)
+        return W_SmallLong128Object(intmask(~hi), r_uint(0) - lo)
+    return W_SmallLong128Object(intmask(hi), lo)
+
+
+def _mod(w_x, w_y):
+    if w_x.fits_int() and w_y.fits_int():
+        x = intmask(w_x.lo)
+        y = intmask(w_y.lo)
+        if y == -1:
+            return W_SmallLong128Object(0, r_uint(0))
+        return W_SmallLong128Object.fromint(x % y)
+    return _mod_lllong(w_x, w_y)
+
+
+# The JIT does not support 128-bit integers, so they must only appear
+# in residual calls.  Without them, OverflowError makes the caller
+# fall back to rbigints.
+
+def _to_lllong(w_x):
+    return (r_longlonglong(w_x.hi) << LONG_BIT) | r_longlonglong(w_x.lo)
+
+def _from_lllong(value):
+    # the only result of // and % that does not fit is (-2**127) // -1
+    hi = rffi.cast(lltype.Signed, value >> LONG_BIT)
+    if r_longlonglong(hi) != value >> LONG_BIT:
+        raise OverflowError
+    return W_SmallLong128Object(hi, rffi.cast(lltype.Unsigned, value))
+
+@jit.dont_look_inside
+def _floordiv_lllong(w_x, w_y):
+    if not SUPPORT_INT128 or LONG_BIT != 64:
+        raise OverflowError
+    return _from_lllong(_to_lllong(w_x) // _to_lllong(w_y))
+
+@jit.dont_look_inside
+def _mod_lllong(w_x, w_y):
+    if not SUPPORT_INT128 or LONG_BIT != 64:
+        raise OverflowError
+    return _from_lllong(_to_lllong(w_x) % _to_lllong(w_y))
+
+
+def _small2long(space, w_small):
+    return W_LongObject(w_small.asbigint())
+
+
+def _pow(space, w_v, iw, w_z):
+    if iw < 0:
+        if w_z is not None:
+            raise oefmt(space.w_TypeError,
+                        "pow() 2nd argument cannot be negative when 3rd "
+                        "argument specified")
+        raise ValueError
+    w_temp = w_v
+    w_ix = W_SmallLong128Object(0, r_uint(1))
+    while iw > 0:
+        if iw & 1:
+            w_ix = _mul(w_ix, w_temp)
+        iw >>= 1   # Shift exponent down by 1 bit
+        if iw == 0:
+            break
+        w_temp = _mul(w_temp, w_temp) # Square the value of temp
+        if w_z is not None:
+            # If we did a multiplication, perform a modulo
+            w_ix = _mod(w_ix, w_z)
+            w_temp = _mod(w_temp, w_z)
+    if w_z is not None:
+        w_ix = _mod(w_ix, w_z)
+    return w_ix
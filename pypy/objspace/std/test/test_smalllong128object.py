@@ -0,0 +1,151 @@
+import py
+import sys
+from pypy.objspace.std.smalllong128object import W_SmallLong128Object
+from pypy.objspace.std.test import test_longobject
+from pypy.objspace.std.test.test_intobject import AppTestInt, TestW_IntObject
+from pypy.tool.pytest.objspace import gettestobjspace
+from pypy.interpreter.error import OperationError
+from rpython.rlib.rarithmetic import LONG_BIT, r_uint
+
+
+def test_direct():
+    space = gettestobjspace(**{"objspace.std.withsmalllong128": True})
+    w5 = space.newlong(5)
+    assert isinstance(w5, W_SmallLong128Object)
+    assert isinstance(space.wrap(r_uint(-1)), W_SmallLong128Object)
+    big = 0x123456789ABCDEF0123456789ABCDEFL
+    wlarge = space.wraplong(big)
+    assert isinstance(wlarge, W_SmallLong128Object)
+    assert not isinstance(space.wraplong(1L << (2 * LONG_BIT - 1)),
+                          W_SmallLong128Object)
+    assert isinstance(space.wraplong(-1L << (2 * LONG_BIT - 1)),
+                      W_SmallLong128Object)
+    #
+    assert space.int_w(w5) == 5
+    py.test.raises(OperationError, space.int_w, wlarge)
+    assert space.bigint_w(wlarge).tolong() == big
+    assert space.unwrap(wlarge) == big
+    #
+    assert space.pos(w5) is w5
+    assert space.abs(w5) is w5
+    wm5 = space.newlong(-5)
+    assert space.int_w(space.abs(wm5)) == 5
+    assert space.int_w(space.neg(w5)) == -5
+    assert space.is_true(w5) is True
+    assert space.is_true(wm5) is True
+    assert space.is_true(space.newlong(0)) is False
+    #
+    w_prod = space.mul(space.wrap(sys.maxint), space.wrap(sys.maxint))
+    assert space.isinstance_w(w_prod, space.w_long)
+    assert isinstance(w_prod, W_SmallLong128Object)
+    assert space.unwrap(w_prod) == sys.maxint ** 2
+    w_mod = space.mod(w_prod, space.wrap(1000003))
+    assert space.unwrap(w_mod) == sys.maxint ** 2 % 1000003
+
+    w_obj = W_SmallLong128Object.fromint(42)
+    assert space.unwrap(w_obj) == 42
+
+
+def test_arithmetic():
+    space = gettestobjspace(**{"objspace.std.withsmalllong128": True})
+    M = 1L << (2 * LONG_BIT - 1)
+    W = 1L << LONG_BIT
+    values = [0L, 1L, -1L, 7L, -7L, W - 1, W, W + 1, -W, -W - 1,
+              sys.maxint, -sys.maxint - 1, M - 1, -M, -M + 1, M // 3,
+              -(M // 3), 0x123456789ABCDEF0123L, W * 12345 + 678]
+    ops = ['add', 'sub', 'mul', 'floordiv', 'mod', 'and_', 'or_', 'xor',
+           'lt', 'le', 'eq', 'ne', 'gt', 'ge', 'divmod']
+    for x in values:
+        w_x = space.wraplong(x)
+        assert isinstance(w_x, W_SmallLong128Object)
+        assert space.unwrap(space.neg(w_x)) == -x
+        assert space.unwrap(space.invert(w_x)) == ~x
+        assert space.unwrap(space.abs(w_x)) == abs(x)
+        assert space.float_w(space.float(w_x)) == float(x)
+        assert space.int_w(space.hash(w_x)) == hash(x)
+        for b in [0, 1, 5, LONG_BIT - 1, LONG_BIT, LONG_BIT + 3,
+                  2 * LONG_BIT - 1, 2 * LONG_BIT, 300]:
+            w_b = space.wrap(b)
+            assert space.unwrap(space.lshift(w_x, w_b)) == x << b
+            assert space.unwrap(space.rshift(w_x, w_b)) == x >> b
+        for y in values + [3, -3, 1000003]:
+            w_y = space.wraplong(y) if type(y) is long else space.wrap(y)
+            for name in ops:
+                if name in ('floordiv', 'mod', 'divmod') and y == 0:
+                    continue
+                if name == 'divmod':
+                    expected = divmod(x, y)
+                else:
+                    import operator
+                    expected = getattr(operator, name)(x, y)
+                got = space.unwrap(getattr(space, name)(w_x, w_y))
+                assert got == expected, (name, x, y)
+                if isinstance(expected, bool):
+                    assert got is expected, (name, x, y)
+
+
+class AppTestSmallLong128(test_longobject.AppTestLong):
+    spaceconfig = {"objspace.std.withsmalllong128": True}
+
+    def test_sl_simple(self):
+        import __pypy__
+        s = __pypy__.internal_repr(5L)
+        assert 'SmallLong128' in s
+
+    def test_sl_hash(self):
+        import __pypy__
+        x = 5L
+        assert hash(5) == hash(x)
+        biglong = 5L
+        biglong ^= 2**200      # hack based on the fact that xor__Long_Long
+        biglong ^= 2**200      # does not call newlong()
+        assert biglong == 5L
+        assert 'SmallLong128' not in __pypy__.internal_repr(biglong)
+        assert hash(5) == hash(biglong)
+        #
+        x = 0x123456789ABCDEF0123456789ABCDEFL
+        assert 'SmallLong128' in __pypy__.internal_repr(x)
+        biglong = x
+        biglong ^= 2**200
+        biglong ^= 2**200
+        assert biglong == x
+        assert 'SmallLong128' not in __pypy__.internal_repr(biglong)
+        assert hash(biglong) == hash(x)
+
+    def test_sl_overflow(self):
+        import __pypy__, sys
+        x = sys.maxint
+        assert 'SmallLong128' in __pypy__.internal_repr(x + 1)
+        assert 'SmallLong128' in __pypy__.internal_repr(x * x)
+        assert 'SmallLong128' in __pypy__.internal_repr(-x - 2)
+        assert 'SmallLong128' in __pypy__.internal_repr(x << 3)
+        assert 'SmallLong128' in __pypy__.internal_repr(x ** 2)
+        big = (x * x) * (x * x)
+        assert big == x ** 4
+        assert 'SmallLong128' not in __pypy__.internal_repr(big)
+
+    def test_sl_mul_mod(self):
+        import sys
+        p = 2 ** 61 - 1
+        h = 1
+        expected = 1
+        for i in range(1, 100):
+            h = (h * 0x9E3779B97F4A7C15 + i) % p
+            expected = (expected * 0x9E3779B97F4A7C15L + i) % p
+        assert h == expected
+        assert int(h) == h
+        assert type(int(h)) is int
+
+    def test_sl_pow(self):
+        assert pow(3L, 80) == 3 ** 80
+        assert pow(3L, 80, 10 ** 30) == 3 ** 80 % 10 ** 30
+        assert pow(-3L, 81, -10 ** 30) == (-3) ** 81 % -10 ** 30
+        assert pow(2L, -1) == 0.5
+
+
+class TestW_IntObjectWithSmallLong128(TestW_IntObject):
+    spaceconfig = {"objspace.std.withsmalllong128": True}
+
+
+class AppTestIntWithSmallLong128(AppTestInt):
+    spaceconfig = {"objspace.std.withsmalllong128": True}
@@ -0,0 +1,97 @@
+#! /usr/bin/env python
+"""
+Usage:  opcodepairs.py [-n COUNT] file_or_directory...
+
+Compile the given Python files with the running interpreter and report
+the most frequent pairs of consecutive opcodes, together with how many
+superinstructions the compiler emitted.  Run it with a PyPy to measure
+how much of the bytecode is covered by the superinstructions of
+pypy/interpreter/astcompiler/assemble.py.
+"""
+
+import sys, os, getopt
+from opcode import opname, HAVE_ARGUMENT, EXTENDED_ARG
+
+SUPERINSTRUCTIONS = ['LOAD_FAST_LOAD_ATTR', 'LOAD_FAST_LOAD_FAST',
+                     'COMPARE_OP_POP_JUMP_IF_FALSE']
+
+
+def iter_opcodes(co):
+    code = co.co_code
+    i = 0
+    n = len(code)
+    while i < n:
+        op = ord(code[i])
+        if op >= HAVE_ARGUMENT:
+            i += 3
+        else:
+            i += 1
+        if op != EXTENDED_ARG:
+            yield op
+
+
+def count_code(co, pairs, singles):
+    prev = None
+    for op in iter_opcodes(co):
+        singles[op] = singles.get(op, 0) + 1
+        if prev is not None:
+            pairs[prev, op] = pairs.get((prev, op), 0) + 1
+        prev = op
+    for const in co.co_consts:
+        if hasattr(const, 'co_code'):
+            count_code(const, pairs, singles)
+
+
+def iter_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                for fn in sorted(filenames):
+                    if fn.endswith('.py'):
+                        yield os.path.join(dirpath, fn)
+        else:
+            yield path
+
+
+def main(argv):
+    opts, args = getopt.getopt(argv, 'n:')
+    count = 20
+    for key, value in opts:
+        if key == '-n':
+            count = int(value)
+    if not args:
+        print __doc__
+        return 2
+    pairs = {}
+    singles = {}
+    for fn in iter_files(args):
+        f = open(fn, 'rU')
+        try:
+            source = f.read()
+        finally:
+            f.close()
+        try:
+            co = compile(source, fn, 'exec')
+        except SyntaxError:
+            print >> sys.stderr, 'skipping %s: SyntaxError' % (fn,)
+            continue
+        count_code(co, pairs, singles)
+    total = sum(singles.values())
+    print 'opcodes (static count): %d' % (total,)
+    for name in SUPERINSTRUCTIONS:
+        n = 0
+        for op in singles:
+            if opname[op] == name:
+                n = singles[op]
+        print '%-30s %8d' % (name, n)
+    print
+    print 'most frequent pairs:'
+    items = sorted(pairs.items(), key=lambda item: item[1], reverse=True)
+    for (op1, op2), n in items[:count]:
+        print '%-30s %-30s %8d  %5.2f%%' % (opname[op1], opname[op2], n,
+                                            100.0 * n / max(total, 1))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
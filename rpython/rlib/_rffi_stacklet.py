@@ -43,6 +43,8 @@ def is_empty_handle(h):
 # ----- functions -----
 
 newthread = llexternal('stacklet_newthread', [], thread_handle)
+newthread_segments = llexternal('stacklet_newthread_segments',
+                                [lltype.Signed], thread_handle)
 deletethread = llexternal('stacklet_deletethread',[thread_handle], lltype.Void)
 
 new = llexternal('stacklet_new', [thread_handle, run_fn, llmemory.Address],
@@ -50,6 +52,11 @@ new = llexternal('stacklet_new', [thread_handle, run_fn, llmemory.Address],
 switch = llexternal('stacklet_switch', [handle], handle,
                     random_effects_on_gcobjs=True)
 destroy = llexternal('stacklet_destroy', [handle], lltype.Void)
+get_stack_size = llexternal('stacklet_get_stack_size', [handle], lltype.Signed)
+segment_start = llexternal('stacklet_segment_start', [thread_handle],
+                           rffi.CCHARP)
+segment_stop = llexternal('stacklet_segment_stop', [thread_handle],
+                          rffi.CCHARP)
 
 _translate_pointer = llexternal("_stacklet_translate_pointer",
                                 [llmemory.Address, llmemory.Address],
@@ -328,6 +328,16 @@ if _POSIX:
                                             [('fd', socketfd_type),
                                              ('events', rffi.SHORT),
                                              ('revents', rffi.SHORT)])
+    # 'msg_iov' really points to an array of 'struct iovec', see
+    # rposix.make_iovec()
+    CConfig.msghdr = platform.Struct('struct msghdr',
+                                     [('msg_name', rffi.VOIDP),
+                                      ('msg_namelen', rffi.UINT),
+                                      ('msg_iov', rffi.VOIDP),
+                                      ('msg_iovlen', rffi.SIZE_T),
+                                      ('msg_control', rffi.VOIDP),
+                                      ('msg_controllen', rffi.SIZE_T),
+                                      ('msg_flags', rffi.INT)])
 
     if _HAS_AF_PACKET:
         CConfig.sockaddr_ll = platform.Struct('struct sockaddr_ll',
@@ -460,6 +470,7 @@ addrinfo = cConfig.addrinfo
 if _POSIX:
     nfds_t = cConfig.nfds_t
     pollfd = cConfig.pollfd
+    msghdr = cConfig.msghdr
     if _HAS_AF_PACKET:
         sockaddr_ll = cConfig.sockaddr_ll
         ifreq = cConfig.ifreq
@@ -589,6 +600,10 @@ getprotobyname = external('getprotobyname', [rffi.CCHARP], lltype.Ptr(cConfig.pr
 
 if _POSIX:
     fcntl = external('fcntl', [socketfd_type, rffi.INT, rffi.INT], rffi.INT)
+    sendmsg = external('sendmsg', [socketfd_type, lltype.Ptr(msghdr),
+                                   rffi.INT], ssize_t, save_err=SAVE_ERR)
+    recvmsg = external('recvmsg', [socketfd_type, lltype.Ptr(msghdr),
+                                   rffi.INT], ssize_t, save_err=SAVE_ERR)
     socketpair_t = rffi.CArray(socketfd_type)
     socketpair = external('socketpair', [rffi.INT, rffi.INT, rffi.INT,
                           lltype.Ptr(socketpair_t)], rffi.INT,
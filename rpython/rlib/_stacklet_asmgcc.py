@@ -250,6 +250,7 @@ def _switch_callback():
 
 class StackletGcRootFinder(object):
     suspstack = NULL_SUSPSTACK
+    supports_segments = False
 
     def new(self, thrd, callback, arg):
         self.newthrd = thrd._thrd
@@ -318,6 +319,9 @@ class StackletGcRootFinder(object):
     def is_empty_handle(self, suspstack):
         return not suspstack
 
+    def get_stack_size(self, suspstack):
+        return _c.get_stack_size(suspstack.handle)
+
     def get_null_handle(self):
         return NULL_SUSPSTACK
 
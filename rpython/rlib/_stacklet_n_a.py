@@ -5,6 +5,8 @@ from rpython.rtyper.annlowlevel import llhelper
 
 
 class StackletGcRootFinder(object):
+    supports_segments = True
+
     @staticmethod
     @specialize.arg(1)
     def new(thrd, callback, arg):
@@ -28,6 +30,7 @@ class StackletGcRootFinder(object):
                               "stacklet_destroy() may leak")
 
     is_empty_handle = staticmethod(_c.is_empty_handle)
+    get_stack_size = staticmethod(_c.get_stack_size)
 
     @staticmethod
     def get_null_handle():
@@ -156,6 +156,7 @@ _switch._dont_inline_ = True
 
 class StackletGcRootFinder(object):
     fresh_stacklet = NULL_STACKLET
+    supports_segments = True
 
     @staticmethod
     def new(thrd, callback, arg):
@@ -178,6 +179,14 @@ class StackletGcRootFinder(object):
     def is_empty_handle(stacklet):
         return not stacklet
 
+    @staticmethod
+    def get_stack_size(stacklet):
+        # the C stack, plus the copy of the shadowstack
+        size = _c.get_stack_size(stacklet.s_handle)
+        if stacklet.s_sscopy:
+            size += stacklet.s_sscopy.signed[0]
+        return size
+
     @staticmethod
     def get_null_handle():
         return NULL_STACKLET
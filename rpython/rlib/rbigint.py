@@ -90,6 +90,21 @@ KARATSUBA_SQUARE_CUTOFF = 2 * KARATSUBA_CUTOFF
 
 FIVEARY_CUTOFF = 8
 
+# For division, use the O(N**2) school algorithm unless both the divisor
+# and the quotient contain more than BZ_DIV_CUTOFF digits.  In that case
+# use the recursive algorithm of Burnikel and Ziegler, which does its
+# work in multiplications and so takes advantage of Karatsuba.  Base
+# conversion to and from strings is done by divide-and-conquer and so
+# becomes subquadratic too.
+
+BZ_DIV_CUTOFF = 3 * KARATSUBA_CUTOFF
+
+# Strings are turned into lists of digits in base BASE_MAX[base]
+# (roughly one bigint digit each); above this many of them, they are
+# combined by divide-and-conquer instead of one by one.
+
+STR_CONV_CUTOFF = 2 * KARATSUBA_CUTOFF
+
 @specialize.argtype(0)
 def _mask_digit(x):
     return UDIGIT_MASK(x & MASK)
@@ -2069,6 +2084,8 @@ def _divrem(a, b):
     if size_b == 1:
         z, urem = _divrem1(a, b.digit(0))
         rem = rbigint([_store_digit(urem)], int(urem != 0), 1)
+    elif size_b > BZ_DIV_CUTOFF and size_a - size_b > BZ_DIV_CUTOFF:
+        z, rem = _bz_divrem(a, b)
     else:
         z, rem = _x_divrem(a, b)
     # Set the signs.
@@ -2081,6 +2098,104 @@ def _divrem(a, b):
         rem.sign = - rem.sign
     return z, rem
 
+def _bz_split(a, n):
+    """ Split the nonnegative bigint a into (a >> n digits, the lowest
+        n digits of a) """
+    size = a.numdigits()
+    if size <= n:
+        return NULLRBIGINT, a
+    assert n > 0
+    hi = rbigint(a._digits[n:size], 1, size - n)
+    lo = rbigint(a._digits[:n], 1, n)
+    lo._normalize()
+    return hi, lo
+
+def _bz_join(hi, lo, n):
+    """ The reverse of _bz_split(): hi << n digits | lo, where the
+        nonnegative lo has at most n digits """
+    if hi.sign == 0:
+        return lo
+    size_lo = lo.numdigits()
+    size_hi = hi.numdigits()
+    assert size_lo <= n
+    digits = (lo._digits[:size_lo] + [NULLDIGIT] * (n - size_lo) +
+              hi._digits[:size_hi])
+    return rbigint(digits, 1, n + size_hi)
+
+def _bz_div2n1n(a, b, n):
+    """ Divide a by b, where b has n digits and the top bit of its top
+        digit set, and a < b << n digits.  Returns (q, r). """
+    if n <= BZ_DIV_CUTOFF or a.numdigits() - n <= BZ_DIV_CUTOFF:
+        if a.lt(b):
+            return NULLRBIGINT, a
+        return _x_divrem(a, b)
+    pad = n & 1
+    if pad:
+        a = a.lshift(SHIFT)
+        b = b.lshift(SHIFT)
+        n += 1
+    half_n = n >> 1
+    b1, b2 = _bz_split(b, half_n)
+    a123, a4 = _bz_split(a, half_n)
+    a12, a3 = _bz_split(a123, half_n)
+    q1, r = _bz_div3n2n(a12, a3, b, b1, b2, half_n)
+    q2, r = _bz_div3n2n(r, a4, b, b1, b2, half_n)
+    if pad:
+        r = r.rshift(SHIFT)
+    return _bz_join(q1, q2, half_n), r
+
+def _bz_div3n2n(a12, a3, b, b1, b2, n):
+    """ Helper for _bz_div2n1n(): divide (a12 << n digits | a3) by
+        b == (b1 << n digits | b2).  The quotient fits in n digits. """
+    a1, _ = _bz_split(a12, n)
+    if a1.eq(b1):
+        q = rbigint([_store_digit(MASK)] * n, 1, n)
+        r = a12.sub(b1.lshift(n * SHIFT)).add(b1)
+    else:
+        q, r = _bz_div2n1n(a12, b1, n)
+    r = _bz_join(r, a3, n).sub(q.mul(b2))
+    # at most two corrections, because b is normalized
+    while r.sign < 0:
+        q = q.int_sub(1)
+        r = r.add(b)
+    return q, r
+
+def _bz_divrem(a, b):
+    """ Unsigned bigint division with remainder for large numbers, with
+        the algorithm of Burnikel and Ziegler ("Fast Recursive Division",
+        1998).  The sign of the arguments is ignored. """
+    size_b = b.numdigits()
+    # normalize: shift a and b left so that the top digit of b is
+    # >= PyLong_BASE/2
+    d = SHIFT - bits_in_digit(b.digit(abs(size_b - 1)))
+    a = rbigint(a._digits, 1, a.numdigits()).lshift(d)
+    b = rbigint(b._digits, 1, size_b).lshift(d)
+    n = b.numdigits()
+    size_a = a.numdigits()
+
+    # divide a block of n digits at a time, from the most significant one
+    nblocks = (size_a + n - 1) // n
+    z = rbigint([NULLDIGIT] * (nblocks * n), 1, nblocks * n)
+    r = NULLRBIGINT
+    i = nblocks - 1
+    while i >= 0:
+        start = i * n
+        stop = min(start + n, size_a)
+        block = rbigint(a._digits[start:stop], 1, stop - start)
+        block._normalize()
+        q, r = _bz_div2n1n(_bz_join(r, block, n), b, n)
+        if q.sign != 0:
+            j = 0
+            while j < q.numdigits():
+                z._digits[start + j] = q._digits[j]
+                j += 1
+        i -= 1
+    z._normalize()
+    r = r.rshift(d)
+    # the caller modifies the sign of the remainder
+    size_r = r.numdigits()
+    return z, rbigint(r._digits[:size_r], r.sign, size_r)
+
 # ______________ conversions to double _______________
 
 def _AsScaledDouble(v):
@@ -2784,7 +2899,7 @@ def _decimalstr_to_bigint(s):
     elif s[p] == '+':
         p += 1
 
-    a = rbigint()
+    parts = []
     tens = 1
     dig = 0
     ord0 = ord('0')
@@ -2792,33 +2907,62 @@ def _decimalstr_to_bigint(s):
         dig = dig * 10 + ord(s[p]) - ord0
         p += 1
         tens *= 10
-        if tens == DEC_MAX or p == lim:
-            a = _muladd1(a, tens, dig)
+        if tens == DEC_MAX and p < lim:
+            parts.append(dig)
             tens = 1
             dig = 0
+    a = _parts_to_bigint(parts, DEC_MAX, dig, tens)
     if sign and a.sign == 1:
         a.sign = -1
     return a
 
+def _parts_to_bigint_rec(parts, start, stop, partmax, powers):
+    # the value of parts[start:stop], as digits in base partmax
+    if stop - start <= STR_CONV_CUTOFF:
+        a = rbigint()
+        for i in range(start, stop):
+            a = _muladd1(a, partmax, parts[i])
+        return a
+    mid = (start + stop) // 2
+    hi = _parts_to_bigint_rec(parts, start, mid, partmax, powers)
+    lo = _parts_to_bigint_rec(parts, mid, stop, partmax, powers)
+    n = stop - mid
+    power = powers.get(n, None)
+    if power is None:
+        power = rbigint.fromint(partmax).pow(rbigint.fromint(n))
+        powers[n] = power
+    return hi.mul(power).add(lo)
+
+def _parts_to_bigint(parts, partmax, lastpart, lasttens):
+    """ Return the value of the digits 'parts' in base partmax, most
+        significant first, followed by lastpart in base lasttens.  Long
+        lists are combined by divide-and-conquer, so that the cost is
+        dominated by the multiplications of the top levels, instead of
+        being quadratic. """
+    a = _parts_to_bigint_rec(parts, 0, len(parts), partmax, {})
+    # always build a new object, the callers modify the sign
+    return _muladd1(a, lasttens, lastpart)
+
 def parse_digit_string(parser):
     # helper for fromstr
     base = parser.base
     if (base & (base - 1)) == 0:
         return parse_string_from_binary_base(parser)
-    a = rbigint()
+    parts = []
     digitmax = BASE_MAX[base]
     tens, dig = 1, 0
     while True:
         digit = parser.next_digit()
-        if tens == digitmax or digit < 0:
-            a = _muladd1(a, tens, dig)
-            if digit < 0:
-                break
+        if digit < 0:
+            break
+        if tens == digitmax:
+            parts.append(dig)
             dig = digit
             tens = base
         else:
             dig = dig * base + digit
             tens *= base
+    a = _parts_to_bigint(parts, digitmax, dig, tens)
     a.sign *= parser.sign
     return a
 
@@ -38,6 +38,46 @@ gil_fetch_fastgil = llexternal('RPyFetchFastGil', [], llmemory.Address,
                                _nowrapper=True, sandboxsafe=True,
                                compilation_info=eci)
 
+_gil_fetch_stats  = llexternal('RPyGilFetchStats', [lltype.Signed],
+                               rffi.LONGP,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
+
+_gil_enable_stats = llexternal('RPyGilEnableStats', [lltype.Signed],
+                               lltype.Void,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
+
+_gil_get_policy   = llexternal('RPyGilGetPolicy', [], lltype.Signed,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
+
+_gil_set_policy   = llexternal('RPyGilSetPolicy', [lltype.Signed], lltype.Void,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
+
+_gil_waiting      = llexternal('RPyGilWaitingThreads', [lltype.Signed],
+                               lltype.Signed,
+                               _nowrapper=True, sandboxsafe=True,
+                               compilation_info=eci)
+
+# handoff policies, see src/thread_gil.c
+POLICY_FAIR    = 0     # round-robin between all waiting threads
+POLICY_IO      = 1     # threads coming back from external calls first
+
+# layout of the array of statistics, see src/thread.h.  The ones marked
+# (*) are only updated after enable_stats(True).
+STAT_ACQUIRE   = 0     # (*) all acquisitions, apart from the JIT's fast path
+STAT_CONTENDED = 1     # acquisitions that had to wait for another thread
+STAT_YIELD     = 2     # explicit yields from yield_thread()
+STAT_WAIT_US   = 3     # total time spent waiting, in microseconds
+STAT_HOLD      = 4     # (*) number of hold periods measured
+STAT_HOLD_US   = 5     # (*) total time of these hold periods, in microseconds
+STAT_WAIT_HIST = 6     # histograms: bucket 0 is below 1 microsecond,
+HIST_SIZE      = 24    # and bucket i is between 2**(i-1) and 2**i us
+STAT_HOLD_HIST = STAT_WAIT_HIST + HIST_SIZE
+STATS_SIZE     = STAT_HOLD_HIST + HIST_SIZE
+
 # ____________________________________________________________
 
 
@@ -144,3 +184,39 @@ yield_thread._dont_inline_ = True
 # yield_thread() needs a different hint: _gctransformer_hint_close_stack_.
 # The *_external_call() functions are themselves called only from the rffi
 # module from a helper function that also has this hint.
+
+
+def get_stats(per_thread=False):
+    """Return a list of STATS_SIZE integers with the GIL statistics,
+    either global or for the current thread only.  Must be called
+    with the GIL held.
+    """
+    p = _gil_fetch_stats(int(per_thread))
+    return [rffi.cast(lltype.Signed, p[i]) for i in range(STATS_SIZE)]
+
+def reset_stats(per_thread=False):
+    p = _gil_fetch_stats(int(per_thread))
+    for i in range(STATS_SIZE):
+        p[i] = rffi.cast(rffi.LONG, 0)
+
+def enable_stats(flag):
+    """Enable or disable the statistics that need extra work every time
+    the GIL is acquired or released, i.e. STAT_ACQUIRE and the hold
+    periods.  They are disabled by default.  Must be called with the
+    GIL held.
+    """
+    _gil_enable_stats(int(flag))
+
+def get_policy():
+    return _gil_get_policy()
+
+def set_policy(policy):
+    assert policy == POLICY_FAIR or policy == POLICY_IO
+    _gil_set_policy(policy)
+
+def waiting_threads(priority_only=False):
+    """Return the approximate number of threads waiting for the GIL.
+    With 'priority_only', count only the ones that have priority
+    according to the policy in use.
+    """
+    return _gil_waiting(int(priority_only))
@@ -586,6 +586,9 @@ EVP_DigestInit = external(
 EVP_DigestUpdate = external(
     'EVP_DigestUpdate',
     [EVP_MD_CTX, rffi.CCHARP, rffi.SIZE_T], rffi.INT)
+EVP_DigestUpdate_nogil = external(      # for small requests
+    'EVP_DigestUpdate',
+    [EVP_MD_CTX, rffi.CCHARP, rffi.SIZE_T], rffi.INT, releasegil=False)
 EVP_DigestFinal = external(
     'EVP_DigestFinal',
     [EVP_MD_CTX, rffi.CCHARP, rffi.VOIDP], rffi.INT)
@@ -10,7 +10,8 @@ from rpython.rlib._os_support import (
     _CYGWIN, _MACRO_ON_POSIX, UNDERSCORE_ON_WIN32, _WIN32,
     _prefer_unicode, _preferred_traits)
 from rpython.rlib.objectmodel import (
-    specialize, enforceargs, register_replacement_for, NOT_CONSTANT)
+    specialize, enforceargs, register_replacement_for, NOT_CONSTANT,
+    keepalive_until_here)
 from rpython.rlib.rarithmetic import intmask, widen
 from rpython.rlib.signature import signature
 from rpython.tool.sourcetools import func_renamer
@@ -237,7 +238,7 @@ else:
                 'sys/resource.h',
                 'sched.h',
                 'grp.h', 'dirent.h', 'sys/stat.h', 'fcntl.h',
-                'signal.h', 'sys/utsname.h', _ptyh]
+                'signal.h', 'sys/utsname.h', 'sys/uio.h', _ptyh]
     if sys.platform.startswith('linux'):
         includes.append('sys/sysmacros.h')
     if sys.platform.startswith('freebsd') or sys.platform.startswith('openbsd'):
@@ -290,6 +291,10 @@ class CConfig:
                            ('ws_xpixel', rffi.USHORT),
                            ('ws_ypixel', rffi.USHORT)])
 
+        IOVEC = rffi_platform.Struct(
+            'struct iovec', [('iov_base', rffi.VOIDP),
+                             ('iov_len', rffi.SIZE_T)])
+
     GETPGRP_HAVE_ARG = rffi_platform.Has("getpgrp(0)")
     SETPGRP_HAVE_ARG = rffi_platform.Has("setpgrp(0, 0)")
 
@@ -497,6 +502,76 @@ if not _WIN32:
         with rffi.scoped_nonmovingbuffer(data) as buf:
             return handle_posix_error('pwrite', c_pwrite(fd, buf, count, offset))
 
+    IOVEC_ARRAY = rffi.CArray(IOVEC)
+    c_writev = external('writev',
+                        [rffi.INT, lltype.Ptr(IOVEC_ARRAY), rffi.INT],
+                        rffi.SSIZE_T, save_err=rffi.RFFI_SAVE_ERRNO)
+    c_readv = external('readv',
+                       [rffi.INT, lltype.Ptr(IOVEC_ARRAY), rffi.INT],
+                       rffi.SSIZE_T, save_err=rffi.RFFI_SAVE_ERRNO)
+
+    def make_iovec(buffers, copy_missing=False):
+        """Returns a raw-malloced array of 'struct iovec' pointing to the
+        data of the given list of rlib buffers, and a list of raw copies.
+        The buffers must all support get_raw_address(), unless
+        'copy_missing' is True: then the data of the other buffers is
+        copied to raw memory, which only works if it is not written to.
+        The caller must free both with free_iovec() and keep the buffers
+        alive until then."""
+        count = len(buffers)
+        iov = lltype.malloc(IOVEC_ARRAY, count, flavor='raw')
+        copies = []
+        try:
+            for i in range(count):
+                buf = buffers[i]
+                try:
+                    addr = buf.get_raw_address()
+                except ValueError:
+                    if not copy_missing:
+                        raise
+                    addr = rffi.str2charp(buf.as_str())
+                    copies.append(addr)
+                iov[i].c_iov_base = rffi.cast(rffi.VOIDP, addr)
+                iov[i].c_iov_len = rffi.cast(rffi.SIZE_T, buf.getlength())
+        except ValueError:
+            free_iovec(iov, copies)
+            raise
+        return iov, copies
+
+    def free_iovec(iov, copies):
+        for addr in copies:
+            rffi.free_charp(addr)
+        lltype.free(iov, flavor='raw')
+
+    @enforceargs(int, None)
+    def writev(fd, buffers):
+        """Write the data of a list of rlib buffers with a single call to
+        writev(), without joining them.  The buffers without a raw address
+        are copied first.  Returns the number of bytes written."""
+        validate_fd(fd)
+        iov, copies = make_iovec(buffers, copy_missing=True)
+        try:
+            res = handle_posix_error('writev',
+                                     c_writev(fd, iov, len(buffers)))
+        finally:
+            free_iovec(iov, copies)
+        keepalive_until_here(buffers)
+        return res
+
+    @enforceargs(int, None)
+    def readv(fd, buffers):
+        """Read into a list of writable rlib buffers, which must all
+        support get_raw_address(), filling them in order with a single
+        call to readv().  Returns the number of bytes read."""
+        validate_fd(fd)
+        iov, copies = make_iovec(buffers)
+        try:
+            res = handle_posix_error('readv', c_readv(fd, iov, len(buffers)))
+        finally:
+            free_iovec(iov, copies)
+        keepalive_until_here(buffers)
+        return res
+
     if HAVE_FALLOCATE:
         c_posix_fallocate = external('posix_fallocate',
                                      [rffi.INT, OFF_T, OFF_T], rffi.INT,
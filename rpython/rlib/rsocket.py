@@ -984,18 +984,80 @@ class RSocket(object):
         until all data is sent.  If an error occurs, it's impossible
         to tell how much data has been sent."""
         with rffi.scoped_nonmovingbuffer(data) as dataptr:
-            remaining = len(data)
-            p = dataptr
-            while remaining > 0:
-                try:
-                    res = self.send_raw(p, remaining, flags)
-                    p = rffi.ptradd(p, res)
-                    remaining -= res
-                except CSocketError as e:
-                    if e.errno != _c.EINTR:
-                        raise
-                if signal_checker is not None:
-                    signal_checker()
+            self.sendall_raw(dataptr, len(data), flags, signal_checker)
+
+    def sendall_raw(self, dataptr, length, flags=0, signal_checker=None):
+        """Send all the data from a CCHARP buffer, like sendall()."""
+        remaining = length
+        p = dataptr
+        while remaining > 0:
+            try:
+                res = self.send_raw(p, remaining, flags)
+                p = rffi.ptradd(p, res)
+                remaining -= res
+            except CSocketError as e:
+                if e.errno != _c.EINTR:
+                    raise
+            if signal_checker is not None:
+                signal_checker()
+
+    def sendmsg(self, buffers, flags=0, address=None):
+        """Send the data of a list of rlib buffers with a single sendmsg()
+        call.  The buffers without a raw address are copied first.
+        Ancillary data is not supported.  Returns the number of bytes
+        sent."""
+        self.wait_for_data(True)
+        iov, copies = rposix.make_iovec(buffers, copy_missing=True)
+        msg = lltype.malloc(_c.msghdr, flavor='raw', zero=True)
+        try:
+            msg.c_msg_iov = rffi.cast(rffi.VOIDP, iov)
+            rffi.setintfield(msg, 'c_msg_iovlen', len(buffers))
+            if address is not None:
+                msg.c_msg_name = rffi.cast(rffi.VOIDP, address.lock())
+                rffi.setintfield(msg, 'c_msg_namelen', address.addrlen)
+            res = rffi.cast(lltype.Signed, _c.sendmsg(self.fd, msg, flags))
+            if address is not None:
+                address.unlock()
+        finally:
+            lltype.free(msg, flavor='raw')
+            rposix.free_iovec(iov, copies)
+        keepalive_until_here(buffers)
+        if res < 0:
+            raise self.error_handler()
+        return res
+
+    def recvmsg_into(self, buffers, flags=0):
+        """Receive data into a list of writable rlib buffers, which must
+        all support get_raw_address(), with a single recvmsg() call.
+        Ancillary data is not supported.  Returns (nbytes, msg_flags,
+        address)."""
+        self.wait_for_data(False)
+        iov, copies = rposix.make_iovec(buffers)
+        msg = lltype.malloc(_c.msghdr, flavor='raw', zero=True)
+        address, addr_p, addrlen_p = self._addrbuf()
+        try:
+            msg.c_msg_iov = rffi.cast(rffi.VOIDP, iov)
+            rffi.setintfield(msg, 'c_msg_iovlen', len(buffers))
+            msg.c_msg_name = rffi.cast(rffi.VOIDP, addr_p)
+            rffi.setintfield(msg, 'c_msg_namelen',
+                             rffi.cast(lltype.Signed, addrlen_p[0]))
+            read_bytes = rffi.cast(lltype.Signed,
+                                   _c.recvmsg(self.fd, msg, flags))
+            addrlen = rffi.getintfield(msg, 'c_msg_namelen')
+            msg_flags = rffi.getintfield(msg, 'c_msg_flags')
+        finally:
+            lltype.free(addrlen_p, flavor='raw')
+            address.unlock()
+            lltype.free(msg, flavor='raw')
+            rposix.free_iovec(iov, copies)
+        keepalive_until_here(buffers)
+        if read_bytes >= 0:
+            if addrlen:
+                address.addrlen = addrlen
+            else:
+                address = None
+            return (read_bytes, msg_flags, address)
+        raise self.error_handler()
 
     def sendto(self, data, length, flags, address):
         """Like send(data, flags) but allows specifying the destination
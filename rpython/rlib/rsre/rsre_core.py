@@ -91,6 +91,8 @@ class AbstractMatchContext(object):
     match_marks = None
     match_marks_flat = None
     fullmatch_only = False
+    prefilter = None       # a Prefilter, if the caller computed one
+    dfa = None             # a rsre_dfa.LazyDFA, if the caller computed one
 
     def __init__(self, pattern, match_start, end, flags):
         # 'match_start' and 'end' must be known to be non-negative
@@ -135,6 +137,12 @@ class AbstractMatchContext(object):
         """Similar to str()."""
         raise NotImplementedError
 
+    @not_rpython
+    def find_literal(self, prefilter, start):
+        """Return the first index >= start where the literal of the
+        prefilter occurs before self.end, or -1.  Similar to str()."""
+        raise NotImplementedError
+
     def get_mark(self, gid):
         return find_mark(self.match_marks, gid)
 
@@ -195,9 +203,25 @@ class BufMatchContext(AbstractMatchContext):
         c = self.str(index)
         return rsre_char.getlower(c, self.flags)
 
+    def find_literal(self, prefilter, start):
+        assert start >= 0
+        literal = prefilter.literal
+        last = self.end - len(literal)
+        while start <= last:
+            i = 0
+            while i < len(literal) and self.str(start + i) == literal[i]:
+                i += 1
+            if i == len(literal):
+                return start
+            start += 1
+        return -1
+
     def fresh_copy(self, start):
-        return BufMatchContext(self.pattern, self._buffer, start,
-                               self.end, self.flags)
+        ctx = BufMatchContext(self.pattern, self._buffer, start,
+                              self.end, self.flags)
+        ctx.prefilter = self.prefilter
+        ctx.dfa = self.dfa
+        return ctx
 
 class StrMatchContext(AbstractMatchContext):
     """Concrete subclass for matching in a plain string."""
@@ -218,9 +242,18 @@ class StrMatchContext(AbstractMatchContext):
         c = self.str(index)
         return rsre_char.getlower(c, self.flags)
 
+    def find_literal(self, prefilter, start):
+        if prefilter.literal_str is None:
+            return -1
+        assert start >= 0
+        return self._string.find(prefilter.literal_str, start, self.end)
+
     def fresh_copy(self, start):
-        return StrMatchContext(self.pattern, self._string, start,
-                               self.end, self.flags)
+        ctx = StrMatchContext(self.pattern, self._string, start,
+                              self.end, self.flags)
+        ctx.prefilter = self.prefilter
+        ctx.dfa = self.dfa
+        return ctx
 
 class UnicodeMatchContext(AbstractMatchContext):
     """Concrete subclass for matching in a unicode string."""
@@ -239,9 +272,18 @@ class UnicodeMatchContext(AbstractMatchContext):
         c = self.str(index)
         return rsre_char.getlower(c, self.flags)
 
+    def find_literal(self, prefilter, start):
+        if prefilter.literal_uni is None:
+            return -1
+        assert start >= 0
+        return self._unicodestr.find(prefilter.literal_uni, start, self.end)
+
     def fresh_copy(self, start):
-        return UnicodeMatchContext(self.pattern, self._unicodestr, start,
-                                   self.end, self.flags)
+        ctx = UnicodeMatchContext(self.pattern, self._unicodestr, start,
+                                  self.end, self.flags)
+        ctx.prefilter = self.prefilter
+        ctx.dfa = self.dfa
+        return ctx
 
 # ____________________________________________________________
 
@@ -1036,10 +1078,32 @@ def _adjust(start, end, length):
     elif end > length: end = length
     return start, end
 
+class _CompiledCache(object):
+    """The prefilter and the DFA of the last pattern given to match() or
+    search(), which are usually called many times in a row with the same
+    pattern.  Callers that keep a pattern object, like _sre, compute them
+    once for it instead."""
+    pattern = None
+    flags = 0
+    prefilter = None
+    dfa = None
+
+_compiled_cache = _CompiledCache()
+
+def _get_compiled(pattern, flags):
+    cache = _compiled_cache
+    if cache.pattern is not pattern or cache.flags != flags:
+        cache.prefilter = compute_prefilter(pattern)
+        cache.dfa = rsre_dfa.compile_dfa(pattern, flags)
+        cache.pattern = pattern
+        cache.flags = flags
+    return cache
+
 def match(pattern, string, start=0, end=sys.maxint, flags=0, fullmatch=False):
     start, end = _adjust(start, end, len(string))
     ctx = StrMatchContext(pattern, string, start, end, flags)
     ctx.fullmatch_only = fullmatch
+    ctx.dfa = _get_compiled(pattern, flags).dfa
     if match_context(ctx):
         return ctx
     else:
@@ -1051,6 +1115,9 @@ def fullmatch(pattern, string, start=0, end=sys.maxint, flags=0):
 def search(pattern, string, start=0, end=sys.maxint, flags=0):
     start, end = _adjust(start, end, len(string))
     ctx = StrMatchContext(pattern, string, start, end, flags)
+    compiled = _get_compiled(pattern, flags)
+    ctx.prefilter = compiled.prefilter
+    ctx.dfa = compiled.dfa
     if search_context(ctx):
         return ctx
     else:
@@ -1064,6 +1131,16 @@ def match_context(ctx):
     ctx.original_pos = ctx.match_start
     if ctx.end < ctx.match_start:
         return False
+    if ctx.dfa is not None:
+        end = rsre_dfa.dfa_match(ctx, ctx.dfa)
+        if end == rsre_dfa.DFA_NO_MATCH:
+            return False
+        if end >= 0 and not ctx.dfa.has_marks:
+            ctx.match_end = end
+            ctx.match_marks = None
+            return True
+        # else the DFA gave up, or we need the backtracking engine to
+        # find the groups
     ctx.jitdriver_Match.jit_merge_point(ctx=ctx)
     return sre_match(ctx, 0, ctx.match_start, None) is not None
 
@@ -1071,6 +1148,17 @@ def search_context(ctx):
     ctx.original_pos = ctx.match_start
     if ctx.end < ctx.match_start:
         return False
+    if ctx.dfa is not None:
+        start = rsre_dfa.dfa_search(ctx, ctx.dfa)
+        if start == rsre_dfa.DFA_NO_MATCH:
+            return False
+        if start >= 0:
+            ctx.match_start = start
+            if not ctx.dfa.has_marks:
+                ctx.match_marks = None
+                return True
+            # the search below finds the same match, with its groups,
+            # at the first position it tries
     base = 0
     charset = False
     if ctx.pat(base) == OPCODE_INFO:
@@ -1081,6 +1169,8 @@ def search_context(ctx):
         else:
             charset = (flags & rsre_char.SRE_INFO_CHARSET)
         base += 1 + ctx.pat(1)
+    if ctx.prefilter is not None:
+        return prefilter_search(ctx, base, ctx.prefilter)
     if ctx.pat(base) == OPCODE_LITERAL:
         return literal_search(ctx, base)
     if charset:
@@ -1192,3 +1282,158 @@ def fast_search(ctx):
         string_position += 1
         if string_position >= ctx.end:
             return False
+
+# ____________________________________________________________
+#
+# Prefilter: a literal string that occurs in every match, found by
+# looking at the sequence of opcodes at the top level of the pattern.
+# A search first looks for the literal with a fast substring search,
+# and only tries to match at the positions from which the literal can
+# be reached.
+
+class Prefilter(object):
+    _immutable_fields_ = ['literal[*]', 'literal_str', 'literal_uni',
+                          'min_offset', 'max_offset']
+
+    def __init__(self, literal, min_offset, max_offset):
+        # 'literal' is a list of character codes; the literal starts
+        # between 'min_offset' and 'max_offset' characters after the
+        # start of the match ('max_offset' is -1 if unbounded)
+        self.literal = literal[:]
+        self.min_offset = min_offset
+        self.max_offset = max_offset
+        # None if some character cannot occur in a str or unicode
+        self.literal_str = None
+        self.literal_uni = None
+        maxchar = 0
+        for c in literal:
+            maxchar = max(maxchar, c)
+        if maxchar <= 255:
+            self.literal_str = ''.join([chr(c) for c in literal])
+        if maxchar <= sys.maxunicode:
+            self.literal_uni = u''.join([unichr(c) for c in literal])
+
+
+def _add_width(offset, width):
+    # 'offset' is -1 if unbounded; so is 'width'
+    if offset < 0 or width < 0:
+        return -1
+    return offset + width
+
+def compute_prefilter(pattern):
+    """Return a Prefilter for 'pattern', or None if there is no useful
+    one.  Only the opcodes at the top level are considered, so the
+    literal found is the longest run of LITERALs that every match must
+    contain.
+    """
+    ppos = 0
+    if pattern[ppos] == OPCODE_INFO:
+        ppos += 1 + pattern[ppos + 1]
+    min_offset = 0
+    max_offset = 0
+    best = []
+    best_min = best_max = 0
+    run = []
+    run_min = run_max = 0
+    while ppos < len(pattern):
+        op = pattern[ppos]
+        if op == OPCODE_LITERAL:
+            if not run:
+                run_min = min_offset
+                run_max = max_offset
+            run.append(pattern[ppos + 1])
+            min_offset += 1
+            max_offset = _add_width(max_offset, 1)
+            ppos += 2
+            continue
+        if op == OPCODE_MARK or op == OPCODE_AT:
+            ppos += 2     # zero-width: the current run goes on
+            continue
+        if len(run) > len(best):
+            best = run
+            best_min = run_min
+            best_max = run_max
+        run = []
+        if (op == OPCODE_ANY or op == OPCODE_ANY_ALL):
+            min_offset += 1
+            max_offset = _add_width(max_offset, 1)
+            ppos += 1
+        elif (op == OPCODE_NOT_LITERAL or op == OPCODE_LITERAL_IGNORE or
+              op == OPCODE_NOT_LITERAL_IGNORE):
+            min_offset += 1
+            max_offset = _add_width(max_offset, 1)
+            ppos += 2
+        elif op == OPCODE_IN or op == OPCODE_IN_IGNORE:
+            min_offset += 1
+            max_offset = _add_width(max_offset, 1)
+            ppos += 1 + pattern[ppos + 1]
+        elif op == OPCODE_REPEAT_ONE or op == OPCODE_MIN_REPEAT_ONE:
+            # <REPEAT_ONE> <skip> <1=min> <2=max> item <SUCCESS> tail
+            min_offset += pattern[ppos + 2]
+            maxcount = pattern[ppos + 3]
+            if maxcount == rsre_char.MAXREPEAT:
+                max_offset = -1
+            else:
+                max_offset = _add_width(max_offset, maxcount)
+            ppos += 1 + pattern[ppos + 1]
+        elif op == OPCODE_ASSERT or op == OPCODE_ASSERT_NOT:
+            ppos += 1 + pattern[ppos + 1]
+        elif op == OPCODE_REPEAT:
+            # <REPEAT> <skip> <1=min> <2=max> item <UNTIL> tail
+            max_offset = -1
+            ppos += 1 + pattern[ppos + 1] + 1
+        elif op == OPCODE_BRANCH:
+            # <BRANCH> <skip> alternative ... <skip> alternative ... <0>
+            max_offset = -1
+            ppos += 1
+            while pattern[ppos]:
+                ppos += pattern[ppos]
+            ppos += 1
+        elif op == OPCODE_GROUPREF or op == OPCODE_GROUPREF_IGNORE:
+            max_offset = -1
+            ppos += 2
+        else:
+            # OPCODE_SUCCESS, or something more complicated: stop here
+            break
+    if len(run) > len(best):
+        best = run
+        best_min = run_min
+        best_max = run_max
+    if not best or (len(best) == 1 and best_max == 0):
+        return None    # nothing, or done just as well by literal_search()
+    return Prefilter(best, best_min, best_max)
+
+install_jitdriver('PrefilterSearch',
+                  greens=['base', 'ctx.pattern'],
+                  reds=['start', 'last', 'ctx', 'prefilter'],
+                  debugprint=(1, 0))
+
+def prefilter_search(ctx, base, prefilter):
+    start = ctx.match_start
+    last = -1     # the last start position from which the literal found
+                  # so far can be reached
+    while start <= ctx.end:
+        ctx.jitdriver_PrefilterSearch.jit_merge_point(ctx=ctx, start=start,
+                                     last=last, base=base, prefilter=prefilter)
+        if start > last:
+            found = _find_literal(ctx, prefilter, start + prefilter.min_offset)
+            if found < 0:
+                return False
+            last = found - prefilter.min_offset
+            if prefilter.max_offset >= 0:
+                first = found - prefilter.max_offset
+                if first > start:
+                    start = first
+        if sre_match(ctx, base, start, None) is not None:
+            ctx.match_start = start
+            return True
+        start += 1
+    return False
+
+@specializectx
+def _find_literal(ctx, prefilter, start):
+    return ctx.find_literal(prefilter, start)
+
+# ____________________________________________________________
+
+from rpython.rlib.rsre import rsre_dfa    # circular import
@@ -0,0 +1,565 @@
+"""
+Lazily built DFAs for 'regular' patterns, i.e. patterns that contain no
+backreference, no lookahead or lookbehind assertion and no conditional
+group.
+
+Such a pattern is translated into a small NFA, which is then simulated
+one character at a time.  The sets of NFA states seen are cached as the
+states of a DFA, together with the transitions between them.  The time
+taken is linear in the length of the string, whatever the pattern; by
+contrast, the backtracking engine of rsre_core can take exponential time
+on patterns like '(a*)*b'.
+
+The NFA states in a DFA state are kept in priority order, and the
+lower-priority ones are dropped as soon as a higher-priority one reaches
+the end of the pattern.  This gives the same match as the backtracking
+engine ('leftmost-first'), not the longest one.
+
+A search first runs the DFA with a leading '.*?' to find where the
+leftmost match ends.  It starts at the first position from which the
+pattern can match up to there, which is found by running the DFA of
+the reversed pattern backward from the end; this DFA keeps all its NFA
+states.
+
+The DFA only finds where the match starts and ends.  If the pattern has
+groups, the backtracking engine is then run from the known start of the
+match to fill them in.  The number of cached DFA states is bounded; if
+the cache has to be flushed too often, the DFA gives up and the
+backtracking engine is used for this pattern from then on.
+"""
+import sys
+from rpython.rlib import jit
+from rpython.rlib.rsre import rsre_char
+from rpython.rlib.rsre.rsre_core import (
+    specializectx, sre_at, unroll_char_checker,
+    OPCODE_SUCCESS, OPCODE_ANY, OPCODE_ANY_ALL, OPCODE_AT, OPCODE_BRANCH,
+    OPCODE_IN, OPCODE_IN_IGNORE, OPCODE_INFO, OPCODE_JUMP, OPCODE_LITERAL,
+    OPCODE_LITERAL_IGNORE, OPCODE_MARK, OPCODE_MAX_UNTIL, OPCODE_MIN_UNTIL,
+    OPCODE_NOT_LITERAL, OPCODE_NOT_LITERAL_IGNORE, OPCODE_REPEAT,
+    OPCODE_REPEAT_ONE, OPCODE_MIN_REPEAT_ONE,
+    AT_LOC_BOUNDARY, AT_LOC_NON_BOUNDARY)
+
+
+# NFA instructions.  Each one has up to three integer arguments.
+NFA_CHAR  = 0    # arg1: the ppos of a single-character opcode in the
+                 #       pattern, or -1 for any character; arg2: next pc
+NFA_SPLIT = 1    # try arg1 first, then arg2
+NFA_AT    = 2    # arg1: the AT code; arg2: next pc
+NFA_LOOP  = 3    # end of one iteration of a repeat.  arg1: the pc where
+                 # the iteration started; arg2: where to go if the
+                 # iteration matched the empty string, or -1 to fail;
+                 # arg3: next pc otherwise
+NFA_MATCH = 4
+NFA_FAIL  = 5
+
+MAX_NFA_SIZE = 4000          # patterns that need more are not handled
+MAX_STATES = 1000            # number of DFA states kept in the cache
+MIN_STEPS_PER_FLUSH = 10 * MAX_STATES
+
+DFA_NO_MATCH = -1
+DFA_GIVE_UP = -2
+
+
+class NotRegular(Exception):
+    pass
+
+def _is_single_char(op):
+    return (op == OPCODE_ANY or op == OPCODE_ANY_ALL or
+            op == OPCODE_IN or op == OPCODE_IN_IGNORE or
+            op == OPCODE_LITERAL or op == OPCODE_LITERAL_IGNORE or
+            op == OPCODE_NOT_LITERAL or op == OPCODE_NOT_LITERAL_IGNORE)
+
+
+class NFABuilder(object):
+    """Translates the opcodes of a pattern into NFA instructions, or
+    into the ones of the reversed pattern if 'reverse' is set.  Raises
+    NotRegular if the pattern uses opcodes that a DFA cannot handle."""
+
+    def __init__(self, pattern, reverse=False):
+        self.pattern = pattern
+        self.reverse = reverse
+        self.kinds = []
+        self.args1 = []
+        self.args2 = []
+        self.args3 = []
+        self.repeats = 0        # weighted number of repeats seen
+        self.has_marks = False
+
+    def pat(self, ppos):
+        if not 0 <= ppos < len(self.pattern):
+            raise NotRegular
+        return self.pattern[ppos]
+
+    def emit(self, kind, arg1=-1, arg2=-1, arg3=-1):
+        pc = len(self.kinds)
+        if pc >= MAX_NFA_SIZE:
+            raise NotRegular
+        self.kinds.append(kind)
+        self.args1.append(arg1)
+        self.args2.append(arg2)
+        self.args3.append(arg3)
+        return pc
+
+    def build(self):
+        """Returns the entry pc for matching, and the entry pc for
+        searching (which also tries to start the match at every later
+        position, with a lower priority), or -1 for a reversed
+        pattern."""
+        base = 0
+        if self.pat(0) == OPCODE_INFO:
+            base = 1 + self.pat(1)
+        ppos = base
+        while self.pat(ppos) != OPCODE_SUCCESS:
+            ppos += self.op_width(ppos)
+        entry = self.compile_seq(base, ppos, self.emit(NFA_MATCH))
+        if self.reverse:
+            return entry, -1
+        search = self.emit(NFA_SPLIT, entry)
+        self.args2[search] = self.emit(NFA_CHAR, -1, search)
+        return entry, search
+
+    def op_width(self, ppos):
+        op = self.pat(ppos)
+        if op == OPCODE_ANY or op == OPCODE_ANY_ALL:
+            return 1
+        elif (op == OPCODE_LITERAL or op == OPCODE_LITERAL_IGNORE or
+              op == OPCODE_NOT_LITERAL or op == OPCODE_NOT_LITERAL_IGNORE or
+              op == OPCODE_AT or op == OPCODE_MARK):
+            return 2
+        elif (op == OPCODE_IN or op == OPCODE_IN_IGNORE or
+              op == OPCODE_INFO or op == OPCODE_REPEAT_ONE or
+              op == OPCODE_MIN_REPEAT_ONE):
+            return 1 + self.pat(ppos + 1)
+        elif op == OPCODE_REPEAT:
+            return 2 + self.pat(ppos + 1)    # including the UNTIL
+        elif op == OPCODE_BRANCH:
+            p = ppos + 1
+            while self.pat(p):
+                if self.pat(p) < 0:
+                    raise NotRegular
+                p += self.pat(p)
+            return p + 1 - ppos
+        else:
+            raise NotRegular
+
+    def nullable(self, ppos, stop):
+        """Can the opcodes between 'ppos' and 'stop' match the empty
+        string?"""
+        while ppos < stop:
+            op = self.pat(ppos)
+            if _is_single_char(op):
+                return False
+            elif op == OPCODE_BRANCH:
+                p = ppos + 1
+                found = False
+                while self.pat(p):
+                    skip = self.pat(p)
+                    if self.nullable(p + 1, p + skip - 2):
+                        found = True
+                    p += skip
+                if not found:
+                    return False
+            elif (op == OPCODE_REPEAT_ONE or op == OPCODE_MIN_REPEAT_ONE or
+                  op == OPCODE_REPEAT):
+                if self.pat(ppos + 2) > 0:
+                    if op == OPCODE_REPEAT:
+                        body_stop = ppos + 1 + self.pat(ppos + 1)
+                    else:
+                        body_stop = ppos + self.pat(ppos + 1)
+                    if not self.nullable(ppos + 4, body_stop):
+                        return False
+            ppos += self.op_width(ppos)
+        return True
+
+    def has_lazy_choice(self, ppos, stop):
+        """Is there, between 'ppos' and 'stop', a choice where the
+        option tried first does not consume a character, i.e. a branch
+        or a non-greedy repeat?"""
+        while ppos < stop:
+            op = self.pat(ppos)
+            if op == OPCODE_BRANCH or op == OPCODE_MIN_REPEAT_ONE:
+                return True
+            elif op == OPCODE_REPEAT:
+                untilppos = ppos + 1 + self.pat(ppos + 1)
+                if (self.pat(untilppos) == OPCODE_MIN_UNTIL or
+                        self.has_lazy_choice(ppos + 4, untilppos)):
+                    return True
+            ppos += self.op_width(ppos)
+        return False
+
+    def compile_seq(self, ppos, stop, next_pc):
+        """Compile the opcodes between 'ppos' and 'stop', continuing
+        with 'next_pc' afterwards.  Returns the first pc."""
+        starts = []
+        while ppos < stop:
+            starts.append(ppos)
+            width = self.op_width(ppos)
+            if width <= 0:
+                raise NotRegular
+            ppos += width
+        if ppos != stop:
+            raise NotRegular
+        if self.reverse:
+            for i in range(len(starts)):
+                next_pc = self.compile_op(starts[i], next_pc)
+        else:
+            i = len(starts) - 1
+            while i >= 0:
+                next_pc = self.compile_op(starts[i], next_pc)
+                i -= 1
+        return next_pc
+
+    def compile_op(self, ppos, next_pc):
+        op = self.pat(ppos)
+        if _is_single_char(op):
+            return self.emit(NFA_CHAR, ppos, next_pc)
+
+        elif op == OPCODE_AT:
+            atcode = self.pat(ppos + 1)
+            if atcode == AT_LOC_BOUNDARY or atcode == AT_LOC_NON_BOUNDARY:
+                raise NotRegular     # depends on the current locale
+            return self.emit(NFA_AT, atcode, next_pc)
+
+        elif op == OPCODE_MARK:
+            self.has_marks = True
+            return next_pc
+
+        elif op == OPCODE_INFO:
+            return next_pc
+
+        elif op == OPCODE_BRANCH:
+            # <BRANCH> <0=skip> code <JUMP> ... <NULL>
+            entries = []
+            p = ppos + 1
+            while self.pat(p):
+                skip = self.pat(p)
+                if self.pat(p + skip - 2) != OPCODE_JUMP:
+                    raise NotRegular
+                entries.append(self.compile_seq(p + 1, p + skip - 2, next_pc))
+                p += skip
+            if not entries:
+                return self.emit(NFA_FAIL)
+            pc = entries[-1]
+            i = len(entries) - 2
+            while i >= 0:
+                pc = self.emit(NFA_SPLIT, entries[i], pc)
+                i -= 1
+            return pc
+
+        elif op == OPCODE_REPEAT_ONE or op == OPCODE_MIN_REPEAT_ONE:
+            # <REPEAT_ONE> <skip> <1=min> <2=max> item <SUCCESS> tail
+            skip = self.pat(ppos + 1)
+            if (self.pat(ppos + skip) != OPCODE_SUCCESS or
+                    not _is_single_char(self.pat(ppos + 4)) or
+                    ppos + 4 + self.op_width(ppos + 4) != ppos + skip):
+                raise NotRegular
+            self.repeats += 1
+            return self.compile_repeat(ppos + 4, ppos + skip,
+                                       self.pat(ppos + 2), self.pat(ppos + 3),
+                                       op == OPCODE_REPEAT_ONE, next_pc)
+
+        elif op == OPCODE_REPEAT:
+            # <REPEAT> <skip> <1=min> <2=max> item <UNTIL> tail
+            untilppos = ppos + 1 + self.pat(ppos + 1)
+            until = self.pat(untilppos)
+            if until != OPCODE_MAX_UNTIL and until != OPCODE_MIN_UNTIL:
+                raise NotRegular
+            if (self.nullable(ppos + 4, untilppos) and
+                    self.has_lazy_choice(ppos + 4, untilppos)):
+                # which alternative comes first after an empty iteration
+                # depends on more than the NFA state, e.g. '(?:a*|.)*'
+                raise NotRegular
+            self.repeats += 2
+            return self.compile_repeat(ppos + 4, untilppos,
+                                       self.pat(ppos + 2), self.pat(ppos + 3),
+                                       until == OPCODE_MAX_UNTIL, next_pc)
+
+        else:
+            raise NotRegular
+
+    def compile_repeat(self, start, stop, min, max, greedy, next_pc):
+        if min > MAX_NFA_SIZE:
+            raise NotRegular
+        if max == rsre_char.MAXREPEAT:
+            count = -1
+        else:
+            count = max - min
+            if count < 0 or count > MAX_NFA_SIZE:
+                raise NotRegular
+        # The optional iterations.  Like rsre_core, an iteration that
+        # matches the empty string is not followed by more iterations:
+        # a greedy repeat goes on with the tail and a lazy one fails
+        # (it already tried the tail before this iteration).
+        if greedy:
+            empty_pc = next_pc
+        else:
+            empty_pc = -1
+        pc = next_pc
+        while count != 0:
+            head = self.emit(NFA_SPLIT)
+            if count < 0:
+                loop = self.emit(NFA_LOOP, head, empty_pc, head)
+            else:
+                loop = self.emit(NFA_LOOP, head, empty_pc, pc)
+            body = self.compile_seq(start, stop, loop)
+            if greedy:
+                self.args1[head] = body
+                self.args2[head] = next_pc
+            else:
+                self.args1[head] = next_pc
+                self.args2[head] = body
+            pc = head
+            if count < 0:
+                break
+            count -= 1
+        # the mandatory iterations
+        for i in range(min):
+            pc = self.compile_seq(start, stop, pc)
+        return pc
+
+
+class DFAState(object):
+    def __init__(self, kernel):
+        self.kernel = kernel        # NFA pcs, in priority order
+        self.closure = None         # the NFA_CHAR pcs reachable from them
+        self.matches = False        # whether an NFA_MATCH is reachable
+        self.contextual = False     # whether the above depend on the
+                                    # position in the string
+        self.transitions = {}       # {character: DFAState}
+
+
+class LazyDFA(object):
+    """The NFA of a regular pattern, and the cache of DFA states built
+    so far.  Not thread-safe; relies on the GIL."""
+
+    def __init__(self, builder, entry_pc, search_pc, flags):
+        self.kinds = builder.kinds
+        self.args1 = builder.args1
+        self.args2 = builder.args2
+        self.args3 = builder.args3
+        self.entry_pc = entry_pc
+        self.search_pc = search_pc
+        self.has_marks = builder.has_marks
+        self.reverse = builder.reverse
+        self.backward = None        # the LazyDFA of the reversed pattern
+        self.flags = flags
+        self.visited = [0] * len(self.kinds)
+        self.generation = 0
+        self.stack = []
+        self.states = {}
+        self.steps = 0              # steps done since the last flush
+        self.gave_up = False
+
+    def usable(self, ctx):
+        return not self.gave_up and ctx.flags == self.flags
+
+    def next_generation(self):
+        # returns a number to mark the NFA pcs visited by one closure
+        if self.generation == sys.maxint:
+            for i in range(len(self.visited)):
+                self.visited[i] = 0
+            self.generation = 0
+        self.generation += 1
+        return self.generation
+
+    def get_state(self, kernel, fullmatch):
+        key = _make_key(kernel, fullmatch)
+        state = self.states.get(key, None)
+        if state is None:
+            if len(self.states) >= MAX_STATES:
+                self.flush()
+            state = DFAState(kernel)
+            self.states[key] = state
+        return state
+
+    def flush(self):
+        if self.steps < MIN_STEPS_PER_FLUSH:
+            self.gave_up = True     # the DFA does not pay off
+        for state in self.states.values():
+            state.transitions.clear()
+        self.states = {}
+        self.steps = 0
+
+def _make_key(kernel, fullmatch):
+    chars = ['F' if fullmatch else 'M']
+    for pc in kernel:
+        chars.append(chr(pc & 0xff))
+        chars.append(chr(pc >> 8))
+    return ''.join(chars)
+
+
+@specializectx
+def _check_char(ctx, ppos, ptr):
+    op = ctx.pat(ppos)
+    for op1, checkerfn in unroll_char_checker:
+        if op1 == op:
+            return checkerfn(ctx, ptr, ppos)
+    return False
+
+@specializectx
+def _compute_closure(ctx, dfa, state, pos, fullmatch):
+    """Follow the NFA from the kernel of 'state' up to the instructions
+    that need a character, or up to the first NFA_MATCH.  A reversed
+    NFA goes on after NFA_MATCH: its lower-priority states are kept."""
+    gen = dfa.next_generation()
+    visited = dfa.visited
+    stack = dfa.stack
+    del stack[:]
+    closure = []
+    matches = False
+    contextual = False
+    for start_pc in state.kernel:
+        stack.append(start_pc)
+        while stack:
+            pc = stack.pop()
+            kind = dfa.kinds[pc]
+            if kind == NFA_LOOP:
+                # not marked as visited: it may be reached again in the
+                # same closure at the end of an empty iteration
+                if visited[dfa.args1[pc]] == gen:
+                    # the iteration matched the empty string
+                    if dfa.args2[pc] >= 0:
+                        stack.append(dfa.args2[pc])
+                else:
+                    stack.append(dfa.args3[pc])
+                continue
+            if visited[pc] == gen:
+                continue
+            visited[pc] = gen
+            if kind == NFA_CHAR:
+                closure.append(pc)
+            elif kind == NFA_SPLIT:
+                stack.append(dfa.args2[pc])
+                stack.append(dfa.args1[pc])
+            elif kind == NFA_AT:
+                contextual = True
+                if sre_at(ctx, dfa.args1[pc], pos):
+                    stack.append(dfa.args2[pc])
+            elif kind == NFA_MATCH:
+                if fullmatch:
+                    contextual = True
+                    if pos != ctx.end:
+                        continue
+                matches = True
+                if dfa.reverse:
+                    continue
+                break
+        if matches and not dfa.reverse:
+            # the remaining NFA states have a lower priority: drop them
+            del stack[:]
+            break
+    state.closure = closure
+    state.matches = matches
+    state.contextual = contextual
+
+@specializectx
+def _step(ctx, dfa, closure, pos):
+    """Returns the kernel reached by consuming the character at 'pos'."""
+    gen = dfa.next_generation()
+    visited = dfa.visited
+    kernel = []
+    for pc in closure:
+        ppos = dfa.args1[pc]
+        if ppos < 0 or _check_char(ctx, ppos, pos):
+            next_pc = dfa.args2[pc]
+            if visited[next_pc] != gen:
+                visited[next_pc] = gen
+                kernel.append(next_pc)
+    return kernel
+
+@specializectx
+def _run(ctx, dfa, start_pc, pos, stop, fullmatch):
+    """Run the DFA from 'pos' until no NFA state is left, or until 'stop'.
+    Returns the end of the match, DFA_NO_MATCH or DFA_GIVE_UP.  A
+    reversed DFA runs backward, consuming the character before 'pos',
+    and returns the smallest position from which the pattern matches up
+    to the initial 'pos'."""
+    reverse = dfa.reverse
+    state = dfa.get_state([start_pc], fullmatch)
+    result = DFA_NO_MATCH
+    while True:
+        if state.closure is None or state.contextual:
+            _compute_closure(ctx, dfa, state, pos, fullmatch)
+        if state.matches:
+            result = pos
+        if reverse:
+            if not state.closure or pos <= stop:
+                return result
+            ptr = pos - 1
+        else:
+            if not state.closure or pos >= stop:
+                return result
+            ptr = pos
+        assert ptr >= 0
+        c = ctx.str(ptr)
+        next_state = None
+        if not state.contextual:
+            next_state = state.transitions.get(c, None)
+        if next_state is None:
+            kernel = _step(ctx, dfa, state.closure, ptr)
+            next_state = dfa.get_state(kernel, fullmatch)
+            if dfa.gave_up:
+                return DFA_GIVE_UP
+            if not state.contextual:
+                state.transitions[c] = next_state
+        state = next_state
+        if reverse:
+            pos = ptr
+        else:
+            pos += 1
+        dfa.steps += 1
+
+# ____________________________________________________________
+
+def compile_dfa(pattern, flags):
+    """Return a LazyDFA for the given compiled pattern, or None if the
+    pattern is not regular, or simple enough that backtracking cannot
+    be much slower than a DFA."""
+    if flags & rsre_char.SRE_FLAG_LOCALE:
+        return None
+    builder = NFABuilder(pattern)
+    backbuilder = NFABuilder(pattern, reverse=True)
+    try:
+        entry_pc, search_pc = builder.build()
+        if builder.repeats < 2:
+            return None
+        back_entry_pc, _ = backbuilder.build()
+    except NotRegular:
+        return None
+    dfa = LazyDFA(builder, entry_pc, search_pc, flags)
+    dfa.backward = LazyDFA(backbuilder, back_entry_pc, -1, flags)
+    return dfa
+
+@jit.dont_look_inside
+@specializectx
+def dfa_match(ctx, dfa):
+    """Match at ctx.match_start.  Returns the end of the match,
+    DFA_NO_MATCH or DFA_GIVE_UP."""
+    if not dfa.usable(ctx):
+        return DFA_GIVE_UP
+    return _run(ctx, dfa, dfa.entry_pc, ctx.match_start, ctx.end,
+                ctx.fullmatch_only)
+
+@jit.dont_look_inside
+@specializectx
+def dfa_search(ctx, dfa):
+    """Search from ctx.match_start.  Returns the start of the match and
+    sets ctx.match_end, or returns DFA_NO_MATCH or DFA_GIVE_UP."""
+    if not dfa.usable(ctx):
+        return DFA_GIVE_UP
+    end = _run(ctx, dfa, dfa.search_pc, ctx.match_start, ctx.end, False)
+    if end < 0:
+        return end
+    # The match ends at 'end'.  It starts at the first position from
+    # which the pattern matches at all, and then it matches up to 'end'.
+    # So this is the first position from which the pattern can match up
+    # to 'end', found in a single backward run.
+    backward = dfa.backward
+    if not backward.usable(ctx):
+        return DFA_GIVE_UP
+    start = _run(ctx, backward, backward.entry_pc, end, ctx.match_start,
+                 False)
+    if start < 0:
+        return DFA_GIVE_UP
+    ctx.match_end = end
+    return start
@@ -0,0 +1,182 @@
+import re, py
+from rpython.rlib.rsre import rsre_core, rsre_dfa
+from rpython.rlib.rsre.test.test_match import get_code
+
+
+def get_dfa(regexp):
+    return rsre_dfa.compile_dfa(get_code(regexp), 0)
+
+def no_dfa_match(code, string, fn):
+    ctx = rsre_core.StrMatchContext(code, string, 0, len(string), 0)
+    if fn == 'fullmatch':
+        ctx.fullmatch_only = True
+    if fn == 'search':
+        found = rsre_core.search_context(ctx)
+    else:
+        found = rsre_core.match_context(ctx)
+    return found and ctx
+
+def spans(ctx, ngroups):
+    if not ctx:
+        return None
+    return [ctx.span(i) for i in range(ngroups + 1)]
+
+
+class TestDFA:
+
+    def test_not_regular(self):
+        assert get_dfa(r'(a*)*b\1') is None
+        assert get_dfa(r'(?=a*)a*b+') is None
+        assert get_dfa(r'(?<!x)a*b+') is None
+        assert get_dfa(r'(a)?(?(1)a*|b*)') is None
+
+    def test_empty_iteration(self):
+        # after an iteration that matches the empty string, rsre_core
+        # tries the tail before the other alternatives of that iteration;
+        # the DFA cannot track this for a body with a branch or a
+        # non-greedy repeat
+        assert get_dfa(r'(?:a*|.)*b') is None
+        assert get_dfa(r'(?:a*?b*)*c') is None
+        assert get_dfa(r'(?:a*b*)*c') is not None
+        assert get_dfa(r'(?:a|bc*)*d') is not None
+
+    def test_too_simple(self):
+        assert get_dfa(r'abc') is None
+        assert get_dfa(r'a[bc]d') is None
+        assert get_dfa(r'ab*c') is None
+
+    def test_regular(self):
+        dfa = get_dfa(r'(a*)*b')
+        assert dfa is not None
+        assert dfa.has_marks
+        dfa = get_dfa(r'(?:a|bc)+d*')
+        assert dfa is not None
+        assert not dfa.has_marks
+
+    def test_locale(self):
+        code = get_code(r'a*b*')
+        assert rsre_dfa.compile_dfa(code, 0) is not None
+        assert rsre_dfa.compile_dfa(code, rsre_core.rsre_char.SRE_FLAG_LOCALE
+                                    ) is None
+
+    def test_too_large(self):
+        assert get_dfa(r'(?:ab*){5000}') is None
+        assert get_dfa(r'(?:ab*){1,10}') is not None
+
+    def test_pathological(self):
+        # exponential for the backtracking engine
+        code = get_code(r'(?:a*)*b')
+        assert rsre_core.match(code, 'a' * 200) is None
+        assert rsre_core.search(code, 'a' * 200) is None
+        res = rsre_core.search(code, 'a' * 200 + 'b')
+        assert res.span() == (0, 201)
+        code = get_code(r'(x+x+)+y')
+        assert rsre_core.search(code, 'x' * 100) is None
+
+    def test_search_is_linear(self):
+        # the start of the match is found by one backward run from its
+        # end, not by matching again from every position before it
+        code = get_code(r'[a-z]*[a-z]*1')
+        dfa = rsre_dfa.compile_dfa(code, 0)
+        n = 2000
+        string = 'a' * n + '-a1'
+        ctx = rsre_core.StrMatchContext(code, string, 0, len(string), 0)
+        assert rsre_dfa.dfa_search(ctx, dfa) == n + 1
+        assert ctx.match_end == n + 3
+        assert dfa.steps + dfa.backward.steps <= 2 * len(string)
+
+    def test_reversed(self):
+        code = get_code(r'(?:ab|a)+?c*$')
+        dfa = rsre_dfa.compile_dfa(code, 0)
+        assert dfa.backward.reverse and not dfa.reverse
+        for string in ['xabac', 'ab\nac', 'aab', 'bx']:
+            ctx = rsre_core.StrMatchContext(code, string, 0, len(string), 0)
+            expected = re.search(r'(?:ab|a)+?c*$', string)
+            got = rsre_dfa.dfa_search(ctx, dfa)
+            if expected is None:
+                assert got == rsre_dfa.DFA_NO_MATCH
+            else:
+                assert (got, ctx.match_end) == expected.span()
+
+    def test_compiled_once(self):
+        code = get_code(r'(?:a|b)*c+')
+        res = rsre_core.search(code, 'xxabcc')
+        dfa = rsre_core._get_compiled(code, 0).dfa
+        assert dfa is not None
+        assert rsre_core.match(code, 'abc').span() == (0, 3)
+        assert rsre_core._get_compiled(code, 0).dfa is dfa
+        assert res.span() == (2, 6)
+
+    def test_groups(self):
+        code = get_code(r'(a|ab)(c|bcd)(d*)')
+        res = rsre_core.search(code, 'xxabcd')
+        assert res.span() == (2, 6)
+        assert res.span(1) == (2, 3)
+        assert res.span(2) == (3, 6)
+        assert res.span(3) == (6, 6)
+
+    def test_fullmatch(self):
+        code = get_code(r'(?:a|ab)(?:c|bcd)d*')
+        assert rsre_core.fullmatch(code, 'abcd').span() == (0, 4)
+        assert rsre_core.fullmatch(code, 'abcdx') is None
+        assert rsre_core.match(code, 'abcdx').span() == (0, 4)
+
+    def test_at(self):
+        code = get_code(r'\b(?:ab|a)+\b')
+        res = rsre_core.search(code, 'xab abab a')
+        assert res.span() == (4, 8)
+        code = get_code(r'(?:a|b)*c*$')
+        res = rsre_core.search(code, 'xxab\n')
+        assert res.span() == (2, 4)
+
+    def test_same_as_backtracking(self):
+        patterns = [r'(?:a|ab)*c', r'(a*)*b?', r'(?:|a)*', r'(?:a|)*',
+                    r'(?:|a)+?b', r'(?:a?){2,3}b*', r'(?:(a)|b)*?(a|b)*',
+                    r'[ab]*?b{1,2}a*',
+                    r'(?:.|\n)*?b+', r'(?i)(?:A|b)*[^c]+']
+        strings = ['', 'a', 'b', 'c', 'ab', 'ba', 'abc', 'aabbcc', 'cabab',
+                   'bbbaaa\nc', 'ABab']
+        for regexp in patterns:
+            code = get_code(regexp)
+            ngroups = re.compile(regexp).groups
+            for string in strings:
+                for fn in ['match', 'fullmatch', 'search']:
+                    expected = no_dfa_match(code, string, fn)
+                    got = getattr(rsre_core, fn)(code, string)
+                    assert spans(got, ngroups) == spans(expected, ngroups), (
+                        regexp, string, fn)
+
+    def test_lazy_repeat_of_nullable(self):
+        # the backtracking engine loops forever on this one
+        regexp = r'(?:a?)*?c'
+        code = get_code(regexp)
+        assert rsre_dfa.compile_dfa(code, 0) is not None
+        r = re.compile(regexp)
+        for string in ['a', 'ab', 'abc', 'aabbcc']:
+            for fn in ['match', 'search']:
+                expected = getattr(r, fn)(string)
+                got = getattr(rsre_core, fn)(code, string)
+                assert (got and got.span()) == (expected and expected.span())
+
+    def test_flush(self, monkeypatch):
+        monkeypatch.setattr(rsre_dfa, 'MAX_STATES', 4)
+        monkeypatch.setattr(rsre_dfa, 'MIN_STEPS_PER_FLUSH', 0)
+        code = get_code(r'(?:a|b)*?b(?:a|b){3}c')
+        dfa = rsre_dfa.compile_dfa(code, 0)
+        string = 'abaabbbaabab' * 10 + 'baaac'
+        ctx = rsre_core.StrMatchContext(code, string, 0, len(string), 0)
+        assert rsre_dfa.dfa_match(ctx, dfa) == len(string)
+        assert len(dfa.states) <= 4
+        assert not dfa.gave_up
+
+    def test_give_up(self, monkeypatch):
+        monkeypatch.setattr(rsre_dfa, 'MAX_STATES', 4)
+        code = get_code(r'(?:a|b)*?b(?:a|b){3}c')
+        dfa = rsre_dfa.compile_dfa(code, 0)
+        string = 'abaabbbaabab' * 10 + 'baaac'
+        ctx = rsre_core.StrMatchContext(code, string, 0, len(string), 0)
+        assert rsre_dfa.dfa_match(ctx, dfa) == rsre_dfa.DFA_GIVE_UP
+        assert dfa.gave_up
+        ctx.dfa = dfa
+        assert rsre_core.match_context(ctx)
+        assert ctx.match_end == len(string)
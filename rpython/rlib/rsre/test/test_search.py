@@ -209,3 +209,46 @@ class TestSearch:
                 else:
                     assert match is None
                     assert res is None
+
+    def test_prefilter(self):
+        def prefilter(regexp):
+            p = rsre_core.compute_prefilter(get_code(regexp))
+            if p is None:
+                return None
+            return p.literal_str, p.min_offset, p.max_offset
+        assert prefilter(r'.*ERROR.*timeout') == ('timeout', 5, -1)
+        assert prefilter(r'ab?cde') == ('cde', 1, 2)
+        assert prefilter(r'(\d+)-(\d+)-abc') == ('-abc', 3, -1)
+        assert prefilter(r'x(?:ab|c)yy') == ('yy', 1, -1)
+        assert prefilter(r'\bfoo\b\s') == ('foo', 0, 0)
+        assert prefilter(r'a') is None
+        assert prefilter(r'(?i)abc') is None
+        assert prefilter(r'[ab]*') is None
+        assert prefilter(r'x?(a|bc)') is None
+
+    def test_prefilter_search(self):
+        for regexp, strings in [
+                (r'.*ERROR.*timeout', ['ERROR: timeout', 'ERROR only',
+                                       'xx\nERROR, timeout\n', 'timeout']),
+                (r'ab?cde', ['xxacde', 'xxabcdeacde', 'xxcde', 'cdeabcde']),
+                (r'(\d+)-(\d+)-abc', ['12-34-ab 5-6-abc', '-abc1-2-abc']),
+                (r'x(?:ab|c)yy', ['xabyxcyy', 'yy', 'xbyy xabyy']),
+                (r'\bfoo\b\s', ['foo', 'xfoo foo ', 'foo\n']),
+                (r'[a-z]{2,3}\.py', ['ab.py', 'abcd.py', 'a.py x.pyc abc.py']),
+                ]:
+            r_code, r = get_code_and_re(regexp)
+            for s in strings:
+                for start in range(len(s) + 1):
+                    match = r.search(s, start)
+                    res = rsre_core.search(r_code, s, start)
+                    if match is None:
+                        assert res is None
+                    else:
+                        assert res is not None
+                        assert res.span() == match.span()
+                ctx = rsre_core.UnicodeMatchContext(r_code, unicode(s),
+                                                    0, len(s), 0)
+                ctx.prefilter = rsre_core.compute_prefilter(r_code)
+                assert ctx.prefilter is not None
+                assert (rsre_core.search_context(ctx) ==
+                        (r.search(s) is not None))
@@ -25,6 +25,8 @@ _stack_get_length = llexternal('LL_stack_get_length', [], lltype.Signed,
 _stack_set_length_fraction = llexternal('LL_stack_set_length_fraction',
                                         [lltype.Float], lltype.Void,
                                         lambda frac: None)
+_stack_set_end = llexternal('LL_stack_set_end', [lltype.Signed], lltype.Void,
+                            lambda end: None)
 _stack_too_big_slowpath = llexternal('LL_stack_too_big_slowpath',
                                      [lltype.Signed], lltype.Char,
                                      lambda cur: '\x00')
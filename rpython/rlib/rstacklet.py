@@ -1,21 +1,37 @@
 import sys
 from rpython.rlib import _rffi_stacklet as _c
-from rpython.rlib import jit
+from rpython.rlib import jit, rstack
 from rpython.rlib.objectmodel import fetch_translated_config
-from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.rtyper.lltypesystem import lltype, llmemory, rffi
 from rpython.rlib.rvmprof import cintf
 
 DEBUG = False
 
+# when running on a stack segment, the stack check reports an overflow
+# when less than this amount of the segment is left
+SEGMENT_MARGIN = 64 * 1024
+
 
 class StackletThread(object):
 
     @jit.dont_look_inside
-    def __init__(self, _argument_ignored_for_backward_compatibility=None):
+    def __init__(self, _argument_ignored_for_backward_compatibility=None,
+                 segment_size=0):
+        """If 'segment_size' is not zero, each stacklet runs on its own
+        stack segment of this many bytes.  Switching is then much cheaper,
+        because nothing needs to be copied, but the recursion depth inside
+        a stacklet is limited by the segment size.  This is ignored with
+        gcrootfinders that don't support it (asmgcc) and on Windows."""
         self._gcrootfinder = _getgcrootfinder(fetch_translated_config())
-        self._thrd = _c.newthread()
+        if not self._gcrootfinder.supports_segments:
+            segment_size = 0
+        if segment_size > 0:
+            self._thrd = _c.newthread_segments(segment_size)
+        else:
+            self._thrd = _c.newthread()
         if not self._thrd:
             raise MemoryError
+        self.segment_size = segment_size
         self._thrd_deleter = StackletThreadDeleter(self._thrd)
         if DEBUG:
             assert debug.sthread is None, "multithread debug support missing"
@@ -25,12 +41,20 @@ class StackletThread(object):
     def new(self, callback, arg=llmemory.NULL):
         if DEBUG:
             callback = _debug_wrapper(callback)
+        callback = _segment_wrapper(callback)
+        stack_end = 0
+        if self.segment_size > 0:
+            stack_end = rstack._stack_get_end()
+            segment_state.sthread = self
         x = cintf.save_rvmprof_stack()
         try:
             cintf.empty_rvmprof_stack()
             h = self._gcrootfinder.new(self, callback, arg)
         finally:
             cintf.restore_rvmprof_stack(x)
+            if self.segment_size > 0:
+                segment_state.sthread = None
+                rstack._stack_set_end(stack_end)
         if DEBUG:
             debug.add(h)
         return h
@@ -40,11 +64,16 @@ class StackletThread(object):
     def switch(self, stacklet):
         if DEBUG:
             debug.remove(stacklet)
+        stack_end = 0
+        if self.segment_size > 0:
+            stack_end = rstack._stack_get_end()
         x = cintf.save_rvmprof_stack()
         try:
             h = self._gcrootfinder.switch(stacklet)
         finally:
             cintf.restore_rvmprof_stack(x)
+            if self.segment_size > 0:
+                rstack._stack_set_end(stack_end)
         if DEBUG:
             debug.add(h)
         return h
@@ -57,6 +86,27 @@ class StackletThread(object):
     def get_null_handle(self):
         return self._gcrootfinder.get_null_handle()
 
+    def get_stack_size(self, stacklet):
+        """Return the number of bytes of stack kept by the suspended
+        'stacklet', or 0 for an empty handle."""
+        if self._gcrootfinder.is_empty_handle(stacklet):
+            return 0
+        return self._gcrootfinder.get_stack_size(stacklet)
+
+    def _enter_segment(self):
+        # we just started running on a fresh segment: tell the stack
+        # check about it.  If the segment is smaller than the usual stack
+        # length, pretend that its end is higher.
+        start = rffi.cast(lltype.Signed, _c.segment_start(self._thrd))
+        if start == 0:
+            return
+        stop = rffi.cast(lltype.Signed, _c.segment_stop(self._thrd))
+        end = start
+        length = rstack._stack_get_length()
+        if start - stop < length + SEGMENT_MARGIN:
+            end = stop + SEGMENT_MARGIN + length
+        rstack._stack_set_end(end)
+
     def _freeze_(self):
         raise Exception("StackletThread instances must not be seen during"
                         " translation.")
@@ -98,6 +148,22 @@ def _getgcrootfinder(config):
 _getgcrootfinder._annspecialcase_ = 'specialize:memo'
 
 
+class SegmentState(object):
+    sthread = None
+segment_state = SegmentState()
+
+def _segment_wrapper(callback):
+    def wrapper(h, arg):
+        sthread = segment_state.sthread
+        if sthread is not None:
+            segment_state.sthread = None
+            sthread._enter_segment()
+        return callback(h, arg)
+    wrapper._dont_insert_stackcheck_ = True
+    return wrapper
+_segment_wrapper._annspecialcase_ = 'specialize:memo'
+
+
 class StackletDebugError(Exception):
     pass
 
@@ -125,6 +125,12 @@ def zlib_external(*a, **kw):
 
 _crc32 = zlib_external('crc32', [uLong, Bytefp, uInt], uLong)
 _adler32 = zlib_external('adler32', [uLong, Bytefp, uInt], uLong)
+# the same, without releasing the GIL, which is not worth it for small
+# strings: see GIL_MINSIZE
+_crc32_nogil = zlib_external('crc32', [uLong, Bytefp, uInt], uLong,
+                             releasegil=False)
+_adler32_nogil = zlib_external('adler32', [uLong, Bytefp, uInt], uLong,
+                               releasegil=False)
 
 
 # XXX I want to call deflateInit2, not deflateInit2_
@@ -174,7 +180,12 @@ _zlibVersion = zlib_external('zlibVersion', [], rffi.CCHARP)
 
 # ____________________________________________________________
 
-def _crc_or_adler(string, start, function):
+# strings of at least this size are checksummed with the GIL released
+GIL_MINSIZE = 2048
+
+def _crc_or_adler(string, start, function, function_nogil):
+    if len(string) < GIL_MINSIZE:
+        function = function_nogil
     with rffi.scoped_nonmovingbuffer(string) as bytes:
         remaining = len(string)
         checksum = start
@@ -193,7 +204,7 @@ def crc32(string, start=CRC32_DEFAULT_START):
     Compute the CRC32 checksum of the string, possibly with the given
     start value, and return it as a unsigned 32 bit integer.
     """
-    return _crc_or_adler(string, start, _crc32)
+    return _crc_or_adler(string, start, _crc32, _crc32_nogil)
 
 ADLER32_DEFAULT_START = 1
 
@@ -202,7 +213,7 @@ def adler32(string, start=ADLER32_DEFAULT_START):
     Compute the Adler-32 checksum of the string, possibly with the given
     start value, and return it as a unsigned 32 bit integer.
     """
-    return _crc_or_adler(string, start, _adler32)
+    return _crc_or_adler(string, start, _adler32, _adler32_nogil)
 
 
 def deflateSetDictionary(stream, string):
@@ -259,6 +270,7 @@ class RZlibError(Exception):
     fromstream = staticmethod(fromstream)
 
 null_stream = lltype.nullptr(z_stream)
+NULL_OUTBUF = lltype.nullptr(rffi.CCHARP.TO)
 
 
 def deflateInit(level=Z_DEFAULT_COMPRESSION, method=Z_DEFLATED,
@@ -339,23 +351,24 @@ def inflateEnd(stream):
     lltype.free(stream, flavor='raw')
 
 
-def compress(stream, data, flush=Z_NO_FLUSH):
+def compress(stream, data, flush=Z_NO_FLUSH, outbuf=NULL_OUTBUF):
     """
     Feed more data into a deflate stream.  Returns a string containing
     (a part of) the compressed data.  If flush != Z_NO_FLUSH, this also
     flushes the output data; see zlib.h or the documentation of the
-    zlib module for the possible values of 'flush'.
+    zlib module for the possible values of 'flush'.  'outbuf' is an
+    optional buffer from alloc_output_buffer() to work in.
     """
     # Warning, reentrant calls to the zlib with a given stream can cause it
     # to crash.  The caller of rpython.rlib.rzlib should use locks if needed.
     data, _, avail_in = _operate(stream, data, flush, sys.maxint, _deflate,
-                                 "while compressing")
+                                 "while compressing", outbuf=outbuf)
     assert not avail_in, "not all input consumed by deflate"
     return data
 
 
 def decompress(stream, data, flush=Z_SYNC_FLUSH, max_length=sys.maxint,
-               zdict=None):
+               zdict=None, outbuf=NULL_OUTBUF):
     """
     Feed more data into an inflate stream.  Returns a tuple (string,
     finished, unused_data_length).  The string contains (a part of) the
@@ -367,6 +380,7 @@ def decompress(stream, data, flush=Z_SYNC_FLUSH, max_length=sys.maxint,
     'unused_data_length' is the number of unprocessed input characters,
     either because they are after the end of the compressed stream or
     because processing it would cause the 'max_length' to be exceeded.
+    'outbuf' is an optional buffer from alloc_output_buffer() to work in.
     """
     # Warning, reentrant calls to the zlib with a given stream can cause it
     # to crash.  The caller of rpython.rlib.rzlib should use locks if needed.
@@ -381,7 +395,7 @@ def decompress(stream, data, flush=Z_SYNC_FLUSH, max_length=sys.maxint,
         should_finish = False
     while_doing = "while decompressing data"
     data, err, avail_in = _operate(stream, data, flush, max_length, _inflate,
-                                   while_doing, zdict=zdict)
+                                   while_doing, zdict=zdict, outbuf=outbuf)
     if should_finish:
         # detect incomplete input
         rffi.setintfield(stream, 'c_avail_in', 0)
@@ -392,7 +406,71 @@ def decompress(stream, data, flush=Z_SYNC_FLUSH, max_length=sys.maxint,
     return data, finished, avail_in
 
 
-def _operate(stream, data, flush, max_length, cfunc, while_doing, zdict=None):
+def decompress_into(stream, data, outbuf, outsize, flush=Z_SYNC_FLUSH):
+    """
+    Feed more data into an inflate stream, like decompress(), but write
+    the decompressed data directly into the raw buffer 'outbuf' of
+    'outsize' bytes.  Returns a tuple (length, finished,
+    unused_data_length), where 'length' is the number of bytes written.
+    The input that is not processed because 'outbuf' is full is counted
+    in 'unused_data_length'.
+    """
+    # Warning, reentrant calls to the zlib with a given stream can cause it
+    # to crash.  The caller of rpython.rlib.rzlib should use locks if needed.
+    assert data is not None
+    written = 0
+    with rffi.scoped_nonmovingbuffer(data) as inbuf:
+        stream.c_next_in = rffi.cast(Bytefp, inbuf)
+        end_inbuf = rffi.ptradd(stream.c_next_in, len(data))
+        stream.c_next_out = rffi.cast(Bytefp, outbuf)
+
+        while True:
+            avail_in = ptrdiff(end_inbuf, stream.c_next_in)
+            if avail_in > INPUT_BUFFER_MAX:
+                avail_in = INPUT_BUFFER_MAX
+            rffi.setintfield(stream, 'c_avail_in', avail_in)
+
+            bufsize = outsize - written
+            if bufsize <= 0:
+                err = Z_OK
+                break
+            if bufsize > INPUT_BUFFER_MAX:
+                bufsize = INPUT_BUFFER_MAX
+            rffi.setintfield(stream, 'c_avail_out', bufsize)
+
+            err = _inflate(stream, flush)
+
+            avail_out = rffi.cast(lltype.Signed, stream.c_avail_out)
+            if err == Z_OK or err == Z_STREAM_END:
+                written += bufsize - avail_out
+                if avail_out > 0 or err == Z_STREAM_END:
+                    break
+                continue
+            elif err == Z_BUF_ERROR:
+                # no progress was possible: not an error
+                if avail_out == bufsize:
+                    break
+            raise RZlibError.fromstream(stream, err,
+                                        "while decompressing data")
+
+        avail_in = ptrdiff(end_inbuf, stream.c_next_in)
+    return written, err == Z_STREAM_END, avail_in
+
+
+def alloc_output_buffer():
+    """
+    Allocate a raw buffer of OUTPUT_BUFFER_SIZE bytes.  It can be passed
+    as 'outbuf' to compress() and decompress() to avoid allocating a new
+    one for every call, and must be freed with free_output_buffer().
+    """
+    return lltype.malloc(rffi.CCHARP.TO, OUTPUT_BUFFER_SIZE, flavor='raw')
+
+def free_output_buffer(outbuf):
+    lltype.free(outbuf, flavor='raw')
+
+
+def _operate(stream, data, flush, max_length, cfunc, while_doing, zdict=None,
+             outbuf=NULL_OUTBUF):
     """Common code for compress() and decompress().
     """
     # Prepare the input buffer for the stream
@@ -401,8 +479,11 @@ def _operate(stream, data, flush, max_length, cfunc, while_doing, zdict=None):
         stream.c_next_in = rffi.cast(Bytefp, inbuf)
         end_inbuf = rffi.ptradd(stream.c_next_in, len(data))
 
-        # Prepare the output buffer
-        with lltype.scoped_alloc(rffi.CCHARP.TO, OUTPUT_BUFFER_SIZE) as outbuf:
+        # Prepare the output buffer, unless the caller gave us one
+        own_outbuf = not outbuf
+        if own_outbuf:
+            outbuf = alloc_output_buffer()
+        try:
             # Strategy: we call deflate() to get as much output data as fits in
             # the buffer, then accumulate all output into a StringBuffer
             # 'result'.
@@ -455,6 +536,9 @@ def _operate(stream, data, flush, max_length, cfunc, while_doing, zdict=None):
 
                 # fallback case: report this error
                 raise RZlibError.fromstream(stream, err, while_doing)
+        finally:
+            if own_outbuf:
+                free_output_buffer(outbuf)
 
     # When decompressing, if the compressed stream of data was truncated,
     # then the zlib simply returns Z_OK and waits for more.  If it is
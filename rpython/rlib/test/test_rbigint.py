@@ -758,6 +758,66 @@ class TestInternalFunctions(object):
                 assert div.tolong() == _div
                 assert rem.tolong() == _rem
 
+    def test__bz_split_join(self):
+        x = rbigint.fromlong((1 << (SHIFT * 7)) + 12345)
+        hi, lo = lobj._bz_split(x, 3)
+        assert hi.tolong() == 1 << (SHIFT * 4)
+        assert lo.tolong() == 12345
+        assert lo.numdigits() == 1
+        assert lobj._bz_join(hi, lo, 3).eq(x)
+        hi, lo = lobj._bz_split(x, 8)
+        assert hi.sign == 0
+        assert lo is x
+        assert lobj._bz_join(hi, lo, 8) is x
+
+    def test__bz_divrem(self):
+        digs = lobj.BZ_DIV_CUTOFF + 5
+        for size_b, size_a in [(digs, 2 * digs + 1), (2 * digs, 5 * digs),
+                               (2 * digs + 1, 4 * digs - 3)]:
+            for i in range(3):
+                x = long(randint(0, 1 << (SHIFT * size_a)))
+                y = long(randint(1, 1 << (SHIFT * size_b)))
+                if i == 1:
+                    y = (1L << (SHIFT * size_b)) - 1
+                    x = y * (x >> (SHIFT * size_b)) + y - 1
+                f1 = rbigint.fromlong(x)
+                f2 = rbigint.fromlong(y)
+                div, rem = lobj._bz_divrem(f1, f2)
+                _div, _rem = divmod(x, y)
+                assert div.tolong() == _div
+                assert rem.tolong() == _rem
+
+    def test_divmod_bz(self, monkeypatch):
+        monkeypatch.setattr(lobj, 'BZ_DIV_CUTOFF', 3)
+        for i in range(20):
+            x = long(randint(0, 1 << (SHIFT * 40)))
+            y = long(randint(1, 1 << (SHIFT * randint(4, 30))))
+            for sx, sy in (1, 1), (1, -1), (-1, -1), (-1, 1):
+                sx *= x
+                sy *= y
+                f1 = rbigint.fromlong(sx)
+                f2 = rbigint.fromlong(sy)
+                div, rem = f1.divmod(f2)
+                _div, _rem = divmod(sx, sy)
+                assert div.tolong() == _div
+                assert rem.tolong() == _rem
+                assert f1.floordiv(f2).tolong() == _div
+                assert f1.mod(f2).tolong() == _rem
+
+    def test_str_conversion_divide_and_conquer(self, monkeypatch):
+        monkeypatch.setattr(lobj, 'BZ_DIV_CUTOFF', 3)
+        monkeypatch.setattr(lobj, 'STR_CONV_CUTOFF', 3)
+        for x in [7 ** 2000, -(10 ** 1000), 10 ** 1000 - 1,
+                  long(randint(0, 1 << (SHIFT * 50)))]:
+            s = str(x)
+            assert rbigint.fromlong(x).str() == s
+            assert rbigint.fromstr(s).tolong() == x
+            assert rbigint.fromdecimalstr(s).tolong() == x
+            assert rbigint.fromlong(x).format('0123456') == lobj._format(
+                rbigint.fromlong(x), '0123456')
+            assert rbigint.fromstr(rbigint.fromlong(x).format(
+                '0123456789abcdef'[:13]), 13).tolong() == x
+
     # testing Karatsuba stuff
     def test__v_iadd(self):
         f1 = bigint([lobj.MASK] * 10, 1)
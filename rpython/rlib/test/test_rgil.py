@@ -1,3 +1,4 @@
+from rpython.config.translationoption import get_combined_translation_config
 from rpython.rlib import rgil
 from rpython.translator.c.test.test_standalone import StandaloneTests
 
@@ -37,6 +38,90 @@ class BaseTestGIL(StandaloneTests):
         data = cbuilder.cmdexec('')
         assert data == "Test\n1\n2\n"
 
+    def test_stats(self):
+        def main(argv):
+            rgil.reset_stats()
+            rgil.release()
+            rgil.acquire()
+            print rgil.get_stats()[rgil.STAT_ACQUIRE]   # disabled
+            rgil.enable_stats(True)
+            rgil.release()
+            rgil.acquire()
+            rgil.enable_stats(False)
+            stats = rgil.get_stats()
+            print stats[rgil.STAT_ACQUIRE]
+            print stats[rgil.STAT_CONTENDED], stats[rgil.STAT_YIELD]
+            assert len(stats) == rgil.STATS_SIZE
+            total = 0
+            for i in range(rgil.HIST_SIZE):
+                total += stats[rgil.STAT_WAIT_HIST + i]
+            print total
+            rgil.reset_stats(per_thread=True)
+            print rgil.get_stats(per_thread=True)[rgil.STAT_ACQUIRE]
+            return 0
+
+        t, cbuilder = self.compile(main)
+        data = cbuilder.cmdexec('')
+        assert data == "0\n1\n0 0\n0\n0\n"
+
+    def test_stats_jit_release(self):
+        # The JIT releases the GIL around external calls by writing
+        # directly to rpy_fastgil.  A hold period that a thread leaves
+        # running this way must not be charged to the thread that gets
+        # the GIL next.
+        import time
+        from rpython.rlib import rthread
+        from rpython.rtyper.lltypesystem import rffi
+
+        from rpython.translator.tool.cbuild import ExternalCompilationInfo
+
+        c_usleep = rffi.llexternal('usleep', [rffi.UINT], rffi.INT,
+            compilation_info=ExternalCompilationInfo(includes=['unistd.h']),
+            _nowrapper=True, releasegil=False)
+
+        class State:
+            pass
+        state = State()
+
+        def bootstrap():
+            # we got the GIL after waiting for it, so a hold period
+            # is measured
+            rthread.gc_thread_start()
+            state.started = True
+            fastgil = rffi.cast(rffi.LONGP, rgil.gil_fetch_fastgil())
+            fastgil[0] = 0          # like the JIT
+            c_usleep(rffi.cast(rffi.UINT, 400000))   # without the GIL
+            rgil.acquire()
+            state.holds = rgil.get_stats(per_thread=True)[rgil.STAT_HOLD]
+            state.done = True
+            rthread.gc_thread_die()
+
+        def main(argv):
+            state.started = state.done = False
+            state.counter = 0
+            rgil.enable_stats(True)
+            rthread.start_new_thread(bootstrap, ())
+            for i in range(100000000):   # keep the GIL while it starts
+                state.counter = i
+            while not state.started:
+                time.sleep(0.01)
+            # the other thread is now in c_usleep()
+            rgil.reset_stats(per_thread=True)
+            rgil.release()
+            rgil.acquire()
+            print rgil.get_stats(per_thread=True)[rgil.STAT_HOLD]
+            while not state.done:
+                time.sleep(0.01)
+            print state.holds
+            return 0
+
+        self.config = get_combined_translation_config(translating=True)
+        self.config.translation.gc = 'incminimark'
+        self.config.translation.thread = True
+        t, cbuilder = self.compile(main)
+        data = cbuilder.cmdexec('')
+        assert data == "0\n0\n"
+
 
 class TestGILAsmGcc(BaseTestGIL):
     gc = 'minimark'
@@ -751,6 +751,43 @@ def test_pwrite():
         os.close(fd)
     py.test.raises(OSError, rposix.pwrite, fd, b'ea', 1)
 
+@rposix_requires('writev')
+def test_writev_readv():
+    from rpython.rlib.buffer import ByteBuffer, StringBuffer
+    fname = str(udir.join('os_test_writev.txt'))
+    fd = os.open(fname, os.O_RDWR | os.O_CREAT, 0777)
+    try:
+        buffers = [StringBuffer(b'Hello'), StringBuffer(b''),
+                   StringBuffer(b' world')]
+        assert rposix.writev(fd, buffers) == 11
+        os.lseek(fd, 0, 0)
+        buffers = [ByteBuffer(3), ByteBuffer(4), ByteBuffer(10)]
+        assert rposix.readv(fd, buffers) == 11
+        assert [buf.as_str() for buf in buffers] == [
+            b'Hel', b'lo w', b'orld' + b'\x00' * 6]
+    finally:
+        os.close(fd)
+    py.test.raises(OSError, rposix.writev, fd, [StringBuffer(b'x')])
+
+@rposix_requires('writev')
+def test_writev_without_raw_address():
+    from rpython.rlib.buffer import StringBuffer
+    class MovingBuffer(StringBuffer):
+        def get_raw_address(self):
+            raise ValueError
+    fname = str(udir.join('os_test_writev_copy.txt'))
+    fd = os.open(fname, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0777)
+    try:
+        buffers = [StringBuffer(b'Hello'), MovingBuffer(b' world'),
+                   MovingBuffer(b'')]
+        assert rposix.writev(fd, buffers) == 11
+        os.lseek(fd, 0, 0)
+        assert os.read(fd, 100) == b'Hello world'
+        # readv() needs the real buffers
+        py.test.raises(ValueError, rposix.readv, fd, [MovingBuffer(b'x')])
+    finally:
+        os.close(fd)
+
 @rposix_requires('posix_fadvise')
 def test_posix_fadvise():
     fname = str(udir.join('test_os_posix_fadvise'))
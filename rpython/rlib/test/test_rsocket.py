@@ -181,6 +181,26 @@ def test_socketpair_recvinto_2():
     s1.close()
     s2.close()
 
+def test_socketpair_sendmsg_recvmsg_into():
+    from rpython.rlib.buffer import ByteBuffer, StringBuffer
+    if sys.platform == "win32":
+        py.test.skip('No socketpair on Windows')
+    s1, s2 = socketpair()
+    class MovingBuffer(StringBuffer):
+        def get_raw_address(self):
+            raise ValueError
+    n = s1.sendmsg([StringBuffer('dupa '), MovingBuffer('was here')])
+    assert n == 13
+    buf1 = ByteBuffer(5)
+    buf2 = ByteBuffer(20)
+    n, flags, addr = s2.recvmsg_into([buf1, buf2])
+    assert n == 13
+    assert flags == 0
+    assert buf1.as_str() == 'dupa '
+    assert buf2.as_str()[:8] == 'was here'
+    s1.close()
+    s2.close()
+
 def test_socketpair_recvfrom_into_1():
     class Buffer:
         def setslice(self, start, string):
@@ -18,8 +18,8 @@ from rpython.translator.c.test.test_standalone import StandaloneTests
 class Runner:
     STATUSMAX = 5000
 
-    def init(self, seed):
-        self.sthread = rstacklet.StackletThread()
+    def init(self, seed, segment_size=0):
+        self.sthread = rstacklet.StackletThread(segment_size=segment_size)
         self.random = rrandom.Random(seed)
 
     def done(self):
@@ -56,6 +56,18 @@ class Runner:
         print 'end', h
         assert self.sthread.is_empty_handle(h)
 
+    @here_is_a_test
+    def test_stack_size(self):
+        self.status = 0
+        h = self.sthread.new(switchbackonce_callback,
+                             rffi.cast(llmemory.Address, 321))
+        assert self.sthread.get_stack_size(h) > 0
+        self.nextstatus(2)
+        h = self.sthread.switch(h)
+        self.nextstatus(4)
+        assert self.sthread.is_empty_handle(h)
+        assert self.sthread.get_stack_size(h) == 0
+
     @here_is_a_test
     def test_various_depths(self):
         self.tasks = [Task(i) for i in range(10)]
@@ -275,9 +287,12 @@ def call_qsort_rec(r):
 
 def entry_point(argv):
     seed = 0
+    segment_size = 0
     if len(argv) > 1:
         seed = int(argv[1])
-    runner.init(seed)
+    if len(argv) > 2:
+        segment_size = int(argv[2])
+    runner.init(seed, segment_size)
     for name, meth in Runner.TESTS:
         print '-----', name, '-----'
         meth(runner)
@@ -321,6 +336,15 @@ class BaseTestStacklet(StandaloneTests):
             for name, meth in Runner.TESTS:
                 assert ('----- %s -----\n' % name) in data
 
+    def test_segments(self):
+        t, cbuilder = self.compile(entry_point)
+
+        for i in range(6):
+            print 'running %s/%s with arg=%d on segments' % (
+                self.gc, self.gcrootfinder, i)
+            data = cbuilder.cmdexec('%d %d' % (i, 256 * 1024))
+            assert data.endswith("----- all done -----\n")
+
 
 class DONTTestStackletBoehm(BaseTestStacklet):
     # Boehm does not work well with stacklets, probably because the
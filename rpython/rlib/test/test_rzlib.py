@@ -6,6 +6,7 @@ Tests for the rzlib module.
 import py, sys
 from rpython.rlib import rzlib
 from rpython.rlib.rarithmetic import r_uint
+from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.rlib import clibffi # for side effect of testing lib_c_name on win32
 import zlib
 
@@ -66,6 +67,21 @@ def test_adler32_start_value():
     assert helloworldsum == rzlib.adler32(hello + world)
 
 
+def test_checksum_large_strings():
+    """
+    Strings of at least GIL_MINSIZE bytes are checksummed with the GIL
+    released; the result must be the same as when done in small pieces.
+    """
+    data = ''.join([chr(i % 251) for i in range(3 * rzlib.GIL_MINSIZE)])
+    pieces = [data[i:i + 100] for i in range(0, len(data), 100)]
+    for function, start in [(rzlib.crc32, rzlib.CRC32_DEFAULT_START),
+                            (rzlib.adler32, rzlib.ADLER32_DEFAULT_START)]:
+        checksum = start
+        for piece in pieces:
+            checksum = function(piece, checksum)
+        assert function(data) == checksum
+
+
 def test_invalidLevel():
     """
     deflateInit() should raise ValueError when an out of bounds level is
@@ -246,6 +262,50 @@ def test_decompress_max_length():
     rzlib.deflateEnd(stream)
 
 
+def test_decompress_into():
+    """
+    Test decompress_into(), writing to a raw buffer of limited size.
+    """
+    stream = rzlib.inflateInit()
+    with lltype.scoped_alloc(rffi.CCHARP.TO, 17) as outbuf:
+        length1, finished1, unused1 = rzlib.decompress_into(
+            stream, compressed, outbuf, 17)
+        assert length1 == 17
+        assert rffi.charpsize2str(outbuf, 17) == expanded[:17]
+        assert finished1 is False
+        assert unused1 > 0
+        pieces = [rffi.charpsize2str(outbuf, 17)]
+        data = compressed[-unused1:]
+        while True:
+            length, finished, unused = rzlib.decompress_into(
+                stream, data, outbuf, 17)
+            pieces.append(rffi.charpsize2str(outbuf, length))
+            if finished:
+                break
+            data = data[len(data) - unused:]
+        assert ''.join(pieces) == expanded
+        assert unused == 0
+    rzlib.inflateEnd(stream)
+
+
+def test_reuse_output_buffer():
+    outbuf = rzlib.alloc_output_buffer()
+    try:
+        stream = rzlib.deflateInit()
+        bytes = rzlib.compress(stream, expanded * 1000, outbuf=outbuf)
+        bytes += rzlib.compress(stream, "", rzlib.Z_FINISH, outbuf=outbuf)
+        rzlib.deflateEnd(stream)
+        stream = rzlib.inflateInit()
+        data, finished, unused = rzlib.decompress(stream, bytes,
+                                                  outbuf=outbuf)
+        rzlib.inflateEnd(stream)
+    finally:
+        rzlib.free_output_buffer(outbuf)
+    assert data == expanded * 1000
+    assert finished is True
+    assert unused == 0
+
+
 def test_cornercases():
     """
     Test degenerate arguments.
@@ -22,6 +22,16 @@ void LL_stack_set_length_fraction(double fraction)
 	rpy_stacktoobig.stack_length = (long)(MAX_STACK_SIZE * fraction);
 }
 
+/* Force the end of the current stack, for code that runs on stacks
+   that are not the thread's own (see stacklet_newthread_segments()) */
+void LL_stack_set_end(long end)
+{
+	char *tl;
+	OP_THREADLOCALREF_ADDR(tl);
+	((struct pypy_threadlocal_s *)tl)->stack_end = (char *)end;
+	rpy_stacktoobig.stack_end = (char *)end;
+}
+
 char LL_stack_too_big_slowpath(long current)
 {
 	long diff, max_stack_size;
@@ -32,6 +32,8 @@ RPY_EXTERN
 char LL_stack_too_big_slowpath(long);    /* returns 0 (ok) or 1 (too big) */
 RPY_EXTERN
 void LL_stack_set_length_fraction(double);
+RPY_EXTERN
+void LL_stack_set_end(long);
 
 /* some macros referenced from rpython.rlib.rstack */
 #define LL_stack_get_end() ((long)rpy_stacktoobig.stack_end)
@@ -7,6 +7,9 @@
 #include <stddef.h>
 #include <string.h>
 #include <stdio.h>
+#ifndef _WIN32
+#  include <sys/mman.h>
+#endif
 
 /************************************************************
  * platform specific code
@@ -55,14 +58,34 @@ struct stacklet_s {
     struct stacklet_s *stack_prev;
 
     stacklet_thread_handle stack_thrd;  /* the thread where the stacklet is */
+
+    /* In a thread that uses stack segments (see stacklet_newthread_segments),
+     * nothing is ever copied: 'stack_start' is the saved stack pointer,
+     * 'stack_stop' is NULL, and 'segment' is the segment of 'segment_size'
+     * bytes that the stacklet runs on, or NULL for the thread's own stack.
+     */
+    char *segment;
+    ptrdiff_t segment_size;
 };
 
+#define SEGMENT_CACHE_SIZE  16
+
 struct stacklet_thread_s {
     struct stacklet_s *g_stack_chain_head;  /* NULL <=> running main */
     char *g_current_stack_stop;
     char *g_current_stack_marker;
     struct stacklet_s *g_source;
     struct stacklet_s *g_target;
+
+    /* only for threads using stack segments */
+    ptrdiff_t g_segment_size;               /* 0 <=> copying stacks */
+    char *g_current_segment;                /* NULL <=> the thread's stack */
+    char *g_new_segment;                    /* used by stacklet_new() */
+    char *g_dead_segment;                   /* of a finished stacklet */
+    stacklet_run_fn g_run;
+    void *g_run_arg;
+    int g_segment_cache_count;
+    char *g_segment_cache[SEGMENT_CACHE_SIZE];
 };
 
 #define _check(x)  do { if (!(x)) _check_failed(#x); } while (0)
@@ -283,6 +306,175 @@ void g_initialstub(struct stacklet_thread_s *thrd,
     /* The second time it returns. */
 }
 
+/************************************************************
+ * Stack segments: instead of copying slices of the C stack around,
+ * each stacklet gets its own piece of memory to use as a C stack, and
+ * switching only saves the registers and changes the stack pointer.
+ */
+
+/* the lowest part of every segment is made inaccessible, in order to
+ * crash cleanly instead of overwriting random memory on overflow.  This
+ * size is a multiple of the page size of all supported platforms. */
+#define SEGMENT_GUARD_SIZE  (64 * 1024)
+/* free space left above the initial stack pointer of a segment */
+#define SEGMENT_HEADROOM    256
+
+#ifndef _WIN32
+static char *_segment_map(ptrdiff_t size)
+{
+    char *p;
+    int flags = MAP_PRIVATE | MAP_ANONYMOUS;
+#ifdef MAP_NORESERVE
+    flags |= MAP_NORESERVE;
+#endif
+#ifdef MAP_STACK
+    flags |= MAP_STACK;
+#endif
+    p = mmap(NULL, size, PROT_READ | PROT_WRITE, flags, -1, 0);
+    if (p == MAP_FAILED)
+        return NULL;
+    if (mprotect(p, SEGMENT_GUARD_SIZE, PROT_NONE) != 0) {
+        munmap(p, size);
+        return NULL;
+    }
+    return p;
+}
+
+static void _segment_unmap(char *segment, ptrdiff_t size)
+{
+    munmap(segment, size);
+}
+#else
+static char *_segment_map(ptrdiff_t size)
+{
+    return NULL;     /* not implemented; stacklet_newthread_segments()
+                        does not enable stack segments on Windows */
+}
+
+static void _segment_unmap(char *segment, ptrdiff_t size)
+{
+}
+#endif
+
+static char *g_alloc_segment(struct stacklet_thread_s *thrd)
+{
+    if (thrd->g_segment_cache_count > 0)
+        return thrd->g_segment_cache[--thrd->g_segment_cache_count];
+    return _segment_map(thrd->g_segment_size);
+}
+
+static void g_release_segment(struct stacklet_thread_s *thrd, char *segment)
+{
+    if (thrd->g_segment_cache_count < SEGMENT_CACHE_SIZE)
+        thrd->g_segment_cache[thrd->g_segment_cache_count++] = segment;
+    else
+        _segment_unmap(segment, thrd->g_segment_size);
+}
+
+static char *g_segment_initial_sp(struct stacklet_thread_s *thrd,
+                                  char *segment)
+{
+    char *sp = segment + thrd->g_segment_size - SEGMENT_HEADROOM;
+    return (char *)(((unsigned long)sp) & ~63UL);
+}
+
+/* Allocate and store in 'g_source' a new stacklet that records the
+ * stack pointer and segment of the current state.
+ */
+static int g_segment_allocate_source(void *old_stack_pointer,
+                                     struct stacklet_thread_s *thrd)
+{
+    struct stacklet_s *stacklet = malloc(sizeof(struct stacklet_s));
+    thrd->g_source = stacklet;
+    if (stacklet == NULL)
+        return -1;
+    stacklet->stack_start = old_stack_pointer;
+    stacklet->stack_stop  = NULL;
+    stacklet->stack_saved = 0;
+    stacklet->stack_prev  = NULL;
+    stacklet->stack_thrd  = thrd;
+    stacklet->segment = thrd->g_current_segment;
+    stacklet->segment_size = thrd->g_segment_size;
+    return 0;
+}
+
+static void *g_segment_save_state(void *old_stack_pointer, void *rawthrd)
+{
+    struct stacklet_thread_s *thrd = (struct stacklet_thread_s *)rawthrd;
+    if (g_segment_allocate_source(old_stack_pointer, thrd) < 0)
+        return NULL;
+    return thrd->g_target->stack_start;
+}
+
+static void *g_segment_destroy_state(void *old_stack_pointer, void *rawthrd)
+{
+    struct stacklet_thread_s *thrd = (struct stacklet_thread_s *)rawthrd;
+    thrd->g_source = EMPTY_STACKLET_HANDLE;
+    /* the segment cannot be released before we leave it */
+    thrd->g_dead_segment = thrd->g_current_segment;
+    return thrd->g_target->stack_start;
+}
+
+static void *g_segment_restore_state(void *new_stack_pointer, void *rawthrd)
+{
+    struct stacklet_thread_s *thrd = (struct stacklet_thread_s *)rawthrd;
+    struct stacklet_s *g = thrd->g_target;
+    check_valid(g);
+
+    _check(new_stack_pointer == g->stack_start);
+    if (thrd->g_dead_segment != NULL) {
+        g_release_segment(thrd, thrd->g_dead_segment);
+        thrd->g_dead_segment = NULL;
+    }
+    thrd->g_current_segment = g->segment;
+    g->stack_saved = -13;   /* debugging */
+    free(g);
+    return EMPTY_STACKLET_HANDLE;
+}
+
+/* This saves the current state in 'g_source' and returns the initial
+ * stack pointer of a fresh segment.
+ */
+static void *g_segment_new_save_state(void *old_stack_pointer, void *rawthrd)
+{
+    struct stacklet_thread_s *thrd = (struct stacklet_thread_s *)rawthrd;
+    char *segment = g_alloc_segment(thrd);
+    if (segment == NULL) {
+        thrd->g_source = NULL;
+        return NULL;
+    }
+    if (g_segment_allocate_source(old_stack_pointer, thrd) < 0) {
+        g_release_segment(thrd, segment);
+        return NULL;
+    }
+    thrd->g_new_segment = segment;
+    return g_segment_initial_sp(thrd, segment);
+}
+
+/* Called by slp_switch() in place of a restore_state() function, once
+ * the stack pointer is on the fresh segment.  Calls run() and then
+ * switches to the result; never returns.
+ */
+static void *g_segment_run(void *new_stack_pointer, void *rawthrd)
+{
+    struct stacklet_thread_s *thrd = (struct stacklet_thread_s *)rawthrd;
+    stacklet_run_fn run = thrd->g_run;
+    void *run_arg = thrd->g_run_arg;
+    struct stacklet_s *result;
+
+    thrd->g_current_segment = thrd->g_new_segment;
+    thrd->g_new_segment = NULL;
+    result = run(thrd->g_source, run_arg);
+
+    check_valid(result);
+    thrd->g_target = result;
+    _stacklet_switchstack(g_segment_destroy_state, g_segment_restore_state,
+                          thrd);
+
+    _check_failed("we should not return here");
+    abort();
+}
+
 /************************************************************/
 
 stacklet_thread_handle stacklet_newthread(void)
@@ -295,8 +487,25 @@ stacklet_thread_handle stacklet_newthread(void)
     return thrd;
 }
 
+stacklet_thread_handle stacklet_newthread_segments(long segment_size)
+{
+    struct stacklet_thread_s *thrd = stacklet_newthread();
+#ifndef _WIN32
+    if (thrd != NULL && segment_size > 0) {
+        /* round up, and make sure there is some room above the guard */
+        segment_size = (segment_size + SEGMENT_GUARD_SIZE - 1) &
+                       ~(long)(SEGMENT_GUARD_SIZE - 1);
+        thrd->g_segment_size = segment_size + SEGMENT_GUARD_SIZE;
+    }
+#endif
+    return thrd;
+}
+
 void stacklet_deletethread(stacklet_thread_handle thrd)
 {
+    while (thrd->g_segment_cache_count > 0)
+        _segment_unmap(thrd->g_segment_cache[--thrd->g_segment_cache_count],
+                       thrd->g_segment_size);
     free(thrd);
 }
 
@@ -304,6 +513,12 @@ stacklet_handle stacklet_new(stacklet_thread_handle thrd,
                              stacklet_run_fn run, void *run_arg)
 {
     long stackmarker;
+    if (thrd->g_segment_size > 0) {
+        thrd->g_run = run;
+        thrd->g_run_arg = run_arg;
+        _stacklet_switchstack(g_segment_new_save_state, g_segment_run, thrd);
+        return thrd->g_source;
+    }
     _check((char *)NULL < (char *)&stackmarker);
     if (thrd->g_current_stack_stop <= (char *)&stackmarker)
         thrd->g_current_stack_stop = ((char *)&stackmarker) + 1;
@@ -318,6 +533,12 @@ stacklet_handle stacklet_switch(stacklet_handle target)
     long stackmarker;
     stacklet_thread_handle thrd = target->stack_thrd;
     check_valid(target);
+    if (thrd->g_segment_size > 0) {
+        thrd->g_target = target;
+        _stacklet_switchstack(g_segment_save_state, g_segment_restore_state,
+                              thrd);
+        return thrd->g_source;
+    }
     if (thrd->g_current_stack_stop <= (char *)&stackmarker)
         thrd->g_current_stack_stop = ((char *)&stackmarker) + 1;
 
@@ -329,7 +550,13 @@ stacklet_handle stacklet_switch(stacklet_handle target)
 void stacklet_destroy(stacklet_handle target)
 {
     check_valid(target);
-    if (target->stack_prev != NULL) {
+    if (target->stack_stop == NULL) {
+        /* a stacklet with its own segment: release it directly, without
+           reading 'stack_thrd', which may already be deallocated */
+        if (target->segment != NULL)
+            _segment_unmap(target->segment, target->segment_size);
+    }
+    else if (target->stack_prev != NULL) {
         /* 'target' appears to be in the chained list 'unsaved_stack',
            so remove it from there.  Note that if 'thrd' was already
            deleted, it means that we left the thread and all stacklets
@@ -350,6 +577,31 @@ void stacklet_destroy(stacklet_handle target)
     free(target);
 }
 
+long stacklet_get_stack_size(stacklet_handle target)
+{
+    check_valid(target);
+    if (target->stack_stop == NULL) {
+        if (target->segment == NULL)
+            return 0;    /* the thread's own stack */
+        return (target->segment + target->segment_size) - target->stack_start;
+    }
+    return target->stack_stop - target->stack_start;
+}
+
+char *stacklet_segment_start(stacklet_thread_handle thrd)
+{
+    if (thrd->g_current_segment == NULL)
+        return NULL;
+    return g_segment_initial_sp(thrd, thrd->g_current_segment);
+}
+
+char *stacklet_segment_stop(stacklet_thread_handle thrd)
+{
+    if (thrd->g_current_segment == NULL)
+        return NULL;
+    return thrd->g_current_segment + SEGMENT_GUARD_SIZE;
+}
+
 char **_stacklet_translate_pointer(stacklet_handle context, char **ptr)
 {
   char *p = (char *)ptr;
@@ -357,6 +609,8 @@ char **_stacklet_translate_pointer(stacklet_handle context, char **ptr)
   if (context == NULL)
     return ptr;
   check_valid(context);
+  if (context->stack_stop == NULL)
+    return ptr;     /* stack segments: nothing was moved */
   delta = p - context->stack_start;
   if (((unsigned long)delta) < ((unsigned long)context->stack_saved)) {
       /* a pointer to a saved away word */
@@ -25,6 +25,16 @@ typedef struct stacklet_thread_s *stacklet_thread_handle;
 RPY_EXTERN stacklet_thread_handle stacklet_newthread(void);
 RPY_EXTERN void stacklet_deletethread(stacklet_thread_handle thrd);
 
+/* Like stacklet_newthread(), but the stacklets created in this thread
+ * each run on their own stack segment of 'segment_size' bytes, allocated
+ * with mmap().  Switching then doesn't copy any part of the stack, but
+ * a stacklet that needs more than 'segment_size' bytes of stack crashes.
+ * If 'segment_size' is 0, or on Windows, it is the same as
+ * stacklet_newthread().
+ */
+RPY_EXTERN stacklet_thread_handle stacklet_newthread_segments(
+                                                      long segment_size);
+
 
 /* The "run" function of a stacklet.  The first argument is the handle
  * of the stack from where we come.  When such a function returns, it
@@ -52,6 +62,18 @@ RPY_EXTERN stacklet_handle stacklet_switch(stacklet_handle target);
  */
 RPY_EXTERN void stacklet_destroy(stacklet_handle target);
 
+/* Return the number of bytes of C stack that the suspended stacklet
+ * 'target' keeps for itself: the part copied away or still to be
+ * copied, or the used part of its stack segment.
+ */
+RPY_EXTERN long stacklet_get_stack_size(stacklet_handle target);
+
+/* The range [stop:start] of the stack segment in which the thread is
+ * currently running, or NULL if it is running on its own stack.
+ */
+RPY_EXTERN char *stacklet_segment_start(stacklet_thread_handle thrd);
+RPY_EXTERN char *stacklet_segment_stop(stacklet_thread_handle thrd);
+
 /* stacklet_handle _stacklet_switch_to_copy(stacklet_handle) --- later */
 
 /* Hack: translate a pointer into the stack of a stacklet into a pointer
@@ -52,6 +52,29 @@ void test_simple_switch(void)
 
 /************************************************************/
 
+stacklet_handle deep_callback(stacklet_handle h, void *arg)
+{
+  volatile char buffer[20000];
+  buffer[0] = 42;
+  buffer[sizeof(buffer) - 1] = 43;
+  h = stacklet_switch(h);
+  assert(buffer[0] == 42);
+  assert(buffer[sizeof(buffer) - 1] == 43);
+  return h;
+}
+
+void test_stack_size(void)
+{
+  stacklet_handle h = stacklet_new(thrd, deep_callback, NULL);
+  assert(h != EMPTY_STACKLET_HANDLE);
+  assert(stacklet_get_stack_size(h) >= 20000);
+  assert(stacklet_segment_start(thrd) == NULL);
+  h = stacklet_switch(h);
+  assert(h == EMPTY_STACKLET_HANDLE);
+}
+
+/************************************************************/
+
 static stacklet_handle handles[10];
 static int nextstep, comefrom, gointo;
 static const int statusmax = 5000;
@@ -637,6 +660,7 @@ typedef struct {
 static test_t test_list[] = {
   TEST(test_new),
   TEST(test_simple_switch),
+  TEST(test_stack_size),
   TEST(test_various_depths),
 #if 0
   TEST(test_new_pending),
@@ -666,6 +690,14 @@ int main(int argc, char **argv)
       tst->runtest();
     }
   stacklet_deletethread(thrd);
+
+  thrd = stacklet_newthread_segments(256 * 1024);
+  for (tst=test_list; tst->runtest; tst++)
+    {
+      printf("+++ Running %s with stack segments... +++\n", tst->name);
+      tst->runtest();
+    }
+  stacklet_deletethread(thrd);
   printf("+++ All ok. +++\n");
   return 0;
 }
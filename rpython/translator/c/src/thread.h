@@ -31,6 +31,13 @@ typedef enum RPyLockStatus {
 RPY_EXTERN void RPyGilAllocate(void);
 RPY_EXTERN long RPyGilYieldThread(void);
 RPY_EXTERN void RPyGilAcquireSlowPath(long);
+RPY_EXTERN void RPyGilStatsAcquired(void);
+RPY_EXTERN void RPyGilStatsReleasing(void);
+RPY_EXTERN long *RPyGilFetchStats(long);
+RPY_EXTERN void RPyGilEnableStats(long);
+RPY_EXTERN long RPyGilGetPolicy(void);
+RPY_EXTERN void RPyGilSetPolicy(long);
+RPY_EXTERN long RPyGilWaitingThreads(long);
 #define RPyGilAcquire _RPyGilAcquire
 #define RPyGilRelease _RPyGilRelease
 #define RPyFetchFastGil _RPyFetchFastGil
@@ -41,15 +48,37 @@ RPY_EXTERN void RPyGilAcquireSlowPath(long);
 # define RPY_FASTGIL_LOCKED(x)   (x != 0)
 #endif
 
+/* GIL statistics: an array of 'long' counters, only ever modified by
+   the thread that holds the GIL.  Keep the layout in sync with
+   rpython/rlib/rgil.py.  The counters marked (*) are only updated when
+   'rpy_gil_stats_enabled' is set, because they need work in the inline
+   fast paths below; the others are updated in the slow paths. */
+#define RPY_GIL_STAT_ACQUIRE      0   /* (*) acquisitions, not by the JIT */
+#define RPY_GIL_STAT_CONTENDED    1   /* acquisitions that had to wait */
+#define RPY_GIL_STAT_YIELD        2   /* explicit yields to another thread */
+#define RPY_GIL_STAT_WAIT_US      3   /* total waiting time, microseconds */
+#define RPY_GIL_STAT_HOLD         4   /* (*) measured hold periods */
+#define RPY_GIL_STAT_HOLD_US      5   /* (*) total measured hold time */
+#define RPY_GIL_STAT_WAIT_HIST    6   /* log2 histogram of the wait times */
+#define RPY_GIL_HIST_SIZE         24
+/* (*) log2 histogram of the hold times */
+#define RPY_GIL_STAT_HOLD_HIST    (RPY_GIL_STAT_WAIT_HIST + RPY_GIL_HIST_SIZE)
+#define RPY_GIL_STATS_SIZE        (RPY_GIL_STAT_HOLD_HIST + RPY_GIL_HIST_SIZE)
+
 RPY_EXTERN long rpy_fastgil;
+RPY_EXTERN long rpy_gil_stats_enabled;
 
 static inline void _RPyGilAcquire(void) {
     long old_fastgil = pypy_lock_test_and_set(&rpy_fastgil, 1);
     if (old_fastgil != 0)
         RPyGilAcquireSlowPath(old_fastgil);
+    if (rpy_gil_stats_enabled)
+        RPyGilStatsAcquired();
 }
 static inline void _RPyGilRelease(void) {
     assert(RPY_FASTGIL_LOCKED(rpy_fastgil));
+    if (rpy_gil_stats_enabled)
+        RPyGilStatsReleasing();
     pypy_lock_release(&rpy_fastgil);
 }
 static inline long *_RPyFetchFastGil(void) {
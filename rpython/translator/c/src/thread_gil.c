@@ -47,6 +47,7 @@ static long rpy_waiting_threads = -42;    /* GIL not initialized */
 static volatile int rpy_early_poll_n = 0;
 static mutex1_t mutex_gil_stealer;
 static mutex2_t mutex_gil;
+static long rpy_priority_waiting_threads = 0;   /* see rpy_gil_policy */
 
 
 static void rpy_init_mutexes(void)
@@ -54,6 +55,7 @@ static void rpy_init_mutexes(void)
     mutex1_init(&mutex_gil_stealer);
     mutex2_init_locked(&mutex_gil);
     rpy_waiting_threads = 0;
+    rpy_priority_waiting_threads = 0;
 }
 
 void RPyGilAllocate(void)
@@ -67,6 +69,128 @@ void RPyGilAllocate(void)
     }
 }
 
+/* Statistics.  The counters in 'rpy_gil_stats' are global; the ones in
+   'rpy_gil_thread_stats' are for the current thread only.  Both are
+   only modified by the thread that holds the GIL.
+
+   The contended acquisitions and the yields are counted in the slow
+   paths.  Counting all acquisitions and measuring the hold periods
+   needs a call from the inline RPyGilAcquire/RPyGilRelease, so it is
+   only done if 'rpy_gil_stats_enabled' is set.  A "hold period" is
+   measured only if it starts while other threads are waiting for the
+   GIL, i.e. when it is relevant for contention.  It ends at the next
+   release or yield.
+
+   The JIT releases and reacquires the GIL around external calls with
+   inline code that does not call RPyGilStatsAcquired/Releasing.  A
+   hold period is then seen as extending over such calls.  To avoid
+   charging it to another thread that got the GIL in the meantime,
+   'rpy_gil_hold_owner' records which thread started it: a period
+   started by another thread is dropped instead of recorded.
+*/
+#ifdef _WIN32
+#  define RPY_GIL_THREADLOCAL  __declspec(thread)
+#else
+#  define RPY_GIL_THREADLOCAL  __thread
+#endif
+
+long rpy_gil_stats_enabled = 0;
+static long rpy_gil_stats[RPY_GIL_STATS_SIZE];
+static long long rpy_gil_hold_start = 0;    /* 0: not measuring */
+static long *rpy_gil_hold_owner = NULL;     /* rpy_gil_thread_stats */
+static RPY_GIL_THREADLOCAL long rpy_gil_thread_stats[RPY_GIL_STATS_SIZE];
+
+static long long rpy_gil_clock_us(void)
+{
+    /* a monotonic clock in microseconds, never returning 0 */
+    long long result;
+#ifdef _WIN32
+    static LARGE_INTEGER frequency;
+    LARGE_INTEGER counter;
+    if (frequency.QuadPart == 0)
+        QueryPerformanceFrequency(&frequency);
+    QueryPerformanceCounter(&counter);
+    result = (long long)(counter.QuadPart * 1000000.0 / frequency.QuadPart);
+#elif defined(CLOCK_MONOTONIC)
+    struct timespec t;
+    clock_gettime(CLOCK_MONOTONIC, &t);
+    result = t.tv_sec * 1000000LL + t.tv_nsec / 1000;
+#else
+    struct timeval tv;
+    RPY_GETTIMEOFDAY(&tv);
+    result = tv.tv_sec * 1000000LL + tv.tv_usec;
+#endif
+    return result | 1;
+}
+
+static void rpy_gil_record(long *stats, int index, long long delta)
+{
+    /* 'index' is RPY_GIL_STAT_WAIT_US or RPY_GIL_STAT_HOLD_US.  Bucket
+       0 counts the periods below 1 microsecond, and bucket 'i' the
+       ones between 2**(i-1) and 2**i microseconds. */
+    int bucket = 0;
+    int hist = (index == RPY_GIL_STAT_WAIT_US ? RPY_GIL_STAT_WAIT_HIST
+                                              : RPY_GIL_STAT_HOLD_HIST);
+    stats[index] += (long)delta;
+    while (delta > 0 && bucket < RPY_GIL_HIST_SIZE - 1) {
+        delta >>= 1;
+        bucket++;
+    }
+    stats[hist + bucket]++;
+}
+
+static void rpy_gil_start_hold(long long now)
+{
+    rpy_gil_hold_start = now;
+    rpy_gil_hold_owner = rpy_gil_thread_stats;
+}
+
+static void rpy_gil_end_hold(void)
+{
+    long long delta;
+    if (rpy_gil_hold_owner != rpy_gil_thread_stats) {
+        /* started by another thread, which the JIT let go without
+           calling RPyGilStatsReleasing() */
+        rpy_gil_hold_start = 0;
+        return;
+    }
+    delta = rpy_gil_clock_us() - rpy_gil_hold_start;
+    rpy_gil_hold_start = 0;
+    rpy_gil_stats[RPY_GIL_STAT_HOLD]++;
+    rpy_gil_record(rpy_gil_stats, RPY_GIL_STAT_HOLD_US, delta);
+    rpy_gil_thread_stats[RPY_GIL_STAT_HOLD]++;
+    rpy_gil_record(rpy_gil_thread_stats, RPY_GIL_STAT_HOLD_US, delta);
+}
+
+void RPyGilStatsAcquired(void)
+{
+    /* called by RPyGilAcquire, with the GIL, if rpy_gil_stats_enabled */
+    rpy_gil_stats[RPY_GIL_STAT_ACQUIRE]++;
+    if (rpy_gil_hold_owner != rpy_gil_thread_stats)
+        rpy_gil_hold_start = 0;    /* stale, or not measuring anyway */
+    if (rpy_waiting_threads > 0 && rpy_gil_hold_start == 0)
+        rpy_gil_start_hold(rpy_gil_clock_us());
+}
+
+void RPyGilStatsReleasing(void)
+{
+    /* called by RPyGilRelease, with the GIL, if rpy_gil_stats_enabled */
+    if (rpy_gil_hold_start != 0)
+        rpy_gil_end_hold();
+}
+
+long *RPyGilFetchStats(long per_thread)
+{
+    return per_thread ? rpy_gil_thread_stats : rpy_gil_stats;
+}
+
+void RPyGilEnableStats(long enabled)
+{
+    /* called with the GIL */
+    rpy_gil_stats_enabled = enabled;
+    rpy_gil_hold_start = 0;
+}
+
 static void check_and_save_old_fastgil(long old_fastgil)
 {
     assert(RPY_FASTGIL_LOCKED(rpy_fastgil));
@@ -91,7 +215,51 @@ static void check_and_save_old_fastgil(long old_fastgil)
 #define RPY_GIL_POKE_MIN   40
 #define RPY_GIL_POKE_MAX  400
 
-void RPyGilAcquireSlowPath(long old_fastgil)
+/* The handoff policy.  With RPY_GIL_POLICY_IO, the threads that come
+   back from an external call (typically a blocking I/O operation) get
+   the GIL before the threads that explicitly yielded it from
+   RPyGilYieldThread() (typically CPU-bound ones).  A yielding thread
+   steps aside at most RPY_GIL_MAX_DEFER times in a row, so that it is
+   not starved either.
+*/
+#define RPY_GIL_POLICY_FAIR   0
+#define RPY_GIL_POLICY_IO     1
+#define RPY_GIL_MAX_DEFER     50
+
+static long rpy_gil_policy = RPY_GIL_POLICY_FAIR;
+
+long RPyGilGetPolicy(void)
+{
+    return rpy_gil_policy;
+}
+
+void RPyGilSetPolicy(long policy)
+{
+    rpy_gil_policy = policy;
+}
+
+long RPyGilWaitingThreads(long priority_only)
+{
+    /* approximate: read without synchronization */
+    long result = priority_only ? rpy_priority_waiting_threads
+                                : rpy_waiting_threads;
+    return result > 0 ? result : 0;
+}
+
+static void rpy_gil_step_aside(void)
+{
+    /* sleep very shortly, to let another thread take 'mutex_gil_stealer' */
+#ifdef _WIN32
+    Sleep(0);
+#else
+    struct timespec t;
+    t.tv_sec = 0;
+    t.tv_nsec = 20000;    /* 20 microseconds */
+    nanosleep(&t, NULL);
+#endif
+}
+
+static void rpy_gil_acquire_slow_path(long old_fastgil, int low_priority)
 {
     /* Acquires the GIL.  This assumes that we already did:
 
@@ -106,6 +274,8 @@ void RPyGilAcquireSlowPath(long old_fastgil)
         /* Otherwise, another thread is busy with the GIL. */
         int n;
         long old_waiting_threads;
+        long long wait_start = rpy_gil_clock_us(), now;
+        int priority = (rpy_gil_policy == RPY_GIL_POLICY_IO);
 
         if (rpy_waiting_threads < 0) {
             /* <arigo> I tried to have RPyGilAllocate() called from
@@ -126,6 +296,8 @@ void RPyGilAcquireSlowPath(long old_fastgil)
            for the GIL.  The number of such threads is found in
            rpy_waiting_threads. */
         old_waiting_threads = atomic_increment(&rpy_waiting_threads);
+        if (priority && !low_priority)
+            atomic_increment(&rpy_priority_waiting_threads);
 
         /* Early polling: before entering the waiting queue, we check
            a certain number of times if the GIL becomes free.  The
@@ -145,6 +317,8 @@ void RPyGilAcquireSlowPath(long old_fastgil)
         while (n >= RPY_GIL_POKE_MAX)
             n -= (RPY_GIL_POKE_MAX - RPY_GIL_POKE_MIN);
         rpy_early_poll_n = n;
+        if (priority && low_priority)
+            n = -1;     /* no early polling for the yielding thread */
         while (n >= 0) {
             n--;
             if (old_waiting_threads != rpy_waiting_threads) {
@@ -181,6 +355,17 @@ void RPyGilAcquireSlowPath(long old_fastgil)
            a round-robin chance.
         */
         mutex1_lock(&mutex_gil_stealer);
+        if (priority && low_priority) {
+            /* Let the threads coming back from external calls become
+               the stealer first. */
+            n = RPY_GIL_MAX_DEFER;
+            while (rpy_priority_waiting_threads > 0 && n > 0) {
+                n--;
+                mutex1_unlock(&mutex_gil_stealer);
+                rpy_gil_step_aside();
+                mutex1_lock(&mutex_gil_stealer);
+            }
+        }
         mutex2_loop_start(&mutex_gil);
 
         /* We are now the stealer thread.  Steals! */
@@ -207,12 +392,29 @@ void RPyGilAcquireSlowPath(long old_fastgil)
             /* Loop back. */
         }
         atomic_decrement(&rpy_waiting_threads);
+        if (priority && !low_priority)
+            atomic_decrement(&rpy_priority_waiting_threads);
         mutex2_loop_stop(&mutex_gil);
         mutex1_unlock(&mutex_gil_stealer);
+
+        /* We hold the GIL now, so we can update the statistics */
+        now = rpy_gil_clock_us();
+        rpy_gil_stats[RPY_GIL_STAT_CONTENDED]++;
+        rpy_gil_record(rpy_gil_stats, RPY_GIL_STAT_WAIT_US, now - wait_start);
+        rpy_gil_thread_stats[RPY_GIL_STAT_CONTENDED]++;
+        rpy_gil_record(rpy_gil_thread_stats, RPY_GIL_STAT_WAIT_US,
+                       now - wait_start);
+        if (rpy_gil_stats_enabled)
+            rpy_gil_start_hold(now);
     }
     check_and_save_old_fastgil(old_fastgil);
 }
 
+void RPyGilAcquireSlowPath(long old_fastgil)
+{
+    rpy_gil_acquire_slow_path(old_fastgil, 0);
+}
+
 long RPyGilYieldThread(void)
 {
     /* can be called even before RPyGilAllocate(), but in this case,
@@ -221,6 +423,11 @@ long RPyGilYieldThread(void)
     if (rpy_waiting_threads <= 0)
         return 0;
 
+    rpy_gil_stats[RPY_GIL_STAT_YIELD]++;
+    rpy_gil_thread_stats[RPY_GIL_STAT_YIELD]++;
+    if (rpy_gil_hold_start != 0)
+        rpy_gil_end_hold();
+
     /* Explicitly release the 'mutex_gil'.
      */
     mutex2_unlock(&mutex_gil);
@@ -231,8 +438,11 @@ long RPyGilYieldThread(void)
        If there is no other waiting thread, it will fall through both
        its mutex_lock() and mutex_lock_timeout() now.  But that's
        unlikely, because we tested above that 'rpy_waiting_threads > 0'.
+       This is the same as RPyGilAcquire(), but with a low priority.
      */
-    RPyGilAcquire();
+    rpy_gil_acquire_slow_path(pypy_lock_test_and_set(&rpy_fastgil, 1), 1);
+    if (rpy_gil_stats_enabled)
+        rpy_gil_stats[RPY_GIL_STAT_ACQUIRE]++;
     return 1;
 }
 
@@ -250,7 +250,34 @@ def entry_point(argv):
     _time = time() - t
     sumTime += _time
     print "v = v + v", _time
-    
+
+    t = time()
+    v4 = rbigint.pow(rbigint.fromint(7), rbigint.fromint(100000))
+    for n in xrange(20):
+        v4.str()
+
+    _time = time() - t
+    sumTime += _time
+    print "str(7**100000)", _time
+
+    t = time()
+    s4 = v4.str()
+    for n in xrange(20):
+        rbigint.fromdecimalstr(s4)
+
+    _time = time() - t
+    sumTime += _time
+    print "long(str(7**100000))", _time
+
+    t = time()
+    v5 = rbigint.pow(rbigint.fromint(3), rbigint.fromint(100000))
+    for n in xrange(20):
+        rbigint.divmod(v4, v5)
+
+    _time = time() - t
+    sumTime += _time
+    print "divmod(7**100000, 3**100000)", _time
+
     print "Sum: ", sumTime
     
     return 0